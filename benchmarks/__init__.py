@@ -0,0 +1,3 @@
+"""
+Suite de benchmarks: servidores simulados de las APIs y generadores de carga
+"""
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DE ARRANQUE - Coste de importar la fachada, la CLI y la web
+
+Lanza un intérprete nuevo con `python -X importtime` por cada escenario y
+resume el tiempo acumulado de importación y los módulos cargados. Sirve
+para detectar regresiones: un import pesado que vuelve a cargarse al
+importar la fachada (requests, colorama, los proveedores...) aparece aquí.
+
+Ejemplo:
+    python -m benchmarks.arranque --repeticiones 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Añadir el directorio raíz al path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+# Intérprete vacío: lo que cuesta arrancar Python (site, .pth...) sin la aplicación
+BASE = "pass"
+
+# nombre -> código a ejecutar en el intérprete nuevo
+ESCENARIOS = {
+    'fachada': "import src.facade.informacion_facade",
+    'fachada_creada': "from src.facade.informacion_facade import FachadaInformacionCiudad; FachadaInformacionCiudad()",
+    'lotes': "import procesamiento_lotes",
+    'web': "import web_app"
+}
+
+
+def parsear_importtime(salida: str) -> Dict[str, tuple]:
+    """
+    Interpreta la salida de -X importtime
+
+    Returns:
+        {módulo: (µs propios, µs acumulados)}
+    """
+    modulos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos[nombre.strip()] = (int(propio), int(acumulado))
+    return modulos
+
+
+def medir(codigo: str, repeticiones: int = 3) -> dict:
+    """
+    Ejecuta `codigo` en intérpretes nuevos y mide sus importaciones
+
+    Returns:
+        {'total_ms': menor suma de µs propios entre repeticiones (en ms, incluye el arranque de Python),
+         'modulos': módulos importados, 'mas_costosos': [(módulo, ms propios)]}
+    """
+    mejor = None
+    for _ in range(max(1, repeticiones)):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', codigo],
+            cwd=RAIZ, capture_output=True, text=True, timeout=120,
+            env={**os.environ, 'WARMUP_CITIES': '', 'CACHE_SNAPSHOT_FILE': ''}
+        )
+        if proceso.returncode != 0:
+            raise RuntimeError(f"Fallo ejecutando {codigo!r}: {proceso.stderr[-500:]}")
+        modulos = parsear_importtime(proceso.stderr)
+        total = sum(propio for propio, _ in modulos.values())
+        if mejor is None or total < mejor[0]:
+            mejor = (total, modulos)
+    total, modulos = mejor
+    mas_costosos = sorted(modulos.items(), key=lambda m: -m[1][0])[:10]
+    return {
+        'total_ms': round(total / 1000, 2),
+        'modulos': set(modulos),
+        'mas_costosos': [(nombre, round(propio / 1000, 2)) for nombre, (propio, _) in mas_costosos]
+    }
+
+
+def ejecutar(escenarios: Optional[List[str]] = None, repeticiones: int = 3) -> dict:
+    """
+    Mide los escenarios indicados (por defecto todos)
+
+    Cada resultado incluye 'neto_ms' y 'modulos_propios': lo que añade el
+    escenario sobre un intérprete vacío.
+    """
+    base = medir(BASE, repeticiones)
+    resultados = {}
+    for nombre in (escenarios or ESCENARIOS):
+        resultado = medir(ESCENARIOS[nombre], repeticiones)
+        resultado['neto_ms'] = round(max(0.0, resultado['total_ms'] - base['total_ms']), 2)
+        resultado['modulos_propios'] = resultado['modulos'] - base['modulos']
+        resultados[nombre] = resultado
+    return resultados
+
+
+def main(argumentos: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación de la fachada, la CLI y la web")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--escenario', action='append', choices=sorted(ESCENARIOS))
+    args = parser.parse_args(argumentos)
+
+    for nombre, resultado in ejecutar(args.escenario, args.repeticiones).items():
+        print(f"\n{nombre}: {resultado['neto_ms']} ms y {len(resultado['modulos_propios'])} módulos "
+              f"sobre el intérprete vacío")
+        for modulo, ms in resultado['mas_costosos'][:5]:
+            print(f"   {ms:>8.2f} ms  {modulo}")
+
+
+if __name__ == '__main__':
+    main()
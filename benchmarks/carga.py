@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DE CARGA - Fachada y API web
+
+Lanza peticiones concurrentes contra FachadaInformacionCiudad o contra
+POST /api/consultar usando los servidores simulados, mide latencias y guarda
+un informe JSON (p50/p95/p99, RPS, errores) para comparar entre commits.
+
+Ejemplos:
+    python -m benchmarks.carga --escenario facade --concurrencia 8 --peticiones 200
+    python -m benchmarks.carga --escenario web --latencia-ms 50 --tasa-error 0.05
+    python -m benchmarks.carga --escenario facade --comparar benchmarks/resultados/base.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import requests
+
+# Añadir el directorio raíz al path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado, apuntar_facade
+
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+
+CIUDADES_POR_DEFECTO = [
+    'Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Bogota', 'Lima',
+    'Buenos Aires', 'Santiago', 'Quito', 'Montevideo', 'Guadalajara', 'Caracas'
+]
+
+
+def percentil(valores_ordenados: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, math.ceil(p / 100.0 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def resumir(latencias: List[float], errores: int, duracion: float) -> dict:
+    """Calcula las métricas del informe a partir de latencias en segundos"""
+    ordenadas = sorted(latencias)
+    total = len(ordenadas)
+    return {
+        'peticiones': total,
+        'errores': errores,
+        'duracion_s': round(duracion, 3),
+        'rps': round(total / duracion, 2) if duracion > 0 else 0.0,
+        'media_ms': round(sum(ordenadas) / total * 1000, 2) if total else 0.0,
+        'p50_ms': round(percentil(ordenadas, 50) * 1000, 2),
+        'p95_ms': round(percentil(ordenadas, 95) * 1000, 2),
+        'p99_ms': round(percentil(ordenadas, 99) * 1000, 2),
+        'max_ms': round(ordenadas[-1] * 1000, 2) if total else 0.0
+    }
+
+
+def ejecutar_carga(operacion: Callable[[str], bool], ciudades: List[str],
+                   peticiones: int, concurrencia: int) -> dict:
+    """
+    Ejecuta la operación `peticiones` veces con `concurrencia` hilos
+
+    Args:
+        operacion: Función que recibe una ciudad y devuelve True si tuvo éxito
+        ciudades: Ciudades a usar en rotación
+        peticiones: Número total de llamadas
+        concurrencia: Número de hilos simultáneos
+
+    Returns:
+        Diccionario con las métricas (ver resumir)
+    """
+    latencias = []
+    errores = 0
+    lock = threading.Lock()
+
+    def una_peticion(i: int):
+        nonlocal errores
+        ciudad = ciudades[i % len(ciudades)]
+        inicio = time.perf_counter()
+        try:
+            ok = operacion(ciudad)
+        except Exception:
+            ok = False
+        transcurrido = time.perf_counter() - inicio
+        with lock:
+            latencias.append(transcurrido)
+            if not ok:
+                errores += 1
+
+    inicio_total = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+        list(executor.map(una_peticion, range(peticiones)))
+    return resumir(latencias, errores, time.perf_counter() - inicio_total)
+
+
+def operacion_facade(base_url: str) -> Callable[[str], bool]:
+    """Crea una operación que llama directamente a la fachada"""
+    from src.facade.informacion_facade import FachadaInformacionCiudad
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        facade = FachadaInformacionCiudad()
+    apuntar_facade(facade, base_url)
+
+    def operacion(ciudad: str) -> bool:
+        resultado = facade.obtener_informacion_completa(ciudad)
+        return not resultado.tiene_errores()
+
+    return operacion
+
+
+@contextlib.contextmanager
+def servidor_web(base_url: str):
+    """Arranca web_app en un servidor WSGI local apuntando a las APIs simuladas"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class ManejadorSilencioso(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import web_app
+    apuntar_facade(web_app.facade, base_url)
+
+    servidor = make_server('127.0.0.1', 0, web_app.app, threaded=True, request_handler=ManejadorSilencioso)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_port}"
+    finally:
+        servidor.shutdown()
+
+
+def operacion_web(url_app: str) -> Callable[[str], bool]:
+    """Crea una operación que llama a POST /api/consultar"""
+    sesion_local = threading.local()
+
+    def operacion(ciudad: str) -> bool:
+        if not hasattr(sesion_local, 'sesion'):
+            sesion_local.sesion = requests.Session()
+        respuesta = sesion_local.sesion.post(f"{url_app}/api/consultar", json={'ciudad': ciudad}, timeout=60)
+        return respuesta.status_code == 200 and not respuesta.json().get('errores')
+
+    return operacion
+
+
+def commit_actual() -> Optional[str]:
+    """Hash del commit actual (None si no es un repositorio git)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar_escenario(escenario: str, peticiones: int = 100, concurrencia: int = 4,
+                       configuracion: ConfiguracionSimulada = None,
+                       ciudades: Optional[List[str]] = None) -> dict:
+    """
+    Ejecuta un escenario completo ('facade' o 'web') contra el servidor simulado
+
+    Returns:
+        Informe con metadatos y métricas
+    """
+    configuracion = configuracion or ConfiguracionSimulada()
+    ciudades = ciudades or CIUDADES_POR_DEFECTO
+
+    with ServidorSimulado(configuracion) as servidor:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if escenario == 'facade':
+                metricas = ejecutar_carga(operacion_facade(servidor.url), ciudades, peticiones, concurrencia)
+            elif escenario == 'web':
+                with servidor_web(servidor.url) as url_app:
+                    metricas = ejecutar_carga(operacion_web(url_app), ciudades, peticiones, concurrencia)
+            else:
+                raise ValueError(f"Escenario desconocido: {escenario}")
+
+    return {
+        'escenario': escenario,
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {
+            'peticiones': peticiones,
+            'concurrencia': concurrencia,
+            'latencia_ms': configuracion.latencia_ms,
+            'variacion_ms': configuracion.variacion_ms,
+            'tasa_error': configuracion.tasa_error
+        },
+        'upstream': {
+            'peticiones': configuracion.peticiones,
+            'errores_inyectados': configuracion.errores
+        },
+        'metricas': metricas
+    }
+
+
+def guardar_informe(informe: dict, directorio: str = DIRECTORIO_RESULTADOS) -> str:
+    """Guarda el informe como JSON y devuelve la ruta"""
+    os.makedirs(directorio, exist_ok=True)
+    marca = informe['fecha'].replace(':', '').replace('-', '')
+    nombre = f"{informe['escenario']}-{informe['commit'] or 'local'}-{marca}.json"
+    ruta = os.path.join(directorio, nombre)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    return ruta
+
+
+def comparar(base: dict, nuevo: dict) -> dict:
+    """Variación porcentual de cada métrica respecto al informe base"""
+    diferencias = {}
+    for metrica in ('p50_ms', 'p95_ms', 'p99_ms', 'media_ms', 'rps'):
+        anterior = base['metricas'].get(metrica, 0)
+        actual = nuevo['metricas'].get(metrica, 0)
+        cambio = ((actual - anterior) / anterior * 100) if anterior else 0.0
+        diferencias[metrica] = {'base': anterior, 'actual': actual, 'cambio_pct': round(cambio, 1)}
+    return diferencias
+
+
+def main(argumentos: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga del patrón Facade")
+    parser.add_argument('--escenario', choices=['facade', 'web'], default='facade')
+    parser.add_argument('--peticiones', type=int, default=100)
+    parser.add_argument('--concurrencia', type=int, default=4)
+    parser.add_argument('--latencia-ms', type=float, default=20.0, help="Latencia base de las APIs simuladas")
+    parser.add_argument('--variacion-ms', type=float, default=10.0, help="Variación aleatoria añadida")
+    parser.add_argument('--tasa-error', type=float, default=0.0, help="Fracción de respuestas con error")
+    parser.add_argument('--codigo-error', type=int, default=500)
+    parser.add_argument('--comparar', help="Informe JSON base con el que comparar")
+    parser.add_argument('--salida', default=DIRECTORIO_RESULTADOS, help="Directorio de informes")
+    args = parser.parse_args(argumentos)
+
+    configuracion = ConfiguracionSimulada(
+        latencia_ms=args.latencia_ms,
+        variacion_ms=args.variacion_ms,
+        tasa_error=args.tasa_error,
+        codigo_error=args.codigo_error
+    )
+    informe = ejecutar_escenario(args.escenario, args.peticiones, args.concurrencia, configuracion)
+    ruta = guardar_informe(informe, args.salida)
+
+    metricas = informe['metricas']
+    print(f"Escenario: {args.escenario} (concurrencia {args.concurrencia}, {args.peticiones} peticiones)")
+    print(f"   RPS: {metricas['rps']}")
+    print(f"   p50: {metricas['p50_ms']} ms | p95: {metricas['p95_ms']} ms | p99: {metricas['p99_ms']} ms")
+    print(f"   Errores: {metricas['errores']}")
+    print(f"Informe guardado en: {ruta}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        print(f"\nComparación con {args.comparar}:")
+        for metrica, valores in comparar(base, informe).items():
+            print(f"   {metrica}: {valores['base']} -> {valores['actual']} ({valores['cambio_pct']:+}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DE DECODIFICACIÓN - Coste de parsear cada respuesta de las APIs
+
+Mide el tiempo medio (µs) de decodificar y extraer los campos usados de cada
+tipo de respuesta, con json de la biblioteca estándar y con orjson si está
+instalado, y compara la respuesta completa de REST Countries con la pedida
+con ?fields=.
+
+Ejemplo:
+    python -m benchmarks.decodificacion --repeticiones 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Añadir el directorio raíz al path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+from benchmarks.servidores_simulados import (
+    respuesta_forecast, respuesta_geocoding, respuesta_item, respuesta_pais
+)
+from src.providers.noticias_provider import NoticiasProvider
+from src.providers.pais_provider import PaisProvider
+from src.utils import decodificacion
+from src.utils.decodificacion import proyectar
+
+
+def cargas_de_prueba() -> Dict[str, tuple]:
+    """nombre -> (cuerpo en bytes, campos a extraer o None)"""
+    pais = respuesta_pais('Spain')
+    pais_filtrado = [{c: p[c] for c in PaisProvider.CAMPOS if c in p} for p in pais]
+    return {
+        'geocoding': (json.dumps(respuesta_geocoding('Madrid')).encode('utf-8'), None),
+        'forecast': (json.dumps(respuesta_forecast('40.4', '-3.7')).encode('utf-8'), ('current',)),
+        'hn_item': (json.dumps(respuesta_item(8863)).encode('utf-8'), NoticiasProvider.CAMPOS_HISTORIA),
+        'pais_completo': (json.dumps(pais).encode('utf-8'), PaisProvider.CAMPOS),
+        'pais_fields': (json.dumps(pais_filtrado).encode('utf-8'), PaisProvider.CAMPOS)
+    }
+
+
+def decodificadores() -> Dict[str, Callable]:
+    """Parsers disponibles en este entorno"""
+    disponibles = {'json': json.loads}
+    if decodificacion.orjson is not None:
+        disponibles['orjson'] = decodificacion.orjson.loads
+    return disponibles
+
+
+def medir(cuerpo: bytes, campos, decodificar: Callable, repeticiones: int) -> float:
+    """Microsegundos medios por respuesta (decodificar + proyectar)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        data = decodificar(cuerpo)
+        if campos is not None:
+            proyectar(data, campos)
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def ejecutar(repeticiones: int = 5000) -> dict:
+    """
+    Mide todas las cargas con todos los parsers disponibles
+
+    Returns:
+        {carga: {'bytes': n, '<parser>_us': µs, ...}}
+    """
+    resultados = {}
+    parsers = decodificadores()
+    for nombre, (cuerpo, campos) in cargas_de_prueba().items():
+        fila = {'bytes': len(cuerpo)}
+        for nombre_parser, decodificar in parsers.items():
+            fila[f"{nombre_parser}_us"] = round(medir(cuerpo, campos, decodificar, repeticiones), 3)
+        resultados[nombre] = fila
+    return resultados
+
+
+def main(argumentos: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Coste de decodificación de las respuestas de las APIs")
+    parser.add_argument('--repeticiones', type=int, default=5000)
+    args = parser.parse_args(argumentos)
+
+    resultados = ejecutar(args.repeticiones)
+    parsers = list(decodificadores())
+    print(f"{'carga':<15}{'bytes':>8}" + ''.join(f"{p + ' µs':>12}" for p in parsers))
+    for nombre, fila in resultados.items():
+        print(f"{nombre:<15}{fila['bytes']:>8}" + ''.join(f"{fila[p + '_us']:>12}" for p in parsers))
+
+
+if __name__ == '__main__':
+    main()
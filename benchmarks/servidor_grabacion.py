@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+SERVIDOR DE GRABACIÓN / REPRODUCCIÓN de las APIs externas
+
+En modo 'grabar' actúa como proxy hacia las APIs reales y guarda cada
+respuesta (estado, cuerpo y latencia) en un directorio de grabaciones.
+En modo 'reproducir' sirve esas respuestas sin red, respetando la latencia
+grabada (multiplicada por un factor), para que los tests de rendimiento y
+la CI sean deterministas.
+
+Las rutas locales llevan un prefijo por API:
+    /geocoding/...  -> https://geocoding-api.open-meteo.com
+    /meteo/...      -> https://api.open-meteo.com
+    /hn/...         -> https://hacker-news.firebaseio.com
+    /paises/...     -> https://restcountries.com
+    /aire/...       -> https://air-quality-api.open-meteo.com
+    /cambio/...     -> https://open.er-api.com
+
+Ejemplo:
+    python -m benchmarks.servidor_grabacion --modo grabar --directorio grabaciones --puerto 8765
+    # exportar las variables que imprime y ejecutar la aplicación una vez
+    python -m benchmarks.servidor_grabacion --modo reproducir --directorio grabaciones --puerto 8765
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+UPSTREAMS_REALES = {
+    'geocoding': 'https://geocoding-api.open-meteo.com',
+    'meteo': 'https://api.open-meteo.com',
+    'hn': 'https://hacker-news.firebaseio.com',
+    'paises': 'https://restcountries.com',
+    'aire': 'https://air-quality-api.open-meteo.com',
+    'cambio': 'https://open.er-api.com',
+    'archivo': 'https://archive-api.open-meteo.com'
+}
+
+MODOS = ('grabar', 'reproducir')
+
+
+def urls_para(base_url: str) -> Dict[str, str]:
+    """Variables de entorno de Config que apuntan las APIs a este servidor"""
+    return {
+        'OPEN_METEO_GEOCODING_URL': f"{base_url}/geocoding/v1/search",
+        'OPEN_METEO_WEATHER_URL': f"{base_url}/meteo/v1/forecast",
+        'HACKER_NEWS_API_BASE_URL': f"{base_url}/hn/v0",
+        'COUNTRIES_API_BASE_URL': f"{base_url}/paises/v3.1/name",
+        'OPEN_METEO_AIR_QUALITY_URL': f"{base_url}/aire/v1/air-quality",
+        'EXCHANGE_RATES_URL': f"{base_url}/cambio/v6/latest",
+        'OPEN_METEO_ARCHIVE_URL': f"{base_url}/archivo/v1/archive"
+    }
+
+
+def clave_peticion(ruta: str, consulta: str) -> str:
+    """Clave estable de una petición (parámetros ordenados)"""
+    parametros = urlencode(sorted(parse_qsl(consulta, keep_blank_values=True)))
+    canonica = f"GET {ruta}?{parametros}"
+    return hashlib.sha1(canonica.encode('utf-8')).hexdigest()
+
+
+class AlmacenGrabaciones:
+    """Grabaciones en disco: un archivo JSON por petición"""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self._cache: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def obtener(self, clave: str) -> Optional[dict]:
+        with self._lock:
+            if clave in self._cache:
+                return self._cache[clave]
+        ruta = self._ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, encoding='utf-8') as archivo:
+            grabacion = json.load(archivo)
+        with self._lock:
+            self._cache[clave] = grabacion
+        return grabacion
+
+    def guardar(self, clave: str, grabacion: dict):
+        temporal = f"{self._ruta(clave)}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(grabacion, archivo, ensure_ascii=False, indent=1)
+        os.replace(temporal, self._ruta(clave))
+        with self._lock:
+            self._cache[clave] = grabacion
+
+
+class _ManejadorGrabacion(BaseHTTPRequestHandler):
+    """Graba o reproduce según el modo del servidor"""
+
+    servidor_grabacion: 'ServidorGrabacion' = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        clave = clave_peticion(url.path, url.query)
+        servidor = self.servidor_grabacion
+
+        if servidor.modo == 'reproducir':
+            grabacion = servidor.almacen.obtener(clave)
+            if grabacion is None:
+                self._responder(404, 'application/json',
+                                json.dumps({'error': f'petición no grabada: {self.path}'}).encode('utf-8'))
+                return
+            retardo = grabacion.get('latencia_ms', 0) / 1000.0 * servidor.factor_latencia
+            if retardo:
+                time.sleep(retardo)
+            self._responder(grabacion['estado'], grabacion['content_type'], grabacion['cuerpo'].encode('utf-8'))
+            return
+
+        prefijo, _, resto = url.path.lstrip('/').partition('/')
+        destino = servidor.upstreams.get(prefijo)
+        if destino is None:
+            self._responder(404, 'application/json',
+                            json.dumps({'error': f'API desconocida: {prefijo}'}).encode('utf-8'))
+            return
+
+        inicio = time.perf_counter()
+        try:
+            respuesta = requests.get(f"{destino}/{resto}", params=parse_qsl(url.query), timeout=servidor.timeout)
+        except requests.RequestException as e:
+            self._responder(502, 'application/json', json.dumps({'error': str(e)}).encode('utf-8'))
+            return
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+
+        content_type = respuesta.headers.get('Content-Type', 'application/json')
+        servidor.almacen.guardar(clave, {
+            'ruta': url.path,
+            'consulta': url.query,
+            'estado': respuesta.status_code,
+            'content_type': content_type,
+            'latencia_ms': round(latencia_ms, 2),
+            'cuerpo': respuesta.text
+        })
+        self._responder(respuesta.status_code, content_type, respuesta.content)
+
+    def _responder(self, codigo: int, content_type: str, cuerpo: bytes):
+        self.send_response(codigo)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+class ServidorGrabacion:
+    """Servidor de grabación/reproducción en un hilo propio"""
+
+    def __init__(self, directorio: str, modo: str = 'reproducir', host: str = '127.0.0.1',
+                 puerto: int = 0, upstreams: Optional[Dict[str, str]] = None,
+                 factor_latencia: float = 1.0, timeout: int = 10):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido: {modo} (usar {', '.join(MODOS)})")
+        self.modo = modo
+        self.almacen = AlmacenGrabaciones(directorio)
+        self.upstreams = upstreams or UPSTREAMS_REALES
+        self.factor_latencia = factor_latencia
+        self.timeout = timeout
+
+        manejador = type('Manejador', (_ManejadorGrabacion,), {'servidor_grabacion': self})
+        self._servidor = ThreadingHTTPServer((host, puerto), manejador)
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self) -> 'ServidorGrabacion':
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="servidor-grabacion", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def servir_siempre(self):
+        self._servidor.serve_forever()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba y reproduce las respuestas de las APIs externas")
+    parser.add_argument('--modo', choices=MODOS, default='reproducir')
+    parser.add_argument('--directorio', default='grabaciones', help="Directorio de grabaciones")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--factor-latencia', type=float, default=1.0,
+                        help="Multiplicador de la latencia grabada al reproducir (0 = sin espera)")
+    args = parser.parse_args()
+
+    servidor = ServidorGrabacion(args.directorio, args.modo, args.host, args.puerto,
+                                 factor_latencia=args.factor_latencia)
+    print(f"Servidor en modo '{args.modo}' escuchando en {servidor.url}")
+    print("Variables de entorno para apuntar la aplicación a este servidor:")
+    for nombre, valor in urls_para(servidor.url).items():
+        print(f"   export {nombre}={valor}")
+    try:
+        servidor.servir_siempre()
+    except KeyboardInterrupt:
+        print("\nServidor detenido.")
+
+
+if __name__ == '__main__':
+    main()
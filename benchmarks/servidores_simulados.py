@@ -0,0 +1,297 @@
+"""
+Servidores locales que imitan las APIs externas para pruebas de carga
+
+Un único servidor HTTP responde a las rutas de Open-Meteo (geocoding,
+forecast, archivo y calidad del aire), Hacker News, REST Countries y
+ExchangeRate-API con datos deterministas. Permite
+inyectar latencia (fija + variación aleatoria) y una tasa de errores HTTP.
+"""
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class ConfiguracionSimulada:
+    """Parámetros de comportamiento del servidor simulado"""
+
+    def __init__(self, latencia_ms: float = 0.0, variacion_ms: float = 0.0,
+                 tasa_error: float = 0.0, codigo_error: int = 500, semilla: int = 42):
+        self.latencia_ms = latencia_ms
+        self.variacion_ms = variacion_ms
+        self.tasa_error = tasa_error
+        self.codigo_error = codigo_error
+        self._random = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.peticiones = 0
+        self.errores = 0
+
+    def siguiente(self):
+        """Devuelve (retardo en segundos, si se debe responder con error)"""
+        with self._lock:
+            self.peticiones += 1
+            retardo = self.latencia_ms + self._random.uniform(0, self.variacion_ms)
+            fallar = self._random.random() < self.tasa_error
+            if fallar:
+                self.errores += 1
+        return retardo / 1000.0, fallar
+
+
+def _numero(texto: str) -> int:
+    """Hash estable (no depende de PYTHONHASHSEED)"""
+    return zlib.crc32(texto.lower().encode('utf-8'))
+
+
+def respuesta_geocoding(nombre: str) -> dict:
+    n = _numero(nombre)
+    return {
+        'results': [{
+            'name': nombre.title(),
+            'latitude': round((n % 18000) / 100.0 - 90, 4),
+            'longitude': round((n // 18000 % 36000) / 100.0 - 180, 4),
+            'country': 'Simulado',
+            'population': n % 5000000
+        }]
+    }
+
+
+def respuesta_forecast(latitud: str, longitud: str) -> dict:
+    n = _numero(f"{latitud},{longitud}")
+    ahora = int(time.time())
+    return {
+        'latitude': float(latitud or 0),
+        'longitude': float(longitud or 0),
+        'utc_offset_seconds': 0,
+        'current': {
+            'time': datetime.fromtimestamp(ahora - ahora % 900, timezone.utc).strftime('%Y-%m-%dT%H:%M'),
+            'temperature_2m': (n % 400) / 10.0 - 5,
+            'relative_humidity_2m': n % 100,
+            'apparent_temperature': (n % 380) / 10.0 - 5,
+            'weather_code': (0, 1, 2, 3, 61, 95)[n % 6],
+            'wind_speed_10m': (n % 300) / 10.0,
+            'pressure_msl': 990 + n % 40
+        }
+    }
+
+
+def respuesta_archivo(latitud: str, longitud: str, inicio: str, fin: str) -> dict:
+    # Serie horaria en UTC con ciclo diario; las horas futuras vienen a null como en la API real
+    n = _numero(f"{latitud},{longitud}")
+    horas, ahora = [], time.time()
+    dia = date.fromisoformat(inicio)
+    while dia <= date.fromisoformat(fin):
+        horas.extend(datetime(dia.year, dia.month, dia.day, h, tzinfo=timezone.utc) for h in range(24))
+        dia += timedelta(days=1)
+    pasadas = [h.timestamp() <= ahora for h in horas]
+    temperaturas = [round((n % 200) / 10.0 + 6 * math.sin((h.hour - 9) * math.pi / 12), 1) for h in horas]
+
+    def serie(valores):
+        return [v if pasada else None for v, pasada in zip(valores, pasadas)]
+
+    return {
+        'latitude': float(latitud or 0),
+        'longitude': float(longitud or 0),
+        'utc_offset_seconds': 0,
+        'hourly': {
+            'time': [h.strftime('%Y-%m-%dT%H:%M') for h in horas],
+            'temperature_2m': serie(temperaturas),
+            'apparent_temperature': serie([t - 1 for t in temperaturas]),
+            'relative_humidity_2m': serie([n % 60 + 20] * len(horas)),
+            'pressure_msl': serie([990.0 + n % 40] * len(horas)),
+            'wind_speed_10m': serie([(n % 300) / 10.0] * len(horas)),
+            'weather_code': serie([(0, 1, 2, 3, 61, 95)[(n + h.hour) % 6] for h in horas])
+        }
+    }
+
+
+def respuesta_calidad_aire(latitud: str, longitud: str) -> dict:
+    n = _numero(f"aire:{latitud},{longitud}")
+    return {
+        'latitude': float(latitud or 0),
+        'longitude': float(longitud or 0),
+        'current': {
+            'european_aqi': n % 120,
+            'us_aqi': n % 200,
+            'pm2_5': (n % 500) / 10.0,
+            'pm10': (n % 900) / 10.0,
+            'nitrogen_dioxide': (n % 600) / 10.0,
+            'ozone': (n % 1500) / 10.0,
+            'carbon_monoxide': float(n % 400)
+        }
+    }
+
+
+def respuesta_tipos_cambio(base: str) -> dict:
+    # Tabla fija en USD (incluye la moneda 'XXX' de respuesta_pais), reexpresada en la base
+    tasas = {'USD': 1.0, 'EUR': 0.9, 'MXN': 17.0, 'COP': 4000.0, 'XXX': 2.0}
+    base = base.upper() if base.upper() in tasas else 'USD'
+    return {
+        'result': 'success',
+        'base_code': base,
+        'time_last_update_unix': 1700000000,
+        'time_next_update_unix': int(time.time()) + 86400,
+        'rates': {moneda: tasa / tasas[base] for moneda, tasa in tasas.items()}
+    }
+
+
+def respuesta_item(item_id: int) -> dict:
+    return {
+        'id': item_id,
+        'type': 'story',
+        'title': f"Historia simulada número {item_id}",
+        'url': f"https://example.com/historia/{item_id}",
+        'score': item_id % 500,
+        'time': 1700000000 + item_id
+    }
+
+
+def respuesta_pais(nombre: str) -> list:
+    n = _numero(nombre)
+    return [{
+        'name': {'common': nombre.title(), 'official': f"República de {nombre.title()}"},
+        'capital': [f"Capital de {nombre.title()}"],
+        'population': n % 100000000,
+        'area': float(n % 2000000),
+        'region': 'Simulada',
+        'subregion': 'Simulada',
+        'languages': {'spa': 'Spanish'},
+        'currencies': {'XXX': {'name': 'Moneda simulada', 'symbol': '¤'}},
+        'cca2': nombre[:2].upper(),
+        'flag': '🏳️',
+        # Campos que las APIs reales incluyen y el proveedor no usa
+        'translations': {
+            idioma: {'official': f"{nombre.title()} ({idioma})", 'common': nombre}
+            for idioma in ('ara', 'bre', 'ces', 'cym', 'deu', 'est', 'fin', 'fra', 'hrv', 'hun', 'ita', 'jpn',
+                           'kor', 'nld', 'per', 'pol', 'por', 'rus', 'slk', 'spa', 'srp', 'swe', 'tur', 'urd', 'zho')
+        },
+        'demonyms': {'eng': {'f': 'Simulated', 'm': 'Simulated'}, 'fra': {'f': 'Simulée', 'm': 'Simulé'}},
+        'altSpellings': [nombre[:2].upper(), nombre, f"Reino de {nombre.title()}"],
+        'tld': ['.xx'],
+        'idd': {'root': '+3', 'suffixes': ['4']},
+        'latlng': [40.0, -4.0],
+        'borders': ['AND', 'FRA', 'GIB', 'PRT', 'MAR'],
+        'timezones': ['UTC', 'UTC+01:00'],
+        'maps': {'googleMaps': 'https://example.com/maps', 'openStreetMaps': 'https://example.com/osm'},
+        'flags': {'png': 'https://example.com/flag.png', 'svg': 'https://example.com/flag.svg',
+                  'alt': 'Bandera simulada con franjas horizontales de colores'},
+        'coatOfArms': {'png': 'https://example.com/coa.png', 'svg': 'https://example.com/coa.svg'},
+        'car': {'signs': ['E'], 'side': 'right'},
+        'postalCode': {'format': '#####', 'regex': '^(\\d{5})$'}
+    }]
+
+
+class _ManejadorSimulado(BaseHTTPRequestHandler):
+    """Enruta las peticiones a la respuesta simulada correspondiente"""
+
+    configuracion: ConfiguracionSimulada = None
+
+    def do_GET(self):
+        retardo, fallar = self.configuracion.siguiente()
+        if retardo:
+            time.sleep(retardo)
+        if fallar:
+            self._responder(self.configuracion.codigo_error, {'error': 'fallo simulado'})
+            return
+
+        url = urlparse(self.path)
+        parametros = {clave: valores[0] for clave, valores in parse_qs(url.query).items()}
+        ruta = url.path
+
+        if ruta.endswith('/v1/search'):
+            cuerpo = respuesta_geocoding(parametros.get('name', ''))
+        elif ruta.endswith('/v1/forecast'):
+            cuerpo = respuesta_forecast(parametros.get('latitude', '0'), parametros.get('longitude', '0'))
+        elif ruta.endswith('/v1/archive'):
+            cuerpo = respuesta_archivo(parametros.get('latitude', '0'), parametros.get('longitude', '0'),
+                                       parametros['start_date'], parametros['end_date'])
+        elif ruta.endswith('/v1/air-quality'):
+            cuerpo = respuesta_calidad_aire(parametros.get('latitude', '0'), parametros.get('longitude', '0'))
+        elif '/v6/latest/' in ruta:
+            cuerpo = respuesta_tipos_cambio(ruta.rsplit('/', 1)[-1])
+        elif ruta.endswith('/v0/topstories.json'):
+            cuerpo = list(range(1, 101))
+        elif '/v0/item/' in ruta:
+            cuerpo = respuesta_item(int(ruta.rsplit('/', 1)[-1].split('.')[0]))
+        elif '/v3.1/name/' in ruta:
+            cuerpo = respuesta_pais(unquote(ruta.rsplit('/', 1)[-1]))
+            if parametros.get('fields'):
+                # Igual que REST Countries: solo los campos pedidos
+                campos = parametros['fields'].split(',')
+                cuerpo = [{c: pais[c] for c in campos if c in pais} for pais in cuerpo]
+        else:
+            self._responder(404, {'error': 'ruta desconocida'})
+            return
+
+        self._responder(200, cuerpo)
+
+    def _responder(self, codigo: int, cuerpo):
+        datos = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        if codigo == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        # Silenciar el log por petición para no distorsionar las mediciones
+        pass
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    # Cola de conexiones para ráfagas de peticiones simultáneas (por defecto es 5)
+    request_queue_size = 128
+
+
+class ServidorSimulado:
+    """
+    Servidor de APIs simuladas en un hilo propio
+
+    Uso:
+        with ServidorSimulado(ConfiguracionSimulada(latencia_ms=20)) as servidor:
+            apuntar_facade(facade, servidor.url)
+    """
+
+    def __init__(self, configuracion: ConfiguracionSimulada = None, host: str = '127.0.0.1', puerto: int = 0):
+        self.configuracion = configuracion or ConfiguracionSimulada()
+        manejador = type('Manejador', (_ManejadorSimulado,), {'configuracion': self.configuracion})
+        self._servidor = _ServidorHTTP((host, puerto), manejador)
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self) -> 'ServidorSimulado':
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="servidor-simulado", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.detener()
+
+
+def apuntar_facade(facade, base_url: str):
+    """Redirige los proveedores de una fachada al servidor simulado"""
+    facade.clima_provider.geocoding_url = f"{base_url}/v1/search"
+    facade.clima_provider.weather_url = f"{base_url}/v1/forecast"
+    facade.clima_provider.archive_url = f"{base_url}/v1/archive"
+    facade.noticias_provider.base_url = f"{base_url}/v0"
+    facade.pais_provider.base_url = f"{base_url}/v3.1/name"
+    facade.proveedor('calidad_aire').url = f"{base_url}/v1/air-quality"
+    facade.proveedor('tipo_cambio').base_url = f"{base_url}/v6/latest"
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+PROCESAMIENTO POR LOTES - Enriquecimiento masivo de ciudades
+
+Lee en streaming un archivo de ciudades (CSV, JSONL o texto plano), elimina
+duplicados y reparte el trabajo entre varios procesos. Cada proceso tiene
+su propia fachada y un pool de hilos para las llamadas HTTP. Los resultados
+se escriben de forma incremental (JSONL o CSV) y cada ciudad terminada se
+anota en un archivo de checkpoint, de modo que una ejecución interrumpida
+continúa donde se quedó.
+
+Ejemplos:
+    python procesamiento_lotes.py ciudades.csv resultados.jsonl
+    python procesamiento_lotes.py ciudades.jsonl resultados.csv --columna nombre --procesos 8 --hilos 16
+    python procesamiento_lotes.py ciudades.txt resultados.jsonl --mock
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Set
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.exportacion_columnar import ExportadorColumnar
+
+FORMATOS_SALIDA = ('jsonl', 'csv', 'parquet', 'binario')
+EXTENSIONES = {'.csv': 'csv', '.parquet': 'parquet', '.fmac': 'binario'}
+
+COLUMNAS_CSV = [
+    'ciudad', 'temperatura', 'sensacion_termica', 'humedad', 'descripcion_clima',
+    'pais', 'codigo_pais', 'capital', 'poblacion', 'area', 'region',
+    'num_noticias', 'errores', 'timestamp'
+]
+
+# Fachada propia de cada proceso trabajador (se crea en el inicializador)
+_facade = None
+_hilos = 1
+
+
+def normalizar_ciudad(ciudad: str) -> str:
+    """Clave para deduplicar y para el checkpoint"""
+    return ' '.join(ciudad.split()).lower()
+
+
+def leer_ciudades(ruta: str, columna: str = 'ciudad') -> Iterator[str]:
+    """
+    Recorre el archivo de entrada línea a línea sin cargarlo entero
+
+    Formatos: .csv (columna indicada), .jsonl (clave indicada) o texto plano
+    (una ciudad por línea).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        if extension == '.csv':
+            for fila in csv.DictReader(archivo):
+                valor = (fila.get(columna) or '').strip()
+                if valor:
+                    yield valor
+        elif extension in ('.jsonl', '.ndjson'):
+            for linea in archivo:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                valor = str(json.loads(linea).get(columna, '')).strip()
+                if valor:
+                    yield valor
+        else:
+            for linea in archivo:
+                valor = linea.strip()
+                if valor:
+                    yield valor
+
+
+def ciudades_pendientes(ciudades: Iterator[str], completadas: Set[str]) -> Iterator[str]:
+    """Filtra duplicados y ciudades ya procesadas en una ejecución anterior"""
+    vistas = set(completadas)
+    for ciudad in ciudades:
+        clave = normalizar_ciudad(ciudad)
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        yield ciudad
+
+
+def agrupar(iterable: Iterator[str], tamano: int) -> Iterator[List[str]]:
+    """Agrupa un iterador en listas de tamaño fijo (la última puede ser menor)"""
+    lote = []
+    for elemento in iterable:
+        lote.append(elemento)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def fila_plana(datos: dict) -> dict:
+    """Aplana el diccionario de InformacionCompleta a las columnas del CSV"""
+    clima = datos.get('clima') or {}
+    pais = datos.get('pais') or {}
+    noticias = datos.get('noticias') or {}
+    return {
+        'ciudad': datos.get('ciudad_consultada', ''),
+        'temperatura': clima.get('temperatura'),
+        'sensacion_termica': clima.get('sensacion_termica'),
+        'humedad': clima.get('humedad'),
+        'descripcion_clima': clima.get('descripcion'),
+        'pais': pais.get('nombre_comun'),
+        'codigo_pais': pais.get('codigo_pais'),
+        'capital': ', '.join(pais.get('capital') or []),
+        'poblacion': pais.get('poblacion'),
+        'area': pais.get('area'),
+        'region': pais.get('region'),
+        'num_noticias': len(noticias.get('noticias') or []),
+        'errores': ' | '.join(datos.get('errores') or []),
+        'timestamp': datos.get('timestamp')
+    }
+
+
+def _inicializar_trabajador(hilos: int, usar_mock: bool):
+    """Inicializador de cada proceso: fachada propia y salida silenciada"""
+    global _facade, _hilos
+    sys.stdout = open(os.devnull, 'w')
+
+    from src.facade.informacion_facade import FachadaInformacionCiudad
+    from src.utils.config import Config
+
+    if usar_mock:
+        Config.usar_datos_simulados()
+    _facade = FachadaInformacionCiudad()
+    _hilos = hilos
+
+
+def _consultar(ciudad: str) -> dict:
+    from src.utils.limitador import PRIORIDAD_LOTE, prioridad
+
+    try:
+        with prioridad(PRIORIDAD_LOTE):
+            return _facade.obtener_informacion_completa(ciudad).a_diccionario()
+    except Exception as e:
+        return {'ciudad_consultada': ciudad, 'clima': None, 'noticias': None, 'pais': None,
+                'timestamp': None, 'errores': [f"Error inesperado: {str(e)}"]}
+
+
+def procesar_lote(ciudades: List[str]) -> List[dict]:
+    """Procesa un lote en el proceso trabajador con un pool de hilos para la E/S"""
+    with ThreadPoolExecutor(max_workers=max(1, min(_hilos, len(ciudades)))) as executor:
+        return list(executor.map(_consultar, ciudades))
+
+
+class EscritorResultados:
+    """Escribe resultados de forma incremental y mantiene el checkpoint"""
+
+    def __init__(self, ruta_salida: str, formato: str, reanudar: bool, tam_bloque: int = 10000):
+        self.formato = formato
+        self.ruta_checkpoint = f"{ruta_salida}.checkpoint"
+        modo = 'a' if reanudar else 'w'
+        self._checkpoint = open(self.ruta_checkpoint, modo, encoding='utf-8')
+        self._salida = None
+        self._csv = None
+        self._columnar = None
+        # Ciudades escritas en un bloque columnar que aún no está en disco
+        self._sin_confirmar: List[str] = []
+
+        if formato in ('parquet', 'binario'):
+            if not reanudar and os.path.exists(ruta_salida):
+                os.remove(ruta_salida)
+            ruta = ruta_salida
+            if reanudar and formato == 'parquet':
+                # Parquet no admite añadir: cada reanudación escribe una parte nueva
+                ruta = _ruta_parte_libre(ruta_salida)
+            self._columnar = ExportadorColumnar(ruta, formato, tam_bloque=tam_bloque)
+            return
+
+        escribir_cabecera = not (reanudar and os.path.exists(ruta_salida) and os.path.getsize(ruta_salida) > 0)
+        self._salida = open(ruta_salida, modo, encoding='utf-8', newline='')
+        if formato == 'csv':
+            self._csv = csv.DictWriter(self._salida, fieldnames=COLUMNAS_CSV)
+            if escribir_cabecera:
+                self._csv.writeheader()
+
+    def escribir(self, resultados: List[dict]):
+        """Escribe un lote y, después, lo marca como completado en el checkpoint"""
+        if self._columnar:
+            for datos in resultados:
+                self._columnar.agregar(datos)
+                self._sin_confirmar.append(normalizar_ciudad(datos['ciudad_consultada']))
+                if self._columnar.filas_pendientes == 0:
+                    self._confirmar()
+            return
+
+        for datos in resultados:
+            if self._csv:
+                self._csv.writerow(fila_plana(datos))
+            else:
+                self._salida.write(json.dumps(datos, ensure_ascii=False) + '\n')
+        self._salida.flush()
+        os.fsync(self._salida.fileno())
+
+        self._sin_confirmar.extend(normalizar_ciudad(datos['ciudad_consultada']) for datos in resultados)
+        self._confirmar()
+
+    def _confirmar(self):
+        """Anota en el checkpoint las ciudades que ya están en disco"""
+        for clave in self._sin_confirmar:
+            self._checkpoint.write(clave + '\n')
+        self._checkpoint.flush()
+        self._sin_confirmar = []
+
+    def cerrar(self):
+        if self._columnar:
+            self._columnar.cerrar()
+            self._confirmar()
+        else:
+            self._salida.close()
+        self._checkpoint.close()
+
+
+def _ruta_parte_libre(ruta: str) -> str:
+    """resultados.parquet -> resultados.parte2.parquet (primera que no exista)"""
+    base, extension = os.path.splitext(ruta)
+    numero = 2
+    while os.path.exists(f"{base}.parte{numero}{extension}"):
+        numero += 1
+    return f"{base}.parte{numero}{extension}"
+
+
+def leer_checkpoint(ruta_salida: str) -> Set[str]:
+    """Ciudades ya completadas en una ejecución anterior"""
+    ruta = f"{ruta_salida}.checkpoint"
+    if not os.path.exists(ruta):
+        return set()
+    with open(ruta, encoding='utf-8') as archivo:
+        return {linea.strip() for linea in archivo if linea.strip()}
+
+
+def ejecutar(entrada: str, salida: str, formato: Optional[str] = None, columna: str = 'ciudad',
+             procesos: Optional[int] = None, hilos: int = 8, tam_lote: int = 25,
+             reiniciar: bool = False, usar_mock: bool = False, tam_bloque: int = 10000) -> dict:
+    """
+    Ejecuta el enriquecimiento completo
+
+    Returns:
+        Resumen con ciudades procesadas, omitidas por checkpoint y duración
+    """
+    formato = formato or EXTENSIONES.get(os.path.splitext(salida)[1].lower(), 'jsonl')
+    procesos = procesos or os.cpu_count() or 1
+    completadas = set() if reiniciar else leer_checkpoint(salida)
+    reanudar = bool(completadas)
+
+    if reanudar:
+        print(f"Reanudando: {len(completadas)} ciudades ya procesadas")
+
+    inicio = time.perf_counter()
+    procesadas = 0
+    escritor = EscritorResultados(salida, formato, reanudar, tam_bloque)
+    lotes = agrupar(ciudades_pendientes(leer_ciudades(entrada, columna), completadas), tam_lote)
+    # Límite de lotes en vuelo: mantiene la memoria acotada con archivos enormes
+    max_en_vuelo = procesos * 2
+
+    try:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_trabajador,
+                                 initargs=(hilos, usar_mock)) as executor:
+            pendientes = set()
+            for lote in lotes:
+                pendientes.add(executor.submit(procesar_lote, lote))
+                if len(pendientes) >= max_en_vuelo:
+                    terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                    procesadas += _escribir_terminados(terminados, escritor)
+            while pendientes:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                procesadas += _escribir_terminados(terminados, escritor)
+    finally:
+        escritor.cerrar()
+
+    duracion = time.perf_counter() - inicio
+    return {
+        'procesadas': procesadas,
+        'omitidas_checkpoint': len(completadas),
+        'duracion_s': round(duracion, 2),
+        'ciudades_por_segundo': round(procesadas / duracion, 2) if duracion > 0 else 0.0
+    }
+
+
+def _escribir_terminados(terminados, escritor: EscritorResultados) -> int:
+    total = 0
+    for futuro in terminados:
+        resultados = futuro.result()
+        escritor.escribir(resultados)
+        total += len(resultados)
+    print(f"   ... {total} ciudades escritas")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enriquecimiento masivo de ciudades con el Facade")
+    parser.add_argument('entrada', help="Archivo de ciudades (.csv, .jsonl o texto plano)")
+    parser.add_argument('salida', help="Archivo de resultados (.jsonl, .csv, .parquet o .fmac)")
+    parser.add_argument('--formato', choices=FORMATOS_SALIDA,
+                        help="Formato de salida (por defecto según extensión: .jsonl, .csv, .parquet, .fmac)")
+    parser.add_argument('--columna', default='ciudad', help="Columna/clave con el nombre de la ciudad")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos trabajadores (por defecto CPUs)")
+    parser.add_argument('--hilos', type=int, default=8, help="Hilos de E/S por proceso")
+    parser.add_argument('--tam-lote', type=int, default=25, help="Ciudades por lote")
+    parser.add_argument('--tam-bloque', type=int, default=10000,
+                        help="Filas por bloque en los formatos columnares (parquet/binario)")
+    parser.add_argument('--reiniciar', action='store_true', help="Ignorar el checkpoint y empezar de cero")
+    parser.add_argument('--mock', action='store_true', help="Usar datos simulados")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PROCESAMIENTO POR LOTES")
+    print("=" * 60)
+    resumen = ejecutar(args.entrada, args.salida, args.formato, args.columna, args.procesos,
+                       args.hilos, args.tam_lote, args.reiniciar, args.mock, args.tam_bloque)
+    print(f"\nCiudades procesadas: {resumen['procesadas']}")
+    print(f"Omitidas (checkpoint): {resumen['omitidas_checkpoint']}")
+    print(f"Duración: {resumen['duracion_s']}s ({resumen['ciudades_por_segundo']} ciudades/s)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nProceso interrumpido. Vuelve a ejecutar el mismo comando para reanudar.")
@@ -6,16 +6,56 @@ Proporciona una interfaz simplificada para acceder a múltiples APIs
 de información (clima, noticias, países) sin que el cliente necesite
 conocer los detalles de implementación de cada una.
 """
-from typing import Optional
-from colorama import init, Fore, Style
+import contextvars
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable, List, Optional
 from ..models.informacion_models import InformacionCompleta
-from ..providers.clima_provider import ClimaProvider
-from ..providers.noticias_provider import NoticiasProvider
-from ..providers.pais_provider import PaisProvider
+from ..providers.registro import DefinicionProveedor, RegistroProveedores, Resolutor
+from ..providers.registro import registro as registro_predeterminado
+from ..utils.autocompletado import IndiceCiudades, leer_lista_ciudades
+from ..utils.cache import guardar_snapshot, presupuesto_global, restaurar_snapshot
+from ..utils.compartimentos import CompartimentoLleno, crear_compartimentos
 from ..utils.config import Config
+from ..utils.historico import AlmacenHistorico, filas_archivo, observacion_actual
+from ..utils.texto import normalizar_nombre
+from ..utils.trazas import trazador
+from ..utils.vigilancia import VigilanteClima
 
-# Inicializar colorama para colores en consola
-init()
+if TYPE_CHECKING:
+    from ..utils.purgas import NotificadorPurgas
+
+# Los proveedores (y con ellos requests, urllib3...), colorama y los pools de
+# hilos se importan al usarlos por primera vez: importar la fachada es barato
+# para los procesos de CLI y los workers pre-fork que no llegan a consultar.
+
+# Componentes del registro predeterminado, en el orden en que se devuelven
+COMPONENTES = registro_predeterminado.nombres()
+
+# Caché de proveedor -> plantilla de la clave sustituta (Surrogate-Key) que
+# hay que purgar en la CDN cuando se refresca una entrada
+_CLAVES_SUSTITUTAS = {
+    'clima.coordenadas': 'ciudad/{}',
+    'clima.clima': 'clima/{}',
+    'pais.paises': 'pais/{}',
+    'noticias.historias': 'noticias/hn',
+    'noticias.items': 'noticias/hn',
+    'calidad_aire.calidad_aire': 'aire/{}',
+    'tipo_cambio.tasas': 'cambio/{}'
+}
+
+
+_consola_iniciada = False
+
+
+def _iniciar_consola():
+    """Inicializa colorama (colores en consola) una sola vez"""
+    global _consola_iniciada
+    if not _consola_iniciada:
+        from colorama import init
+        init()
+        _consola_iniciada = True
 
 
 class FachadaInformacionCiudad:
@@ -23,84 +63,232 @@ class FachadaInformacionCiudad:
     FACADE - Interfaz unificada para obtener información completa de ciudades
     
     Esta clase encapsula la complejidad de trabajar con múltiples APIs:
-    - Open-Meteo (clima) - Completamente gratuita
+    - Open-Meteo (clima y calidad del aire) - Completamente gratuita
     - FreeNewsAPI (noticias) - Completamente gratuita
     - REST Countries (información de países) - Completamente gratuita
+    - ExchangeRate-API (tipos de cambio) - Completamente gratuita
     
     El cliente solo necesita conocer esta clase, no los detalles de cada API.
+    Los proveedores salen de un registro (ver providers/registro.py) que
+    declara sus entradas; la fachada ejecuta su grafo de dependencias con el
+    máximo paralelismo.
     """
     
-    def __init__(self):
-        """Inicializa todos los proveedores internos"""
+    def __init__(self, registro: Optional[RegistroProveedores] = None):
+        """
+        Prepara la fachada; cada proveedor se crea la primera vez que se usa
+        
+        Args:
+            registro: Proveedores disponibles (por defecto el registro compartido)
+        """
+        _iniciar_consola()
         print("Inicializando Fachada de Información...")
         
-        # Crear instancias de todos los proveedores
-        self.clima_provider = ClimaProvider()
-        self.noticias_provider = NoticiasProvider()
-        self.pais_provider = PaisProvider()
+        self.registro = registro or registro_predeterminado
+        self._proveedores = {}
+        self._lock = threading.RLock()
+        self._notificador_purgas = None
+        
+        # Concurrencia acotada por proveedor (Config.BULKHEADS_UPSTREAM o la que
+        # declare el proveedor): una API lenta no bloquea los hilos del resto
+        limites = {definicion.nombre: definicion.concurrencia for definicion in self.registro}
+        limites.update(Config.BULKHEADS_UPSTREAM)
+        self.compartimentos = crear_compartimentos(
+            limites, Config.BULKHEAD_MAX_WAIT, Config.BULKHEAD_RETRY_AFTER
+        )
+        
+        # Índice de autocompletado y un pool de hilos por proveedor (al primer uso)
+        self._indice_ciudades = None
+        self._executors = {}
+        # Tareas admitidas por pool con compartimento (nunca más que hilos tiene)
+        self._plazas = {}
+        
+        # Histórico de clima (Config.HISTORY_DIR, al primer uso) y días cuyo
+        # relleno ya se intentó: (ubicación, día) -> instante del intento
+        # (con _lock_relleno; se podan los que ya se pueden reintentar)
+        self._historico = None
+        self._intentos_relleno = {}
+        self._limite_poda_relleno = 1024
+        # Rellenos en curso por ubicación (uno a la vez por ubicación; las
+        # demás no esperan)
+        self._rellenando = {}
+        self._lock_relleno = threading.Lock()
+        
+        # Vigilancia del clima por suscripción (al primer suscriptor)
+        self._vigilante = None
         
         print("Fachada lista para usar")
     
-    def obtener_informacion_completa(self, ciudad: str) -> InformacionCompleta:
+    @property
+    def clima_provider(self):
+        """Proveedor de clima (Open-Meteo)"""
+        return self.proveedor('clima')
+    
+    @clima_provider.setter
+    def clima_provider(self, proveedor):
+        self._instalar_proveedor('clima', proveedor)
+    
+    @property
+    def noticias_provider(self):
+        """Proveedor de noticias (fuentes locales / Hacker News)"""
+        return self.proveedor('noticias')
+    
+    @noticias_provider.setter
+    def noticias_provider(self, proveedor):
+        self._instalar_proveedor('noticias', proveedor)
+    
+    @property
+    def pais_provider(self):
+        """Proveedor de información de países (REST Countries)"""
+        return self.proveedor('pais')
+    
+    @pais_provider.setter
+    def pais_provider(self, proveedor):
+        self._instalar_proveedor('pais', proveedor)
+    
+    def proveedor(self, nombre: str):
+        """
+        Instancia del proveedor `nombre` (se crea con la fábrica del registro al primer uso)
+        
+        Raises:
+            KeyError: si el proveedor no está registrado
+        """
+        proveedor = self._proveedores.get(nombre)
+        if proveedor is None:
+            with self._lock:
+                proveedor = self._proveedores.get(nombre)
+                if proveedor is None:
+                    proveedor = self.registro.definicion(nombre).fabrica(self)
+                    self._instalar_proveedor(nombre, proveedor)
+        return proveedor
+    
+    def _instalar_proveedor(self, nombre: str, proveedor):
+        """Registra el proveedor y engancha sus cachés a las purgas y al autocompletado"""
+        with self._lock:
+            self._proveedores[nombre] = proveedor
+            if self._notificador_purgas is not None:
+                self._conectar_purgas_proveedor(nombre, proveedor)
+            if nombre == 'clima':
+                proveedor.cache_coordenadas.suscribir(
+                    lambda clave, coordenadas: self._indexar_ciudad(coordenadas)
+                )
+                # Cada observación nueva de la API de clima pasa al histórico
+                proveedor.cache_clima.suscribir(self._archivar_observacion)
+                if self._indice_ciudades is not None:
+                    self._indexar_coordenadas()
+    
+    @property
+    def indice_ciudades(self) -> IndiceCiudades:
+        """Autocompletado: lista incluida + ciudades ya geocodificadas (y las que se vayan geocodificando)"""
+        if self._indice_ciudades is None:
+            with self._lock:
+                if self._indice_ciudades is None:
+                    self._indice_ciudades = IndiceCiudades(leer_lista_ciudades(Config.CITY_LIST_FILE))
+                    self._indexar_coordenadas()
+        return self._indice_ciudades
+    
+    def _executor_de(self, nombre: str):
+        """
+        Pool de hilos propio de un proveedor: tantos hilos como admite su
+        compartimento (activos + cola), así un proveedor lento solo agota los suyos
+        """
+        executor = self._executors.get(nombre)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(nombre)
+                if executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    compartimento = self.compartimentos.get(nombre)
+                    hilos = (compartimento.max_concurrentes + compartimento.max_cola
+                             if compartimento else Config.FACADE_WORKERS)
+                    if compartimento:
+                        self._plazas[nombre] = threading.BoundedSemaphore(max(1, hilos))
+                    executor = self._executors[nombre] = ThreadPoolExecutor(
+                        max_workers=max(1, hilos), thread_name_prefix=f"fachada-{nombre}"
+                    )
+        return executor
+    
+    def _lanzar(self, nodo: DefinicionProveedor, argumentos: list):
+        """
+        Envía el proveedor a su pool sin que las tareas se acumulen en la cola
+        interna del executor: con todos sus hilos ocupados (activos y en la cola
+        del compartimento) se rechaza al momento
+        
+        Raises:
+            CompartimentoLleno: si el compartimento del proveedor no tiene hueco
+        """
+        executor = self._executor_de(nodo.nombre)
+        plazas = self._plazas.get(nodo.nombre)
+        if plazas is not None and not plazas.acquire(blocking=False):
+            raise self.compartimentos[nodo.nombre].rechazo()
+        futuro = executor.submit(contextvars.copy_context().run, self._llamar_proveedor, nodo, argumentos)
+        if plazas is not None:
+            futuro.add_done_callback(lambda _: plazas.release())
+        return futuro
+    
+    def obtener_informacion_completa(self, ciudad: str, componentes: Optional[Iterable[str]] = None,
+                                     tiempo_maximo_ms: Optional[float] = None) -> InformacionCompleta:
         """
         MÉTODO PRINCIPAL DEL FACADE
         
         Obtiene toda la información disponible sobre una ciudad en una sola llamada.
-        Internamente coordina las llamadas a múltiples APIs y maneja errores.
+        Internamente coordina las llamadas a múltiples APIs y maneja errores:
+        cada proveedor se lanza en cuanto sus entradas están disponibles.
         
         Args:
             ciudad: Nombre de la ciudad a consultar
+            componentes: Subconjunto de los componentes registrados (por defecto
+                Config.DEFAULT_COMPONENTS o los predeterminados del registro);
+                los proveedores no pedidos (ni necesarios) no se llaman
+            tiempo_maximo_ms: Si se indica, se devuelve lo que esté listo en ese
+                tiempo; el resto queda en `pendientes` (lo ya lanzado sigue
+                cargándose en segundo plano hacia las cachés)
             
         Returns:
             InformacionCompleta: Objeto con toda la información agregada
+            
+        Raises:
+            ValueError: si se pide un componente desconocido
         """
+        # Toda la consulta (incluidos los hilos de los proveedores) ve la misma
+        # configuración aunque otro hilo la cambie mientras tanto
+        with Config.fijar():
+            componentes = self._validar_componentes(componentes)
+            with trazador.span("facade.obtener_informacion_completa", ciudad=ciudad,
+                               componentes=','.join(componentes)) as span:
+                resultado = self._obtener_informacion(ciudad, componentes, tiempo_maximo_ms)
+                span.anotar(errores=len(resultado.errores))
+                if resultado.pendientes:
+                    span.anotar(pendientes=','.join(resultado.pendientes))
+        return resultado
+    
+    def _obtener_informacion(self, ciudad: str, componentes: List[str],
+                             tiempo_maximo_ms: Optional[float]) -> InformacionCompleta:
+        """Cuerpo de obtener_informacion_completa (dentro del span de la consulta)"""
         print(f"\nObteniendo información completa de: {ciudad}")
         print("=" * 60)
         
         # Crear objeto resultado
         resultado = InformacionCompleta(ciudad_consultada=ciudad)
         
-        # Determinar país basado en la ciudad
-        pais = self.pais_provider.obtener_pais_por_ciudad(ciudad)
-        
-        # 1. Obtener información climática
-        print(f"\nPASO 1: Obteniendo clima...")
-        try:
-            resultado.clima = self.clima_provider.obtener_clima(ciudad)
-            if resultado.clima:
-                print(f"Clima obtenido: {resultado.clima.temperatura}°C")
-            else:
-                resultado.errores.append("No se pudo obtener información climática")
-                print("Error obteniendo clima")
-        except Exception as e:
-            resultado.errores.append(f"Error clima: {str(e)}")
-            print(f"Error clima: {str(e)}")
-        
-        # 2. Obtener noticias
-        print(f"\nPASO 2: Obteniendo noticias...")
-        try:
-            resultado.noticias = self.noticias_provider.obtener_noticias(pais)
-            if resultado.noticias:
-                print(f"Noticias obtenidas: {len(resultado.noticias.noticias)} artículos")
-            else:
-                resultado.errores.append("No se pudieron obtener noticias")
-                print("Error obteniendo noticias")
-        except Exception as e:
-            resultado.errores.append(f"Error noticias: {str(e)}")
-            print(f"Error noticias: {str(e)}")
-        
-        # 3. Obtener información del país
-        print(f"\nPASO 3: Obteniendo información del país...")
-        try:
-            resultado.pais = self.pais_provider.obtener_info_pais(pais)
-            if resultado.pais:
-                print(f"País obtenido: {resultado.pais.nombre_comun}")
-            else:
-                resultado.errores.append("No se pudo obtener información del país")
-                print("Error obteniendo información del país")
-        except Exception as e:
-            resultado.errores.append(f"Error país: {str(e)}")
-            print(f"Error país: {str(e)}")
+        plazo = tiempo_maximo_ms / 1000.0 if tiempo_maximo_ms is not None else None
+        print(f"\nObteniendo {', '.join(componentes)} en paralelo"
+              + (f" (máximo {tiempo_maximo_ms:.0f} ms)" if plazo is not None else "") + "...")
+        resultados, errores, pendientes = self._ejecutar_plan(
+            self.registro.plan(componentes), {'ciudad': ciudad}, plazo
+        )
+        for componente in componentes:
+            if componente in errores:
+                self._registrar_componente(resultado, componente, error=errores[componente])
+            elif componente in resultados:
+                try:
+                    self._registrar_componente(resultado, componente, resultados[componente])
+                except Exception as e:
+                    self._registrar_componente(resultado, componente, error=e)
+            elif componente in pendientes:
+                resultado.pendientes.append(componente)
+        if resultado.pendientes:
+            print(f"Pendientes tras el plazo: {', '.join(resultado.pendientes)}")
         
         # Resumen final
         print(f"\nRESUMEN:")
@@ -114,6 +302,430 @@ class FachadaInformacionCiudad:
         
         return resultado
     
+    def _validar_componentes(self, componentes: Optional[Iterable[str]]) -> List[str]:
+        """Normaliza la selección manteniendo el orden del registro"""
+        disponibles = self.registro.nombres()
+        if componentes is None:
+            componentes = Config.actual().DEFAULT_COMPONENTS or self.registro.predeterminados()
+        seleccion = {c.strip().lower() for c in componentes if c and c.strip()}
+        desconocidos = seleccion - set(disponibles)
+        if desconocidos:
+            raise ValueError(f"Componentes desconocidos: {', '.join(sorted(desconocidos))} "
+                             f"(disponibles: {', '.join(disponibles)})")
+        return [c for c in disponibles if c in seleccion]
+    
+    def _ejecutar_plan(self, plan: list, valores: dict, plazo: Optional[float]):
+        """
+        Ejecuta el grafo de dependencias con el máximo paralelismo
+        
+        Cada proveedor con sus entradas disponibles se lanza en su propio pool;
+        los resolutores (baratos) se calculan en este hilo. Sin plazo, este hilo
+        ejecuta además uno de los proveedores listos en lugar de quedarse
+        esperando, pero solo después de lanzar todos los demás que estén listos.
+        Si una entrada falla, los proveedores que dependen de ella fallan con el
+        mismo error.
+        
+        Returns:
+            (resultados, errores, pendientes): valor por proveedor, excepción por
+            proveedor y proveedores sin terminar (o sin lanzar) al vencer el plazo
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+        
+        limite = time.monotonic() + plazo if plazo is not None else None
+        por_hacer = list(plan)
+        en_curso = {}
+        resultados, errores = {}, {}
+        
+        def completar(nodo, obtener):
+            try:
+                valor = obtener()
+            except Exception as e:
+                errores[nodo.nombre] = e
+                return
+            valores[nodo.salida] = valor
+            if isinstance(nodo, DefinicionProveedor):
+                resultados[nodo.nombre] = valor
+        
+        def listos():
+            preparados = []
+            for nodo in list(por_hacer):
+                fallida = next((e for e in nodo.entradas if e in errores), None)
+                if fallida is not None:
+                    errores[nodo.nombre] = errores[fallida]
+                    por_hacer.remove(nodo)
+                elif all(e in valores for e in nodo.entradas):
+                    preparados.append(nodo)
+                    por_hacer.remove(nodo)
+            return preparados
+        
+        while True:
+            # Resolutores y lanzamientos hasta que no quede nada listo: los
+            # proveedores que dependen de un resolutor salen en esta misma
+            # vuelta, antes de que este hilo se ponga a ejecutar uno
+            propio = None
+            preparados = listos()
+            while preparados:
+                for nodo in preparados:
+                    argumentos = [valores[e] for e in nodo.entradas]
+                    if isinstance(nodo, Resolutor):
+                        completar(nodo, lambda: nodo.funcion(self, *argumentos))
+                    elif plazo is None and propio is None:
+                        propio = (nodo, argumentos)
+                    else:
+                        try:
+                            en_curso[self._lanzar(nodo, argumentos)] = nodo
+                        except CompartimentoLleno as e:
+                            errores[nodo.nombre] = e
+                preparados = listos()
+            if propio is not None:
+                nodo, argumentos = propio
+                completar(nodo, lambda: self._llamar_proveedor(nodo, argumentos))
+                continue
+            if not en_curso:
+                break
+            
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                break
+            hechos, _ = wait(en_curso, timeout=restante, return_when=FIRST_COMPLETED)
+            if not hechos:
+                break
+            for futuro in hechos:
+                completar(en_curso.pop(futuro), futuro.result)
+        
+        pendientes = [n.nombre for n in list(en_curso.values()) + por_hacer if isinstance(n, DefinicionProveedor)]
+        return resultados, errores, pendientes
+    
+    def _llamar_proveedor(self, definicion: DefinicionProveedor, argumentos: list):
+        """Llama al proveedor dentro de su compartimento (si lo tiene)"""
+        print(f"\n{definicion.paso or definicion.nombre}...")
+        llamada = getattr(self.proveedor(definicion.nombre), definicion.metodo)
+        with trazador.span(f"facade.{definicion.nombre}", componente=definicion.nombre,
+                           argumento=', '.join(str(a) for a in argumentos)) as span:
+            compartimento = self.compartimentos.get(definicion.nombre)
+            valor = llamada(*argumentos) if compartimento is None else compartimento.ejecutar(llamada, *argumentos)
+            span.anotar(vacio=not valor)
+            return valor
+    
+    def _registrar_componente(self, resultado: InformacionCompleta, componente: str, valor=None,
+                              error: Exception = None):
+        """Guarda el componente en el resultado, o el error correspondiente"""
+        definicion = self.registro.definicion(componente)
+        etiqueta_error = definicion.etiqueta_error or f"Error {componente}"
+        if error is not None:
+            resultado.errores.append(f"{etiqueta_error}: {str(error)}")
+            print(f"{etiqueta_error}: {str(error)}")
+            return
+        setattr(resultado, componente, valor)
+        if not valor:
+            resultado.errores.append(definicion.mensaje_vacio or f"No se pudo obtener {componente}")
+            print(definicion.mensaje_error or f"Error obteniendo {componente}")
+        elif definicion.describir is not None:
+            print(definicion.describir(valor))
+    
+    def precalentar(self, ciudades: Optional[List[str]] = None) -> dict:
+        """
+        Precarga las ciudades más consultadas para evitar el arranque en frío
+        
+        Llama en paralelo a cada proveedor de los componentes predeterminados
+        cuyas entradas se conocen sin consultar a otro (clima, país y noticias),
+        llenando las cachés y dejando abiertas las conexiones de cada proveedor.
+        
+        Args:
+            ciudades: Ciudades a precargar (por defecto Config.WARMUP_CITIES)
+            
+        Returns:
+            Resumen con número de tareas, fallos y duración
+        """
+        config = Config.actual()
+        ciudades = config.WARMUP_CITIES if ciudades is None else ciudades
+        if not ciudades or config.USE_MOCK_DATA:
+            return {'tareas': 0, 'fallidas': 0, 'duracion_s': 0.0}
+        
+        from concurrent.futures import ThreadPoolExecutor
+        from ..utils.limitador import PRIORIDAD_PRECALENTAMIENTO, prioridad
+        
+        print(f"\nPrecalentando {len(ciudades)} ciudades...")
+        inicio = time.perf_counter()
+        tareas = {}
+        for ciudad in ciudades:
+            valores = {'ciudad': ciudad}
+            for nodo in self.registro.plan(self._validar_componentes(None)):
+                if not all(e in valores for e in nodo.entradas):
+                    continue  # depende de otro proveedor: se calienta al consultar
+                argumentos = tuple(valores[e] for e in nodo.entradas)
+                if isinstance(nodo, Resolutor):
+                    valores[nodo.salida] = nodo.funcion(self, *argumentos)
+                else:
+                    llamada = getattr(self.proveedor(nodo.nombre), nodo.metodo)
+                    tareas.setdefault((nodo.nombre, argumentos), (llamada, argumentos))
+        tareas = list(tareas.values())
+        
+        def ejecutar(tarea):
+            funcion, argumentos = tarea
+            try:
+                with Config.fijar(config), prioridad(PRIORIDAD_PRECALENTAMIENTO):
+                    return funcion(*argumentos) is not None
+            except Exception as e:
+                print(f"Error precalentando {', '.join(map(str, argumentos))}: {str(e)}")
+                return False
+        
+        with ThreadPoolExecutor(max_workers=max(1, config.WARMUP_WORKERS)) as executor:
+            resultados = list(executor.map(ejecutar, tareas))
+        
+        resumen = {
+            'tareas': len(tareas),
+            'fallidas': resultados.count(False),
+            'duracion_s': round(time.perf_counter() - inicio, 3)
+        }
+        print(f"Precalentamiento completado: {resumen['tareas']} tareas en {resumen['duracion_s']}s")
+        return resumen
+    
+    def caches(self) -> dict:
+        """Todas las cachés de los proveedores, con nombre 'proveedor.cache'"""
+        caches, vistos = {}, set()
+        for definicion in self.registro:
+            proveedor = self.proveedor(definicion.nombre)
+            if id(proveedor) in vistos:
+                continue  # varios pasos del registro con la misma instancia
+            vistos.add(id(proveedor))
+            caches_proveedor = getattr(proveedor, 'caches', None)
+            for nombre_cache, cache in (caches_proveedor() if caches_proveedor else {}).items():
+                caches[f"{definicion.nombre}.{nombre_cache}"] = cache
+        return caches
+    
+    def uso_memoria(self) -> dict:
+        """Presupuesto de memoria compartido y bytes/expulsiones de cada caché"""
+        return {
+            'presupuesto': presupuesto_global.estadisticas(),
+            'caches': {nombre: cache.uso_memoria() for nombre, cache in self.caches().items()}
+        }
+    
+    def conectar_purgas(self, notificador: 'NotificadorPurgas'):
+        """Pide purgar las claves sustitutas afectadas cada vez que se refresca una caché"""
+        with self._lock:
+            self._notificador_purgas = notificador
+            for nombre, proveedor in self._proveedores.items():
+                self._conectar_purgas_proveedor(nombre, proveedor)
+    
+    def _conectar_purgas_proveedor(self, nombre: str, proveedor):
+        # Solo cuando un dato ya servido cambia: el llenado en frío es justo
+        # lo que la CDN acaba de guardar
+        notificador = self._notificador_purgas
+        caches_proveedor = getattr(proveedor, 'caches', None)
+        for nombre_cache, cache in (caches_proveedor() if caches_proveedor else {}).items():
+            plantilla = _CLAVES_SUSTITUTAS.get(f"{nombre}.{nombre_cache}")
+            if plantilla:
+                cache.suscribir(
+                    lambda clave, valor, plantilla=plantilla: notificador.purgar([plantilla.format(normalizar_nombre(clave))]),
+                    solo_cambios=True
+                )
+        indice = getattr(proveedor, 'indice', None)
+        if nombre == 'noticias' and indice is not None:
+            # Noticias de feeds locales: el refresco del índice sustituye las del país
+            indice.suscribir(lambda pais: notificador.purgar([f"noticias/{normalizar_nombre(pais)}"]))
+    
+    def claves_sustitutas(self, informacion: InformacionCompleta) -> List[str]:
+        """Claves sustitutas de los datos incluidos en una respuesta (ver conectar_purgas)"""
+        ciudad = normalizar_nombre(informacion.ciudad_consultada)
+        pais = normalizar_nombre(self.pais_provider.obtener_pais_por_ciudad(ciudad))
+        claves = [f"ciudad/{ciudad}"]
+        if informacion.clima:
+            clave_clima = self.clima_provider.clave_clima(ciudad)
+            if clave_clima:
+                claves.append(f"clima/{clave_clima}")
+        if informacion.noticias:
+            claves.append('noticias/hn' if informacion.noticias.fuente_api == "Hacker News API" else f"noticias/{pais}")
+        if informacion.pais:
+            claves.append(f"pais/{pais}")
+        if informacion.calidad_aire:
+            clave_aire = self.clima_provider.clave_clima(ciudad)
+            if clave_aire:
+                claves.append(f"aire/{clave_aire}")
+        if informacion.tipo_cambio:
+            claves.append(f"cambio/{normalizar_nombre(informacion.tipo_cambio.moneda_base)}")
+        return claves
+    
+    def convertir_moneda(self, cantidad: float, de: str, a: str) -> Optional[float]:
+        """
+        Convierte entre dos monedas con la tabla diaria de tipos de cambio
+        
+        Solo la primera conversión del día descarga la tabla; el resto es
+        aritmética local.
+        
+        Returns:
+            La cantidad convertida, o None si alguna moneda no está en la tabla
+        """
+        return self.proveedor('tipo_cambio').convertir_moneda(cantidad, de, a)
+    
+    @property
+    def vigilante(self) -> VigilanteClima:
+        """Bucles de refresco compartidos por los suscriptores de cada ciudad (ver utils/vigilancia.py)"""
+        if self._vigilante is None:
+            with self._lock:
+                if self._vigilante is None:
+                    self._vigilante = VigilanteClima(self.obtener_solo_clima)
+        return self._vigilante
+    
+    @property
+    def historico(self) -> Optional[AlmacenHistorico]:
+        """Histórico de clima en Config.HISTORY_DIR (None si está deshabilitado)"""
+        directorio = Config.actual().HISTORY_DIR
+        if not directorio:
+            return None
+        if self._historico is None or self._historico.directorio != directorio:
+            with self._lock:
+                if self._historico is None or self._historico.directorio != directorio:
+                    self._historico = AlmacenHistorico(directorio)
+        return self._historico
+    
+    def _archivar_observacion(self, clave: str, data: dict):
+        historico = self.historico
+        if historico is None:
+            return
+        try:
+            observacion = observacion_actual(data)
+            if observacion:
+                historico.registrar(clave, *observacion)
+        except Exception as e:
+            print(f"Error guardando observación en el histórico: {str(e)}")
+    
+    def historial_clima(self, ciudad: str, dias: int = 30, desde: Optional[datetime] = None,
+                        hasta: Optional[datetime] = None, intervalo: Optional[int] = None,
+                        rellenar: bool = True) -> dict:
+        """
+        Serie histórica del clima de una ciudad
+        
+        Los días del rango que no están en el histórico se piden a la API de
+        archivo en una sola petición; el resto sale de los segmentos locales.
+        
+        Args:
+            ciudad: Nombre de la ciudad
+            dias: Días hacia atrás desde `hasta` (si no se indica `desde`)
+            desde, hasta: Límites del rango (por defecto, los últimos `dias` hasta ahora)
+            intervalo: Segundos por punto agregado (None: observaciones sin agregar)
+            rellenar: Si se deben pedir a la API los días que faltan
+            
+        Returns:
+            {'ciudad', 'ubicacion', 'desde', 'hasta', 'intervalo', 'rellenadas', 'puntos'}
+            
+        Raises:
+            RuntimeError: si el histórico está deshabilitado
+            ValueError: si el rango no es válido o no se encuentra la ciudad
+        """
+        historico = self.historico
+        if historico is None:
+            raise RuntimeError("El histórico de clima está deshabilitado (configura HISTORY_DIR)")
+        
+        fin = int((hasta or datetime.now(timezone.utc)).timestamp())
+        inicio = int(desde.timestamp()) if desde else fin - int(dias * 86400)
+        if inicio > fin:
+            raise ValueError("El inicio del rango es posterior al final")
+        if intervalo is not None and intervalo <= 0:
+            raise ValueError("El intervalo debe ser positivo")
+        
+        with Config.fijar() as config:
+            coordenadas = self.clima_provider.obtener_coordenadas(ciudad)
+            if not coordenadas:
+                raise ValueError(f"No se encontró la ciudad {ciudad}")
+            ubicacion = self.clima_provider.clave_coordenadas(coordenadas)
+        
+        with Config.fijar(config), trazador.span("facade.historico", ciudad=ciudad):
+            rellenadas = self._rellenar_historico(historico, ubicacion, coordenadas, inicio, fin) if rellenar else 0
+            puntos = historico.consultar(ubicacion, inicio, fin, intervalo)
+        
+        return {
+            'ciudad': coordenadas['name'],
+            'ubicacion': ubicacion,
+            'desde': datetime.fromtimestamp(inicio, timezone.utc).isoformat(),
+            'hasta': datetime.fromtimestamp(fin, timezone.utc).isoformat(),
+            'intervalo': intervalo,
+            'rellenadas': rellenadas,
+            'puntos': puntos
+        }
+    
+    def _rellenar_historico(self, historico: AlmacenHistorico, ubicacion: str, coordenadas: dict,
+                            inicio: int, fin: int) -> int:
+        """
+        Pide a la API de archivo los días incompletos del rango; devuelve las filas nuevas
+        
+        Las consultas de la misma ubicación esperan al relleno en curso (y
+        luego encuentran los días completos); las de otras ubicaciones no.
+        """
+        with self._lock_relleno:
+            # [lock, hilos que lo tienen o lo esperan]: se borra con el último
+            entrada = self._rellenando.setdefault(ubicacion, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                return self._rellenar_pendientes(historico, ubicacion, coordenadas, inicio, fin)
+        finally:
+            with self._lock_relleno:
+                entrada[1] -= 1
+                if not entrada[1]:
+                    del self._rellenando[ubicacion]
+    
+    def _podar_intentos_relleno(self, ahora: float, reintento: float):
+        """
+        Olvida los intentos que ya no impiden reintentar (con _lock_relleno)
+
+        Solo recorre el diccionario cuando ha doblado su tamaño desde la
+        última poda, así que el coste por llamada es constante en promedio.
+        """
+        if len(self._intentos_relleno) <= self._limite_poda_relleno:
+            return
+        self._intentos_relleno = {
+            clave: instante for clave, instante in self._intentos_relleno.items()
+            if ahora - instante <= reintento
+        }
+        self._limite_poda_relleno = max(1024, 2 * len(self._intentos_relleno))
+    
+    def _rellenar_pendientes(self, historico: AlmacenHistorico, ubicacion: str, coordenadas: dict,
+                             inicio: int, fin: int) -> int:
+        ahora = time.time()
+        reintento = Config.actual().HISTORY_BACKFILL_RETRY
+        incompletos = historico.dias_incompletos(ubicacion, inicio, fin)
+        with self._lock_relleno:
+            self._podar_intentos_relleno(ahora, reintento)
+            pendientes = [
+                dia for dia in incompletos
+                if ahora - self._intentos_relleno.get((ubicacion, dia), 0) > reintento
+            ]
+            for dia in pendientes:
+                self._intentos_relleno[(ubicacion, dia)] = ahora
+        if not pendientes:
+            return 0
+        
+        data = self.clima_provider.obtener_archivo(
+            coordenadas,
+            datetime.fromtimestamp(pendientes[0], timezone.utc).date(),
+            datetime.fromtimestamp(pendientes[-1], timezone.utc).date()
+        )
+        if not data:
+            return 0
+        rellenadas = historico.registrar_varias(ubicacion, filas_archivo(data))
+        print(f"Histórico de {coordenadas['name']}: {rellenadas} observaciones rellenadas")
+        return rellenadas
+    
+    def guardar_cache(self, ruta: Optional[str] = None):
+        """Guarda un snapshot de las cachés (por defecto en Config.CACHE_SNAPSHOT_FILE)"""
+        ruta = ruta or Config.actual().CACHE_SNAPSHOT_FILE
+        if not ruta:
+            return
+        guardar_snapshot(self.caches(), ruta)
+        print(f"Snapshot de caché guardado en {ruta}")
+    
+    def restaurar_cache(self, ruta: Optional[str] = None) -> int:
+        """Restaura las cachés desde un snapshot; devuelve las entradas cargadas"""
+        ruta = ruta or Config.actual().CACHE_SNAPSHOT_FILE
+        if not ruta:
+            return 0
+        restauradas = restaurar_snapshot(self.caches(), ruta)
+        self._indexar_coordenadas()
+        if restauradas:
+            print(f"Caché restaurada desde {ruta}: {restauradas} entradas")
+        return restauradas
+    
     def mostrar_resumen(self, informacion: InformacionCompleta):
         """
         Muestra un resumen bonito de toda la información obtenida
@@ -146,6 +758,20 @@ class FachadaInformacionCiudad:
             print(f"   Idiomas: {', '.join(informacion.pais.idiomas)}")
             print(f"   Monedas: {', '.join(informacion.pais.monedas)}")
         
+        # Mostrar tipo de cambio
+        if informacion.tipo_cambio:
+            print(f"\nTIPO DE CAMBIO:")
+            for moneda, equivalencias in informacion.tipo_cambio.equivalencias.items():
+                valores = ', '.join(f"{valor:,.4f} {referencia}" for referencia, valor in equivalencias.items())
+                print(f"   1 {moneda} = {valores or '-'}")
+        
+        # Mostrar calidad del aire
+        if informacion.calidad_aire:
+            print(f"\nCALIDAD DEL AIRE:")
+            print(f"   Índice europeo: {informacion.calidad_aire.indice_europeo} ({informacion.calidad_aire.nivel})")
+            if informacion.calidad_aire.pm2_5 is not None:
+                print(f"   PM2.5: {informacion.calidad_aire.pm2_5} µg/m³  PM10: {informacion.calidad_aire.pm10} µg/m³")
+        
         # Mostrar noticias
         if informacion.noticias and informacion.noticias.noticias:
             print(f"\nNOTICIAS RECIENTES ({informacion.noticias.total_resultados}):")
@@ -191,12 +817,36 @@ class FachadaInformacionCiudad:
     
     def obtener_solo_clima(self, ciudad: str) -> Optional:
         """Método de conveniencia para obtener solo información climática"""
-        return self.clima_provider.obtener_clima(ciudad)
+        with Config.fijar():
+            return self.clima_provider.obtener_clima(ciudad)
     
     def obtener_solo_noticias(self, pais: str) -> Optional:
         """Método de conveniencia para obtener solo noticias"""
-        return self.noticias_provider.obtener_noticias(pais)
+        with Config.fijar():
+            return self.noticias_provider.obtener_noticias(pais)
     
     def obtener_solo_pais(self, pais: str) -> Optional:
         """Método de conveniencia para obtener solo información del país"""
-        return self.pais_provider.obtener_info_pais(pais) 
\ No newline at end of file
+        with Config.fijar():
+            return self.pais_provider.obtener_info_pais(pais)
+    
+    def autocompletar(self, prefijo: str, limite: int = 8) -> List[dict]:
+        """Sugerencias de ciudades por prefijo (sin llamar a las APIs), por población"""
+        return self.indice_ciudades.sugerir(prefijo, limite)
+    
+    def _indexar_ciudad(self, coordenadas: dict):
+        if self._indice_ciudades is not None and coordenadas and coordenadas.get('name'):
+            self._indice_ciudades.agregar(
+                coordenadas['name'], coordenadas.get('country'), coordenadas.get('population', 0)
+            )
+    
+    def _indexar_coordenadas(self):
+        """Añade al índice las ciudades de la caché de geocodificación (si el proveedor ya existe)"""
+        clima = self._proveedores.get('clima')
+        if clima is not None:
+            for _, coordenadas, _ in clima.cache_coordenadas.exportar():
+                self._indexar_ciudad(coordenadas)
+    
+    def buscar_noticias(self, consulta: str, dias: Optional[int] = None, limite: int = 10) -> list:
+        """Busca en las noticias ya obtenidas (offline, sin llamar a las APIs)"""
+        return self.noticias_provider.buscar_noticias(consulta, dias=dias, limite=limite) 
\ No newline at end of file
@@ -1,8 +1,8 @@
 """
 Modelos de datos para estructurar la información obtenida de las APIs
 """
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -18,6 +18,8 @@ class InformacionClima:
     icono: str
     presion: Optional[int] = None
     visibilidad: Optional[int] = None
+    # Datos simulados o de respaldo: no deben cachearse como si fueran reales
+    simulado: bool = False
     
     def __str__(self):
         return f"{self.ciudad}: {self.temperatura}°C ({self.descripcion})"
@@ -63,31 +65,79 @@ class InformacionPais:
     monedas: List[str]
     codigo_pais: str
     bandera_emoji: str
+    codigos_moneda: List[str] = field(default_factory=list)  # ISO 4217 (EUR, MXN...)
+    # Datos simulados o de respaldo: no deben cachearse como si fueran reales
+    simulado: bool = False
     
     def __str__(self):
         return f"{self.nombre_comun} - {self.capital[0] if self.capital else 'N/A'}"
 
 
+@dataclass
+class InformacionCalidadAire:
+    """Modelo para la calidad del aire"""
+    indice_europeo: int
+    nivel: str
+    ciudad: str
+    indice_eeuu: Optional[int] = None
+    pm2_5: Optional[float] = None
+    pm10: Optional[float] = None
+    dioxido_nitrogeno: Optional[float] = None
+    ozono: Optional[float] = None
+    monoxido_carbono: Optional[float] = None
+    # Datos simulados o de respaldo: no deben cachearse como si fueran reales
+    simulado: bool = False
+    
+    def __str__(self):
+        return f"{self.ciudad}: índice {self.indice_europeo} ({self.nivel})"
+
+
+@dataclass
+class InformacionTipoCambio:
+    """Modelo para el tipo de cambio de las monedas de un país"""
+    monedas: List[str]
+    equivalencias: Dict[str, Dict[str, float]]  # moneda -> {moneda de referencia: valor de 1 unidad}
+    moneda_base: str
+    actualizada: Optional[str] = None
+    fuente_api: str = "ExchangeRate-API"
+    
+    def __str__(self):
+        return f"Tipo de cambio de {', '.join(self.monedas) or 'N/A'} (base {self.moneda_base})"
+
+
 @dataclass
 class InformacionCompleta:
     """Modelo que agrupa toda la información de una ciudad/país"""
     clima: Optional[InformacionClima] = None
     noticias: Optional[InformacionNoticias] = None
     pais: Optional[InformacionPais] = None
+    calidad_aire: Optional[InformacionCalidadAire] = None
+    tipo_cambio: Optional[InformacionTipoCambio] = None
     ciudad_consultada: str = ""
     timestamp: datetime = None
     errores: List[str] = None
+    pendientes: List[str] = None  # Componentes que no llegaron dentro del plazo
     
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
         if self.errores is None:
             self.errores = []
+        if self.pendientes is None:
+            self.pendientes = []
     
     def tiene_errores(self) -> bool:
         """Verifica si hubo errores al obtener la información"""
         return len(self.errores) > 0
     
+    def tiene_datos_simulados(self) -> bool:
+        """Verifica si algún componente incluido viene de datos simulados o de respaldo"""
+        for componente in (self.clima, self.pais, self.calidad_aire):
+            if componente and componente.simulado:
+                return True
+        return any(componente and componente.fuente_api == "Datos simulados"
+                   for componente in (self.noticias, self.tipo_cambio))
+    
     def informacion_disponible(self) -> List[str]:
         """Retorna qué tipos de información están disponibles"""
         disponible = []
@@ -97,8 +147,18 @@ class InformacionCompleta:
             disponible.append("noticias")
         if self.pais:
             disponible.append("país")
+        if self.calidad_aire:
+            disponible.append("calidad del aire")
+        if self.tipo_cambio:
+            disponible.append("tipo de cambio")
         return disponible
     
+    def a_diccionario(self) -> dict:
+        """Convierte toda la información a tipos básicos (serializable a JSON)"""
+        datos = asdict(self)
+        datos['timestamp'] = self.timestamp.isoformat(timespec='seconds')
+        return datos
+    
     def __str__(self):
         info_tipos = ", ".join(self.informacion_disponible())
         return f"Información de {self.ciudad_consultada}: {info_tipos}" 
\ No newline at end of file
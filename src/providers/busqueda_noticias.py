@@ -0,0 +1,218 @@
+"""
+Índice invertido para búsqueda offline sobre las noticias ya obtenidas
+
+Cada Noticia que pasa por NoticiasProvider se indexa por título, descripción
+y fuente. El índice es incremental, está acotado en memoria (número máximo de
+documentos y edad máxima desde la última vez que se vio cada noticia) y puede
+guardarse/cargarse desde disco en JSON.
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from ..models.informacion_models import Noticia
+from ..utils.config import Config
+from .fuentes_noticias import marca_tiempo_noticia
+
+# Peso de cada campo al puntuar un término
+PESOS_CAMPOS = {
+    'titulo': 3.0,
+    'fuente': 2.0,
+    'descripcion': 1.0
+}
+
+_PATRON_PALABRA = re.compile(r"\w+")
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Normaliza (minúsculas, sin tildes) y separa un texto en términos"""
+    if not texto:
+        return []
+    normalizado = unicodedata.normalize('NFKD', texto.lower())
+    sin_tildes = ''.join(c for c in normalizado if not unicodedata.combining(c))
+    return [palabra for palabra in _PATRON_PALABRA.findall(sin_tildes) if len(palabra) > 1]
+
+
+class IndiceBusquedaNoticias:
+    """Índice invertido en memoria con desalojo por edad"""
+
+    def __init__(self, max_documentos: Optional[int] = None, max_edad: Optional[float] = None,
+                 ruta: Optional[str] = None):
+        self.max_documentos = max_documentos or Config.NEWS_SEARCH_MAX_DOCS
+        self.max_edad = max_edad or Config.NEWS_SEARCH_MAX_AGE_DAYS * 86400
+        self.ruta = ruta
+        # doc_id -> {'noticia', 'visto', 'publicado', 'terminos'}; orden = última vez visto
+        self._documentos: "OrderedDict[str, dict]" = OrderedDict()
+        # término -> {doc_id: peso}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    def agregar(self, noticia: Noticia, visto: Optional[float] = None):
+        """
+        Indexa (o refresca) una noticia
+
+        Args:
+            noticia: Noticia a indexar
+            visto: Momento de ingreso (epoch); por defecto ahora
+        """
+        visto = time.time() if visto is None else visto
+        doc_id = noticia.url or noticia.titulo
+        with self._lock:
+            existente = self._documentos.get(doc_id)
+            if existente and existente['noticia'] == noticia:
+                # Ya indexada: solo se renueva su edad
+                existente['visto'] = visto
+                self._documentos.move_to_end(doc_id)
+            else:
+                if existente:
+                    self._quitar(doc_id)
+                self._insertar(doc_id, noticia, visto)
+            self._desalojar(visto)
+
+    def agregar_varias(self, noticias: List[Noticia]):
+        """Indexa una colección de noticias"""
+        visto = time.time()
+        for noticia in noticias:
+            self.agregar(noticia, visto)
+
+    def buscar(self, consulta: str, limite: int = 10, desde: Optional[float] = None) -> List[dict]:
+        """
+        Busca noticias por texto libre
+
+        Args:
+            consulta: Texto a buscar (se tokeniza igual que los documentos)
+            limite: Número máximo de resultados
+            desde: Si se indica, solo noticias publicadas desde ese epoch
+
+        Returns:
+            Lista de {'noticia': Noticia, 'puntuacion': float}, mejor primero
+        """
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return []
+
+        with self._lock:
+            total = len(self._documentos) or 1
+            puntuaciones: Dict[str, float] = {}
+            coincidencias: Dict[str, int] = {}
+            for termino in set(terminos):
+                postings = self._postings.get(termino)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for doc_id, peso in postings.items():
+                    puntuaciones[doc_id] = puntuaciones.get(doc_id, 0.0) + peso * idf
+                    coincidencias[doc_id] = coincidencias.get(doc_id, 0) + 1
+
+            candidatos = []
+            for doc_id, puntuacion in puntuaciones.items():
+                documento = self._documentos[doc_id]
+                if desde is not None and documento['publicado'] < desde:
+                    continue
+                candidatos.append((coincidencias[doc_id], puntuacion, documento['noticia']))
+
+        # Primero las que contienen más términos de la consulta, luego por puntuación
+        candidatos.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [
+            {'noticia': noticia, 'puntuacion': round(puntuacion, 4)}
+            for _, puntuacion, noticia in candidatos[:limite]
+        ]
+
+    def guardar(self, ruta: Optional[str] = None):
+        """Persiste el índice en disco (JSON, escritura atómica)"""
+        ruta = ruta or self.ruta
+        if not ruta:
+            return
+        with self._lock:
+            documentos = [
+                {'noticia': asdict(doc['noticia']), 'visto': doc['visto']}
+                for doc in self._documentos.values()
+            ]
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'version': 1, 'documentos': documentos}, archivo, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    def cargar(self, ruta: Optional[str] = None) -> int:
+        """
+        Carga un índice persistido, descartando las noticias caducadas
+
+        Returns:
+            Número de documentos cargados
+        """
+        ruta = ruta or self.ruta
+        if not ruta or not os.path.exists(ruta):
+            return 0
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                data = json.load(archivo)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo cargar el índice de búsqueda {ruta}: {e}")
+            return 0
+
+        ahora = time.time()
+        with self._lock:
+            for documento in data.get('documentos', []):
+                noticia = Noticia(**documento['noticia'])
+                doc_id = noticia.url or noticia.titulo
+                if doc_id in self._documentos:
+                    self._quitar(doc_id)
+                self._insertar(doc_id, noticia, documento['visto'])
+            self._desalojar(ahora)
+        return len(self._documentos)
+
+    def estadisticas(self) -> dict:
+        """Tamaño actual del índice"""
+        return {
+            'documentos': len(self._documentos),
+            'terminos': len(self._postings),
+            'max_documentos': self.max_documentos,
+            'max_edad_segundos': self.max_edad
+        }
+
+    def _insertar(self, doc_id: str, noticia: Noticia, visto: float):
+        pesos: Dict[str, float] = {}
+        for campo, peso_campo in PESOS_CAMPOS.items():
+            for termino in tokenizar(getattr(noticia, campo) or ''):
+                pesos[termino] = pesos.get(termino, 0.0) + peso_campo
+
+        for termino, peso in pesos.items():
+            self._postings.setdefault(termino, {})[doc_id] = peso
+
+        publicado = marca_tiempo_noticia(noticia.fecha_publicacion) or visto
+        self._documentos[doc_id] = {
+            'noticia': noticia,
+            'visto': visto,
+            'publicado': publicado,
+            'terminos': tuple(pesos)
+        }
+        self._documentos.move_to_end(doc_id)
+
+    def _quitar(self, doc_id: str):
+        documento = self._documentos.pop(doc_id)
+        for termino in documento['terminos']:
+            postings = self._postings.get(termino)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[termino]
+
+    def _desalojar(self, ahora: float):
+        """Elimina lo más antiguo mientras se supere el tamaño o la edad máxima"""
+        limite_edad = ahora - self.max_edad
+        while self._documentos:
+            doc_id, documento = next(iter(self._documentos.items()))
+            if len(self._documentos) <= self.max_documentos and documento['visto'] >= limite_edad:
+                break
+            self._quitar(doc_id)
@@ -0,0 +1,153 @@
+"""
+Proveedor de calidad del aire con Open-Meteo Air Quality API (gratuita)
+"""
+from typing import Callable, Optional
+from ..models.informacion_models import InformacionCalidadAire
+from ..utils.cache import CacheTTL
+from ..utils.config import Ajuste, Config, ajuste_vigente
+from ..utils.decodificacion import decodificar_respuesta
+from ..utils.limitador import SesionPlanificada
+from ..utils.mock_data import MockDataProvider
+from ..utils.trazas import anotar
+
+
+class CalidadAireProvider:
+    """
+    Proveedor de calidad del aire usando Open-Meteo (gratuita)
+
+    No geocodifica por su cuenta: recibe las coordenadas del geocodificador
+    del proveedor de clima, así que reutiliza su caché de coordenadas y, en
+    una consulta completa, la misma petición de geocoding.
+    """
+
+    VARIABLES = ('european_aqi', 'us_aqi', 'pm2_5', 'pm10', 'nitrogen_dioxide', 'ozone', 'carbon_monoxide')
+
+    # Índice europeo (EAQI): límite superior de cada nivel
+    NIVELES = ((20, "Buena"), (40, "Aceptable"), (60, "Moderada"), (80, "Mala"), (100, "Muy mala"))
+
+    url = Ajuste('OPEN_METEO_AIR_QUALITY_URL')
+    timeout = Ajuste('REQUEST_TIMEOUT')
+
+    def __init__(self, geocodificador: Optional[Callable[[str], Optional[dict]]] = None):
+        """
+        Args:
+            geocodificador: ciudad -> coordenadas (por defecto el de un ClimaProvider propio)
+        """
+        self.sesion = SesionPlanificada()
+        self.cache_calidad_aire = CacheTTL(ajuste_vigente('AIR_QUALITY_CACHE_TTL'))
+        if geocodificador is None:
+            from .clima_provider import ClimaProvider
+            geocodificador = ClimaProvider().obtener_coordenadas
+        self.geocodificador = geocodificador
+
+    def obtener_calidad_aire(self, ciudad: str) -> Optional[InformacionCalidadAire]:
+        """
+        Obtiene la calidad del aire actual de una ciudad
+
+        Args:
+            ciudad: Nombre de la ciudad
+
+        Returns:
+            InformacionCalidadAire o None si hay error
+        """
+        if Config.actual().USE_MOCK_DATA:
+            print(f"Usando datos simulados para calidad del aire de {ciudad}")
+            anotar(simulado=True)
+            MockDataProvider.simular_red("calidad_aire")
+            return self._procesar_respuesta(MockDataProvider.get_calidad_aire_mock(ciudad), ciudad.title(),
+                                            simulado=True)
+
+        try:
+            print(f"Consultando calidad del aire de {ciudad} con Open-Meteo...")
+            coordenadas = self.geocodificador(ciudad)
+            if not coordenadas:
+                return self._usar_fallback(ciudad)
+
+            respuesta = self._hacer_peticion(coordenadas)
+            if respuesta:
+                return self._procesar_respuesta(respuesta, coordenadas['name'])
+            return self._usar_fallback(ciudad)
+
+        except Exception as e:
+            print(f"Error obteniendo calidad del aire: {str(e)}")
+            return self._usar_fallback(ciudad)
+
+    def caches(self) -> dict:
+        """Cachés del proveedor (para snapshot/restauración)"""
+        return {'calidad_aire': self.cache_calidad_aire}
+
+    def _hacer_peticion(self, coordenadas: dict) -> Optional[dict]:
+        """Hace la petición a la API de calidad del aire (cacheada por coordenadas)"""
+        clave = f"{coordenadas['latitude']:.3f},{coordenadas['longitude']:.3f}"
+        data = self.cache_calidad_aire.obtener(clave)
+        anotar(cache_calidad_aire=bool(data))
+        if data:
+            return data
+
+        respuesta = self.sesion.get(
+            self.url,
+            params={
+                'latitude': coordenadas['latitude'],
+                'longitude': coordenadas['longitude'],
+                'current': ','.join(self.VARIABLES),
+                'timezone': 'auto'
+            },
+            timeout=self.timeout
+        )
+
+        if respuesta.status_code == 200:
+            data = decodificar_respuesta(respuesta, ('current',))
+            self.cache_calidad_aire.guardar(clave, data)
+            return data
+        print(f"Error API calidad del aire: {respuesta.status_code}")
+        return None
+
+    def _procesar_respuesta(self, data: dict, ciudad: str, simulado: bool = False) -> InformacionCalidadAire:
+        """Crea InformacionCalidadAire a partir de la respuesta de Open-Meteo"""
+        try:
+            current = data['current']
+            indice = int(round(current['european_aqi']))
+            return InformacionCalidadAire(
+                indice_europeo=indice,
+                nivel=self.nivel(indice),
+                ciudad=ciudad,
+                indice_eeuu=int(round(current['us_aqi'])) if current.get('us_aqi') is not None else None,
+                pm2_5=current.get('pm2_5'),
+                pm10=current.get('pm10'),
+                dioxido_nitrogeno=current.get('nitrogen_dioxide'),
+                ozono=current.get('ozone'),
+                monoxido_carbono=current.get('carbon_monoxide'),
+                simulado=simulado
+            )
+        except (KeyError, TypeError) as e:
+            print(f"Error procesando datos de calidad del aire: {str(e)}")
+            raise
+
+    @classmethod
+    def nivel(cls, indice: int) -> str:
+        """Descripción del nivel del índice europeo"""
+        for limite, descripcion in cls.NIVELES:
+            if indice <= limite:
+                return descripcion
+        return "Extremadamente mala"
+
+    def _usar_fallback(self, ciudad: str) -> Optional[InformacionCalidadAire]:
+        """Usa datos simulados como fallback"""
+        if Config.actual().ENABLE_FALLBACK:
+            print(f"API de calidad del aire falló, usando datos simulados para {ciudad}")
+            anotar(fallback=True)
+            return self._procesar_respuesta(MockDataProvider.get_calidad_aire_mock(ciudad), ciudad.title(),
+                                            simulado=True)
+        return None
+
+    def verificar_conexion(self) -> bool:
+        """Verifica si la API está disponible"""
+        try:
+            respuesta = self.sesion.get(
+                self.url,
+                params={'latitude': 40.4168, 'longitude': -3.7038, 'current': 'european_aqi'},
+                timeout=5
+            )
+            return respuesta.status_code == 200
+        except:
+            return False
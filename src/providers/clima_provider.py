@@ -1,20 +1,35 @@
 """
 Proveedor para obtener información climática de Open-Meteo API (gratuita)
 """
-import requests
+import threading
+from datetime import date
 from typing import Optional
 from ..models.informacion_models import InformacionClima
-from ..utils.config import Config
+from ..utils.cache import CacheTTL
+from ..utils.config import Ajuste, Config, ajuste_vigente
+from ..utils.decodificacion import decodificar_respuesta
+from ..utils.historico import VARIABLES
+from ..utils.limitador import SesionPlanificada
 from ..utils.mock_data import MockDataProvider
+from ..utils.trazas import anotar
 
 
 class ClimaProvider:
     """Proveedor de información climática usando Open-Meteo (gratuita)"""
     
+    geocoding_url = Ajuste('OPEN_METEO_GEOCODING_URL')
+    weather_url = Ajuste('OPEN_METEO_WEATHER_URL')
+    archive_url = Ajuste('OPEN_METEO_ARCHIVE_URL')
+    timeout = Ajuste('REQUEST_TIMEOUT')
+    
     def __init__(self):
-        self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        self.weather_url = "https://api.open-meteo.com/v1/forecast"
-        self.timeout = Config.REQUEST_TIMEOUT
+        # Sesión HTTP compartida: reutiliza conexiones (keep-alive) entre peticiones
+        self.sesion = SesionPlanificada()
+        self.cache_coordenadas = CacheTTL(ajuste_vigente('GEOCODING_CACHE_TTL'))
+        self.cache_clima = CacheTTL(ajuste_vigente('WEATHER_CACHE_TTL'))
+        # Geocodificaciones en curso por ciudad (las comparte la calidad del aire)
+        self._geocodificando = {}
+        self._lock_geocodificacion = threading.Lock()
         
     def obtener_clima(self, ciudad: str) -> Optional[InformacionClima]:
         """
@@ -27,8 +42,10 @@ class ClimaProvider:
             InformacionClima o None si hay error
         """
         # Si está configurado para usar mock, usar simulación
-        if Config.USE_MOCK_DATA:
+        if Config.actual().USE_MOCK_DATA:
             print(f"Usando datos simulados para clima de {ciudad}")
+            anotar(simulado=True)
+            MockDataProvider.simular_red("clima")
             return self._procesar_respuesta_clima_mock(
                 MockDataProvider.get_clima_mock(ciudad)
             )
@@ -38,7 +55,7 @@ class ClimaProvider:
             print(f"Consultando clima real de {ciudad} con Open-Meteo...")
             
             # Paso 1: Obtener coordenadas de la ciudad
-            coordenadas = self._obtener_coordenadas(ciudad)
+            coordenadas = self.obtener_coordenadas(ciudad)
             if not coordenadas:
                 return self._usar_fallback(ciudad)
             
@@ -54,8 +71,53 @@ class ClimaProvider:
             print(f"Error obteniendo clima: {str(e)}")
             return self._usar_fallback(ciudad)
     
+    def caches(self) -> dict:
+        """Cachés del proveedor (para snapshot/restauración)"""
+        return {'coordenadas': self.cache_coordenadas, 'clima': self.cache_clima}
+    
+    @staticmethod
+    def clave_coordenadas(coordenadas: dict) -> str:
+        """Clave de la caché de clima: coordenadas redondeadas a 3 decimales"""
+        return f"{coordenadas['latitude']:.3f},{coordenadas['longitude']:.3f}"
+    
+    def clave_clima(self, ciudad: str) -> Optional[str]:
+        """Clave de la caché de clima de una ciudad ya geocodificada (o None)"""
+        coordenadas = self.cache_coordenadas.obtener(ciudad.strip().lower())
+        return self.clave_coordenadas(coordenadas) if coordenadas else None
+    
+    def obtener_coordenadas(self, ciudad: str) -> Optional[dict]:
+        """
+        Coordenadas de una ciudad (cacheadas por nombre)
+        
+        Si otro hilo ya está geocodificando la misma ciudad (p. ej. el clima y
+        la calidad del aire de una misma consulta), espera su resultado en
+        lugar de repetir la petición.
+        
+        Returns:
+            {'latitude', 'longitude', 'name', 'country', 'population'} o None
+        """
+        if Config.actual().USE_MOCK_DATA:
+            return MockDataProvider.get_coordenadas_mock(ciudad)
+        
+        clave = ciudad.strip().lower()
+        with self._lock_geocodificacion:
+            lock = self._geocodificando.setdefault(clave, threading.Lock())
+        with lock:
+            try:
+                return self._obtener_coordenadas(ciudad)
+            finally:
+                with self._lock_geocodificacion:
+                    if self._geocodificando.get(clave) is lock:
+                        del self._geocodificando[clave]
+    
     def _obtener_coordenadas(self, ciudad: str) -> Optional[dict]:
-        """Obtiene las coordenadas de una ciudad"""
+        """Obtiene las coordenadas de una ciudad (cacheadas por nombre)"""
+        clave = ciudad.strip().lower()
+        coordenadas = self.cache_coordenadas.obtener(clave)
+        anotar(cache_coordenadas=bool(coordenadas))
+        if coordenadas:
+            return coordenadas
+        
         try:
             parametros = {
                 'name': ciudad,
@@ -64,22 +126,25 @@ class ClimaProvider:
                 'format': 'json'
             }
             
-            respuesta = requests.get(
+            respuesta = self.sesion.get(
                 self.geocoding_url,
                 params=parametros,
                 timeout=self.timeout
             )
             
             if respuesta.status_code == 200:
-                data = respuesta.json()
+                data = decodificar_respuesta(respuesta)
                 if data.get('results') and len(data['results']) > 0:
                     resultado = data['results'][0]
-                    return {
+                    coordenadas = {
                         'latitude': resultado['latitude'],
                         'longitude': resultado['longitude'],
                         'name': resultado['name'],
-                        'country': resultado.get('country', 'N/A')
+                        'country': resultado.get('country', 'N/A'),
+                        'population': resultado.get('population', 0)
                     }
+                    self.cache_coordenadas.guardar(clave, coordenadas)
+                    return coordenadas
             
             print(f"No se encontraron coordenadas para {ciudad}")
             return None
@@ -90,6 +155,12 @@ class ClimaProvider:
     
     def _hacer_peticion_clima(self, coordenadas: dict) -> Optional[dict]:
         """Hace la petición HTTP a la API de clima de Open-Meteo"""
+        clave = self.clave_coordenadas(coordenadas)
+        data = self.cache_clima.obtener(clave)
+        anotar(cache_clima=bool(data))
+        if data:
+            return data
+        
         try:
             parametros = {
                 'latitude': coordenadas['latitude'],
@@ -99,14 +170,16 @@ class ClimaProvider:
                 'forecast_days': 1
             }
             
-            respuesta = requests.get(
+            respuesta = self.sesion.get(
                 self.weather_url,
                 params=parametros,
                 timeout=self.timeout
             )
             
             if respuesta.status_code == 200:
-                return respuesta.json()
+                data = decodificar_respuesta(respuesta, ('current', 'utc_offset_seconds'))
+                self.cache_clima.guardar(clave, data)
+                return data
             else:
                 print(f"Error API clima: {respuesta.status_code}")
                 return None
@@ -115,6 +188,48 @@ class ClimaProvider:
             print(f"Error en petición de clima: {str(e)}")
             return None
     
+    def obtener_archivo(self, coordenadas: dict, desde: date, hasta: date) -> Optional[dict]:
+        """
+        Observaciones horarias pasadas (API de archivo de Open-Meteo, en UTC)
+        
+        Args:
+            coordenadas: Resultado de obtener_coordenadas
+            desde, hasta: Días inicial y final (inclusive)
+            
+        Returns:
+            Respuesta con 'hourly' (una lista por variable) o None si hay error
+        """
+        if Config.actual().USE_MOCK_DATA:
+            anotar(simulado=True)
+            MockDataProvider.simular_red("archivo_clima")
+            return MockDataProvider.get_archivo_clima_mock(
+                coordenadas['latitude'], coordenadas['longitude'], desde, hasta
+            )
+        
+        try:
+            print(f"Consultando archivo de clima ({desde} a {hasta}) con Open-Meteo...")
+            respuesta = self.sesion.get(
+                self.archive_url,
+                params={
+                    'latitude': coordenadas['latitude'],
+                    'longitude': coordenadas['longitude'],
+                    'start_date': desde.isoformat(),
+                    'end_date': hasta.isoformat(),
+                    'hourly': ','.join(VARIABLES.values()),
+                    'timezone': 'GMT'
+                },
+                timeout=self.timeout
+            )
+            
+            if respuesta.status_code == 200:
+                return decodificar_respuesta(respuesta, ('hourly', 'utc_offset_seconds'))
+            print(f"Error API archivo de clima: {respuesta.status_code}")
+            return None
+            
+        except Exception as e:
+            print(f"Error en petición de archivo de clima: {str(e)}")
+            return None
+    
     def _procesar_respuesta_clima(self, data: dict, ciudad: str, coordenadas: dict) -> InformacionClima:
         """Procesa la respuesta de Open-Meteo y crea el objeto InformacionClima"""
         try:
@@ -151,7 +266,8 @@ class ClimaProvider:
                 pais=data['sys'].get('country', 'N/A'),
                 icono=data['weather'][0]['icon'],
                 presion=data['main'].get('pressure'),
-                visibilidad=data.get('visibility')
+                visibilidad=data.get('visibility'),
+                simulado=True
             )
         except KeyError as e:
             print(f"Error procesando datos simulados: {str(e)}")
@@ -207,8 +323,9 @@ class ClimaProvider:
     
     def _usar_fallback(self, ciudad: str) -> Optional[InformacionClima]:
         """Usa datos simulados como fallback"""
-        if Config.ENABLE_FALLBACK:
+        if Config.actual().ENABLE_FALLBACK:
             print(f"API de clima falló, usando datos simulados para {ciudad}")
+            anotar(fallback=True)
             return self._procesar_respuesta_clima_mock(
                 MockDataProvider.get_clima_mock(ciudad)
             )
@@ -217,7 +334,7 @@ class ClimaProvider:
     def verificar_conexion(self) -> bool:
         """Verifica si la API está disponible"""
         try:
-            respuesta = requests.get(
+            respuesta = self.sesion.get(
                 self.geocoding_url,
                 params={'name': 'Madrid', 'count': 1},
                 timeout=5
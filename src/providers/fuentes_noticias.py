@@ -0,0 +1,281 @@
+"""
+Fuentes de noticias enchufables e índice de noticias por país
+
+Cada fuente implementa la interfaz FuenteNoticias. La fuente incluida lee
+feeds RSS/Atom de forma incremental (iterparse), de modo que nunca se carga
+el documento completo en memoria. El índice precalcula, para cada país
+configurado, las noticias ya ordenadas; en tiempo de petición solo hay una
+búsqueda en un diccionario.
+"""
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..models.informacion_models import InformacionNoticias, Noticia
+from ..utils.config import Ajuste, Config
+from ..utils.limitador import SesionPlanificada
+
+
+class FuenteNoticias:
+    """Interfaz base para cualquier fuente de noticias"""
+
+    nombre = "Fuente"
+
+    def obtener(self, pais: str) -> List[Noticia]:
+        """
+        Obtiene las noticias de la fuente
+
+        Args:
+            pais: Nombre del país para el que se piden noticias
+
+        Returns:
+            Lista de Noticia (puede estar vacía)
+        """
+        raise NotImplementedError
+
+
+class FuenteFeed(FuenteNoticias):
+    """Fuente RSS 2.0 / Atom leída en streaming desde HTTP o un archivo local"""
+
+    max_articulos = Ajuste('NEWS_MAX_ARTICLES')
+    timeout = Ajuste('REQUEST_TIMEOUT')
+
+    def __init__(self, url: str, max_articulos: Optional[int] = None):
+        self.url = url
+        self.nombre = url
+        if max_articulos:
+            self.max_articulos = max_articulos
+        # Turno por host, Retry-After y trazas como el resto de proveedores
+        self.sesion = SesionPlanificada()
+
+    def obtener(self, pais: str) -> List[Noticia]:
+        return list(self.iterar_noticias())
+
+    def iterar_noticias(self) -> Iterator[Noticia]:
+        """Recorre el feed elemento a elemento y produce objetos Noticia"""
+        with self._abrir() as flujo:
+            emitidas = 0
+            titulo_feed = None
+            dentro_item = False
+            for evento, elemento in ET.iterparse(flujo, events=('start', 'end')):
+                etiqueta = _sin_namespace(elemento.tag)
+                if etiqueta in ('item', 'entry'):
+                    dentro_item = evento == 'start'
+                if evento == 'start':
+                    continue
+                if etiqueta == 'title' and not dentro_item and titulo_feed is None:
+                    titulo_feed = (elemento.text or '').strip() or None
+                if etiqueta not in ('item', 'entry'):
+                    continue
+
+                noticia = self._procesar_elemento(elemento, titulo_feed)
+                # Liberar el subárbol ya procesado para mantener memoria constante
+                elemento.clear()
+                if noticia is None:
+                    continue
+
+                yield noticia
+                emitidas += 1
+                if emitidas >= self.max_articulos:
+                    break
+
+    def _abrir(self):
+        """Abre el feed como flujo binario (archivo local, file:// o HTTP)"""
+        if self.url.startswith('file://'):
+            return open(self.url[len('file://'):], 'rb')
+        if not self.url.startswith(('http://', 'https://')):
+            return open(self.url, 'rb')
+
+        respuesta = self.sesion.get(self.url, timeout=self.timeout, stream=True)
+        respuesta.raise_for_status()
+        respuesta.raw.decode_content = True
+        return _FlujoRespuesta(respuesta)
+
+    def _procesar_elemento(self, elemento, titulo_feed: Optional[str]) -> Optional[Noticia]:
+        """Convierte un <item> RSS o <entry> Atom en Noticia"""
+        campos = {}
+        for hijo in elemento:
+            etiqueta = _sin_namespace(hijo.tag)
+            if etiqueta == 'link' and hijo.get('href'):
+                # Atom: <link href="..."/>; preferir rel="alternate"
+                if hijo.get('rel', 'alternate') == 'alternate' or 'link' not in campos:
+                    campos['link'] = hijo.get('href')
+            elif hijo.text and etiqueta not in campos:
+                campos[etiqueta] = hijo.text.strip()
+
+        titulo = campos.get('title')
+        if not titulo:
+            return None
+
+        descripcion = campos.get('description') or campos.get('summary') or campos.get('content') or ''
+        if len(descripcion) > 200:
+            descripcion = descripcion[:200] + "..."
+
+        fecha = campos.get('pubDate') or campos.get('published') or campos.get('updated') or campos.get('date')
+
+        return Noticia(
+            titulo=titulo,
+            descripcion=descripcion,
+            url=campos.get('link') or campos.get('guid') or campos.get('id') or '',
+            fuente=titulo_feed or self.nombre,
+            fecha_publicacion=fecha
+        )
+
+
+class IndiceNoticiasPorPais:
+    """
+    Índice precalculado de noticias ordenadas por país
+
+    Se refresca en segundo plano cada Config.NEWS_REFRESH_INTERVAL segundos.
+    """
+
+    def __init__(self, fuentes: Dict[str, List[FuenteNoticias]], intervalo: Optional[int] = None):
+        self.fuentes = {pais.lower(): lista for pais, lista in fuentes.items()}
+        self._nombres = {pais.lower(): pais for pais in fuentes}
+        self.intervalo = intervalo or Config.NEWS_REFRESH_INTERVAL
+        self._indice: Dict[str, InformacionNoticias] = {}
+        self._suscriptores: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def tiene_pais(self, pais: str) -> bool:
+        """Indica si hay fuentes configuradas para el país"""
+        return pais.lower() in self.fuentes
+
+    def obtener(self, pais: str) -> Optional[InformacionNoticias]:
+        """Devuelve las noticias precalculadas del país (búsqueda en diccionario)"""
+        clave = pais.lower()
+        resultado = self._indice.get(clave)
+        if resultado is None and clave in self.fuentes:
+            # Primera petición antes de que el refresco haya terminado
+            resultado = self.refrescar_pais(pais)
+        return resultado
+
+    def refrescar(self):
+        """Recalcula el índice de todos los países configurados"""
+        for clave in list(self.fuentes):
+            self.refrescar_pais(self._nombres[clave])
+
+    def refrescar_pais(self, pais: str) -> Optional[InformacionNoticias]:
+        """Lee todas las fuentes del país, ordena y publica el resultado"""
+        clave = pais.lower()
+        noticias = []
+        for fuente in self.fuentes.get(clave, []):
+            try:
+                noticias.extend(fuente.obtener(pais))
+            except Exception as e:
+                print(f"Error leyendo fuente de noticias {fuente.nombre}: {e}")
+
+        if not noticias:
+            return self._indice.get(clave)
+
+        ordenadas = ordenar_noticias(noticias)[:Config.actual().NEWS_MAX_ARTICLES]
+        resultado = InformacionNoticias(
+            noticias=ordenadas,
+            total_resultados=len(ordenadas),
+            pais=pais,
+            fuente_api="Feeds RSS/Atom"
+        )
+        with self._lock:
+            anterior = self._indice.get(clave)
+            self._indice[clave] = resultado
+        if anterior is not None and anterior.noticias != resultado.noticias:
+            for suscriptor in self._suscriptores:
+                suscriptor(pais)
+        return resultado
+
+    def suscribir(self, callback: Callable[[str], None]):
+        """Registra `callback(pais)`, llamado cuando un refresco cambia las noticias ya publicadas del país"""
+        self._suscriptores.append(callback)
+
+    def iniciar(self):
+        """Arranca el hilo de refresco en segundo plano (idempotente)"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle_refresco, name="indice-noticias", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de refresco"""
+        self._detener.set()
+
+    def _bucle_refresco(self):
+        while not self._detener.is_set():
+            self.refrescar()
+            self._detener.wait(self.intervalo)
+
+
+def ordenar_noticias(noticias: List[Noticia]) -> List[Noticia]:
+    """
+    Ordena noticias por relevancia: más recientes primero, sin duplicados por URL
+
+    Las noticias sin fecha conservan el orden del feed detrás de las fechadas.
+    """
+    vistas = set()
+    unicas = []
+    for posicion, noticia in enumerate(noticias):
+        clave = noticia.url or noticia.titulo
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        unicas.append((marca_tiempo_noticia(noticia.fecha_publicacion), -posicion, noticia))
+
+    unicas.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [noticia for _, _, noticia in unicas]
+
+
+def crear_fuentes_desde_config() -> Dict[str, List[FuenteNoticias]]:
+    """Construye las fuentes de feeds declaradas en Config.NEWS_FEEDS"""
+    return {
+        pais: [FuenteFeed(url) for url in urls]
+        for pais, urls in Config.NEWS_FEEDS.items()
+    }
+
+
+def marca_tiempo_noticia(fecha: Optional[str]) -> float:
+    """
+    Convierte una fecha RSS (RFC 822), ISO 8601 o epoch en segundos
+
+    Las fechas sin zona horaria (o con '-0000') se toman como UTC, nunca
+    como hora local del servidor.
+    """
+    if not fecha:
+        return 0.0
+    fecha = fecha.strip()
+    if fecha.isdigit():
+        return float(fecha)
+    try:
+        valor = parsedate_to_datetime(fecha)
+    except (TypeError, ValueError, IndexError):
+        try:
+            valor = datetime.fromisoformat(fecha.replace('Z', '+00:00'))
+        except ValueError:
+            return 0.0
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor.timestamp()
+
+
+def _sin_namespace(etiqueta: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return etiqueta.rsplit('}', 1)[-1]
+
+
+class _FlujoRespuesta:
+    """Adaptador para usar una respuesta HTTP en streaming con 'with'"""
+
+    def __init__(self, respuesta):
+        self._respuesta = respuesta
+
+    def read(self, tamano: int = -1) -> bytes:
+        return self._respuesta.raw.read(tamano)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._respuesta.close()
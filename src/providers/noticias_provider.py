@@ -1,64 +1,122 @@
 """
 Proveedor para obtener noticias de Hacker News API (completamente gratuita)
 """
-import requests
-from typing import Optional, List, Dict, Any
+import atexit
+import time
+from typing import Optional, List, Dict
 from ..models.informacion_models import InformacionNoticias, Noticia
-from ..utils.config import Config
+from ..utils.cache import CacheTTL
+from ..utils.config import Ajuste, Config, ajuste_vigente
+from ..utils.decodificacion import decodificar_respuesta
+from ..utils.limitador import SesionPlanificada
 from ..utils.mock_data import MockDataProvider
+from ..utils.trazas import anotar, incrementar
+from .busqueda_noticias import IndiceBusquedaNoticias
+from .fuentes_noticias import FuenteNoticias, IndiceNoticiasPorPais, crear_fuentes_desde_config
 
 
 class NoticiasProvider:
-    """Proveedor de noticias usando Hacker News API (completamente gratuita)"""
+    """
+    Proveedor de noticias
+
+    Si el país tiene fuentes locales configuradas (Config.NEWS_FEEDS) se sirven
+    desde el índice precalculado; en otro caso se usa Hacker News API.
+    """
+    
+    # Campos de un item de Hacker News que se usan para construir la Noticia
+    CAMPOS_HISTORIA = ('id', 'type', 'title', 'text', 'url', 'score', 'time')
+    
+    base_url = Ajuste('HACKER_NEWS_API_BASE_URL')
+    timeout = Ajuste('REQUEST_TIMEOUT')
     
-    def __init__(self):
-        self.base_url = "https://hacker-news.firebaseio.com/v0"
-        self.timeout = Config.REQUEST_TIMEOUT
+    def __init__(self, fuentes: Optional[Dict[str, List[FuenteNoticias]]] = None):
+        self.sesion = SesionPlanificada()
+        # Lista de mejores historias (cambia a menudo) y detalle de cada historia
+        self.cache_historias = CacheTTL(ajuste_vigente('NEWS_CACHE_TTL'))
+        self.cache_items = CacheTTL(ajuste_vigente('NEWS_CACHE_TTL', 12))
+        
+        fuentes = crear_fuentes_desde_config() if fuentes is None else fuentes
+        self.indice = IndiceNoticiasPorPais(fuentes) if fuentes else None
+        if self.indice:
+            self.indice.iniciar()
+        
+        # Índice de búsqueda offline sobre todas las noticias servidas
+        self.indice_busqueda = IndiceBusquedaNoticias(ruta=Config.NEWS_SEARCH_INDEX_FILE or None)
+        if self.indice_busqueda.ruta:
+            self.indice_busqueda.cargar()
+            atexit.register(self.indice_busqueda.guardar)
         
     def obtener_noticias(self, pais: str) -> Optional[InformacionNoticias]:
         """
-        Obtiene noticias de Hacker News API
+        Obtiene noticias locales del país o, si no hay fuentes, de Hacker News API
         
         Args:
-            pais: Código del país (se usa para personalizar el tipo de noticias)
+            pais: Nombre del país (selecciona las fuentes locales)
             
         Returns:
             InformacionNoticias con las noticias obtenidas o None si falla
         """
+        resultado = self._obtener_noticias(pais)
+        # Las noticias simuladas no se indexan para no contaminar la búsqueda
+        if resultado and resultado.fuente_api != "Datos simulados":
+            self.indice_busqueda.agregar_varias(resultado.noticias)
+        return resultado
+    
+    def buscar_noticias(self, consulta: str, dias: Optional[int] = None, limite: int = 10) -> List[dict]:
+        """
+        Busca en las noticias ya obtenidas sin llamar a ninguna API
+        
+        Args:
+            consulta: Texto a buscar en título, descripción y fuente
+            dias: Limitar a noticias publicadas en los últimos N días
+            limite: Número máximo de resultados
+            
+        Returns:
+            Lista de {'noticia': Noticia, 'puntuacion': float}
+        """
+        desde = time.time() - dias * 86400 if dias else None
+        return self.indice_busqueda.buscar(consulta, limite=limite, desde=desde)
+    
+    def caches(self) -> dict:
+        """Cachés del proveedor (para snapshot/restauración)"""
+        return {'historias': self.cache_historias, 'items': self.cache_items}
+    
+    def _obtener_noticias(self, pais: str) -> Optional[InformacionNoticias]:
+        """Obtiene noticias de la fuente que corresponda al país"""
+        # Si está configurado para usar mock, usar simulación
+        if Config.actual().USE_MOCK_DATA:
+            anotar(simulado=True)
+            MockDataProvider.simular_red("noticias")
+            return self._usar_datos_simulados(pais)
+        
+        if self.indice and self.indice.tiene_pais(pais):
+            noticias_locales = self.indice.obtener(pais)
+            if noticias_locales:
+                print(f"[OK] Noticias locales de {pais}: {noticias_locales.total_resultados} artículos")
+                anotar(fuente="locales")
+                return noticias_locales
+            print(f"Sin noticias locales para {pais}, usando Hacker News")
+        
         try:
             print(f"Obteniendo noticias reales de Hacker News...")
             
             # Obtener las mejores historias
-            top_stories_url = f"{self.base_url}/topstories.json"
-            response = requests.get(top_stories_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            story_ids = response.json()[:10]  # Obtener las primeras 10 historias
+            story_ids = self.cache_historias.obtener('topstories')
+            anotar(fuente="hacker_news", cache_historias=story_ids is not None)
+            if story_ids is None:
+                top_stories_url = f"{self.base_url}/topstories.json"
+                response = self.sesion.get(top_stories_url, timeout=self.timeout)
+                response.raise_for_status()
+                
+                story_ids = decodificar_respuesta(response)[:10]  # Obtener las primeras 10 historias
+                self.cache_historias.guardar('topstories', story_ids)
             
             noticias = []
             for story_id in story_ids:
                 try:
-                    # Obtener detalles de cada historia
-                    story_url = f"{self.base_url}/item/{story_id}.json"
-                    story_response = requests.get(story_url, timeout=self.timeout)
-                    story_response.raise_for_status()
-                    
-                    story_data = story_response.json()
-                    
-                    # Verificar que la historia tenga los campos necesarios
-                    if not story_data or story_data.get('type') != 'story':
-                        continue
-                        
-                    # Crear objeto Noticia
-                    noticia = Noticia(
-                        titulo=story_data.get('title', 'Sin título'),
-                        descripcion=story_data.get('text', 'Historia de Hacker News')[:200] + "..." if story_data.get('text') else f"Historia sobre tecnología y startup - {story_data.get('score', 0)} puntos",
-                        url=story_data.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                        fuente="Hacker News",
-                        fecha_publicacion=str(story_data.get('time', ''))
-                    )
-                    noticias.append(noticia)
-                    
+                    noticia = self._obtener_historia(story_id)
+                    if noticia:
+                        noticias.append(noticia)
                 except Exception as e:
                     print(f"Error obteniendo historia {story_id}: {e}")
                     continue
@@ -76,18 +134,60 @@ class NoticiasProvider:
                 
         except Exception as e:
             print(f"[ERROR] Error obteniendo noticias de Hacker News: {e}")
+            anotar(fallback=True)
             return self._usar_datos_simulados(pais)
     
+    def _obtener_historia(self, story_id) -> Optional[Noticia]:
+        """Obtiene una historia de Hacker News (cacheada por id); None si no es una 'story'"""
+        story_data = self.cache_items.obtener(str(story_id))
+        incrementar('cache_items_aciertos' if story_data is not None else 'cache_items_fallos')
+        if story_data is None:
+            story_url = f"{self.base_url}/item/{story_id}.json"
+            story_response = self.sesion.get(story_url, timeout=self.timeout)
+            story_response.raise_for_status()
+            
+            story_data = decodificar_respuesta(story_response, self.CAMPOS_HISTORIA)
+            self.cache_items.guardar(str(story_id), story_data)
+        
+        # Verificar que la historia tenga los campos necesarios
+        if not story_data or story_data.get('type') != 'story':
+            return None
+        
+        # Crear objeto Noticia
+        return Noticia(
+            titulo=story_data.get('title', 'Sin título'),
+            descripcion=story_data.get('text', 'Historia de Hacker News')[:200] + "..." if story_data.get('text') else f"Historia sobre tecnología y startup - {story_data.get('score', 0)} puntos",
+            url=story_data.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+            fuente="Hacker News",
+            fecha_publicacion=str(story_data.get('time', ''))
+        )
+    
     def _usar_datos_simulados(self, pais: str) -> InformacionNoticias:
         """Fallback a datos simulados si la API falla"""
         print("Usando noticias simuladas para", pais)
-        mock_provider = MockDataProvider()
-        return mock_provider.obtener_noticias_simuladas(pais)
+        data = MockDataProvider.get_noticias_mock(pais)
+        noticias = [
+            Noticia(
+                titulo=articulo['title'],
+                descripcion=articulo['description'],
+                url=articulo['url'],
+                fuente=articulo['source']['name'],
+                fecha_publicacion=articulo.get('publishedAt'),
+                imagen_url=articulo.get('urlToImage')
+            )
+            for articulo in data['articles']
+        ]
+        return InformacionNoticias(
+            noticias=noticias,
+            total_resultados=data['totalResults'],
+            pais=pais,
+            fuente_api="Datos simulados"
+        )
 
     def verificar_conexion(self) -> bool:
         """Verifica si la API está disponible"""
         try:
-            respuesta = requests.get(
+            respuesta = self.sesion.get(
                 f"{self.base_url}/topstories.json",
                 timeout=5
             )
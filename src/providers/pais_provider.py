@@ -1,19 +1,30 @@
 """
 Proveedor para obtener información de países de REST Countries API
 """
-import requests
 from typing import Optional
 from ..models.informacion_models import InformacionPais
-from ..utils.config import Config
+from ..utils.cache import CacheTTL
+from ..utils.config import Ajuste, Config, ajuste_vigente
+from ..utils.decodificacion import decodificar_respuesta
+from ..utils.limitador import SesionPlanificada
 from ..utils.mock_data import MockDataProvider
+from ..utils.trazas import anotar
 
 
 class PaisProvider:
     """Proveedor de información de países"""
     
+    # Campos que usa _procesar_respuesta_pais; se piden con ?fields= para que
+    # REST Countries no envíe traducciones, mapas, gentilicios, etc.
+    CAMPOS = ('name', 'capital', 'population', 'area', 'region', 'subregion',
+              'languages', 'currencies', 'cca2', 'flag')
+    
+    base_url = Ajuste('COUNTRIES_API_BASE_URL')
+    timeout = Ajuste('REQUEST_TIMEOUT')
+    
     def __init__(self):
-        self.base_url = Config.COUNTRIES_API_BASE_URL
-        self.timeout = Config.REQUEST_TIMEOUT
+        self.sesion = SesionPlanificada()
+        self.cache_paises = CacheTTL(ajuste_vigente('COUNTRY_CACHE_TTL'))
         
     def obtener_info_pais(self, pais: str) -> Optional[InformacionPais]:
         """
@@ -26,10 +37,12 @@ class PaisProvider:
             InformacionPais o None si hay error
         """
         # Si está configurado para usar mock, usar simulación
-        if Config.USE_MOCK_DATA:
+        if Config.actual().USE_MOCK_DATA:
             print(f"🎭 Usando información simulada del país {pais}")
+            anotar(simulado=True)
+            MockDataProvider.simular_red("pais")
             return self._procesar_respuesta_pais(
-                MockDataProvider.get_pais_mock(pais)[0]
+                MockDataProvider.get_pais_mock(pais)[0], simulado=True
             )
         
         try:
@@ -41,37 +54,51 @@ class PaisProvider:
                 return self._procesar_respuesta_pais(respuesta[0])
             else:
                 # Fallback a datos simulados
-                if Config.ENABLE_FALLBACK:
+                if Config.actual().ENABLE_FALLBACK:
                     print(f"⚠️  API de países falló, usando datos simulados para {pais}")
+                    anotar(fallback=True)
                     return self._procesar_respuesta_pais(
-                        MockDataProvider.get_pais_mock(pais)[0]
+                        MockDataProvider.get_pais_mock(pais)[0], simulado=True
                     )
                 
         except Exception as e:
             print(f"❌ Error obteniendo información del país: {str(e)}")
             
             # Fallback a datos simulados
-            if Config.ENABLE_FALLBACK:
+            if Config.actual().ENABLE_FALLBACK:
                 print(f"🎭 Usando información simulada como fallback para {pais}")
+                anotar(fallback=True)
                 return self._procesar_respuesta_pais(
-                    MockDataProvider.get_pais_mock(pais)[0]
+                    MockDataProvider.get_pais_mock(pais)[0], simulado=True
                 )
         
         return None
     
+    def caches(self) -> dict:
+        """Cachés del proveedor (para snapshot/restauración)"""
+        return {'paises': self.cache_paises}
+    
     def _hacer_peticion_pais(self, pais: str) -> Optional[list]:
-        """Hace la petición HTTP a la API de países"""
+        """Hace la petición HTTP a la API de países (cacheada por nombre)"""
+        clave = pais.strip().lower()
+        data = self.cache_paises.obtener(clave)
+        anotar(cache_pais=bool(data))
+        if data:
+            return data
+        
         url = f"{self.base_url}/{pais}"
         
-        respuesta = requests.get(url, timeout=self.timeout)
+        respuesta = self.sesion.get(url, params={'fields': ','.join(self.CAMPOS)}, timeout=self.timeout)
         
         if respuesta.status_code == 200:
-            return respuesta.json()
+            data = decodificar_respuesta(respuesta, self.CAMPOS)
+            self.cache_paises.guardar(clave, data)
+            return data
         else:
             print(f"❌ Error API países: {respuesta.status_code} - {respuesta.text}")
             return None
     
-    def _procesar_respuesta_pais(self, data: dict) -> InformacionPais:
+    def _procesar_respuesta_pais(self, data: dict, simulado: bool = False) -> InformacionPais:
         """Procesa la respuesta de la API y crea el objeto InformacionPais"""
         try:
             # Extraer idiomas
@@ -100,7 +127,9 @@ class PaisProvider:
                 idiomas=idiomas,
                 monedas=monedas,
                 codigo_pais=data.get('cca2', 'XX'),
-                bandera_emoji=data.get('flag', '🏳️')
+                bandera_emoji=data.get('flag', '🏳️'),
+                codigos_moneda=list(data.get('currencies', {})),
+                simulado=simulado
             )
             
         except KeyError as e:
@@ -150,7 +179,7 @@ class PaisProvider:
     def verificar_conexion(self) -> bool:
         """Verifica si la API está disponible"""
         try:
-            respuesta = requests.get(
+            respuesta = self.sesion.get(
                 f"{self.base_url}/Spain",
                 timeout=5
             )
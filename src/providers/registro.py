@@ -0,0 +1,249 @@
+"""
+Registro de proveedores de la fachada
+
+Cada proveedor declara qué valores necesita (entradas) y qué componente
+produce; la fachada construye con ellos un grafo de dependencias y ejecuta
+en paralelo todo lo que ya tiene sus entradas. Los resolutores calculan
+valores intermedios baratos (p. ej. el país de una ciudad) de los que
+dependen otros proveedores.
+
+Añadir una fuente nueva es registrar su definición, sin tocar la fachada:
+
+    registro.registrar(DefinicionProveedor(
+        nombre='mareas', fabrica=lambda fachada: MareasProvider(), metodo='obtener_mareas',
+        entradas=('ciudad',), paso="Obteniendo mareas", ...))
+
+Las fábricas reciben la fachada, para que un proveedor pueda reutilizar otro
+(la calidad del aire usa el geocodificador del clima). Los proveedores se
+importan dentro de sus fábricas: registrar no cuesta nada hasta la primera
+consulta.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Valores disponibles al empezar cualquier consulta
+ENTRADAS_INICIALES = ('ciudad',)
+
+
+@dataclass(frozen=True)
+class DefinicionProveedor:
+    """
+    Un proveedor de datos: cómo crearlo, qué método llamar y con qué entradas
+
+    El método recibe las entradas en el orden declarado y su resultado se
+    guarda como componente `nombre` de InformacionCompleta (y como valor
+    disponible para otros proveedores). Con componente=False es un paso
+    intermedio lento (p. ej. descargar una tabla) que corre en paralelo como
+    cualquier proveedor pero no se devuelve ni se puede pedir. Con
+    predeterminado=False solo se obtiene si se pide expresamente.
+    """
+    nombre: str
+    fabrica: Callable[[Any], Any]      # fabrica(fachada) -> instancia del proveedor
+    metodo: str
+    entradas: Tuple[str, ...] = ('ciudad',)
+    paso: str = ''                     # Mensaje de consola al empezar
+    mensaje_vacio: str = ''            # Error si el proveedor no devuelve nada
+    mensaje_error: str = ''            # Mensaje de consola si viene vacío
+    etiqueta_error: str = ''           # Prefijo del error si lanza una excepción
+    describir: Optional[Callable[[Any], str]] = None   # Resumen de consola del valor
+    concurrencia: Tuple[int, int] = (8, 16)            # (concurrentes, cola) si no hay config
+    componente: bool = True
+    predeterminado: bool = True
+
+    @property
+    def salida(self) -> str:
+        return self.nombre
+
+
+@dataclass(frozen=True)
+class Resolutor:
+    """
+    Valor intermedio barato derivado de otros, calculado en el hilo que
+    coordina la consulta: funcion(fachada, *entradas)
+    """
+    nombre: str
+    funcion: Callable[..., Any]
+    entradas: Tuple[str, ...] = ('ciudad',)
+
+    @property
+    def salida(self) -> str:
+        return self.nombre
+
+
+class RegistroProveedores:
+    """Definiciones de proveedores y resolutores, en orden de registro"""
+
+    def __init__(self):
+        self._proveedores: Dict[str, DefinicionProveedor] = OrderedDict()
+        self._resolutores: Dict[str, Resolutor] = OrderedDict()
+
+    def registrar(self, definicion: DefinicionProveedor) -> DefinicionProveedor:
+        """
+        Registra un proveedor
+
+        Raises:
+            ValueError: si el nombre ya está registrado
+        """
+        self._comprobar_nombre(definicion.nombre)
+        self._proveedores[definicion.nombre] = definicion
+        return definicion
+
+    def registrar_resolutor(self, resolutor: Resolutor) -> Resolutor:
+        """Registra un valor intermedio (ValueError si el nombre ya existe)"""
+        self._comprobar_nombre(resolutor.nombre)
+        self._resolutores[resolutor.nombre] = resolutor
+        return resolutor
+
+    def _comprobar_nombre(self, nombre: str):
+        if nombre in self._proveedores or nombre in self._resolutores or nombre in ENTRADAS_INICIALES:
+            raise ValueError(f"Ya hay un proveedor o valor llamado '{nombre}'")
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._proveedores
+
+    def __iter__(self) -> Iterator[DefinicionProveedor]:
+        return iter(list(self._proveedores.values()))
+
+    def nombres(self) -> Tuple[str, ...]:
+        """Componentes disponibles, en orden de registro"""
+        return tuple(nombre for nombre, definicion in self._proveedores.items() if definicion.componente)
+
+    def predeterminados(self) -> Tuple[str, ...]:
+        """Componentes que se obtienen cuando no se indica ninguno"""
+        return tuple(nombre for nombre in self.nombres() if self._proveedores[nombre].predeterminado)
+
+    def definicion(self, nombre: str) -> DefinicionProveedor:
+        return self._proveedores[nombre]
+
+    def plan(self, objetivos: List[str]) -> List[Any]:
+        """
+        Nodos (proveedores y resolutores) necesarios para obtener `objetivos`,
+        en orden topológico
+
+        Raises:
+            ValueError: si falta alguna entrada o hay un ciclo de dependencias
+        """
+        plan: List[Any] = []
+        estado: Dict[str, str] = {}  # nombre -> 'visitando' | 'hecho'
+
+        def visitar(nombre: str, requerido_por: Optional[str]):
+            if nombre in ENTRADAS_INICIALES or estado.get(nombre) == 'hecho':
+                return
+            if estado.get(nombre) == 'visitando':
+                raise ValueError(f"Dependencia circular en '{nombre}'")
+            nodo = self._proveedores.get(nombre) or self._resolutores.get(nombre)
+            if nodo is None:
+                raise ValueError(f"'{requerido_por}' necesita '{nombre}', que nadie produce")
+            estado[nombre] = 'visitando'
+            for entrada in nodo.entradas:
+                visitar(entrada, nombre)
+            estado[nombre] = 'hecho'
+            plan.append(nodo)
+
+        for objetivo in objetivos:
+            visitar(objetivo, None)
+        return plan
+
+
+def _crear_clima(fachada):
+    from .clima_provider import ClimaProvider
+    return ClimaProvider()
+
+
+def _crear_noticias(fachada):
+    from .noticias_provider import NoticiasProvider
+    return NoticiasProvider()
+
+
+def _crear_pais(fachada):
+    from .pais_provider import PaisProvider
+    return PaisProvider()
+
+
+def _crear_calidad_aire(fachada):
+    from .calidad_aire_provider import CalidadAireProvider
+    # Mismo geocodificador (y caché de coordenadas) que el clima
+    return CalidadAireProvider(fachada.proveedor('clima').obtener_coordenadas)
+
+
+def _crear_tipo_cambio(fachada):
+    from .tipo_cambio_provider import TipoCambioProvider
+    return TipoCambioProvider()
+
+
+def _tabla_cambios(fachada):
+    # La descarga de la tabla la hace la misma instancia que convierte
+    return fachada.proveedor('tipo_cambio')
+
+
+def _pais_de_ciudad(fachada, ciudad: str) -> str:
+    return fachada.proveedor('pais').obtener_pais_por_ciudad(ciudad)
+
+
+def crear_registro_predeterminado() -> RegistroProveedores:
+    """
+    Registro con los proveedores incluidos: clima, noticias, país, calidad del
+    aire y tipo de cambio
+
+    El tipo de cambio necesita el país (sus monedas) y la tabla diaria; la
+    descarga de la tabla no depende de nada y corre a la vez que el resto.
+    Calidad del aire y tipo de cambio se obtienen si se piden (o si están en
+    Config.DEFAULT_COMPONENTS).
+    """
+    registro = RegistroProveedores()
+    registro.registrar_resolutor(Resolutor('pais_ciudad', _pais_de_ciudad, ('ciudad',)))
+    registro.registrar(DefinicionProveedor(
+        nombre='clima', fabrica=_crear_clima, metodo='obtener_clima', entradas=('ciudad',),
+        paso="Obteniendo clima",
+        mensaje_vacio="No se pudo obtener información climática",
+        mensaje_error="Error obteniendo clima",
+        etiqueta_error="Error clima",
+        describir=lambda clima: f"Clima obtenido: {clima.temperatura}°C"
+    ))
+    registro.registrar(DefinicionProveedor(
+        nombre='noticias', fabrica=_crear_noticias, metodo='obtener_noticias', entradas=('pais_ciudad',),
+        paso="Obteniendo noticias",
+        mensaje_vacio="No se pudieron obtener noticias",
+        mensaje_error="Error obteniendo noticias",
+        etiqueta_error="Error noticias",
+        describir=lambda noticias: f"Noticias obtenidas: {len(noticias.noticias)} artículos",
+        concurrencia=(4, 8)
+    ))
+    registro.registrar(DefinicionProveedor(
+        nombre='pais', fabrica=_crear_pais, metodo='obtener_info_pais', entradas=('pais_ciudad',),
+        paso="Obteniendo información del país",
+        mensaje_vacio="No se pudo obtener información del país",
+        mensaje_error="Error obteniendo información del país",
+        etiqueta_error="Error país",
+        describir=lambda pais: f"País obtenido: {pais.nombre_comun}"
+    ))
+    registro.registrar(DefinicionProveedor(
+        nombre='calidad_aire', fabrica=_crear_calidad_aire, metodo='obtener_calidad_aire', entradas=('ciudad',),
+        paso="Obteniendo calidad del aire",
+        mensaje_vacio="No se pudo obtener la calidad del aire",
+        mensaje_error="Error obteniendo calidad del aire",
+        etiqueta_error="Error calidad del aire",
+        describir=lambda aire: f"Calidad del aire obtenida: {aire.nivel} ({aire.indice_europeo})",
+        predeterminado=False
+    ))
+    registro.registrar(DefinicionProveedor(
+        nombre='tabla_cambios', fabrica=_tabla_cambios, metodo='obtener_tabla', entradas=(),
+        paso="Obteniendo tabla de tipos de cambio",
+        concurrencia=(2, 32), componente=False
+    ))
+    registro.registrar(DefinicionProveedor(
+        nombre='tipo_cambio', fabrica=_crear_tipo_cambio, metodo='obtener_tipos_cambio',
+        entradas=('pais', 'tabla_cambios'),
+        paso="Calculando tipo de cambio",
+        mensaje_vacio="No se pudo obtener el tipo de cambio",
+        mensaje_error="Error obteniendo tipo de cambio",
+        etiqueta_error="Error tipo de cambio",
+        describir=lambda cambio: f"Tipo de cambio obtenido: {', '.join(cambio.monedas)}",
+        predeterminado=False
+    ))
+    return registro
+
+
+# Registro compartido: los proveedores adicionales se registran aquí
+registro = crear_registro_predeterminado()
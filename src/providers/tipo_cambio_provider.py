@@ -0,0 +1,162 @@
+"""
+Proveedor de tipos de cambio con ExchangeRate-API (endpoint abierto, gratuito)
+
+La tabla completa de tipos frente a una moneda base se descarga en una sola
+petición y se guarda hasta la siguiente actualización de la API (una vez al
+día). Cualquier conversión es aritmética local sobre esa tabla.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from ..models.informacion_models import InformacionPais, InformacionTipoCambio
+from ..utils.cache import CacheTTL
+from ..utils.config import Ajuste, Config, ajuste_vigente
+from ..utils.decodificacion import decodificar_respuesta
+from ..utils.limitador import SesionPlanificada
+from ..utils.mock_data import MockDataProvider
+from ..utils.trazas import anotar
+
+
+class TipoCambioProvider:
+    """Proveedor de tipos de cambio a partir de una tabla diaria"""
+
+    CAMPOS = ('result', 'base_code', 'rates', 'time_last_update_unix', 'time_next_update_unix')
+
+    base_url = Ajuste('EXCHANGE_RATES_URL')
+    moneda_base = Ajuste('EXCHANGE_BASE_CURRENCY')
+    referencias = Ajuste('EXCHANGE_REFERENCE_CURRENCIES')
+    timeout = Ajuste('REQUEST_TIMEOUT')
+
+    def __init__(self):
+        self.sesion = SesionPlanificada()
+        self.cache_tasas = CacheTTL(ajuste_vigente('EXCHANGE_RATES_TTL'))
+        # Con la tabla caducada, solo un hilo la descarga; el resto espera
+        self._lock_descarga = threading.Lock()
+
+    def obtener_tabla(self) -> Optional[dict]:
+        """
+        Tabla de tipos de cambio vigente
+
+        Returns:
+            {'base': moneda base, 'tasas': {moneda: unidades por 1 base},
+             'actualizada': timestamp Unix} o None si hay error
+        """
+        if Config.actual().USE_MOCK_DATA:
+            anotar(simulado=True)
+            MockDataProvider.simular_red("tipo_cambio")
+            return self._tabla_simulada()
+
+        tabla = self.cache_tasas.obtener(self.moneda_base)
+        anotar(cache_tasas=bool(tabla))
+        if tabla:
+            return tabla
+
+        with self._lock_descarga:
+            # Otro hilo pudo descargarla mientras esperábamos
+            tabla = self.cache_tasas.obtener(self.moneda_base)
+            if tabla:
+                return tabla
+            try:
+                print(f"Descargando tabla de tipos de cambio ({self.moneda_base})...")
+                tabla = self._descargar_tabla()
+            except Exception as e:
+                print(f"Error descargando tipos de cambio: {str(e)}")
+                tabla = None
+
+        if tabla is None and Config.actual().ENABLE_FALLBACK:
+            print("API de tipos de cambio falló, usando tabla simulada")
+            anotar(fallback=True)
+            return self._tabla_simulada()
+        return tabla
+
+    def caches(self) -> dict:
+        """Cachés del proveedor (para snapshot/restauración)"""
+        return {'tasas': self.cache_tasas}
+
+    def _descargar_tabla(self) -> Optional[dict]:
+        """Descarga la tabla completa y la guarda hasta la próxima actualización de la API"""
+        respuesta = self.sesion.get(f"{self.base_url}/{self.moneda_base}", timeout=self.timeout)
+        if respuesta.status_code != 200:
+            print(f"Error API tipos de cambio: {respuesta.status_code}")
+            return None
+
+        data = decodificar_respuesta(respuesta, self.CAMPOS)
+        if data.get('result') != 'success' or not data.get('rates'):
+            print(f"Error API tipos de cambio: {data.get('result')}")
+            return None
+
+        tabla = self._procesar_tabla(data)
+        ttl = self.cache_tasas.ttl
+        if data.get('time_next_update_unix'):
+            ttl = min(ttl, max(60, data['time_next_update_unix'] - time.time()))
+        self.cache_tasas.guardar(self.moneda_base, tabla, ttl)
+        return tabla
+
+    def _tabla_simulada(self) -> dict:
+        """Tabla simulada, marcada para no presentarla como datos de la API"""
+        return {**self._procesar_tabla(MockDataProvider.get_tipos_cambio_mock(self.moneda_base)), 'simulada': True}
+
+    @staticmethod
+    def _procesar_tabla(data: dict) -> dict:
+        return {
+            'base': data['base_code'],
+            'tasas': data['rates'],
+            'actualizada': data.get('time_last_update_unix')
+        }
+
+    @staticmethod
+    def convertir(tabla: dict, cantidad: float, de: str, a: str) -> Optional[float]:
+        """Convierte `cantidad` de la moneda `de` a la moneda `a` (None si alguna no está en la tabla)"""
+        tasas = tabla['tasas']
+        de, a = de.upper(), a.upper()
+        if de not in tasas or a not in tasas:
+            return None
+        return cantidad / tasas[de] * tasas[a]
+
+    def convertir_moneda(self, cantidad: float, de: str, a: str) -> Optional[float]:
+        """Convierte con la tabla vigente (solo descarga si ha caducado)"""
+        tabla = self.obtener_tabla()
+        return self.convertir(tabla, cantidad, de, a) if tabla else None
+
+    def obtener_tipos_cambio(self, pais: Optional[InformacionPais],
+                             tabla: Optional[dict]) -> Optional[InformacionTipoCambio]:
+        """
+        Equivalencias de las monedas de un país frente a las de referencia
+
+        Args:
+            pais: Información del país (sus códigos de moneda)
+            tabla: Tabla de obtener_tabla()
+
+        Returns:
+            InformacionTipoCambio o None si falta el país, la tabla o sus monedas
+        """
+        if not pais or not tabla:
+            return None
+        monedas = [moneda for moneda in pais.codigos_moneda if moneda in tabla['tasas']]
+        if not monedas:
+            return None
+        equivalencias = {
+            moneda: {
+                referencia: round(self.convertir(tabla, 1, moneda, referencia), 6)
+                for referencia in self.referencias
+                if referencia != moneda and referencia in tabla['tasas']
+            }
+            for moneda in monedas
+        }
+        actualizada = tabla.get('actualizada')
+        return InformacionTipoCambio(
+            monedas=monedas,
+            equivalencias=equivalencias,
+            moneda_base=tabla['base'],
+            actualizada=datetime.fromtimestamp(actualizada).isoformat(timespec='seconds') if actualizada else None,
+            fuente_api="Datos simulados" if tabla.get('simulada') else "ExchangeRate-API"
+        )
+
+    def verificar_conexion(self) -> bool:
+        """Verifica si la API está disponible"""
+        try:
+            respuesta = self.sesion.get(f"{self.base_url}/{self.moneda_base}", timeout=5)
+            return respuesta.status_code == 200
+        except:
+            return False
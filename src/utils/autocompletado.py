@@ -0,0 +1,135 @@
+"""
+Índice de prefijos de ciudades para autocompletar
+
+Los nombres normalizados (minúsculas, sin tildes) se mantienen ordenados en
+una lista; las coincidencias de un prefijo forman un rango contiguo que se
+localiza con búsqueda binaria, y dentro de él se eligen las más pobladas.
+Los datos paralelos se guardan en arrays compactos (población como enteros
+sin signo y el país como índice en una tabla de países). Los prefijos cortos
+abarcan rangos enormes, así que el resultado de cada prefijo se memoriza y se
+invalida solo cuando se añade una ciudad que empieza por él.
+"""
+import heapq
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .texto import normalizar_nombre
+
+# Carácter mayor que cualquier letra: cierra el rango de un prefijo
+_FIN_PREFIJO = '\U0010ffff'
+
+# Sugerencias memorizadas por prefijo (se calculan siempre las MAX_SUGERENCIAS mejores)
+MAX_SUGERENCIAS = 50
+MAX_PREFIJOS_MEMORIZADOS = 4096
+
+
+class IndiceCiudades:
+    """Índice ordenado nombre -> (nombre visible, país, población)"""
+
+    def __init__(self, entradas: Iterable[Tuple[str, str, int]] = ()):
+        self._claves: List[str] = []
+        self._nombres: List[str] = []
+        self._paises = array('H')
+        self._poblacion = array('Q')
+        self._tabla_paises: List[str] = []
+        self._indice_paises: Dict[str, int] = {}
+        self._memoria: Dict[str, List[Tuple[str, str, int]]] = {}
+        self._lock = threading.Lock()
+        self.construir(entradas)
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def _codigo_pais(self, pais: str) -> int:
+        codigo = self._indice_paises.get(pais)
+        if codigo is None:
+            codigo = len(self._tabla_paises)
+            self._tabla_paises.append(pais)
+            self._indice_paises[pais] = codigo
+        return codigo
+
+    def construir(self, entradas: Iterable[Tuple[str, str, int]]):
+        """Carga masiva: ordena una sola vez (sustituye el contenido)"""
+        filas = sorted(
+            (normalizar_nombre(nombre), nombre.strip(), pais or '', max(0, int(poblacion or 0)))
+            for nombre, pais, poblacion in entradas if normalizar_nombre(nombre)
+        )
+        with self._lock:
+            self._claves = [fila[0] for fila in filas]
+            self._nombres = [fila[1] for fila in filas]
+            self._paises = array('H', (self._codigo_pais(fila[2]) for fila in filas))
+            self._poblacion = array('Q', (fila[3] for fila in filas))
+            self._memoria.clear()
+
+    def agregar(self, nombre: str, pais: Optional[str] = None, poblacion: int = 0):
+        """Añade una ciudad (o actualiza la población si ya existe en ese país)"""
+        clave = normalizar_nombre(nombre)
+        if not clave:
+            return
+        pais = pais or ''
+        poblacion = max(0, int(poblacion or 0))
+        with self._lock:
+            codigo = self._codigo_pais(pais)
+            inicio = bisect_left(self._claves, clave)
+            fin = bisect_right(self._claves, clave, inicio)
+            for posicion in range(inicio, fin):
+                if self._paises[posicion] == codigo:
+                    if poblacion > self._poblacion[posicion]:
+                        self._poblacion[posicion] = poblacion
+                        self._olvidar_prefijos(clave)
+                    return
+            self._olvidar_prefijos(clave)
+            self._claves.insert(fin, clave)
+            self._nombres.insert(fin, nombre.strip())
+            self._paises.insert(fin, codigo)
+            self._poblacion.insert(fin, poblacion)
+
+    def sugerir(self, prefijo: str, limite: int = 8) -> List[dict]:
+        """
+        Ciudades cuyo nombre empieza por `prefijo`, de más a menos pobladas
+
+        Returns:
+            Lista de {'nombre', 'pais', 'poblacion'}
+        """
+        prefijo = normalizar_nombre(prefijo)
+        if not prefijo or limite <= 0:
+            return []
+        with self._lock:
+            mejores = self._memoria.get(prefijo)
+            if mejores is None:
+                inicio = bisect_left(self._claves, prefijo)
+                fin = bisect_left(self._claves, prefijo + _FIN_PREFIJO, inicio)
+                posiciones = heapq.nlargest(MAX_SUGERENCIAS, range(inicio, fin), key=self._poblacion.__getitem__)
+                mejores = [
+                    (self._nombres[p], self._tabla_paises[self._paises[p]], self._poblacion[p])
+                    for p in posiciones
+                ]
+                if len(self._memoria) >= MAX_PREFIJOS_MEMORIZADOS:
+                    self._memoria.clear()
+                self._memoria[prefijo] = mejores
+        return [
+            {'nombre': nombre, 'pais': pais, 'poblacion': poblacion}
+            for nombre, pais, poblacion in mejores[:limite]
+        ]
+
+    def _olvidar_prefijos(self, clave: str):
+        for longitud in range(1, len(clave) + 1):
+            self._memoria.pop(clave[:longitud], None)
+
+
+def leer_lista_ciudades(ruta: str) -> List[Tuple[str, str, int]]:
+    """Lee la lista incluida (TSV nombre, país, población; '#' para comentarios)"""
+    if not ruta or not os.path.exists(ruta):
+        return []
+    entradas = []
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            if not linea.strip() or linea.startswith('#'):
+                continue
+            campos = linea.rstrip('\n').split('\t')
+            if len(campos) >= 3 and campos[2].strip().isdigit():
+                entradas.append((campos[0], campos[1], int(campos[2])))
+    return entradas
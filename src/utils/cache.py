@@ -0,0 +1,424 @@
+"""
+Caché en memoria con expiración (TTL) para las respuestas de las APIs
+
+Los valores guardados deben ser serializables a JSON (diccionarios y listas
+de las respuestas originales) para poder volcar la caché a disco y
+restaurarla al arrancar.
+
+Todas las cachés comparten un presupuesto de memoria (Config.CACHE_MAX_MB)
+con el tamaño real de cada entrada. Cuando se llena, la política W-TinyLFU
+decide qué sale: las entradas nuevas pasan por una ventana LRU pequeña y
+solo entran en la zona principal si se piden más a menudo que la entrada a
+la que desplazarían (frecuencias aproximadas con un count-min sketch que se
+envejece). Así, un recorrido por miles de ciudades consultadas una sola vez
+no expulsa a las ciudades frecuentes.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .config import Config
+
+
+def tamano_en_memoria(valor: Any) -> int:
+    """Bytes que ocupa un valor con todo lo que contiene (sys.getsizeof recursivo)"""
+    total, vistos, pendientes = 0, set(), [valor]
+    while pendientes:
+        objeto = pendientes.pop()
+        if id(objeto) in vistos:
+            continue
+        vistos.add(id(objeto))
+        total += sys.getsizeof(objeto)
+        if isinstance(objeto, dict):
+            pendientes.extend(objeto.keys())
+            pendientes.extend(objeto.values())
+        elif isinstance(objeto, (list, tuple, set, frozenset)):
+            pendientes.extend(objeto)
+        elif hasattr(objeto, '__dict__'):
+            pendientes.append(vars(objeto))
+    return total
+
+
+class SketchFrecuencias:
+    """
+    Frecuencia aproximada de cada clave (count-min sketch de 4 filas)
+
+    Los contadores se saturan en 15 y se dividen a la mitad cada `muestra`
+    incrementos, de modo que las claves que dejan de pedirse pierden peso.
+    """
+
+    _SEMILLAS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MAXIMO = 15
+
+    def __init__(self, capacidad: int):
+        ancho = 1
+        while ancho < max(capacidad, 64):
+            ancho <<= 1
+        self._mascara = ancho - 1
+        self._filas = [bytearray(ancho) for _ in self._SEMILLAS]
+        self.muestra = 10 * ancho
+        self._incrementos = 0
+
+    def _indices(self, clave) -> List[int]:
+        h = hash(clave) & 0xFFFFFFFFFFFFFFFF
+        return [(((h * semilla) & 0xFFFFFFFFFFFFFFFF) >> 32) & self._mascara for semilla in self._SEMILLAS]
+
+    def incrementar(self, clave):
+        for fila, indice in zip(self._filas, self._indices(clave)):
+            if fila[indice] < self._MAXIMO:
+                fila[indice] += 1
+        self._incrementos += 1
+        if self._incrementos >= self.muestra:
+            self._envejecer()
+
+    def frecuencia(self, clave) -> int:
+        return min(fila[indice] for fila, indice in zip(self._filas, self._indices(clave)))
+
+    def _envejecer(self):
+        self._incrementos //= 2
+        for i, fila in enumerate(self._filas):
+            self._filas[i] = bytearray(contador >> 1 for contador in fila)
+
+
+class PresupuestoMemoria:
+    """
+    Límite de memoria compartido por varias cachés (W-TinyLFU por tamaño)
+
+    Tres zonas LRU con las entradas de todas las cachés:
+      - ventana (Config.CACHE_WINDOW_RATIO del total): recibe las entradas nuevas
+      - prueba: las que salen de la ventana y ganan la admisión
+      - protegida (80 % de la principal): las de prueba que se vuelven a pedir
+
+    Con `maximo_bytes` = 0 no hay límite (solo se contabiliza).
+    """
+
+    def __init__(self, maximo_bytes: int, proporcion_ventana: Optional[float] = None):
+        self._dimensionar(maximo_bytes, proporcion_ventana)
+        self._zonas = {'ventana': OrderedDict(), 'prueba': OrderedDict(), 'protegida': OrderedDict()}
+        self._bytes = dict.fromkeys(self._zonas, 0)
+        self._zona_de: Dict[tuple, str] = {}
+        # Entradas esperadas: para dimensionar el sketch (~2 KB por entrada)
+        self._sketch = SketchFrecuencias(max(1024, maximo_bytes // 2048))
+        self._lock = threading.Lock()
+        self.expulsiones = 0
+        self.rechazos = 0
+
+    def _dimensionar(self, maximo_bytes: int, proporcion_ventana: Optional[float]):
+        self.maximo_bytes = maximo_bytes
+        proporcion = Config.CACHE_WINDOW_RATIO if proporcion_ventana is None else proporcion_ventana
+        self.maximo_ventana = int(maximo_bytes * proporcion)
+        self.maximo_protegida = int((maximo_bytes - self.maximo_ventana) * 0.8)
+
+    @property
+    def bytes(self) -> int:
+        return sum(self._bytes.values())
+
+    def redimensionar(self, maximo_bytes: int, proporcion_ventana: Optional[float] = None):
+        """Cambia el límite (al recargar la configuración) y expulsa lo que ya no cabe"""
+        with self._lock:
+            self._dimensionar(maximo_bytes, proporcion_ventana)
+            expulsadas = self._ajustar()
+        self.expulsar(expulsadas)
+
+    def acceso(self, cache: 'CacheTTL', clave: str, acierto: bool):
+        """Anota una consulta (acierto o fallo) y reordena la entrada si está"""
+        entrada = (cache, clave)
+        with self._lock:
+            self._sketch.incrementar(entrada)
+            if acierto:
+                self._promover(entrada)
+
+    def registrar(self, cache: 'CacheTTL', clave: str, tamano: int) -> List[tuple]:
+        """
+        Da de alta (o actualiza) una entrada y decide qué sale para hacerle hueco
+
+        Se llama con el lock de la caché tomado (orden: caché y luego
+        presupuesto). Devuelve las entradas expulsadas, que el llamador pasa a
+        expulsar() después de soltarlo.
+        """
+        entrada = (cache, clave)
+        with self._lock:
+            zona = self._zona_de.get(entrada)
+            if zona is not None:
+                self._bytes[zona] += tamano - self._zonas[zona][entrada]
+                self._zonas[zona][entrada] = tamano
+                self._promover(entrada)
+                expulsadas = self._ajustar()
+            elif self.maximo_bytes and tamano > self.maximo_bytes - self.maximo_ventana:
+                expulsadas = [entrada]  # no cabría nunca en la zona principal
+                self.rechazos += 1
+            else:
+                self._meter('ventana', entrada, tamano)
+                expulsadas = self._ajustar()
+        return expulsadas
+
+    def registrada(self, cache: 'CacheTTL', clave: str) -> bool:
+        """Si la entrada se contabiliza (se llama con el lock de la caché tomado)"""
+        with self._lock:
+            return (cache, clave) in self._zona_de
+
+    def retirar(self, cache: 'CacheTTL', clave: Optional[str] = None):
+        """Olvida una entrada (o todas las de una caché) que la caché borra (con su lock tomado)"""
+        with self._lock:
+            entradas = [(cache, clave)] if clave is not None else [e for e in self._zona_de if e[0] is cache]
+            for entrada in entradas:
+                zona = self._zona_de.pop(entrada, None)
+                if zona is not None:
+                    self._bytes[zona] -= self._zonas[zona].pop(entrada)
+
+    def _meter(self, zona: str, entrada: tuple, tamano: int):
+        self._zonas[zona][entrada] = tamano
+        self._bytes[zona] += tamano
+        self._zona_de[entrada] = zona
+
+    def _sacar(self, entrada: tuple) -> int:
+        zona = self._zona_de.pop(entrada)
+        tamano = self._zonas[zona].pop(entrada)
+        self._bytes[zona] -= tamano
+        return tamano
+
+    def _promover(self, entrada: tuple):
+        zona = self._zona_de.get(entrada)
+        if zona == 'prueba':
+            self._meter('protegida', entrada, self._sacar(entrada))
+            # La protegida desborda hacia la cabeza de prueba
+            while self._bytes['protegida'] > self.maximo_protegida and len(self._zonas['protegida']) > 1:
+                degradada = next(iter(self._zonas['protegida']))
+                self._meter('prueba', degradada, self._sacar(degradada))
+        elif zona is not None:
+            self._zonas[zona].move_to_end(entrada)
+
+    def _ajustar(self) -> List[tuple]:
+        """Saca candidatos de la ventana y decide quién se queda; devuelve las entradas expulsadas"""
+        if not self.maximo_bytes:
+            return []
+        expulsadas = []
+        maximo_principal = self.maximo_bytes - self.maximo_ventana
+        while self._bytes['ventana'] > self.maximo_ventana:
+            candidata = next(iter(self._zonas['ventana']))
+            tamano = self._sacar(candidata)
+            frecuencia = self._sketch.frecuencia(candidata)
+            # Víctimas de la principal (primero prueba, luego protegida) hasta hacer hueco
+            victimas, liberado = [], 0
+            ocupado = self._bytes['prueba'] + self._bytes['protegida']
+            orden = chain(self._zonas['prueba'], self._zonas['protegida'])
+            admitida = True
+            while ocupado - liberado + tamano > maximo_principal:
+                victima = next(orden, None)
+                if victima is None or self._sketch.frecuencia(victima) >= frecuencia:
+                    admitida = False
+                    break
+                victimas.append(victima)
+                liberado += self._zonas[self._zona_de[victima]][victima]
+            if admitida:
+                for victima in victimas:
+                    self._sacar(victima)
+                expulsadas.extend(victimas)
+                self._meter('prueba', candidata, tamano)
+            else:
+                expulsadas.append(candidata)
+                self.rechazos += 1
+        # Una entrada de la principal que crece al actualizarse puede desbordarla
+        while self._bytes['prueba'] + self._bytes['protegida'] > maximo_principal:
+            victima = next(iter(self._zonas['prueba'] or self._zonas['protegida']))
+            self._sacar(victima)
+            expulsadas.append(victima)
+        self.expulsiones += len(expulsadas)
+        return expulsadas
+
+    @staticmethod
+    def expulsar(entradas: List[tuple]):
+        """Borra de sus cachés las entradas expulsadas (sin ningún lock tomado)"""
+        for cache, clave in entradas:
+            cache._descartar(clave)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                'maximo_bytes': self.maximo_bytes,
+                'bytes': self.bytes,
+                'entradas': len(self._zona_de),
+                'bytes_por_zona': dict(self._bytes),
+                'expulsiones': self.expulsiones,
+                'rechazos': self.rechazos
+            }
+
+
+# Presupuesto compartido por todas las cachés de los proveedores
+presupuesto_global = PresupuestoMemoria(int(Config.CACHE_MAX_MB * 1024 * 1024))
+
+
+@Config.suscribir
+def _reconfigurar_presupuesto(cambiados: frozenset):
+    if cambiados & {'CACHE_MAX_MB', 'CACHE_WINDOW_RATIO'}:
+        config = Config.instantanea()
+        presupuesto_global.redimensionar(int(config.CACHE_MAX_MB * 1024 * 1024), config.CACHE_WINDOW_RATIO)
+
+
+class CacheTTL:
+    """Caché clave -> valor con expiración por entrada y tamaño contabilizado"""
+
+    def __init__(self, ttl: Union[float, Callable[[], float]], presupuesto: Optional[PresupuestoMemoria] = None):
+        """
+        Args:
+            ttl: Segundos de vida por defecto de cada entrada, o una función que
+                los devuelve (ajuste_vigente) para seguir los cambios de Config
+            presupuesto: Límite de memoria que comparte (por defecto el global)
+        """
+        self._ttl = ttl
+        self.presupuesto = presupuesto_global if presupuesto is None else presupuesto
+        self._datos: Dict[str, tuple] = {}
+        self._tamanos: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.bytes = 0
+        self.expulsiones = 0
+        self._suscriptores: List[tuple] = []  # (callback, solo_cambios)
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    @ttl.setter
+    def ttl(self, ttl: Union[float, Callable[[], float]]):
+        self._ttl = ttl
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """Devuelve el valor si existe y no ha caducado"""
+        entrada = self._datos.get(clave)
+        if entrada is not None and entrada[1] > time.time():
+            self.aciertos += 1
+            self.presupuesto.acceso(self, clave, True)
+            return entrada[0]
+        if entrada is not None:
+            with self._lock:
+                # Otro hilo puede haberla renovado mientras tanto
+                if self._datos.get(clave) is entrada:
+                    self._borrar(clave)
+                    self.presupuesto.retirar(self, clave)
+        self.fallos += 1
+        self.presupuesto.acceso(self, clave, False)
+        return None
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None):
+        """Guarda un valor con el TTL indicado o el de la caché"""
+        expira = time.time() + (self.ttl if ttl is None else ttl)
+        tamano = sys.getsizeof(clave) + tamano_en_memoria(valor)
+        with self._lock:
+            anterior = self._datos.get(clave)
+            self._datos[clave] = (valor, expira)
+            self.bytes += tamano - self._tamanos.get(clave, 0)
+            self._tamanos[clave] = tamano
+            expulsadas = self.presupuesto.registrar(self, clave, tamano)
+        self.presupuesto.expulsar(expulsadas)
+        cambiada = anterior is not None and anterior[0] != valor
+        for suscriptor, solo_cambios in self._suscriptores:
+            if cambiada or not solo_cambios:
+                suscriptor(clave, valor)
+
+    def _borrar(self, clave: str) -> bool:
+        """Borra una entrada (con el lock tomado)"""
+        if self._datos.pop(clave, None) is None:
+            return False
+        self.bytes -= self._tamanos.pop(clave, 0)
+        return True
+
+    def _descartar(self, clave: str):
+        """Expulsión decidida por el presupuesto de memoria"""
+        with self._lock:
+            # Si se volvió a guardar después de la expulsión, la nueva se queda
+            if not self.presupuesto.registrada(self, clave) and self._borrar(clave):
+                self.expulsiones += 1
+
+    def suscribir(self, callback: Callable[[str, Any], None], solo_cambios: bool = False):
+        """
+        Registra `callback(clave, valor)`, llamado cada vez que se guarda una entrada
+
+        Con solo_cambios=True solo se llama cuando se sustituye una entrada
+        presente por un valor distinto (no al llenar la caché en frío).
+        """
+        self._suscriptores.append((callback, solo_cambios))
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._tamanos.clear()
+            self.bytes = 0
+            self.presupuesto.retirar(self)
+
+    def exportar(self) -> List[list]:
+        """Entradas vigentes como [clave, valor, expira] (para snapshot)"""
+        ahora = time.time()
+        with self._lock:
+            return [[clave, valor, expira] for clave, (valor, expira) in self._datos.items() if expira > ahora]
+
+    def importar(self, entradas: List[list]) -> int:
+        """Carga entradas exportadas descartando las caducadas"""
+        ahora = time.time()
+        cargadas, expulsadas = 0, []
+        with self._lock:
+            for clave, valor, expira in entradas:
+                if expira > ahora:
+                    tamano = sys.getsizeof(clave) + tamano_en_memoria(valor)
+                    self._datos[clave] = (valor, expira)
+                    self.bytes += tamano - self._tamanos.get(clave, 0)
+                    self._tamanos[clave] = tamano
+                    expulsadas.extend(self.presupuesto.registrar(self, clave, tamano))
+                    cargadas += 1
+        self.presupuesto.expulsar(expulsadas)
+        return cargadas
+
+    def estadisticas(self) -> dict:
+        return {'entradas': len(self._datos), 'aciertos': self.aciertos, 'fallos': self.fallos}
+
+    def uso_memoria(self) -> dict:
+        """Bytes contabilizados y expulsiones por falta de memoria"""
+        return {'entradas': len(self._datos), 'bytes': self.bytes, 'expulsiones': self.expulsiones}
+
+
+def guardar_snapshot(caches: Dict[str, CacheTTL], ruta: str):
+    """Vuelca varias cachés a un archivo JSON (escritura atómica)"""
+    contenido = {
+        'version': 1,
+        'creado': time.time(),
+        'caches': {nombre: cache.exportar() for nombre, cache in caches.items()}
+    }
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(contenido, archivo, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def restaurar_snapshot(caches: Dict[str, CacheTTL], ruta: str) -> int:
+    """
+    Restaura las cachés desde un snapshot
+
+    Returns:
+        Número total de entradas restauradas (0 si no hay archivo o es inválido)
+    """
+    if not os.path.exists(ruta):
+        return 0
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo leer el snapshot de caché {ruta}: {e}")
+        return 0
+
+    total = 0
+    for nombre, entradas in contenido.get('caches', {}).items():
+        if nombre in caches:
+            total += caches[nombre].importar(entradas)
+    return total
@@ -0,0 +1,112 @@
+"""
+Compartimentos estancos (bulkheads) con control de admisión
+
+Cada compartimento limita cuántas tareas se ejecutan a la vez y cuántas
+pueden esperar turno. Si la cola está llena (o la espera supera el máximo)
+la tarea se rechaza al momento con CompartimentoLleno, en lugar de dejar que
+la latencia crezca sin límite. Así un cliente de lotes o una API lenta no
+consumen los hilos del resto.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class CompartimentoLleno(Exception):
+    """El compartimento no admite más trabajo; reintentar pasados `reintentar_en` segundos"""
+
+    def __init__(self, nombre: str, reintentar_en: float):
+        super().__init__(f"Compartimento '{nombre}' saturado")
+        self.nombre = nombre
+        self.reintentar_en = reintentar_en
+
+
+class Compartimento:
+    """Límite de concurrencia con cola acotada y espera máxima"""
+
+    def __init__(self, nombre: str, max_concurrentes: int, max_cola: int,
+                 max_espera: float = 2.0, reintentar_en: float = 1.0):
+        self.nombre = nombre
+        self.max_concurrentes = max(1, max_concurrentes)
+        self.max_cola = max(0, max_cola)
+        self.max_espera = max_espera
+        self.reintentar_en = reintentar_en
+        self.activos = 0
+        self.en_cola = 0
+        self.admitidas = 0
+        self.rechazadas = 0
+        self._condicion = threading.Condition()
+
+    def entrar(self):
+        """
+        Ocupa un hueco, esperando en cola si hace falta
+
+        Raises:
+            CompartimentoLleno: si la cola está llena o se agota la espera
+        """
+        with self._condicion:
+            if self.activos >= self.max_concurrentes:
+                if self.en_cola >= self.max_cola:
+                    self.rechazadas += 1
+                    raise CompartimentoLleno(self.nombre, self.reintentar_en)
+                self.en_cola += 1
+                try:
+                    limite = time.monotonic() + self.max_espera
+                    while self.activos >= self.max_concurrentes:
+                        restante = limite - time.monotonic()
+                        if restante <= 0:
+                            self.rechazadas += 1
+                            raise CompartimentoLleno(self.nombre, self.reintentar_en)
+                        self._condicion.wait(restante)
+                finally:
+                    self.en_cola -= 1
+            self.activos += 1
+            self.admitidas += 1
+
+    def rechazo(self) -> CompartimentoLleno:
+        """Cuenta un rechazo hecho fuera de entrar() y devuelve la excepción a lanzar"""
+        with self._condicion:
+            self.rechazadas += 1
+        return CompartimentoLleno(self.nombre, self.reintentar_en)
+
+    def salir(self):
+        with self._condicion:
+            self.activos -= 1
+            self._condicion.notify()
+
+    @contextmanager
+    def ocupar(self):
+        self.entrar()
+        try:
+            yield
+        finally:
+            self.salir()
+
+    def ejecutar(self, funcion: Callable, *args, **kwargs):
+        """Ejecuta `funcion` dentro del compartimento"""
+        with self.ocupar():
+            return funcion(*args, **kwargs)
+
+    def estadisticas(self) -> dict:
+        return {
+            'activos': self.activos,
+            'en_cola': self.en_cola,
+            'max_concurrentes': self.max_concurrentes,
+            'max_cola': self.max_cola,
+            'admitidas': self.admitidas,
+            'rechazadas': self.rechazadas
+        }
+
+
+def crear_compartimentos(limites: Dict[str, tuple], max_espera: float,
+                         reintentar_en: float) -> Dict[str, Compartimento]:
+    """Crea un compartimento por nombre a partir de {nombre: (concurrentes, cola)}"""
+    return {
+        nombre: Compartimento(nombre, int(concurrentes), int(cola), max_espera, reintentar_en)
+        for nombre, (concurrentes, cola) in limites.items()
+    }
+
+
+def estadisticas(compartimentos: Optional[Dict[str, Compartimento]]) -> dict:
+    return {nombre: c.estadisticas() for nombre, c in (compartimentos or {}).items()}
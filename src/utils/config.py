@@ -1,33 +1,492 @@
 """
 Configuración centralizada para el proyecto
+
+Los ajustes son atributos de clase de Config, leídos de las variables de
+entorno (y del .env más cercano). El código que sirve consultas no los lee
+directamente sino de Config.actual(): una instantánea inmutable fijada al
+empezar cada consulta, de modo que cambiar la configuración en caliente
+(usar_datos_simulados, alternar_fallback, recargar...) no mezcla modos
+dentro de una misma respuesta.
 """
+import contextvars
 import os
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+
+
+def _buscar_env() -> Optional[str]:
+    """
+    Ruta del .env más cercano subiendo desde este directorio (lo mismo que
+    buscaría load_dotenv()), o None si no hay ninguno
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        ruta = os.path.join(directorio, '.env')
+        if os.path.isfile(ruta):
+            return ruta
+        padre = os.path.dirname(directorio)
+        if padre == directorio:
+            return None
+        directorio = padre
+
+
+# Variables que ya tenía el proceso antes de leer el .env: tienen prioridad
+# sobre él, también al recargar
+_VARIABLES_PROCESO = frozenset(os.environ)
+
+
+def _cargar_env():
+    """Carga el .env más cercano, importando python-dotenv solo si hay alguno"""
+    ruta = _buscar_env()
+    if ruta:
+        from dotenv import load_dotenv
+        load_dotenv(ruta)
+
 
 # Cargar variables de entorno
-load_dotenv()
+_cargar_env()
+
+
+def _parsear_feeds(valor: str) -> dict:
+    """
+    Convierte 'Spain=url1|url2;Mexico=url3' en {'Spain': [url1, url2], 'Mexico': [url3]}
+    """
+    feeds = {}
+    for bloque in valor.split(';'):
+        if '=' not in bloque:
+            continue
+        pais, urls = bloque.split('=', 1)
+        lista = [url.strip() for url in urls.split('|') if url.strip()]
+        if pais.strip() and lista:
+            feeds[pais.strip()] = lista
+    return feeds
+
+
+def _parsear_limites(valor: str) -> dict:
+    """
+    Convierte 'api.open-meteo.com=10:20;*=5' en {host: (tasa/s, ráfaga)}
+
+    Si no se indica ráfaga se usa la tasa. '*' aplica a cualquier otro host.
+    """
+    limites = {}
+    for bloque in valor.split(';'):
+        if '=' not in bloque:
+            continue
+        host, limite = bloque.split('=', 1)
+        tasa, _, rafaga = limite.partition(':')
+        try:
+            limites[host.strip()] = (float(tasa), float(rafaga or tasa))
+        except ValueError:
+            continue
+    return limites
+
+
+def leer_configuracion(entorno: Mapping[str, str]) -> dict:
+    """
+    Valores de todos los ajustes de Config a partir de unas variables de entorno
+    
+    Es el único sitio donde se declaran los ajustes y sus valores por
+    defecto: Config los toma al importarse y Config.recargar() los vuelve a
+    leer para aplicarlos todos de una vez.
+    
+    Args:
+        entorno: Variables de entorno (os.environ o las recargadas)
+        
+    Returns:
+        {NOMBRE: valor} de cada ajuste
+    """
+    getenv = entorno.get
+    
+    class Ajustes:
+        # URLs de las APIs (todas gratuitas). Se pueden redirigir a un proxy de
+        # caché o a un servidor local (ver benchmarks/servidor_grabacion.py)
+        OPEN_METEO_GEOCODING_URL = getenv('OPEN_METEO_GEOCODING_URL', "https://geocoding-api.open-meteo.com/v1/search")
+        OPEN_METEO_WEATHER_URL = getenv('OPEN_METEO_WEATHER_URL', "https://api.open-meteo.com/v1/forecast")
+        HACKER_NEWS_API_BASE_URL = getenv('HACKER_NEWS_API_BASE_URL', "https://hacker-news.firebaseio.com/v0")
+        COUNTRIES_API_BASE_URL = getenv('COUNTRIES_API_BASE_URL', "https://restcountries.com/v3.1/name")
+        OPEN_METEO_AIR_QUALITY_URL = getenv('OPEN_METEO_AIR_QUALITY_URL', "https://air-quality-api.open-meteo.com/v1/air-quality")
+        EXCHANGE_RATES_URL = getenv('EXCHANGE_RATES_URL', "https://open.er-api.com/v6/latest")
+        OPEN_METEO_ARCHIVE_URL = getenv('OPEN_METEO_ARCHIVE_URL', "https://archive-api.open-meteo.com/v1/archive")
+        
+        # Configuración general
+        USE_MOCK_DATA = getenv('USE_MOCK_DATA', 'false').lower() == 'true'
+        DEFAULT_LANGUAGE = getenv('DEFAULT_LANGUAGE', 'es')
+        DEFAULT_UNITS = getenv('DEFAULT_UNITS', 'metric')
+        REQUEST_TIMEOUT = int(getenv('REQUEST_TIMEOUT', '10'))
+        FACADE_WORKERS = int(getenv('FACADE_WORKERS', '8'))
+        # Componentes de una consulta sin selección (vacío: los predeterminados del
+        # registro, es decir clima, noticias y país). Ej: "clima,pais,calidad_aire,tipo_cambio"
+        DEFAULT_COMPONENTS = [c.strip().lower() for c in getenv('DEFAULT_COMPONENTS', '').split(',') if c.strip()]
+        
+        # Datos simulados deterministas y modelo de red sintético (pruebas de capacidad)
+        MOCK_SEED = int(getenv('MOCK_SEED', '42'))
+        MOCK_LATENCY_MS = float(getenv('MOCK_LATENCY_MS', '0'))
+        MOCK_LATENCY_JITTER_MS = float(getenv('MOCK_LATENCY_JITTER_MS', '0'))
+        MOCK_ERROR_RATE = float(getenv('MOCK_ERROR_RATE', '0'))
+        
+        # Noticias locales por país (feeds RSS/Atom). Formato de NEWS_FEEDS:
+        # "Spain=https://...|https://...;Mexico=https://..."
+        NEWS_FEEDS = _parsear_feeds(getenv('NEWS_FEEDS', ''))
+        NEWS_REFRESH_INTERVAL = int(getenv('NEWS_REFRESH_INTERVAL', '900'))
+        NEWS_MAX_ARTICLES = int(getenv('NEWS_MAX_ARTICLES', '10'))
+        
+        # Búsqueda offline sobre noticias ya obtenidas
+        NEWS_SEARCH_MAX_DOCS = int(getenv('NEWS_SEARCH_MAX_DOCS', '5000'))
+        NEWS_SEARCH_MAX_AGE_DAYS = int(getenv('NEWS_SEARCH_MAX_AGE_DAYS', '30'))
+        NEWS_SEARCH_INDEX_FILE = getenv('NEWS_SEARCH_INDEX_FILE', '')
+        
+        # Cachés de los proveedores (segundos)
+        GEOCODING_CACHE_TTL = int(getenv('GEOCODING_CACHE_TTL', '604800'))
+        WEATHER_CACHE_TTL = int(getenv('WEATHER_CACHE_TTL', '600'))
+        COUNTRY_CACHE_TTL = int(getenv('COUNTRY_CACHE_TTL', '86400'))
+        NEWS_CACHE_TTL = int(getenv('NEWS_CACHE_TTL', '300'))
+        AIR_QUALITY_CACHE_TTL = int(getenv('AIR_QUALITY_CACHE_TTL', '1800'))
+        
+        # Tipos de cambio: la tabla completa se descarga de una vez y se refresca a
+        # diario (o cuando la API anuncia la siguiente actualización); convertir es
+        # aritmética local. Las monedas de referencia son las que se muestran por país
+        EXCHANGE_RATES_TTL = int(getenv('EXCHANGE_RATES_TTL', '86400'))
+        EXCHANGE_BASE_CURRENCY = getenv('EXCHANGE_BASE_CURRENCY', 'USD').upper()
+        EXCHANGE_REFERENCE_CURRENCIES = [
+            m.strip().upper() for m in getenv('EXCHANGE_REFERENCE_CURRENCIES', 'USD,EUR').split(',') if m.strip()
+        ]
+        
+        # Memoria de las cachés: presupuesto compartido por todas (0 = sin límite)
+        # y fracción para la ventana de entradas nuevas de W-TinyLFU
+        CACHE_MAX_MB = float(getenv('CACHE_MAX_MB', '64'))
+        CACHE_WINDOW_RATIO = float(getenv('CACHE_WINDOW_RATIO', '0.01'))
+        
+        # Arranque en caliente: ciudades a precargar y snapshot de cachés
+        WARMUP_CITIES = [c.strip() for c in getenv('WARMUP_CITIES', '').split(',') if c.strip()]
+        WARMUP_WORKERS = int(getenv('WARMUP_WORKERS', '4'))
+        CACHE_SNAPSHOT_FILE = getenv('CACHE_SNAPSHOT_FILE', '')
+        
+        # Vigilancia del clima por suscripción (SSE): un bucle de refresco por
+        # ciudad vigilada, compartido por todos sus suscriptores
+        WATCH_INTERVAL = float(getenv('WATCH_INTERVAL', '60'))
+        WATCH_KEEPALIVE = float(getenv('WATCH_KEEPALIVE', '15'))
+        WATCH_MAX_CITIES = int(getenv('WATCH_MAX_CITIES', '20'))
+        WATCH_MAX_SUBSCRIBERS = int(getenv('WATCH_MAX_SUBSCRIBERS', '1000'))
+        WATCH_QUEUE_SIZE = int(getenv('WATCH_QUEUE_SIZE', '100'))
+        
+        # Histórico de clima (serie temporal local por ubicación). Vacío: deshabilitado.
+        # Los días que faltan se rellenan con la API de archivo de Open-Meteo y no
+        # se vuelven a pedir hasta pasado HISTORY_BACKFILL_RETRY segundos
+        HISTORY_DIR = getenv('HISTORY_DIR', '')
+        HISTORY_RETENTION_DAYS = int(getenv('HISTORY_RETENTION_DAYS', '365'))
+        HISTORY_SEGMENT_ROWS = int(getenv('HISTORY_SEGMENT_ROWS', '1024'))
+        HISTORY_BACKFILL_RETRY = int(getenv('HISTORY_BACKFILL_RETRY', '21600'))
+        
+        # Límite de tasa por host (peticiones/s:ráfaga). El tráfico interactivo
+        # tiene prioridad sobre los lotes y el precalentamiento
+        RATE_LIMIT_ENABLED = getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+        RATE_LIMITS = _parsear_limites(getenv(
+            'RATE_LIMITS',
+            'geocoding-api.open-meteo.com=10:10;api.open-meteo.com=10:10;'
+            'hacker-news.firebaseio.com=30:30;restcountries.com=5:5;'
+            'air-quality-api.open-meteo.com=10:10;open.er-api.com=2:2;'
+            'archive-api.open-meteo.com=5:5'
+        ))
+        RATE_LIMIT_MAX_WAIT = float(getenv('RATE_LIMIT_MAX_WAIT', '30'))
+        
+        # Reintentos (solo GET) con backoff exponencial y presupuesto, y peticiones
+        # de cobertura cuando un intento supera el percentil de su endpoint
+        RETRY_MAX_ATTEMPTS = int(getenv('RETRY_MAX_ATTEMPTS', '3'))
+        RETRY_BACKOFF_BASE_MS = float(getenv('RETRY_BACKOFF_BASE_MS', '100'))
+        RETRY_BACKOFF_MAX_MS = float(getenv('RETRY_BACKOFF_MAX_MS', '2000'))
+        RETRY_BUDGET_RATIO = float(getenv('RETRY_BUDGET_RATIO', '0.2'))
+        HEDGE_ENABLED = getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+        HEDGE_PERCENTILE = float(getenv('HEDGE_PERCENTILE', '95'))
+        HEDGE_MIN_SAMPLES = int(getenv('HEDGE_MIN_SAMPLES', '20'))
+        HEDGE_MAX_WORKERS = int(getenv('HEDGE_MAX_WORKERS', '16'))
+        
+        # Compartimentos (bulkheads): "nombre=concurrentes:cola". Por API externa
+        # (clima, noticias, pais) y por clase de cliente de la web (cabecera
+        # X-Clase-Cliente: interactivo o lotes). Si la cola está llena se responde
+        # 503 con Retry-After en lugar de acumular latencia
+        BULKHEADS_UPSTREAM = _parsear_limites(getenv('BULKHEADS_UPSTREAM', 'clima=8:16;noticias=4:8;pais=8:16'))
+        BULKHEADS_CLIENTS = _parsear_limites(getenv('BULKHEADS_CLIENTS', 'interactivo=16:32;lotes=4:4'))
+        BULKHEAD_MAX_WAIT = float(getenv('BULKHEAD_MAX_WAIT', '2'))
+        BULKHEAD_RETRY_AFTER = int(getenv('BULKHEAD_RETRY_AFTER', '1'))
+        
+        # Respuestas de la web: tamaño mínimo para comprimir (gzip/brotli)
+        COMPRESSION_MIN_BYTES = int(getenv('COMPRESSION_MIN_BYTES', '1024'))
+        
+        # Purga de la CDN/proxy por Surrogate-Key al refrescar las cachés (POST JSON)
+        PURGE_URL = getenv('PURGE_URL', '')
+        PURGE_DEBOUNCE_MS = float(getenv('PURGE_DEBOUNCE_MS', '500'))
+        
+        # Trazas por petición: búfer en memoria (/api/debug/trazas) y archivo JSONL (OTLP) opcional
+        TRACING_ENABLED = getenv('TRACING_ENABLED', 'true').lower() == 'true'
+        TRACE_BUFFER_SIZE = int(getenv('TRACE_BUFFER_SIZE', '2000'))
+        TRACE_EXPORT_FILE = getenv('TRACE_EXPORT_FILE', '')
+        
+        # Endpoints de administración (/api/admin/...): deshabilitados si no hay token
+        ADMIN_TOKEN = getenv('ADMIN_TOKEN', '')
+        
+        # Perfilado bajo demanda: intervalo del muestreo y duración máxima de una sesión
+        PROFILING_INTERVAL_MS = float(getenv('PROFILING_INTERVAL_MS', '5'))
+        PROFILING_MAX_SECONDS = float(getenv('PROFILING_MAX_SECONDS', '300'))
+        
+        # Autocompletado de ciudades: lista incluida (TSV nombre, país, población)
+        CITY_LIST_FILE = getenv(
+            'CITY_LIST_FILE',
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ciudades.tsv')
+        )
+        
+        # Configuración de fallback
+        ENABLE_FALLBACK = getenv('ENABLE_FALLBACK', 'true').lower() == 'true'
+        
+        # Configuración de logging
+        LOG_LEVEL = getenv('LOG_LEVEL', 'INFO')
+    
+    return {nombre: valor for nombre, valor in vars(Ajustes).items() if nombre.isupper()}
+
 
+def _entorno_recargado(ruta: Optional[str] = None) -> dict:
+    """
+    Variables del proceso más las del .env leído de nuevo
+    
+    Como al arrancar, las variables que el proceso ya tenía antes de cargar
+    el .env mandan sobre él; si se indica un archivo, manda el archivo.
+    
+    Raises:
+        FileNotFoundError: si se indica un archivo que no existe
+    """
+    entorno = dict(os.environ)
+    if ruta and not os.path.isfile(ruta):
+        raise FileNotFoundError(f"No existe el archivo de configuración {ruta}")
+    archivo = ruta or _buscar_env()
+    if archivo:
+        from dotenv import dotenv_values
+        for nombre, valor in dotenv_values(archivo).items():
+            if valor is not None and (ruta or nombre not in _VARIABLES_PROCESO):
+                entorno[nombre] = valor
+    return entorno
+
+
+def _congelar(valor):
+    """Copia inmutable de listas y diccionarios (anidados)"""
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    return valor
+
+
+class InstantaneaConfig:
+    """
+    Vista de solo lectura de todos los ajustes de Config en un instante
+    
+    Se lee igual que Config (instantanea.USE_MOCK_DATA). Las listas pasan a
+    ser tuplas y los diccionarios, mappings de solo lectura.
+    """
+    
+    __slots__ = ('_valores', 'version')
+    
+    def __init__(self, valores: dict, version: int):
+        object.__setattr__(self, '_valores', {nombre: _congelar(v) for nombre, v in valores.items()})
+        object.__setattr__(self, 'version', version)
+    
+    def __getattr__(self, nombre):
+        try:
+            return self._valores[nombre]
+        except KeyError:
+            raise AttributeError(f"Ajuste desconocido: {nombre}") from None
+    
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("La instantánea de configuración es de solo lectura")
+    
+    def __delattr__(self, nombre):
+        raise AttributeError("La instantánea de configuración es de solo lectura")
+    
+    def como_dict(self) -> dict:
+        return dict(self._valores)
+
+
+# Ajustes que solo se leen al arrancar (tamaño de pools, hilos de fondo,
+# índices en disco...): recargar() los aplica a Config pero no surten efecto
+# hasta reiniciar. Los demás se leen en cada consulta o reconfiguran sus
+# objetos al cambiar (ver Config.suscribir).
+AJUSTES_CON_REINICIO = frozenset({
+    'FACADE_WORKERS', 'BULKHEADS_UPSTREAM', 'BULKHEADS_CLIENTS', 'BULKHEAD_MAX_WAIT',
+    'BULKHEAD_RETRY_AFTER', 'NEWS_FEEDS', 'NEWS_REFRESH_INTERVAL', 'NEWS_SEARCH_MAX_DOCS',
+    'NEWS_SEARCH_MAX_AGE_DAYS', 'NEWS_SEARCH_INDEX_FILE', 'MOCK_SEED', 'TRACING_ENABLED',
+    'TRACE_BUFFER_SIZE', 'TRACE_EXPORT_FILE', 'PURGE_URL', 'PURGE_DEBOUNCE_MS',
+    'WATCH_INTERVAL', 'CITY_LIST_FILE', 'HISTORY_SEGMENT_ROWS', 'HISTORY_RETENTION_DAYS',
+})
 
-class Config:
-    """Configuración centralizada del proyecto"""
+
+class _MetaConfig(type):
+    """
+    Serializa los cambios de ajustes de Config (también los de patch.object
+    en los tests) con la construcción de instantáneas, e invalida la
+    instantánea global en cada cambio
+    """
     
-    # URLs de las APIs (todas gratuitas)
-    OPEN_METEO_GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
-    OPEN_METEO_WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
-    HACKER_NEWS_API_BASE_URL = "https://hacker-news.firebaseio.com/v0"
-    COUNTRIES_API_BASE_URL = "https://restcountries.com/v3.1/name"
+    def __setattr__(cls, nombre, valor):
+        with cls._lock:
+            super().__setattr__(nombre, valor)
+            if nombre.isupper():
+                cls._invalidar()
     
-    # Configuración general
-    USE_MOCK_DATA = os.getenv('USE_MOCK_DATA', 'false').lower() == 'true'
-    DEFAULT_LANGUAGE = os.getenv('DEFAULT_LANGUAGE', 'es')
-    DEFAULT_UNITS = os.getenv('DEFAULT_UNITS', 'metric')
-    REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '10'))
+    def __delattr__(cls, nombre):
+        with cls._lock:
+            super().__delattr__(nombre)
+            if nombre.isupper():
+                cls._invalidar()
+
+
+class Config(metaclass=_MetaConfig):
+    """
+    Configuración centralizada del proyecto
     
-    # Configuración de fallback
-    ENABLE_FALLBACK = os.getenv('ENABLE_FALLBACK', 'true').lower() == 'true'
+    Los ajustes (en mayúsculas) se declaran en leer_configuracion(). Para
+    cambiar varios a la vez usar actualizar() o recargar(); para leerlos
+    mientras se sirve una consulta, actual().
+    """
     
-    # Configuración de logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    _lock = threading.RLock()
+    _instantanea: Optional[InstantaneaConfig] = None
+    _version = 0
+    _recargas = 0
+    _suscriptores: list = []
+    # Instantánea fijada para la consulta en curso (la heredan los hilos
+    # lanzados con contextvars.copy_context, como los de la fachada)
+    _fijada = contextvars.ContextVar('config_fijada', default=None)
+    
+    @classmethod
+    def _invalidar(cls):
+        type.__setattr__(cls, '_instantanea', None)
+        type.__setattr__(cls, '_version', cls._version + 1)
+    
+    @classmethod
+    def instantanea(cls) -> InstantaneaConfig:
+        """Instantánea de los valores actuales (la misma hasta el siguiente cambio)"""
+        instantanea = cls._instantanea
+        if instantanea is None:
+            with cls._lock:
+                if cls._instantanea is None:
+                    valores = {nombre: v for nombre, v in vars(cls).items() if nombre.isupper()}
+                    type.__setattr__(cls, '_instantanea', InstantaneaConfig(valores, cls._version))
+                instantanea = cls._instantanea
+        return instantanea
+    
+    @classmethod
+    def actual(cls) -> InstantaneaConfig:
+        """Instantánea fijada para la consulta en curso o, si no hay ninguna, la global"""
+        return cls._fijada.get() or cls.instantanea()
+    
+    @classmethod
+    @contextmanager
+    def fijar(cls, instantanea: Optional[InstantaneaConfig] = None):
+        """
+        Fija una instantánea para todo lo que se ejecute dentro del bloque
+        
+        Si ya hay una fijada (una consulta que llama a otra) y no se indica
+        ninguna, se mantiene la de fuera.
+        
+        Uso:
+            with Config.fijar():
+                ...  # Config.actual() no cambia aunque se toque Config
+        """
+        fijada = cls._fijada.get()
+        if instantanea is None and fijada is not None:
+            yield fijada
+            return
+        token = cls._fijada.set(instantanea or cls.instantanea())
+        try:
+            yield cls._fijada.get()
+        finally:
+            cls._fijada.reset(token)
+    
+    @classmethod
+    def actualizar(cls, **valores):
+        """
+        Cambia varios ajustes de forma atómica: ninguna instantánea ve solo una parte
+        
+        Raises:
+            AttributeError: si algún ajuste no existe
+        """
+        desconocidos = [nombre for nombre in valores if not nombre.isupper() or not hasattr(cls, nombre)]
+        if desconocidos:
+            raise AttributeError(f"Ajustes desconocidos: {', '.join(sorted(desconocidos))}")
+        cls._aplicar(valores)
+    
+    @classmethod
+    def _aplicar(cls, valores: dict) -> list:
+        cambiados = cls._cambiar(valores)
+        cls._notificar(cambiados)
+        return cambiados
+    
+    @classmethod
+    def _cambiar(cls, valores: dict) -> list:
+        with cls._lock:
+            cambiados = sorted(nombre for nombre, valor in valores.items() if getattr(cls, nombre, None) != valor)
+            for nombre, valor in valores.items():
+                type.__setattr__(cls, nombre, valor)
+            cls._invalidar()
+        return cambiados
+    
+    @classmethod
+    def _notificar(cls, cambiados: list):
+        # Fuera del lock: los suscriptores toman los suyos y leen Config
+        if not cambiados:
+            return
+        for callback in list(cls._suscriptores):
+            try:
+                callback(frozenset(cambiados))
+            except Exception as e:
+                print(f"Error aplicando la configuración nueva en {getattr(callback, '__qualname__', callback)}: {e}")
+    
+    @classmethod
+    def suscribir(cls, callback: Callable[[frozenset], None]):
+        """
+        Registra una función a la que actualizar() y recargar() pasan los
+        nombres de los ajustes cambiados
+        
+        La usan los objetos que se construyen una vez con la configuración
+        (limitador de peticiones, política de reintentos, presupuesto de
+        memoria) para reconfigurarse en caliente.
+        """
+        cls._suscriptores.append(callback)
+        return callback
+    
+    @classmethod
+    def recargar(cls, ruta: Optional[str] = None) -> list:
+        """
+        Vuelve a leer la configuración del entorno y del .env y la aplica de una vez
+        
+        Las consultas en curso terminan con la instantánea que tenían; las
+        siguientes ven la nueva. Los ajustes de AJUSTES_CON_REINICIO quedan
+        en Config pero no surten efecto hasta reiniciar.
+        
+        Args:
+            ruta: Archivo .env a leer (por defecto el más cercano); sus valores
+                mandan sobre las variables del proceso
+                
+        Returns:
+            Nombres de los ajustes que han cambiado
+            
+        Raises:
+            FileNotFoundError: si se indica un archivo que no existe
+        """
+        nuevos = leer_configuracion(_entorno_recargado(ruta))
+        cambiados = cls._aplicar(nuevos)
+        with cls._lock:
+            type.__setattr__(cls, '_recargas', cls._recargas + 1)
+        print(f"Configuración recargada: {', '.join(cambiados) if cambiados else 'sin cambios'}")
+        pendientes = AJUSTES_CON_REINICIO.intersection(cambiados)
+        if pendientes:
+            print(f"Requieren reiniciar para surtir efecto: {', '.join(sorted(pendientes))}")
+        return cambiados
+    
+    @classmethod
+    def estado(cls) -> dict:
+        """Versión de la configuración y recargas (para el diagnóstico)"""
+        return {'version': cls.instantanea().version, 'recargas': cls._recargas}
     
     @classmethod
     def mostrar_configuracion(cls):
@@ -41,26 +500,32 @@ class Config:
         print(f"   APIs utilizadas:")
         print(f"      - Clima: Open-Meteo (gratuita)")
         print(f"      - Noticias: Hacker News (gratuita)")
+        if cls.NEWS_FEEDS:
+            print(f"      - Noticias locales: feeds RSS/Atom para {', '.join(cls.NEWS_FEEDS)}")
         print(f"      - Países: REST Countries (gratuita)")
+        print(f"      - Calidad del aire: Open-Meteo Air Quality (gratuita)")
+        print(f"      - Tipos de cambio: ExchangeRate-API (gratuita, tabla diaria)")
     
     @classmethod
     def usar_datos_simulados(cls):
         """Activa el modo de datos simulados"""
-        cls.USE_MOCK_DATA = True
+        cls.actualizar(USE_MOCK_DATA=True)
         print("Modo datos simulados activado")
     
     @classmethod
     def usar_datos_reales(cls):
         """Activa el modo de datos reales"""
-        cls.USE_MOCK_DATA = False
+        cls.actualizar(USE_MOCK_DATA=False)
         print("Modo datos reales activado")
     
     @classmethod
     def alternar_fallback(cls):
         """Alterna el estado del fallback"""
-        cls.ENABLE_FALLBACK = not cls.ENABLE_FALLBACK
-        estado = "activado" if cls.ENABLE_FALLBACK else "desactivado"
-        print(f"Fallback {estado}")
+        with cls._lock:
+            activar = not cls.ENABLE_FALLBACK
+            cambiados = cls._cambiar({'ENABLE_FALLBACK': activar})
+        cls._notificar(cambiados)
+        print(f"Fallback {'activado' if activar else 'desactivado'}")
     
     @classmethod
     def get_status_apis(cls):
@@ -86,5 +551,61 @@ class Config:
                 "gratuita": True,
                 "requiere_api_key": False,
                 "descripcion": "API gratuita de información de países"
+            },
+            "calidad_aire": {
+                "api": "Open-Meteo Air Quality",
+                "url": cls.OPEN_METEO_AIR_QUALITY_URL,
+                "gratuita": True,
+                "requiere_api_key": False,
+                "descripcion": "API gratuita de calidad del aire (índice europeo, PM2.5, PM10...)"
+            },
+            "tipo_cambio": {
+                "api": "ExchangeRate-API",
+                "url": cls.EXCHANGE_RATES_URL,
+                "gratuita": True,
+                "requiere_api_key": False,
+                "descripcion": "Tabla diaria de tipos de cambio (endpoint abierto)"
             }
-        } 
\ No newline at end of file
+        } 
+
+
+class Ajuste:
+    """
+    Atributo de clase que lee un ajuste de Config.actual() en cada acceso
+    
+    Para los proveedores: así un cambio de configuración (actualizar,
+    recargar) llega a las consultas siguientes sin recrearlos. Asignar el
+    atributo en una instancia fija su valor solo para ella (lo hacen los
+    tests y los servidores simulados con las URLs).
+    
+    Uso:
+        class ClimaProvider:
+            timeout = Ajuste('REQUEST_TIMEOUT')
+    """
+    
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.atributo = nombre
+    
+    def __set_name__(self, propietario, atributo):
+        self.atributo = atributo
+    
+    def __get__(self, instancia, propietario=None):
+        if instancia is not None and self.atributo in instancia.__dict__:
+            return instancia.__dict__[self.atributo]
+        return getattr(Config.actual(), self.nombre)
+    
+    def __set__(self, instancia, valor):
+        instancia.__dict__[self.atributo] = valor
+    
+    def __delete__(self, instancia):
+        instancia.__dict__.pop(self.atributo, None)
+
+
+def ajuste_vigente(nombre: str, factor: float = 1) -> Callable[[], float]:
+    """Función que devuelve el valor actual de un ajuste numérico (p. ej. el TTL de una caché)"""
+    return lambda: getattr(Config.actual(), nombre) * factor
+
+
+# Ajustes leídos al importar
+Config._aplicar(leer_configuracion(os.environ))
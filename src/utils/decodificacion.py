@@ -0,0 +1,46 @@
+"""
+Decodificación rápida de respuestas JSON de las APIs
+
+Usa orjson si está instalado (dependencia opcional, varias veces más rápido
+que json) y permite quedarse solo con los campos que usan los proveedores,
+de modo que las cachés y los snapshots no guardan traducciones, mapas y demás
+claves que nunca se leen.
+"""
+import json
+from typing import Any, Iterable, Union
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+def decodificar(contenido: Union[bytes, str]) -> Any:
+    """Decodifica JSON con el parser más rápido disponible"""
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+def proyectar(data: Any, campos: Iterable[str]) -> Any:
+    """
+    Se queda solo con `campos` de un objeto JSON (o de cada objeto de una lista)
+
+    Args:
+        data: dict o lista de dicts ya decodificados
+        campos: Claves de primer nivel a conservar
+
+    Returns:
+        El mismo tipo de entrada con las claves sobrantes eliminadas
+    """
+    if isinstance(data, list):
+        return [proyectar(elemento, campos) for elemento in data]
+    if not isinstance(data, dict):
+        return data
+    return {campo: data[campo] for campo in campos if campo in data}
+
+
+def decodificar_respuesta(respuesta, campos: Iterable[str] = None) -> Any:
+    """Decodifica el cuerpo de una respuesta de requests, proyectando si se indica"""
+    data = decodificar(respuesta.content)
+    return data if campos is None else proyectar(data, campos)
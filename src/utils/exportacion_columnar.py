@@ -0,0 +1,336 @@
+"""
+Exportación columnar de resultados masivos
+
+Aplana InformacionClima, InformacionPais y el número de noticias de cada
+InformacionCompleta en columnas tipadas y las escribe por bloques (chunks),
+de modo que la memoria usada depende del tamaño del bloque y no del total de
+filas.
+
+Formatos:
+- 'parquet': requiere pyarrow (dependencia opcional)
+- 'binario': formato propio compacto (columnas tipadas + zlib por bloque),
+  sin dependencias; se lee con leer_columnar()
+"""
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional
+    pa = None
+    pq = None
+
+from ..models.informacion_models import InformacionCompleta
+
+# (columna, tipo) en el orden en que se escriben
+ESQUEMA = [
+    ('ciudad', 'str'),
+    ('timestamp', 'str'),
+    ('temperatura', 'float'),
+    ('sensacion_termica', 'float'),
+    ('humedad', 'int'),
+    ('presion', 'int'),
+    ('descripcion_clima', 'str'),
+    ('ciudad_clima', 'str'),
+    ('pais_clima', 'str'),
+    ('pais', 'str'),
+    ('pais_oficial', 'str'),
+    ('codigo_pais', 'str'),
+    ('region', 'str'),
+    ('subregion', 'str'),
+    ('capital', 'str'),
+    ('poblacion', 'int'),
+    ('area', 'float'),
+    ('idiomas', 'str'),
+    ('monedas', 'str'),
+    ('num_noticias', 'int'),
+    ('num_errores', 'int')
+]
+
+FORMATOS = ('parquet', 'binario')
+
+_MAGICO = b'FMAC'
+_VERSION = 1
+_CODIGOS_ARRAY = {'int': 'q', 'float': 'd'}
+
+
+def aplanar(informacion: Union[InformacionCompleta, dict]) -> dict:
+    """
+    Convierte una InformacionCompleta (o su a_diccionario()) en una fila plana
+
+    Returns:
+        Diccionario columna -> valor según ESQUEMA
+    """
+    datos = informacion.a_diccionario() if isinstance(informacion, InformacionCompleta) else informacion
+    clima = datos.get('clima') or {}
+    pais = datos.get('pais') or {}
+    noticias = datos.get('noticias') or {}
+    return {
+        'ciudad': datos.get('ciudad_consultada'),
+        'timestamp': datos.get('timestamp'),
+        'temperatura': clima.get('temperatura'),
+        'sensacion_termica': clima.get('sensacion_termica'),
+        'humedad': clima.get('humedad'),
+        'presion': clima.get('presion'),
+        'descripcion_clima': clima.get('descripcion'),
+        'ciudad_clima': clima.get('ciudad'),
+        'pais_clima': clima.get('pais'),
+        'pais': pais.get('nombre_comun'),
+        'pais_oficial': pais.get('nombre_oficial'),
+        'codigo_pais': pais.get('codigo_pais'),
+        'region': pais.get('region'),
+        'subregion': pais.get('subregion'),
+        'capital': ', '.join(pais['capital']) if pais.get('capital') else None,
+        'poblacion': pais.get('poblacion'),
+        'area': pais.get('area'),
+        'idiomas': ', '.join(pais['idiomas']) if pais.get('idiomas') else None,
+        'monedas': ', '.join(pais['monedas']) if pais.get('monedas') else None,
+        'num_noticias': len(noticias.get('noticias') or []),
+        'num_errores': len(datos.get('errores') or [])
+    }
+
+
+def _convertir(valor, tipo: str):
+    """Fuerza el tipo de la columna; None se conserva como nulo"""
+    if valor is None:
+        return None
+    if tipo == 'int':
+        return int(valor)
+    if tipo == 'float':
+        return float(valor)
+    return str(valor)
+
+
+class ExportadorColumnar:
+    """
+    Acumula filas en columnas y las escribe cada `tam_bloque` filas
+
+    Uso:
+        with ExportadorColumnar('resultados.parquet') as exportador:
+            for info in resultados:
+                exportador.agregar(info)
+    """
+
+    def __init__(self, ruta: str, formato: Optional[str] = None, tam_bloque: int = 10000):
+        formato = formato or ('parquet' if pa is not None else 'binario')
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato} (usar {', '.join(FORMATOS)})")
+        if formato == 'parquet' and pa is None:
+            raise ImportError("El formato 'parquet' requiere pyarrow (pip install pyarrow)")
+
+        self.ruta = ruta
+        self.formato = formato
+        self.tam_bloque = tam_bloque
+        self.filas_escritas = 0
+        self._columnas: Dict[str, list] = {nombre: [] for nombre, _ in ESQUEMA}
+        self._pendientes = 0
+        self._escritor = _EscritorParquet(ruta) if formato == 'parquet' else _EscritorBinario(ruta)
+
+    @property
+    def filas_pendientes(self) -> int:
+        """Filas acumuladas que aún no se han escrito en disco"""
+        return self._pendientes
+
+    def agregar(self, informacion: Union[InformacionCompleta, dict]):
+        """Añade una fila; escribe el bloque cuando se completa"""
+        fila = aplanar(informacion)
+        for nombre, tipo in ESQUEMA:
+            self._columnas[nombre].append(_convertir(fila[nombre], tipo))
+        self._pendientes += 1
+        if self._pendientes >= self.tam_bloque:
+            self.vaciar()
+
+    def agregar_varias(self, informaciones):
+        for informacion in informaciones:
+            self.agregar(informacion)
+
+    def vaciar(self):
+        """Escribe el bloque pendiente (si lo hay) y libera su memoria"""
+        if not self._pendientes:
+            return
+        self._escritor.escribir_bloque(self._columnas, self._pendientes)
+        self.filas_escritas += self._pendientes
+        self._columnas = {nombre: [] for nombre, _ in ESQUEMA}
+        self._pendientes = 0
+
+    def cerrar(self):
+        self.vaciar()
+        self._escritor.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+class _EscritorParquet:
+    """Escritura por row groups con pyarrow"""
+
+    _TIPOS = {'str': 'string', 'int': 'int64', 'float': 'float64'}
+
+    def __init__(self, ruta: str):
+        self.esquema = pa.schema([(nombre, getattr(pa, self._TIPOS[tipo])()) for nombre, tipo in ESQUEMA])
+        self._escritor = pq.ParquetWriter(ruta, self.esquema, compression='zstd')
+
+    def escribir_bloque(self, columnas: Dict[str, list], filas: int):
+        tabla = pa.Table.from_pydict(columnas, schema=self.esquema)
+        self._escritor.write_table(tabla)
+
+    def cerrar(self):
+        self._escritor.close()
+
+
+class _EscritorBinario:
+    """
+    Formato binario propio:
+        'FMAC' | versión (u8) | longitud esquema (u32) | esquema JSON
+        bloques: filas (u32) | longitud comprimida (u32) | datos zlib
+
+    Dentro de cada bloque, por columna: máscara de nulos (1 bit por fila) y
+    los valores (int64/float64 little-endian, o offsets u32 + UTF-8 en texto).
+    """
+
+    def __init__(self, ruta: str):
+        self._archivo = open(ruta, 'r+b' if os.path.exists(ruta) else 'w+b')
+        self._archivo.seek(0, os.SEEK_END)
+        if self._archivo.tell() == 0:
+            esquema = json.dumps(ESQUEMA).encode('utf-8')
+            self._archivo.write(_MAGICO + struct.pack('<BI', _VERSION, len(esquema)) + esquema)
+        else:
+            self._descartar_bloque_incompleto()
+
+    def _descartar_bloque_incompleto(self):
+        """Al continuar un archivo, elimina un último bloque a medio escribir"""
+        archivo = self._archivo
+        archivo.seek(0)
+        if archivo.read(4) != _MAGICO:
+            raise ValueError(f"{archivo.name} no es un archivo columnar exportado")
+        _, longitud = struct.unpack('<BI', archivo.read(5))
+        posicion = 9 + longitud
+        total = archivo.seek(0, os.SEEK_END)
+        while posicion + 8 <= total:
+            archivo.seek(posicion)
+            _, tamano = struct.unpack('<II', archivo.read(8))
+            if posicion + 8 + tamano > total:
+                break
+            posicion += 8 + tamano
+        archivo.truncate(posicion)
+        archivo.seek(posicion)
+
+    def escribir_bloque(self, columnas: Dict[str, list], filas: int):
+        partes = []
+        for nombre, tipo in ESQUEMA:
+            valores = columnas[nombre]
+            partes.append(_mascara_nulos(valores))
+            if tipo in _CODIGOS_ARRAY:
+                datos = array(_CODIGOS_ARRAY[tipo], (0 if v is None else v for v in valores))
+                partes.append(_little_endian(datos))
+            else:
+                codificados = [(v or '').encode('utf-8') for v in valores]
+                offsets = array('I', [0])
+                for texto in codificados:
+                    offsets.append(offsets[-1] + len(texto))
+                partes.append(_little_endian(offsets))
+                partes.append(b''.join(codificados))
+
+        comprimido = zlib.compress(b''.join(partes), 6)
+        self._archivo.write(struct.pack('<II', filas, len(comprimido)))
+        self._archivo.write(comprimido)
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+def leer_columnar(ruta: str) -> Iterator[Dict[str, list]]:
+    """
+    Lee un archivo exportado bloque a bloque
+
+    Returns:
+        Iterador de diccionarios columna -> lista de valores
+    """
+    with open(ruta, 'rb') as archivo:
+        cabecera = archivo.read(4)
+    if cabecera == b'PAR1':
+        if pq is None:
+            raise ImportError("Leer parquet requiere pyarrow (pip install pyarrow)")
+        for lote in pq.ParquetFile(ruta).iter_batches():
+            yield lote.to_pydict()
+        return
+    if cabecera != _MAGICO:
+        raise ValueError(f"{ruta} no es un archivo columnar exportado")
+    yield from _leer_binario(ruta)
+
+
+def _leer_binario(ruta: str) -> Iterator[Dict[str, list]]:
+    with open(ruta, 'rb') as archivo:
+        archivo.read(4)
+        version, longitud = struct.unpack('<BI', archivo.read(5))
+        if version != _VERSION:
+            raise ValueError(f"Versión de formato no soportada: {version}")
+        esquema = json.loads(archivo.read(longitud).decode('utf-8'))
+
+        while True:
+            cabecera = archivo.read(8)
+            if len(cabecera) < 8:
+                break
+            filas, tamano = struct.unpack('<II', cabecera)
+            comprimido = archivo.read(tamano)
+            if len(comprimido) < tamano:
+                # Último bloque a medio escribir (ejecución interrumpida)
+                break
+            datos = memoryview(zlib.decompress(comprimido))
+            posicion = 0
+            bloque = {}
+            for nombre, tipo in esquema:
+                tam_mascara = (filas + 7) // 8
+                mascara = datos[posicion:posicion + tam_mascara]
+                posicion += tam_mascara
+
+                if tipo in _CODIGOS_ARRAY:
+                    valores = array(_CODIGOS_ARRAY[tipo])
+                    fin = posicion + filas * valores.itemsize
+                    valores.frombytes(datos[posicion:fin])
+                    posicion = fin
+                    if sys.byteorder == 'big':
+                        valores.byteswap()
+                    columna = valores.tolist()
+                else:
+                    offsets = array('I')
+                    fin = posicion + (filas + 1) * offsets.itemsize
+                    offsets.frombytes(datos[posicion:fin])
+                    posicion = fin
+                    if sys.byteorder == 'big':
+                        offsets.byteswap()
+                    texto = bytes(datos[posicion:posicion + offsets[-1]])
+                    posicion += offsets[-1]
+                    columna = [texto[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(filas)]
+
+                bloque[nombre] = [
+                    valor if mascara[i >> 3] & (1 << (i & 7)) else None
+                    for i, valor in enumerate(columna)
+                ]
+            yield bloque
+
+
+def _mascara_nulos(valores: List) -> bytes:
+    """1 bit por fila: 1 = valor presente, 0 = nulo"""
+    mascara = bytearray((len(valores) + 7) // 8)
+    for i, valor in enumerate(valores):
+        if valor is not None:
+            mascara[i >> 3] |= 1 << (i & 7)
+    return bytes(mascara)
+
+
+def _little_endian(datos: array) -> bytes:
+    if sys.byteorder == 'big':
+        datos = array(datos.typecode, datos)
+        datos.byteswap()
+    return datos.tobytes()
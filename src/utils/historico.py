@@ -0,0 +1,404 @@
+"""
+Histórico local de observaciones meteorológicas (serie temporal)
+
+Cada ubicación (coordenadas redondeadas, la misma clave que la caché de
+clima) tiene su directorio con segmentos columnares comprimidos de solo
+anexado:
+
+    <directorio>/<lat>_<lon>/seg-<inicio>-<fin>-<filas>-<secuencia>.bin   sellados, inmutables
+    <directorio>/<lat>_<lon>/abierto.jsonl                                observaciones sin sellar
+
+Las observaciones en vivo se anexan al registro abierto y, al llegar a
+`filas_segmento`, se ordenan y se sellan en un segmento. El relleno desde la
+API de archivo de Open-Meteo escribe segmentos sellados directamente.
+
+El índice (ubicación -> segmentos ordenados por inicio) se reconstruye al
+arrancar a partir de los nombres de archivo, sin abrirlos: una consulta por
+rango solo descomprime los segmentos que la solapan. La retención borra
+segmentos enteros cuyo final queda fuera del periodo retenido.
+
+Formato de un segmento:
+    'FMAH' | versión (u8) | filas (u32) | longitud nombres (u16) | nombres JSON
+    datos zlib: timestamps (int64, deltas) y una columna float64 por variable (NaN = nulo)
+"""
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import Config
+
+# Variable del histórico -> variable de Open-Meteo (current / hourly)
+VARIABLES = OrderedDict([
+    ('temperatura', 'temperature_2m'),
+    ('sensacion_termica', 'apparent_temperature'),
+    ('humedad', 'relative_humidity_2m'),
+    ('presion', 'pressure_msl'),
+    ('viento', 'wind_speed_10m'),
+    ('codigo_clima', 'weather_code')
+])
+COLUMNAS = tuple(VARIABLES)
+
+_MAGICO = b'FMAH'
+_VERSION = 1
+_CABECERA = struct.Struct('<BIH')  # versión, filas, longitud de los nombres
+_REGISTRO_ABIERTO = 'abierto.jsonl'
+_SEGMENTOS_DECODIFICADOS = 32
+
+Segmento = namedtuple('Segmento', 'inicio fin filas ruta')
+
+
+def _little_endian(datos: array) -> bytes:
+    if sys.byteorder != 'little':
+        datos = array(datos.typecode, datos)
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _desde_little_endian(codigo: str, contenido: bytes) -> array:
+    datos = array(codigo)
+    datos.frombytes(contenido)
+    if sys.byteorder != 'little':
+        datos.byteswap()
+    return datos
+
+
+def _a_float(valor) -> float:
+    return float('nan') if valor is None else float(valor)
+
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec='minutes').replace('+00:00', 'Z')
+
+
+def _timestamp_local(texto: str, desfase_s: int) -> int:
+    """'2024-05-01T10:15' en hora local con desfase UTC -> timestamp Unix"""
+    local = datetime.fromisoformat(texto).replace(tzinfo=timezone.utc)
+    return int(local.timestamp()) - int(desfase_s or 0)
+
+
+def observacion_actual(data: dict) -> Optional[Tuple[int, dict]]:
+    """
+    Observación de una respuesta de forecast de Open-Meteo ('current')
+
+    Returns:
+        (timestamp, {variable: valor}) o None si la respuesta no trae hora
+    """
+    actual = data.get('current') or {}
+    if not actual.get('time'):
+        return None
+    ts = _timestamp_local(actual['time'], data.get('utc_offset_seconds', 0))
+    return ts, {variable: actual.get(origen) for variable, origen in VARIABLES.items()}
+
+
+def filas_archivo(data: dict) -> List[Tuple[int, dict]]:
+    """
+    Filas horarias de una respuesta de la API de archivo de Open-Meteo
+
+    Se descartan las horas sin ningún valor (el archivo va unos días por
+    detrás y devuelve nulos para las más recientes).
+    """
+    horario = data.get('hourly') or {}
+    desfase = data.get('utc_offset_seconds', 0)
+    filas = []
+    for i, texto in enumerate(horario.get('time') or []):
+        valores = {variable: (horario.get(origen) or [None] * (i + 1))[i] for variable, origen in VARIABLES.items()}
+        if any(v is not None for v in valores.values()):
+            filas.append((_timestamp_local(texto, desfase), valores))
+    return filas
+
+
+class AlmacenHistorico:
+    """
+    Serie temporal por ubicación en segmentos columnares comprimidos
+
+    Uso:
+        historico = AlmacenHistorico('datos/historico')
+        historico.registrar('4.711,-74.072', ts, {'temperatura': 14.2, ...})
+        historico.consultar('4.711,-74.072', desde, hasta, intervalo=86400)
+    """
+
+    def __init__(self, directorio: str, filas_segmento: Optional[int] = None,
+                 retencion_dias: Optional[float] = None):
+        self.directorio = directorio
+        self.filas_segmento = filas_segmento or Config.HISTORY_SEGMENT_ROWS
+        self.retencion_dias = Config.HISTORY_RETENTION_DAYS if retencion_dias is None else retencion_dias
+        self._segmentos: Dict[str, List[Segmento]] = {}
+        self._abiertos: Dict[str, Dict[int, tuple]] = {}
+        self._decodificados: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.segmentos_leidos = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._cargar()
+        self.aplicar_retencion()
+
+    # ------------------------------------------------------------------ índice
+
+    @staticmethod
+    def _carpeta(ubicacion: str) -> str:
+        return ubicacion.replace(',', '_')
+
+    def _ruta_ubicacion(self, ubicacion: str) -> str:
+        return os.path.join(self.directorio, self._carpeta(ubicacion))
+
+    def _cargar(self):
+        """Reconstruye el índice con los nombres de los segmentos y reabre los registros abiertos"""
+        for carpeta in sorted(os.listdir(self.directorio)):
+            ruta = os.path.join(self.directorio, carpeta)
+            if not os.path.isdir(ruta):
+                continue
+            ubicacion = carpeta.replace('_', ',')
+            segmentos = []
+            for nombre in os.listdir(ruta):
+                if nombre.startswith('seg-') and nombre.endswith('.bin'):
+                    _, inicio, fin, filas, _ = nombre[:-4].split('-')
+                    segmentos.append(Segmento(int(inicio), int(fin), int(filas), os.path.join(ruta, nombre)))
+            self._segmentos[ubicacion] = sorted(segmentos)
+            self._abiertos[ubicacion] = self._leer_registro_abierto(os.path.join(ruta, _REGISTRO_ABIERTO))
+
+    @staticmethod
+    def _leer_registro_abierto(ruta: str) -> Dict[int, tuple]:
+        filas = {}
+        if not os.path.exists(ruta):
+            return filas
+        with open(ruta, encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    ts, *valores = json.loads(linea)
+                except ValueError:
+                    continue  # última línea a medio escribir
+                filas[int(ts)] = tuple(_a_float(v) for v in valores)
+        return filas
+
+    def ubicaciones(self) -> List[str]:
+        with self._lock:
+            return sorted(u for u in set(self._segmentos) | set(self._abiertos)
+                          if self._segmentos.get(u) or self._abiertos.get(u))
+
+    # ---------------------------------------------------------------- escritura
+
+    def registrar(self, ubicacion: str, ts: int, valores: dict):
+        """Anexa una observación (se sella con las demás al completar un segmento)"""
+        fila = tuple(_a_float(valores.get(columna)) for columna in COLUMNAS)
+        with self._lock:
+            abiertas = self._abiertos.setdefault(ubicacion, {})
+            if ts in abiertas:
+                return
+            os.makedirs(self._ruta_ubicacion(ubicacion), exist_ok=True)
+            linea = json.dumps([int(ts)] + [None if math.isnan(v) else v for v in fila])
+            with open(os.path.join(self._ruta_ubicacion(ubicacion), _REGISTRO_ABIERTO), 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + '\n')
+            abiertas[int(ts)] = fila
+            if len(abiertas) >= self.filas_segmento:
+                self.sellar(ubicacion)
+
+    def registrar_varias(self, ubicacion: str, filas: Iterable[Tuple[int, dict]]) -> int:
+        """
+        Escribe un lote (p. ej. relleno histórico) en segmentos sellados
+
+        Las horas que ya están en el histórico se omiten.
+
+        Returns:
+            Número de filas nuevas
+        """
+        filas = sorted((int(ts), tuple(_a_float(v.get(c)) for c in COLUMNAS)) for ts, v in filas)
+        if not filas:
+            return 0
+        with self._lock:
+            existentes = {p['ts'] for p in self.consultar(ubicacion, filas[0][0], filas[-1][0])}
+            nuevas, vistas = [], set()
+            for ts, fila in filas:
+                if ts not in existentes and ts not in vistas:
+                    vistas.add(ts)
+                    nuevas.append((ts, fila))
+            for i in range(0, len(nuevas), self.filas_segmento):
+                self._escribir_segmento(ubicacion, nuevas[i:i + self.filas_segmento])
+        return len(nuevas)
+
+    def sellar(self, ubicacion: Optional[str] = None):
+        """Convierte el registro abierto (de una ubicación o de todas) en un segmento"""
+        with self._lock:
+            for nombre in ([ubicacion] if ubicacion else list(self._abiertos)):
+                abiertas = self._abiertos.get(nombre)
+                if not abiertas:
+                    continue
+                self._escribir_segmento(nombre, sorted(abiertas.items()))
+                self._abiertos[nombre] = {}
+                ruta = os.path.join(self._ruta_ubicacion(nombre), _REGISTRO_ABIERTO)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+    def _escribir_segmento(self, ubicacion: str, filas: List[Tuple[int, tuple]]):
+        marcas = array('q', (ts for ts, _ in filas))
+        deltas = array('q', [marcas[0]] + [marcas[i] - marcas[i - 1] for i in range(1, len(marcas))])
+        partes = [_little_endian(deltas)]
+        for i in range(len(COLUMNAS)):
+            partes.append(_little_endian(array('d', (fila[i] for _, fila in filas))))
+        nombres = json.dumps(COLUMNAS).encode('utf-8')
+        cabecera = _MAGICO + _CABECERA.pack(_VERSION, len(filas), len(nombres)) + nombres
+
+        carpeta = self._ruta_ubicacion(ubicacion)
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"seg-{marcas[0]}-{marcas[-1]}-{len(filas)}-{time.time_ns()}.bin")
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(cabecera + zlib.compress(b''.join(partes), 6))
+        os.replace(temporal, ruta)
+
+        segmentos = self._segmentos.setdefault(ubicacion, [])
+        segmentos.append(Segmento(marcas[0], marcas[-1], len(filas), ruta))
+        segmentos.sort()
+
+    # ----------------------------------------------------------------- lectura
+
+    def _leer(self, segmento: Segmento) -> tuple:
+        """(timestamps, columnas) de un segmento; los segmentos son inmutables y se cachean"""
+        with self._lock:
+            leido = self._decodificados.get(segmento.ruta)
+            if leido is not None:
+                self._decodificados.move_to_end(segmento.ruta)
+                return leido
+        with open(segmento.ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        if contenido[:4] != _MAGICO:
+            raise ValueError(f"{segmento.ruta} no es un segmento del histórico")
+        inicio = 4 + _CABECERA.size
+        _, filas, longitud = _CABECERA.unpack(contenido[4:inicio])
+        nombres = json.loads(contenido[inicio:inicio + longitud])
+        datos = zlib.decompress(contenido[inicio + longitud:])
+        tamano = filas * 8
+        deltas = _desde_little_endian('q', datos[:tamano])
+        marcas, acumulado = array('q'), 0
+        for delta in deltas:
+            acumulado += delta
+            marcas.append(acumulado)
+        leidas = {
+            nombre: _desde_little_endian('d', datos[tamano * (i + 1):tamano * (i + 2)])
+            for i, nombre in enumerate(nombres)
+        }
+        nan = array('d', [float('nan')]) * filas
+        leido = (marcas, tuple(leidas.get(columna, nan) for columna in COLUMNAS))
+        with self._lock:
+            self.segmentos_leidos += 1
+            self._decodificados[segmento.ruta] = leido
+            while len(self._decodificados) > _SEGMENTOS_DECODIFICADOS:
+                self._decodificados.popitem(last=False)
+        return leido
+
+    def consultar(self, ubicacion: str, desde: int, hasta: int, intervalo: Optional[int] = None) -> List[dict]:
+        """
+        Observaciones de una ubicación entre `desde` y `hasta` (timestamps, inclusive)
+
+        Args:
+            intervalo: Si se indica (segundos), agrega por intervalos: media de
+                cada variable, mínima y máxima de la temperatura y número de muestras
+
+        Returns:
+            Lista de puntos ordenados por tiempo
+        """
+        with self._lock:
+            segmentos = [s for s in self._segmentos.get(ubicacion, []) if s.fin >= desde and s.inicio <= hasta]
+            abiertas = [(ts, fila) for ts, fila in self._abiertos.get(ubicacion, {}).items() if desde <= ts <= hasta]
+
+        filas: Dict[int, tuple] = dict(abiertas)
+        for segmento in segmentos:
+            marcas, columnas = self._leer(segmento)
+            for k in range(bisect_left(marcas, desde), bisect_right(marcas, hasta)):
+                filas.setdefault(marcas[k], tuple(columna[k] for columna in columnas))
+        ordenadas = sorted(filas.items())
+
+        if not intervalo:
+            return [self._punto(ts, fila) for ts, fila in ordenadas]
+        return self._agregar(ordenadas, int(intervalo))
+
+    @staticmethod
+    def _punto(ts: int, fila: tuple) -> dict:
+        punto = {'ts': ts, 'fecha': _iso(ts)}
+        for columna, valor in zip(COLUMNAS, fila):
+            punto[columna] = None if math.isnan(valor) else valor
+        return punto
+
+    @staticmethod
+    def _agregar(filas: List[Tuple[int, tuple]], intervalo: int) -> List[dict]:
+        grupos: 'OrderedDict[int, list]' = OrderedDict()
+        for ts, fila in filas:
+            grupos.setdefault(ts - ts % intervalo, []).append(fila)
+        puntos = []
+        indice_temperatura = COLUMNAS.index('temperatura')
+        for inicio, grupo in grupos.items():
+            punto = {'ts': inicio, 'fecha': _iso(inicio), 'muestras': len(grupo)}
+            for i, columna in enumerate(COLUMNAS):
+                valores = [fila[i] for fila in grupo if not math.isnan(fila[i])]
+                punto[columna] = round(sum(valores) / len(valores), 2) if valores else None
+                if i == indice_temperatura:
+                    punto['temperatura_min'] = min(valores) if valores else None
+                    punto['temperatura_max'] = max(valores) if valores else None
+            puntos.append(punto)
+        return puntos
+
+    def dias_incompletos(self, ubicacion: str, desde: int, hasta: int, cobertura: float = 0.8) -> List[int]:
+        """
+        Días (inicio UTC) del rango con menos de `cobertura` de sus horas registradas
+
+        Solo cuenta las horas ya transcurridas; sirve para decidir qué rellenar.
+        """
+        hasta = min(hasta, int(time.time()))
+        horas = {ts - ts % 3600 for ts in (p['ts'] for p in self.consultar(ubicacion, desde, hasta))}
+        incompletos = []
+        dia = desde - desde % 86400
+        while dia <= hasta:
+            inicio, fin = max(dia, desde), min(dia + 86399, hasta)
+            esperadas = (fin - inicio) // 3600 + 1
+            registradas = sum(1 for hora in range(dia, dia + 86400, 3600) if hora in horas and inicio - 3599 <= hora <= fin)
+            if registradas < esperadas * cobertura:
+                incompletos.append(dia)
+            dia += 86400
+        return incompletos
+
+    # --------------------------------------------------------------- retención
+
+    def aplicar_retencion(self, ahora: Optional[float] = None) -> int:
+        """
+        Borra los segmentos que terminan antes del periodo retenido
+
+        Returns:
+            Número de segmentos borrados
+        """
+        if not self.retencion_dias:
+            return 0
+        limite = (time.time() if ahora is None else ahora) - self.retencion_dias * 86400
+        borrados = 0
+        with self._lock:
+            for ubicacion, segmentos in self._segmentos.items():
+                caducados = [s for s in segmentos if s.fin < limite]
+                for segmento in caducados:
+                    try:
+                        os.remove(segmento.ruta)
+                    except FileNotFoundError:
+                        pass
+                    self._decodificados.pop(segmento.ruta, None)
+                self._segmentos[ubicacion] = [s for s in segmentos if s.fin >= limite]
+                borrados += len(caducados)
+        return borrados
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            segmentos = [s for lista in self._segmentos.values() for s in lista]
+            return {
+                'ubicaciones': len(self.ubicaciones()),
+                'segmentos': len(segmentos),
+                'filas_selladas': sum(s.filas for s in segmentos),
+                'filas_abiertas': sum(len(a) for a in self._abiertos.values()),
+                'bytes': sum(os.path.getsize(s.ruta) for s in segmentos if os.path.exists(s.ruta)),
+                'segmentos_leidos': self.segmentos_leidos
+            }
+
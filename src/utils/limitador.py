@@ -0,0 +1,279 @@
+"""
+Limitador de tasa adaptativo y planificador de peticiones por host
+
+Cada host externo tiene un cubo de tokens con tasa y ráfaga configurables
+(Config.RATE_LIMITS). Las peticiones esperan su turno en una cola con
+prioridad: el tráfico interactivo (/api/consultar) pasa antes que los lotes
+y el precalentamiento. Ante un 429 se respeta Retry-After y se reduce la tasa
+a la mitad; cada respuesta correcta la recupera poco a poco (AIMD).
+
+La prioridad se fija por contexto (contextvars), sin tener que pasarla por
+todas las firmas de los proveedores:
+
+    with prioridad(PRIORIDAD_LOTE):
+        facade.obtener_informacion_completa("Madrid")
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .config import Config
+from .reintentos import METODOS_IDEMPOTENTES, AdaptadorCortable, PoliticaReintentos, clave_endpoint
+from .reintentos import politica as politica_compartida
+from .trazas import trazador
+
+PRIORIDAD_INTERACTIVA = 0
+PRIORIDAD_LOTE = 10
+PRIORIDAD_PRECALENTAMIENTO = 20
+
+_prioridad_actual = contextvars.ContextVar('prioridad_peticiones', default=PRIORIDAD_INTERACTIVA)
+
+
+@contextmanager
+def prioridad(valor: int):
+    """Fija la prioridad de las peticiones HTTP hechas dentro del bloque"""
+    token = _prioridad_actual.set(valor)
+    try:
+        yield
+    finally:
+        _prioridad_actual.reset(token)
+
+
+class ErrorLimiteTasa(requests.RequestException):
+    """No se obtuvo turno para el host dentro del tiempo máximo de espera"""
+
+
+def segundos_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Interpreta la cabecera Retry-After (segundos o fecha HTTP)"""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return max(0.0, (fecha - datetime.now(timezone.utc)).total_seconds())
+
+
+class CuboTokens:
+    """Cubo de tokens con tasa ajustable; no es thread-safe por sí mismo"""
+
+    def __init__(self, tasa: float, rafaga: float):
+        self.tasa_base = tasa
+        self.tasa = tasa
+        self.rafaga = max(1.0, rafaga)
+        self.tokens = self.rafaga
+        self.bloqueado_hasta = 0.0
+        self._ultimo = time.monotonic()
+
+    def _rellenar(self, ahora: float):
+        self.tokens = min(self.rafaga, self.tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def espera_necesaria(self, ahora: float) -> float:
+        """Segundos hasta que haya un token disponible (0 si ya lo hay)"""
+        if ahora < self.bloqueado_hasta:
+            return self.bloqueado_hasta - ahora
+        self._rellenar(ahora)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.tasa
+
+    def consumir(self):
+        self.tokens -= 1
+
+
+class _EstadoHost:
+    def __init__(self, cubo: CuboTokens):
+        self.cubo = cubo
+        self.condicion = threading.Condition()
+        self.cola = []
+        self.peticiones = 0
+        self.limitadas_429 = 0
+        self.espera_total = 0.0
+
+
+class PlanificadorPeticiones:
+    """Planificador central: un cubo de tokens y una cola con prioridad por host"""
+
+    def __init__(self, limites: Optional[Dict[str, tuple]] = None, max_espera: Optional[float] = None):
+        self.limites = Config.RATE_LIMITS if limites is None else limites
+        self.max_espera = Config.RATE_LIMIT_MAX_WAIT if max_espera is None else max_espera
+        self._hosts: Dict[str, _EstadoHost] = {}
+        self._lock = threading.Lock()
+        self._secuencia = itertools.count()
+
+    def _estado(self, host: str) -> Optional[_EstadoHost]:
+        estado = self._hosts.get(host)
+        if estado is not None:
+            return estado
+        limite = self.limites.get(host) or self.limites.get('*')
+        if not limite or not limite[0]:
+            return None  # Host sin límite configurado
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _EstadoHost(CuboTokens(*limite))
+            return self._hosts[host]
+
+    def adquirir(self, host: str, prioridad_peticion: Optional[int] = None):
+        """
+        Espera turno para hacer una petición al host
+
+        Raises:
+            ErrorLimiteTasa: si la espera supera max_espera
+        """
+        estado = self._estado(host)
+        if estado is None:
+            return
+        prioridad_peticion = _prioridad_actual.get() if prioridad_peticion is None else prioridad_peticion
+        entrada = (prioridad_peticion, next(self._secuencia))
+        inicio = time.monotonic()
+        limite = inicio + self.max_espera
+
+        with estado.condicion:
+            heapq.heappush(estado.cola, entrada)
+            try:
+                while True:
+                    ahora = time.monotonic()
+                    if estado.cola[0] == entrada:
+                        espera = estado.cubo.espera_necesaria(ahora)
+                        if espera <= 0:
+                            estado.cubo.consumir()
+                            estado.peticiones += 1
+                            estado.espera_total += ahora - inicio
+                            return
+                    else:
+                        espera = 0.05
+                    if ahora + espera > limite:
+                        raise ErrorLimiteTasa(f"Sin turno para {host} tras {self.max_espera}s")
+                    estado.condicion.wait(espera)
+            finally:
+                estado.cola.remove(entrada)
+                heapq.heapify(estado.cola)
+                estado.condicion.notify_all()
+
+    def registrar_respuesta(self, host: str, codigo: int, retry_after: Optional[str] = None):
+        """Ajusta la tasa del host según la respuesta (AIMD + Retry-After)"""
+        estado = self._estado(host)
+        if estado is None:
+            return
+        with estado.condicion:
+            cubo = estado.cubo
+            if codigo == 429 or codigo == 503:
+                estado.limitadas_429 += codigo == 429
+                cubo.tasa = max(cubo.tasa_base * 0.05, cubo.tasa / 2)
+                pausa = segundos_retry_after(retry_after)
+                if pausa is None:
+                    pausa = 1.0 / cubo.tasa
+                cubo.bloqueado_hasta = max(cubo.bloqueado_hasta, time.monotonic() + pausa)
+                cubo.tokens = min(cubo.tokens, 0.0)
+            elif codigo < 400 and cubo.tasa < cubo.tasa_base:
+                cubo.tasa = min(cubo.tasa_base, cubo.tasa + cubo.tasa_base * 0.1)
+            estado.condicion.notify_all()
+
+    def reconfigurar(self, limites: Dict[str, tuple], max_espera: float):
+        """
+        Aplica límites nuevos (al recargar la configuración) sin perder las
+        colas: cada cubo conserva su recorte AIMD en proporción a la tasa nueva
+        y los hosts que se quedan sin límite dejan de esperar turno
+        """
+        self.max_espera = max_espera
+        with self._lock:
+            self.limites = limites
+            for host, estado in list(self._hosts.items()):
+                limite = limites.get(host) or limites.get('*')
+                if not limite or not limite[0]:
+                    del self._hosts[host]
+                    continue
+                with estado.condicion:
+                    cubo = estado.cubo
+                    recorte = cubo.tasa / cubo.tasa_base
+                    cubo.tasa_base, cubo.rafaga = limite[0], max(1.0, limite[1])
+                    cubo.tasa = cubo.tasa_base * recorte
+                    cubo.tokens = min(cubo.tokens, cubo.rafaga)
+                    estado.condicion.notify_all()
+
+    def estadisticas(self) -> dict:
+        """Estado de cada host para diagnóstico"""
+        ahora = time.monotonic()
+        return {
+            host: {
+                'tasa_configurada': estado.cubo.tasa_base,
+                'tasa_actual': round(estado.cubo.tasa, 3),
+                'en_cola': len(estado.cola),
+                'peticiones': estado.peticiones,
+                'respuestas_429': estado.limitadas_429,
+                'espera_media_ms': round(estado.espera_total / estado.peticiones * 1000, 2) if estado.peticiones else 0.0,
+                'bloqueado_s': round(max(0.0, estado.cubo.bloqueado_hasta - ahora), 3)
+            }
+            for host, estado in self._hosts.items()
+        }
+
+
+# Planificador compartido por todos los proveedores del proceso
+planificador = PlanificadorPeticiones()
+
+
+@Config.suscribir
+def _reconfigurar_planificador(cambiados: frozenset):
+    if cambiados & {'RATE_LIMITS', 'RATE_LIMIT_MAX_WAIT'}:
+        config = Config.instantanea()
+        planificador.reconfigurar(config.RATE_LIMITS, config.RATE_LIMIT_MAX_WAIT)
+
+
+class SesionPlanificada(requests.Session):
+    """
+    requests.Session que pide turno al planificador antes de cada petición y
+    aplica la política de reintentos y cobertura a las peticiones idempotentes
+    """
+
+    def __init__(self, planificador_peticiones: Optional[PlanificadorPeticiones] = None,
+                 politica: Optional[PoliticaReintentos] = None):
+        super().__init__()
+        self.planificador = planificador_peticiones or planificador
+        self.politica = politica or politica_compartida
+        # Conexiones que se pueden cortar cuando gana la petición de cobertura
+        self.mount('http://', AdaptadorCortable())
+        self.mount('https://', AdaptadorCortable())
+
+    def request(self, method, url, *args, **kwargs):
+        def enviar():
+            return self._enviar(method, url, *args, **kwargs)
+
+        if method.upper() not in METODOS_IDEMPOTENTES or kwargs.get('stream'):
+            return enviar()
+        return self.politica.ejecutar(url, enviar)
+
+    def _enviar(self, method, url, *args, **kwargs):
+        """Un intento: turno en el planificador, petición y registro de latencia"""
+        host = urlparse(url).netloc
+        clave = clave_endpoint(url)
+        limitar = Config.actual().RATE_LIMIT_ENABLED
+        with trazador.span(f"HTTP {method.upper()} {host}", metodo=method.upper(), url=clave) as span:
+            inicio = time.perf_counter()
+            if limitar:
+                self.planificador.adquirir(host)
+                span.anotar(espera_turno_ms=round((time.perf_counter() - inicio) * 1000, 3))
+            inicio = time.perf_counter()
+            respuesta = super().request(method, url, *args, **kwargs)
+            if respuesta.status_code < 400:
+                self.politica.latencias.registrar(clave, time.perf_counter() - inicio)
+            if limitar:
+                self.planificador.registrar_respuesta(host, respuesta.status_code, respuesta.headers.get('Retry-After'))
+            span.anotar(estado=respuesta.status_code)
+            if not kwargs.get('stream'):
+                span.anotar(bytes=len(respuesta.content))
+            return respuesta
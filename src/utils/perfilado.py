@@ -0,0 +1,311 @@
+"""
+Perfilado bajo demanda en producción (sin reiniciar)
+
+Dos modos, activables durante N segundos o N peticiones:
+
+- 'muestreo': un hilo toma cada pocos ms la pila de todos los hilos
+  (sys._current_frames) y acumula pilas colapsadas ("a;b;c N"), listas
+  para flamegraph.pl o speedscope. El coste es proporcional al número de
+  muestras, no al de llamadas. Con el reloj de CPU de cada hilo separa el
+  tiempo de CPU del de espera (red, colas, locks) por función.
+- 'cprofile': cProfile sobre cada petición perfilada (solo el hilo de la
+  petición), con llamadas y tiempos exactos por función.
+
+En ambos modos se resume el tiempo por función de los proveedores y de la
+fachada (_obtener_coordenadas, _procesar_respuesta_pais, _obtener_historia...).
+Solo se muestrean pilas que pasan por código de la aplicación: los hilos
+ociosos de los pools y del servidor no ensucian el resultado.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+from .config import Config
+
+MODOS = ('muestreo', 'cprofile')
+
+# Código de la aplicación (se excluyen dependencias instaladas dentro del árbol)
+RAIZ_APLICACION = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DIRECTORIOS_ATRIBUIDOS = tuple(
+    os.path.join(RAIZ_APLICACION, 'src', directorio) + os.sep for directorio in ('providers', 'facade')
+)
+
+_reloj_cpu_hilo = getattr(time, 'pthread_getcpuclockid', None)
+
+
+def _es_codigo_aplicacion(ruta: str) -> bool:
+    return ruta.startswith(RAIZ_APLICACION) and 'site-packages' not in ruta
+
+
+def _es_atribuible(ruta: str) -> bool:
+    return ruta.startswith(DIRECTORIOS_ATRIBUIDOS)
+
+
+def _nombre_funcion(codigo) -> str:
+    return getattr(codigo, 'co_qualname', codigo.co_name)
+
+
+def _cpu_hilo(ident: int) -> Optional[float]:
+    """Segundos de CPU consumidos por un hilo (None si la plataforma no lo permite)"""
+    if _reloj_cpu_hilo is None:
+        return None
+    try:
+        return time.clock_gettime(_reloj_cpu_hilo(ident))
+    except (OSError, OverflowError):
+        return None
+
+
+class MuestreadorPilas:
+    """Toma muestras periódicas de las pilas de todos los hilos"""
+
+    def __init__(self, intervalo_ms: float, duracion_s: Optional[float] = None, al_terminar=None):
+        self.intervalo = max(0.001, intervalo_ms / 1000.0)
+        self.duracion_s = duracion_s
+        self.al_terminar = al_terminar
+        self.pilas = Counter()
+        self.funciones = defaultdict(lambda: {'muestras': 0, 'pared_s': 0.0, 'cpu_s': 0.0})
+        self.muestras = 0
+        self.cpu_disponible = _reloj_cpu_hilo is not None
+        self._detener = threading.Event()
+        self._cpu_anterior: Dict[int, float] = {}
+        self._rutas: Dict[str, bool] = {}
+        self._hilo = threading.Thread(target=self._bucle, name="perfilador-muestreo", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not threading.current_thread():
+            self._hilo.join()
+
+    def _bucle(self):
+        fin = time.monotonic() + self.duracion_s if self.duracion_s else None
+        anterior = time.perf_counter()
+        while not self._detener.wait(self.intervalo):
+            ahora = time.perf_counter()
+            self._muestrear(ahora - anterior)
+            anterior = ahora
+            if fin is not None and time.monotonic() >= fin:
+                break
+        if self.al_terminar and not self._detener.is_set():
+            self.al_terminar()
+
+    def _muestrear(self, transcurrido: float):
+        propio = threading.get_ident()
+        nombres_hilos = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == propio:
+                continue
+            pila = []
+            atribuibles = set()
+            aplicacion = False
+            while frame is not None:
+                codigo = frame.f_code
+                ruta = codigo.co_filename
+                es_aplicacion = self._rutas.get(ruta)
+                if es_aplicacion is None:
+                    es_aplicacion = self._rutas[ruta] = _es_codigo_aplicacion(ruta)
+                aplicacion = aplicacion or es_aplicacion
+                nombre = _nombre_funcion(codigo)
+                pila.append(f"{nombre} ({os.path.basename(ruta)}:{codigo.co_firstlineno})")
+                if es_aplicacion and _es_atribuible(ruta):
+                    atribuibles.add(nombre)
+                frame = frame.f_back
+            cpu = self._cpu_desde_anterior(ident)
+            if not aplicacion:
+                continue
+            self.muestras += 1
+            pila.append(nombres_hilos.get(ident, str(ident)))
+            self.pilas[';'.join(reversed(pila))] += 1
+            for nombre in atribuibles:
+                funcion = self.funciones[nombre]
+                funcion['muestras'] += 1
+                funcion['pared_s'] += transcurrido
+                funcion['cpu_s'] += min(cpu or 0.0, transcurrido)
+
+    def _cpu_desde_anterior(self, ident: int) -> Optional[float]:
+        actual = _cpu_hilo(ident)
+        if actual is None:
+            return None
+        anterior = self._cpu_anterior.get(ident, actual)
+        self._cpu_anterior[ident] = actual
+        return actual - anterior
+
+
+class Perfilador:
+    """
+    Controla una sesión de perfilado (una a la vez) y guarda el último resultado
+
+    Los hooks antes_de_peticion/despues_de_peticion los llama la web en cada
+    petición para contar peticiones y, en modo 'cprofile', perfilarlas.
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.modo: Optional[str] = None
+        self.resultado: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._muestreador: Optional[MuestreadorPilas] = None
+        self._estadisticas: Optional[pstats.Stats] = None
+        self._temporizador: Optional[threading.Timer] = None
+        self._inicio = 0.0
+        self._peticiones_objetivo: Optional[int] = None
+        self._peticiones = 0
+
+    def iniciar(self, modo: str = 'muestreo', segundos: Optional[float] = None,
+                peticiones: Optional[int] = None, intervalo_ms: Optional[float] = None) -> dict:
+        """
+        Empieza a perfilar durante `segundos` o hasta completar `peticiones`
+
+        Raises:
+            ValueError: modo desconocido, o sin límite de segundos ni de peticiones
+            RuntimeError: si ya hay un perfilado en curso
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido: {modo} (disponibles: {', '.join(MODOS)})")
+        if not segundos and not peticiones:
+            raise ValueError("Indica 'segundos' o 'peticiones'")
+        if segundos:
+            segundos = min(float(segundos), Config.PROFILING_MAX_SECONDS)
+        with self._lock:
+            if self.activo:
+                raise RuntimeError("Ya hay un perfilado en curso")
+            self.activo = True
+            self.modo = modo
+            self._inicio = time.perf_counter()
+            self._peticiones = 0
+            self._peticiones_objetivo = int(peticiones) if peticiones else None
+            self._estadisticas = None
+            self._muestreador = None
+            self._temporizador = None
+            if modo == 'muestreo':
+                self._muestreador = MuestreadorPilas(
+                    intervalo_ms or Config.PROFILING_INTERVAL_MS,
+                    duracion_s=segundos if not peticiones else None,
+                    al_terminar=self.detener
+                )
+                self._muestreador.iniciar()
+            if segundos and (modo == 'cprofile' or peticiones):
+                self._temporizador = threading.Timer(segundos, self.detener)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+        print(f"Perfilado '{modo}' iniciado ({f'{segundos}s' if segundos else f'{peticiones} peticiones'})")
+        return self.estado()
+
+    def antes_de_peticion(self) -> Optional[cProfile.Profile]:
+        """Devuelve el perfil a cerrar en despues_de_peticion (modo 'cprofile')"""
+        if not self.activo or self.modo != 'cprofile':
+            return None
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:  # Otro perfilador activo en este hilo
+            return None
+        return perfil
+
+    def despues_de_peticion(self, perfil: Optional[cProfile.Profile] = None):
+        if perfil is not None:
+            perfil.disable()
+        if not self.activo:
+            return
+        completado = False
+        with self._lock:
+            if not self.activo:
+                return
+            if perfil is not None:
+                if self._estadisticas is None:
+                    self._estadisticas = pstats.Stats(perfil)
+                else:
+                    self._estadisticas.add(perfil)
+            self._peticiones += 1
+            completado = self._peticiones_objetivo is not None and self._peticiones >= self._peticiones_objetivo
+        if completado:
+            self.detener()
+
+    def detener(self) -> Optional[dict]:
+        """Termina la sesión en curso (si la hay) y devuelve su resultado"""
+        with self._lock:
+            if not self.activo:
+                return self.resultado
+            self.activo = False
+            muestreador, self._muestreador = self._muestreador, None
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+        if muestreador is not None:
+            muestreador.detener()
+        with self._lock:
+            self.resultado = self._construir_resultado(muestreador)
+        print(f"Perfilado '{self.modo}' terminado: {self.resultado['duracion_s']}s, "
+              f"{self.resultado['peticiones']} peticiones")
+        return self.resultado
+
+    def estado(self) -> dict:
+        return {
+            'activo': self.activo,
+            'modo': self.modo,
+            'transcurrido_s': round(time.perf_counter() - self._inicio, 3) if self.activo else None,
+            'peticiones': self._peticiones,
+            'peticiones_objetivo': self._peticiones_objetivo
+        }
+
+    def _construir_resultado(self, muestreador: Optional[MuestreadorPilas]) -> dict:
+        resultado = {
+            'modo': self.modo,
+            'duracion_s': round(time.perf_counter() - self._inicio, 3),
+            'peticiones': self._peticiones
+        }
+        if muestreador is not None:
+            resultado.update({
+                'muestras': muestreador.muestras,
+                'intervalo_ms': round(muestreador.intervalo * 1000, 3),
+                'cpu_disponible': muestreador.cpu_disponible,
+                'funciones': self._funciones_muestreo(muestreador),
+                'pilas_colapsadas': '\n'.join(
+                    f"{pila} {cuenta}" for pila, cuenta in muestreador.pilas.most_common()
+                )
+            })
+        else:
+            resultado.update(self._resumen_cprofile())
+        return resultado
+
+    @staticmethod
+    def _funciones_muestreo(muestreador: MuestreadorPilas) -> dict:
+        funciones = {}
+        for nombre, datos in sorted(muestreador.funciones.items(), key=lambda f: -f[1]['pared_s']):
+            pared_ms = datos['pared_s'] * 1000
+            funcion = {'muestras': datos['muestras'], 'pared_ms': round(pared_ms, 1)}
+            if muestreador.cpu_disponible:
+                cpu_ms = min(datos['cpu_s'] * 1000, pared_ms)
+                funcion.update({'cpu_ms': round(cpu_ms, 1), 'espera_ms': round(pared_ms - cpu_ms, 1)})
+            funciones[nombre] = funcion
+        return funciones
+
+    def _resumen_cprofile(self) -> dict:
+        if self._estadisticas is None:
+            return {'funciones': {}, 'tabla': ''}
+        funciones = {}
+        for (ruta, _, nombre), (_, llamadas, propio, acumulado, _) in self._estadisticas.stats.items():
+            if _es_atribuible(ruta):
+                funciones[nombre] = {
+                    'llamadas': llamadas,
+                    'propio_ms': round(propio * 1000, 3),
+                    'acumulado_ms': round(acumulado * 1000, 3)
+                }
+        salida = io.StringIO()
+        self._estadisticas.stream = salida
+        self._estadisticas.sort_stats('cumulative').print_stats(40)
+        return {
+            'funciones': dict(sorted(funciones.items(), key=lambda f: -f[1]['acumulado_ms'])),
+            'tabla': salida.getvalue()
+        }
+
+
+# Sesión de perfilado compartida por la web
+perfilador = Perfilador()
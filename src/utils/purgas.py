@@ -0,0 +1,77 @@
+"""
+Purga de cachés intermedias (CDN / proxy inverso) por claves sustitutas
+
+Las respuestas de /api/ciudad/<nombre> llevan la cabecera Surrogate-Key con
+las claves de los datos que contienen (ciudad/madrid, pais/spain, ...).
+Cuando una caché de proveedor se refresca, la fachada pide purgar esas claves.
+Las purgas se agrupan durante un breve intervalo y se envían en una sola
+petición POST a Config.PURGE_URL (si está configurada).
+"""
+import threading
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+import requests
+
+from .config import Config
+
+
+class NotificadorPurgas:
+    """Agrupa claves a purgar y las envía en segundo plano"""
+
+    def __init__(self, url: Optional[str] = None, intervalo: Optional[float] = None):
+        self.url = Config.PURGE_URL if url is None else url
+        self.intervalo = Config.PURGE_DEBOUNCE_MS / 1000.0 if intervalo is None else intervalo
+        self.historial = deque(maxlen=100)
+        self.enviadas = 0
+        self.fallidas = 0
+        self._pendientes = set()
+        self._temporizador = None
+        self._suscriptores: List[Callable[[List[str]], None]] = []
+        self._lock = threading.Lock()
+
+    def suscribir(self, callback: Callable[[List[str]], None]):
+        """Registra `callback(claves)` para cada lote purgado (p. ej. una caché local)"""
+        self._suscriptores.append(callback)
+
+    def purgar(self, claves: Iterable[str]):
+        """Programa la purga de las claves (se agrupan durante `intervalo` segundos)"""
+        with self._lock:
+            self._pendientes.update(claves)
+            if self._temporizador is None and self._pendientes:
+                self._temporizador = threading.Timer(self.intervalo, self.vaciar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def vaciar(self) -> List[str]:
+        """Envía ya las purgas pendientes; devuelve las claves enviadas"""
+        with self._lock:
+            claves = sorted(self._pendientes)
+            self._pendientes.clear()
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+        if not claves:
+            return []
+
+        self.historial.append(claves)
+        for suscriptor in self._suscriptores:
+            suscriptor(claves)
+        if self.url:
+            try:
+                respuesta = requests.post(self.url, json={'surrogate_keys': claves}, timeout=Config.REQUEST_TIMEOUT)
+                respuesta.raise_for_status()
+                self.enviadas += 1
+            except requests.RequestException as e:
+                self.fallidas += 1
+                print(f"Error enviando purga de {len(claves)} claves: {str(e)}")
+        return claves
+
+    def estadisticas(self) -> dict:
+        return {
+            'url': self.url or None,
+            'lotes_enviados': self.enviadas,
+            'lotes_fallidos': self.fallidas,
+            'pendientes': len(self._pendientes),
+            'ultimas': list(self.historial)[-5:]
+        }
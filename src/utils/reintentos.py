@@ -0,0 +1,406 @@
+"""
+Reintentos con backoff exponencial y peticiones de cobertura (hedging)
+
+- Solo se reintentan peticiones idempotentes (GET/HEAD) que fallan por
+  conexión, timeout o códigos 429/5xx transitorios.
+- La espera entre intentos es exponencial con jitter completo.
+- Un presupuesto de reintentos limita los reintentos a una fracción del
+  tráfico, para no multiplicar la carga cuando una API está caída.
+- Si una petición tarda más que el p95 de su endpoint se lanza una copia y
+  se usa la primera respuesta (recorta la cola de latencia, p99). El intento
+  principal corre en el hilo de quien llama; solo las copias usan el pool
+  (HEDGE_MAX_WORKERS), y si una gana se corta la conexión del principal.
+"""
+import contextvars
+import heapq
+import itertools
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .config import Config
+
+METODOS_IDEMPOTENTES = {'GET', 'HEAD', 'OPTIONS'}
+CODIGOS_REINTENTABLES = {429, 500, 502, 503, 504}
+ERRORES_REINTENTABLES = (requests.ConnectionError, requests.Timeout)
+
+_DIGITOS = re.compile(r'(?<=/)\d+(?=[/.]|$)')
+
+
+def clave_endpoint(url: str) -> str:
+    """Agrupa URLs por endpoint: /v0/item/123.json -> host/v0/item/{n}.json"""
+    partes = urlparse(url)
+    return f"{partes.netloc}{_DIGITOS.sub('{n}', partes.path)}"
+
+
+class PresupuestoReintentos:
+    """
+    Cada petición original aporta `proporcion` tokens; cada reintento o
+    cobertura consume uno. `minimo` son los tokens iniciales y el tope.
+    """
+
+    def __init__(self, proporcion: float = 0.2, minimo: float = 10.0):
+        self.proporcion = proporcion
+        self.maximo = max(minimo, 1.0)
+        self.tokens = minimo
+        self.denegados = 0
+        self._lock = threading.Lock()
+
+    def depositar(self):
+        with self._lock:
+            self.tokens = min(self.maximo, self.tokens + self.proporcion)
+
+    def retirar(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.denegados += 1
+            return False
+
+
+class RegistroLatencias:
+    """Últimas latencias por endpoint y su percentil (recalculado cada pocas muestras)"""
+
+    def __init__(self, percentil: float = 95.0, min_muestras: int = 20, ventana: int = 200):
+        self.percentil = percentil
+        self.min_muestras = min_muestras
+        self.ventana = ventana
+        self._muestras: Dict[str, deque] = {}
+        self._umbrales: Dict[str, float] = {}
+        self._nuevas: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, clave: str, segundos: float):
+        with self._lock:
+            muestras = self._muestras.setdefault(clave, deque(maxlen=self.ventana))
+            muestras.append(segundos)
+            self._nuevas[clave] = self._nuevas.get(clave, 0) + 1
+            if len(muestras) < self.min_muestras:
+                return
+            if clave not in self._umbrales or self._nuevas[clave] >= 10:
+                ordenadas = sorted(muestras)
+                indice = max(0, math.ceil(self.percentil / 100 * len(ordenadas)) - 1)
+                self._umbrales[clave] = ordenadas[indice]
+                self._nuevas[clave] = 0
+
+    def umbral(self, clave: str) -> Optional[float]:
+        """Latencia a partir de la cual cubrir la petición, o None si faltan muestras"""
+        return self._umbrales.get(clave)
+
+    def umbrales(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._umbrales)
+
+
+def cerrar(respuesta: Optional[requests.Response]):
+    """Devuelve la conexión de una respuesta descartada al pool"""
+    if respuesta is not None and hasattr(respuesta, 'close'):
+        respuesta.close()
+
+
+class _Aviso:
+    """Función programada en el temporizador (se puede cancelar antes de que venza)"""
+
+    __slots__ = ('funcion', 'args', 'cancelado')
+
+    def __init__(self, funcion: Callable, args: tuple):
+        self.funcion = funcion
+        self.args = args
+        self.cancelado = False
+
+    def cancelar(self):
+        self.cancelado = True
+
+
+class Temporizador:
+    """Un solo hilo que lanza las funciones programadas cuando vence su plazo"""
+
+    def __init__(self):
+        self._pendientes = []  # montículo de (vence, orden, aviso)
+        self._orden = itertools.count()
+        self._condicion = threading.Condition()
+        self._hilo = None
+
+    def programar(self, segundos: float, funcion: Callable, *args) -> _Aviso:
+        aviso = _Aviso(funcion, args)
+        with self._condicion:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="temporizador-coberturas", daemon=True)
+                self._hilo.start()
+            heapq.heappush(self._pendientes, (time.monotonic() + segundos, next(self._orden), aviso))
+            if self._pendientes[0][2] is aviso:
+                self._condicion.notify()
+        return aviso
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes:
+                    self._condicion.wait()
+                vence, _, aviso = self._pendientes[0]
+                espera = vence - time.monotonic()
+                if espera > 0:
+                    self._condicion.wait(espera)
+                    continue
+                heapq.heappop(self._pendientes)
+            if not aviso.cancelado:
+                try:
+                    aviso.funcion(*aviso.args)
+                except Exception as e:
+                    print(f"Error en tarea programada: {str(e)}")
+
+
+class _Carrera:
+    """Intento principal frente a su copia: gana la primera respuesta válida"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conexion = None         # conexión HTTP del intento principal
+        self.terminada = False       # el principal ya volvió
+        self.principal_valida = False
+        self.cobertura = None        # Future de la copia, si se lanzó
+        self.ganadora: Optional[requests.Response] = None
+
+    def cortar_principal(self):
+        """Cierra el socket del principal para que su hilo deje de esperar"""
+        sock = getattr(self.conexion, 'sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+# Carrera del intento principal en curso en este hilo (la consulta el adaptador)
+_carrera_actual: contextvars.ContextVar = contextvars.ContextVar('carrera_cobertura', default=None)
+
+
+class _ConPrincipal:
+    """Apunta en la carrera la conexión que usa el intento principal"""
+
+    def _get_conn(self, timeout=None):
+        conexion = super()._get_conn(timeout)
+        carrera = _carrera_actual.get()
+        if carrera is not None:
+            carrera.conexion = conexion
+        return conexion
+
+
+class _PoolHTTP(_ConPrincipal, HTTPConnectionPool):
+    pass
+
+
+class _PoolHTTPS(_ConPrincipal, HTTPSConnectionPool):
+    pass
+
+
+class AdaptadorCortable(HTTPAdapter):
+    """HTTPAdapter cuyo intento principal se puede cortar desde el hilo de su copia"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _PoolHTTP, 'https': _PoolHTTPS}
+
+
+# Temporizador compartido que lanza las copias al vencer el umbral
+temporizador = Temporizador()
+
+
+class PoliticaReintentos:
+    """Política compartida de reintentos y cobertura para las sesiones HTTP"""
+
+    def __init__(self, max_intentos: Optional[int] = None, espera_base: Optional[float] = None,
+                 espera_maxima: Optional[float] = None, presupuesto: Optional[PresupuestoReintentos] = None,
+                 cobertura: Optional[bool] = None, latencias: Optional[RegistroLatencias] = None):
+        self.max_intentos = Config.RETRY_MAX_ATTEMPTS if max_intentos is None else max_intentos
+        self.espera_base = Config.RETRY_BACKOFF_BASE_MS / 1000.0 if espera_base is None else espera_base
+        self.espera_maxima = Config.RETRY_BACKOFF_MAX_MS / 1000.0 if espera_maxima is None else espera_maxima
+        self.presupuesto = presupuesto or PresupuestoReintentos(Config.RETRY_BUDGET_RATIO)
+        self.cobertura = Config.HEDGE_ENABLED if cobertura is None else cobertura
+        self.latencias = latencias or RegistroLatencias(Config.HEDGE_PERCENTILE, Config.HEDGE_MIN_SAMPLES)
+        self.reintentos = 0
+        self.coberturas = 0
+        self.coberturas_ganadoras = 0
+        self._executor = None
+        self._hilos_executor = 0
+        self._lock = threading.Lock()
+
+    def espera(self, intento: int) -> float:
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * (2 ** (intento - 1))))
+
+    def ejecutar(self, url: str, enviar: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Ejecuta `enviar` (un intento HTTP) aplicando reintentos y cobertura
+
+        Returns:
+            La respuesta del último intento (puede ser un código de error si se
+            agotaron los intentos o el presupuesto)
+        """
+        clave = clave_endpoint(url)
+        self.presupuesto.depositar()
+        intento = 1
+        while True:
+            error = None
+            try:
+                respuesta = self._intentar(clave, enviar)
+                if respuesta.status_code not in CODIGOS_REINTENTABLES:
+                    return respuesta
+            except ERRORES_REINTENTABLES as e:
+                error = e
+            if intento >= self.max_intentos or not self.presupuesto.retirar():
+                if error is not None:
+                    raise error
+                return respuesta
+            cerrar(respuesta if error is None else None)
+            with self._lock:
+                self.reintentos += 1
+            time.sleep(self.espera(intento))
+            intento += 1
+
+    def _intentar(self, clave: str, enviar: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Un intento, cubierto con una copia si supera el umbral de su endpoint
+
+        El principal corre en este hilo (sin cola ni tope de concurrencia); la
+        copia se lanza en el pool al vencer el umbral. Si la copia responde
+        antes, se corta la conexión del principal y se devuelve la copia; la
+        respuesta perdedora se cierra.
+        """
+        umbral = self.latencias.umbral(clave) if self.cobertura else None
+        if umbral is None:
+            return enviar()
+
+        carrera = _Carrera()
+        aviso = temporizador.programar(umbral, self._cubrir, carrera, enviar, contextvars.copy_context())
+        token = _carrera_actual.set(carrera)
+        respuesta, error = None, None
+        try:
+            respuesta = enviar()
+        except Exception as e:
+            error = e
+        finally:
+            _carrera_actual.reset(token)
+            aviso.cancelar()
+
+        valida = error is None and respuesta.status_code not in CODIGOS_REINTENTABLES
+        with carrera.lock:
+            carrera.terminada = True
+            carrera.principal_valida = valida
+            ganadora, cobertura = carrera.ganadora, carrera.cobertura
+        if ganadora is None and cobertura is not None and not valida:
+            # El principal falló con la copia en marcha: esperarla
+            try:
+                ganadora = cobertura.result()
+            except Exception:
+                ganadora = None
+            if ganadora is not None:
+                with self._lock:
+                    self.coberturas_ganadoras += 1
+        if ganadora is not None:
+            cerrar(respuesta)
+            return ganadora
+        if error is not None:
+            raise error
+        return respuesta
+
+    def _cubrir(self, carrera: _Carrera, enviar: Callable[[], requests.Response], contexto: contextvars.Context):
+        """Lanza la copia (desde el temporizador) si el principal sigue en curso y hay presupuesto"""
+        with carrera.lock:
+            if carrera.terminada:
+                return
+        if not self.presupuesto.retirar():
+            return
+        with self._lock:
+            self.coberturas += 1
+        with carrera.lock:
+            if not carrera.terminada:
+                carrera.cobertura = self._obtener_executor().submit(
+                    contexto.run, self._correr_cobertura, carrera, enviar
+                )
+
+    def _correr_cobertura(self, carrera: _Carrera, enviar: Callable[[], requests.Response]):
+        """
+        Ejecuta la copia. Devuelve la respuesta si se va a usar (gana o el
+        principal falló) o None tras cerrarla
+        """
+        respuesta = enviar()
+        valida = respuesta.status_code not in CODIGOS_REINTENTABLES
+        with carrera.lock:
+            if carrera.terminada:
+                entregar = valida and not carrera.principal_valida
+            else:
+                entregar = valida
+                if valida:
+                    carrera.ganadora = respuesta
+        if not entregar:
+            cerrar(respuesta)
+            return None
+        if carrera.ganadora is respuesta:
+            with self._lock:
+                self.coberturas_ganadoras += 1
+            carrera.cortar_principal()
+        return respuesta
+
+    def _obtener_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._hilos_executor = Config.HEDGE_MAX_WORKERS
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._hilos_executor, thread_name_prefix="cobertura"
+                )
+            return self._executor
+
+    def reconfigurar(self, config):
+        """Toma los ajustes RETRY_* y HEDGE_* de una instantánea de Config (al recargar)"""
+        self.max_intentos = config.RETRY_MAX_ATTEMPTS
+        self.espera_base = config.RETRY_BACKOFF_BASE_MS / 1000.0
+        self.espera_maxima = config.RETRY_BACKOFF_MAX_MS / 1000.0
+        self.presupuesto.proporcion = config.RETRY_BUDGET_RATIO
+        self.cobertura = config.HEDGE_ENABLED
+        self.latencias.percentil = config.HEDGE_PERCENTILE
+        self.latencias.min_muestras = config.HEDGE_MIN_SAMPLES
+        with self._lock:
+            anterior = self._executor
+            if anterior is not None and self._hilos_executor != config.HEDGE_MAX_WORKERS:
+                self._executor = None  # el siguiente se crea con el tamaño nuevo
+            else:
+                anterior = None
+        if anterior is not None:
+            anterior.shutdown(wait=False)  # las coberturas ya lanzadas terminan
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            contadores = {
+                'reintentos': self.reintentos,
+                'coberturas': self.coberturas,
+                'coberturas_ganadoras': self.coberturas_ganadoras
+            }
+        return {
+            **contadores,
+            'presupuesto_disponible': round(self.presupuesto.tokens, 2),
+            'presupuesto_denegado': self.presupuesto.denegados,
+            'umbrales_ms': {clave: round(valor * 1000, 1) for clave, valor in self.latencias.umbrales().items()}
+        }
+
+
+# Política compartida por todas las sesiones del proceso
+politica = PoliticaReintentos()
+
+
+@Config.suscribir
+def _reconfigurar_politica(cambiados: frozenset):
+    if any(nombre.startswith(('RETRY_', 'HEDGE_')) for nombre in cambiados):
+        politica.reconfigurar(Config.instantanea())
@@ -0,0 +1,94 @@
+"""
+Compresión y cabeceras de caché HTTP para las respuestas de la web
+
+- Compresión negociada (brotli si está instalado, gzip si no) a partir de un
+  tamaño mínimo: los cuerpos pequeños no compensan el coste de comprimir.
+- ETag fuerte a partir del contenido y Cache-Control a partir de los TTL de
+  los componentes incluidos.
+- RespuestaPrecalculada guarda el cuerpo serializado y sus variantes
+  comprimidas para endpoints estáticos, que así no hacen trabajo por petición.
+"""
+import gzip
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+from .config import Config
+
+# Orden de preferencia de codificaciones
+CODIFICACIONES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimir(datos: bytes, codificacion: str) -> bytes:
+    """Comprime con la codificación indicada ('br' o 'gzip')"""
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=5)
+    return gzip.compress(datos, compresslevel=6, mtime=0)
+
+
+def elegir_codificacion(aceptadas, tamano: int, umbral: Optional[int] = None) -> Optional[str]:
+    """
+    Elige la codificación según Accept-Encoding y el tamaño del cuerpo
+
+    Args:
+        aceptadas: request.accept_encodings de Flask/werkzeug
+        tamano: Bytes del cuerpo sin comprimir
+        umbral: Tamaño mínimo para comprimir (por defecto Config.COMPRESSION_MIN_BYTES)
+
+    Returns:
+        'br', 'gzip' o None si no se debe comprimir
+    """
+    umbral = Config.COMPRESSION_MIN_BYTES if umbral is None else umbral
+    if tamano < umbral:
+        return None
+    return aceptadas.best_match(CODIFICACIONES)
+
+
+def calcular_etag(datos: bytes, codificacion: Optional[str] = None) -> str:
+    """ETag (sin comillas) del contenido; cada codificación es una representación distinta"""
+    etag = hashlib.blake2b(datos, digest_size=12).hexdigest()
+    return f"{etag}-{codificacion}" if codificacion else etag
+
+
+def cache_control(ttl: Optional[int], publica: bool = True) -> str:
+    """Cabecera Cache-Control para un TTL en segundos (None o 0 => no-store)"""
+    if not ttl:
+        return 'no-store'
+    return f"{'public' if publica else 'private'}, max-age={int(ttl)}"
+
+
+def ttl_componentes(componentes: Iterable[str]) -> Optional[int]:
+    """TTL de la respuesta: el menor de los componentes incluidos"""
+    ttls = {
+        'clima': Config.WEATHER_CACHE_TTL,
+        'noticias': Config.NEWS_CACHE_TTL,
+        'pais': Config.COUNTRY_CACHE_TTL,
+        'calidad_aire': Config.AIR_QUALITY_CACHE_TTL,
+        'tipo_cambio': Config.EXCHANGE_RATES_TTL
+    }
+    valores = [ttls[c] for c in componentes if c in ttls]
+    return min(valores) if valores else None
+
+
+class RespuestaPrecalculada:
+    """Cuerpo serializado una sola vez, con ETag y variantes comprimidas"""
+
+    def __init__(self, datos: bytes, tipo: str = 'application/json', ttl: Optional[int] = 3600):
+        self.datos = datos
+        self.tipo = tipo
+        self.etag = calcular_etag(datos)  # sin comprimir
+        self.cache_control = cache_control(ttl)
+        self.variantes: Dict[str, bytes] = {}
+        if len(datos) >= Config.COMPRESSION_MIN_BYTES:
+            self.variantes = {codificacion: comprimir(datos, codificacion) for codificacion in CODIFICACIONES}
+
+    def variante(self, aceptadas) -> Tuple[bytes, Optional[str], str]:
+        """(cuerpo, codificación, etag) para el Accept-Encoding del cliente"""
+        codificacion = aceptadas.best_match(tuple(self.variantes)) if self.variantes else None
+        if codificacion:
+            return self.variantes[codificacion], codificacion, calcular_etag(self.datos, codificacion)
+        return self.datos, None, self.etag
@@ -0,0 +1,14 @@
+"""
+Normalización de nombres (ciudades, países) para claves y URLs canónicas
+"""
+import unicodedata
+
+
+def quitar_tildes(texto: str) -> str:
+    normalizado = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in normalizado if not unicodedata.combining(c))
+
+
+def normalizar_nombre(nombre: str) -> str:
+    """'  Bogotá  D.C.' -> 'bogota d.c.' (minúsculas, sin tildes, espacios simples)"""
+    return ' '.join(quitar_tildes(nombre or '').lower().split())
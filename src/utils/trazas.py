@@ -0,0 +1,234 @@
+"""
+Trazas ligeras por petición (spans)
+
+Cada paso de la fachada y cada petición HTTP a una API abre un span con
+atributos (plantilla de URL, código, bytes, aciertos de caché, fallback...).
+El span activo viaja en una ContextVar: los hijos se enlazan solos, las
+tareas de asyncio heredan el contexto y los hilos lo reciben con
+contextvars.copy_context().run (como ya hacen la fachada y las coberturas).
+
+Al cerrarse, cada span se entrega a los exportadores:
+- ExportadorMemoria: búfer circular con los últimos spans (endpoint de depuración)
+- ExportadorArchivo: una línea JSON por span con la forma de OTLP/JSON
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from .config import Config
+
+_span_actual: ContextVar = ContextVar('span_actual', default=None)
+
+
+class Span:
+    """Un tramo de trabajo con inicio, duración, atributos y estado"""
+
+    def __init__(self, nombre: str, traza_id: Optional[str] = None, padre_id: Optional[str] = None,
+                 atributos: Optional[dict] = None):
+        self.nombre = nombre
+        self.traza_id = traza_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.padre_id = padre_id
+        self.atributos = dict(atributos or {})
+        self.hilo = threading.current_thread().name
+        self.inicio = time.time()
+        self.duracion_ms: Optional[float] = None
+        self.estado = 'ok'
+        self.error: Optional[str] = None
+        self._inicio_monotono = time.perf_counter()
+
+    def anotar(self, **atributos):
+        self.atributos.update(atributos)
+
+    def incrementar(self, atributo: str, cantidad: int = 1):
+        self.atributos[atributo] = self.atributos.get(atributo, 0) + cantidad
+
+    def terminar(self, error: Optional[BaseException] = None):
+        self.duracion_ms = (time.perf_counter() - self._inicio_monotono) * 1000
+        if error is not None:
+            self.estado = 'error'
+            self.error = f"{type(error).__name__}: {error}"
+
+    def a_dict(self) -> dict:
+        return {
+            'nombre': self.nombre,
+            'traza_id': self.traza_id,
+            'span_id': self.span_id,
+            'padre_id': self.padre_id,
+            'inicio': self.inicio,
+            'duracion_ms': round(self.duracion_ms, 3) if self.duracion_ms is not None else None,
+            'estado': self.estado,
+            'error': self.error,
+            'hilo': self.hilo,
+            'atributos': self.atributos
+        }
+
+
+class ExportadorMemoria:
+    """Búfer circular con los últimos spans terminados"""
+
+    def __init__(self, capacidad: Optional[int] = None):
+        capacidad = Config.TRACE_BUFFER_SIZE if capacidad is None else capacidad
+        self._spans = deque(maxlen=max(1, capacidad))
+        self._lock = threading.Lock()
+
+    def exportar(self, span: Span):
+        with self._lock:
+            self._spans.append(span.a_dict())
+
+    def spans(self) -> List[dict]:
+        with self._lock:
+            return list(self._spans)
+
+    def trazas(self, limite: int = 20, traza_id: Optional[str] = None) -> List[dict]:
+        """
+        Agrupa los spans por traza, de la más reciente a la más antigua
+
+        Returns:
+            Lista de {'traza_id', 'nombre', 'duracion_ms', 'spans'} con los
+            spans ordenados por inicio; nombre y duración son los de la raíz
+            (o los del primer span si la raíz ya salió del búfer o sigue abierta)
+        """
+        agrupados = OrderedDict()
+        for span in reversed(self.spans()):
+            if traza_id is None or span['traza_id'] == traza_id:
+                agrupados.setdefault(span['traza_id'], []).append(span)
+        trazas = []
+        for identificador, spans in list(agrupados.items())[:limite]:
+            spans.sort(key=lambda s: s['inicio'])
+            raiz = next((s for s in spans if s['padre_id'] is None), spans[0])
+            trazas.append({
+                'traza_id': identificador,
+                'nombre': raiz['nombre'],
+                'duracion_ms': raiz['duracion_ms'],
+                'spans': spans
+            })
+        return trazas
+
+    def limpiar(self):
+        with self._lock:
+            self._spans.clear()
+
+
+def _valor_otlp(valor) -> dict:
+    if isinstance(valor, bool):
+        return {'boolValue': valor}
+    if isinstance(valor, int):
+        return {'intValue': str(valor)}
+    if isinstance(valor, float):
+        return {'doubleValue': valor}
+    return {'stringValue': str(valor)}
+
+
+def span_otlp(span: Span) -> dict:
+    """Span con la forma de OTLP/JSON (resourceSpans[].scopeSpans[].spans[])"""
+    inicio_ns = int(span.inicio * 1e9)
+    return {
+        'traceId': span.traza_id,
+        'spanId': span.span_id,
+        'parentSpanId': span.padre_id or '',
+        'name': span.nombre,
+        'startTimeUnixNano': str(inicio_ns),
+        'endTimeUnixNano': str(inicio_ns + int((span.duracion_ms or 0) * 1e6)),
+        'attributes': [
+            {'key': clave, 'value': _valor_otlp(valor)}
+            for clave, valor in list(span.atributos.items()) + [('hilo', span.hilo)]
+        ],
+        'status': {'code': 2, 'message': span.error} if span.estado == 'error' else {'code': 1}
+    }
+
+
+class ExportadorArchivo:
+    """Añade cada span a un archivo, una línea JSON (formato OTLP) por span"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+    def exportar(self, span: Span):
+        linea = json.dumps(span_otlp(span), ensure_ascii=False)
+        with self._lock:
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + '\n')
+
+
+class _SpanNulo:
+    """Span que no registra nada (trazas desactivadas)"""
+    traza_id = None
+    span_id = None
+
+    def anotar(self, **atributos):
+        pass
+
+    def incrementar(self, atributo: str, cantidad: int = 1):
+        pass
+
+
+SPAN_NULO = _SpanNulo()
+
+
+class Trazador:
+    """Crea spans enlazados con el span activo y los entrega a los exportadores"""
+
+    def __init__(self, exportadores: Optional[list] = None, activo: Optional[bool] = None):
+        self.exportadores = list(exportadores or [])
+        self.activo = Config.TRACING_ENABLED if activo is None else activo
+
+    @contextmanager
+    def span(self, nombre: str, **atributos) -> Iterator[Span]:
+        """Abre un span hijo del activo (o raíz de una traza nueva)"""
+        if not self.activo:
+            yield SPAN_NULO
+            return
+        padre = _span_actual.get()
+        span = Span(nombre, padre.traza_id if padre else None, padre.span_id if padre else None, atributos)
+        token = _span_actual.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.terminar(e)
+            raise
+        else:
+            span.terminar()
+        finally:
+            _span_actual.reset(token)
+            self._exportar(span)
+
+    def _exportar(self, span: Span):
+        for exportador in self.exportadores:
+            try:
+                exportador.exportar(span)
+            except Exception as e:
+                print(f"Error exportando span {span.nombre}: {str(e)}")
+
+
+def span_actual():
+    """El span activo en este contexto (o un span nulo)"""
+    return _span_actual.get() or SPAN_NULO
+
+
+def anotar(**atributos):
+    """Añade atributos al span activo (no hace nada si no hay ninguno)"""
+    span_actual().anotar(**atributos)
+
+
+def incrementar(atributo: str, cantidad: int = 1):
+    """Suma `cantidad` a un atributo numérico del span activo"""
+    span_actual().incrementar(atributo, cantidad)
+
+
+def _crear_trazador() -> Trazador:
+    exportadores = [memoria]
+    if Config.TRACE_EXPORT_FILE:
+        exportadores.append(ExportadorArchivo(Config.TRACE_EXPORT_FILE))
+    return Trazador(exportadores)
+
+
+# Trazador compartido por la fachada, los proveedores y la web
+memoria = ExportadorMemoria()
+trazador = _crear_trazador()
@@ -0,0 +1,230 @@
+"""
+Vigilancia del clima por suscripción (eventos push en lugar de sondeo)
+
+Los clientes se suscriben a un conjunto de ciudades. Por cada ciudad
+vigilada hay un único bucle de refresco, lo compartan uno o mil
+suscriptores: consulta el clima cada `intervalo` segundos (a través de la
+caché del proveedor), lo compara con el valor anterior y publica solo los
+campos que cambian. Cuando la última suscripción de una ciudad se cancela,
+su bucle se detiene.
+
+Eventos (diccionarios):
+    {'tipo': 'estado', 'ciudad', 'version', 'datos': clima completo}  al suscribirse
+    {'tipo': 'cambio', 'ciudad', 'version', 'cambios': {campo: valor}}
+    {'tipo': 'error', 'ciudad', 'version', 'error': mensaje}         al empezar a fallar
+"""
+import queue
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .config import Config
+from .texto import normalizar_nombre
+
+
+def diferencias(anterior: Optional[dict], nuevo: dict) -> dict:
+    """Campos de `nuevo` que no están en `anterior` o cuyo valor ha cambiado"""
+    anterior = anterior or {}
+    return {campo: valor for campo, valor in nuevo.items() if campo not in anterior or anterior[campo] != valor}
+
+
+class SuscripcionesAgotadas(Exception):
+    """Se alcanzó Config.WATCH_MAX_SUBSCRIBERS"""
+
+
+class Suscripcion:
+    """
+    Cola de eventos de un cliente
+
+    Si el cliente no consume y la cola se llena, se vacía y el siguiente
+    evento es de nuevo el estado completo de cada ciudad (los deltas perdidos
+    dejarían al cliente con datos incoherentes).
+    """
+
+    def __init__(self, vigilante: 'VigilanteClima', ciudades: List[str], maximo_pendientes: int):
+        self.vigilante = vigilante
+        self.ciudades = ciudades
+        self.descartados = 0
+        self.activa = True
+        self._cola = queue.Queue(maximo_pendientes)
+        self._resincronizar = False
+        self._lock = threading.Lock()
+
+    def publicar(self, evento: dict):
+        with self._lock:
+            if self._resincronizar:
+                return
+            try:
+                self._cola.put_nowait(evento)
+            except queue.Full:
+                self.descartados += self._cola.qsize() + 1
+                while not self._cola.empty():
+                    self._cola.get_nowait()
+                self._resincronizar = True
+
+    def siguiente(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Siguiente evento, o None si no llega ninguno en `timeout` segundos"""
+        with self._lock:
+            resincronizar, self._resincronizar = self._resincronizar, False
+        if resincronizar:
+            for evento in self.vigilante.estados(self.ciudades):
+                self.publicar(evento)
+        try:
+            return self._cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def cancelar(self):
+        if self.activa:
+            self.activa = False
+            self.vigilante.cancelar(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cancelar()
+
+
+class _CiudadVigilada:
+    """Estado de una ciudad: último valor, versión y suscriptores de su bucle"""
+
+    def __init__(self, ciudad: str):
+        self.ciudad = ciudad
+        self.suscriptores = set()
+        self.ultimo: Optional[dict] = None
+        self.version = 0
+        self.error: Optional[str] = None
+        self.parar = threading.Event()
+        self.hilo: Optional[threading.Thread] = None
+
+
+class VigilanteClima:
+    """
+    Un bucle de refresco por ciudad compartido por todos sus suscriptores
+
+    Uso:
+        vigilante = VigilanteClima(facade.obtener_solo_clima)
+        with vigilante.suscribir(['madrid', 'lima']) as suscripcion:
+            evento = suscripcion.siguiente(timeout=15)
+    """
+
+    def __init__(self, obtener: Callable[[str], object], intervalo: Optional[float] = None):
+        """
+        Args:
+            obtener: ciudad -> InformacionClima (o None si no se pudo obtener)
+            intervalo: Segundos entre refrescos de una ciudad (Config.WATCH_INTERVAL)
+        """
+        self.obtener = obtener
+        self.intervalo = Config.WATCH_INTERVAL if intervalo is None else intervalo
+        self._ciudades: Dict[str, _CiudadVigilada] = {}
+        self._suscripciones = 0
+        self._lock = threading.Lock()
+        self.refrescos = 0
+        self.eventos = 0
+
+    def suscribir(self, ciudades: Iterable[str]) -> Suscripcion:
+        """
+        Empieza a vigilar las ciudades; las que ya tienen valor lo envían al momento
+
+        Raises:
+            ValueError: si no hay ciudades o son más de Config.WATCH_MAX_CITIES
+            SuscripcionesAgotadas: si ya hay Config.WATCH_MAX_SUBSCRIBERS suscripciones
+        """
+        claves = list(dict.fromkeys(normalizar_nombre(c) for c in ciudades if normalizar_nombre(c)))
+        if not claves:
+            raise ValueError("Indica al menos una ciudad")
+        if len(claves) > Config.WATCH_MAX_CITIES:
+            raise ValueError(f"Como máximo {Config.WATCH_MAX_CITIES} ciudades por suscripción")
+
+        suscripcion = Suscripcion(self, claves, Config.WATCH_QUEUE_SIZE)
+        with self._lock:
+            if self._suscripciones >= Config.WATCH_MAX_SUBSCRIBERS:
+                raise SuscripcionesAgotadas(f"Límite de {Config.WATCH_MAX_SUBSCRIBERS} suscripciones alcanzado")
+            self._suscripciones += 1
+            for clave in claves:
+                vigilada = self._ciudades.get(clave)
+                if vigilada is None:
+                    vigilada = self._ciudades[clave] = _CiudadVigilada(clave)
+                    vigilada.hilo = threading.Thread(
+                        target=self._bucle, args=(vigilada,), name=f"vigilancia-{clave}", daemon=True
+                    )
+                    vigilada.hilo.start()
+                vigilada.suscriptores.add(suscripcion)
+                if vigilada.ultimo is not None:
+                    suscripcion.publicar(self._estado(vigilada))
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        """Quita la suscripción; la ciudad que se queda sin suscriptores deja de refrescarse"""
+        with self._lock:
+            self._suscripciones -= 1
+            for clave in suscripcion.ciudades:
+                vigilada = self._ciudades.get(clave)
+                if vigilada is None:
+                    continue
+                vigilada.suscriptores.discard(suscripcion)
+                if not vigilada.suscriptores:
+                    vigilada.parar.set()
+                    del self._ciudades[clave]
+
+    def estados(self, ciudades: Iterable[str]) -> List[dict]:
+        """Evento de estado completo de las ciudades que ya tienen valor"""
+        with self._lock:
+            return [self._estado(self._ciudades[c]) for c in ciudades
+                    if c in self._ciudades and self._ciudades[c].ultimo is not None]
+
+    @staticmethod
+    def _estado(vigilada: _CiudadVigilada) -> dict:
+        return {'tipo': 'estado', 'ciudad': vigilada.ciudad, 'version': vigilada.version, 'datos': vigilada.ultimo}
+
+    def _bucle(self, vigilada: _CiudadVigilada):
+        espera = 0
+        while not vigilada.parar.wait(espera):
+            inicio = time.monotonic()
+            self.refrescar(vigilada)
+            espera = max(0.0, self.intervalo - (time.monotonic() - inicio))
+
+    def refrescar(self, vigilada: _CiudadVigilada) -> Optional[dict]:
+        """Consulta una vez la ciudad y publica el evento si algo cambió"""
+        try:
+            valor = self.obtener(vigilada.ciudad)
+            error = None if valor is not None else "Clima no disponible"
+        except Exception as e:
+            valor, error = None, str(e)
+
+        with self._lock:
+            self.refrescos += 1
+            if error:
+                if vigilada.error == error:
+                    return None
+                vigilada.error = error
+                evento = {'tipo': 'error', 'ciudad': vigilada.ciudad, 'version': vigilada.version, 'error': error}
+            else:
+                vigilada.error = None
+                datos = asdict(valor) if is_dataclass(valor) else dict(valor)
+                primero = vigilada.ultimo is None
+                cambios = diferencias(vigilada.ultimo, datos)
+                if not cambios:
+                    return None
+                vigilada.ultimo = datos
+                vigilada.version += 1
+                evento = self._estado(vigilada) if primero else {
+                    'tipo': 'cambio', 'ciudad': vigilada.ciudad, 'version': vigilada.version, 'cambios': cambios
+                }
+            suscriptores = list(vigilada.suscriptores)
+            self.eventos += 1
+        for suscripcion in suscriptores:
+            suscripcion.publicar(evento)
+        return evento
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                'ciudades': len(self._ciudades),
+                'suscripciones': self._suscripciones,
+                'refrescos': self.refrescos,
+                'eventos': self.eventos,
+                'intervalo_s': self.intervalo
+            }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL ARRANQUE (IMPORTACIONES PEREZOSAS)
+
+Con `python -X importtime` en intérpretes nuevos, verifica que importar o
+crear la fachada no carga requests, colorama ni los proveedores, y que el
+coste de importarla se mantiene acotado. Los proveedores se crean al usarlos.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import arranque
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.config import Config
+
+# Módulos que no deben cargarse solo por importar la fachada
+PESADOS = ('requests', 'urllib3', 'colorama', 'concurrent.futures', 'src.providers.clima_provider',
+           'src.providers.noticias_provider', 'src.providers.pais_provider')
+
+# Margen amplio sobre los ~40 ms actuales: detecta regresiones gruesas sin ser frágil
+LIMITE_FACADE_MS = 150
+
+
+class TestArranque(unittest.TestCase):
+    """Tests del coste de importación"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.resultados = arranque.ejecutar(['fachada', 'fachada_creada'], repeticiones=2)
+
+    def test_parsear_importtime(self):
+        salida = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      2000 |       2120 | modulo\n"
+        )
+        self.assertEqual(arranque.parsear_importtime(salida), {'_io': (120, 120), 'modulo': (2000, 2120)})
+
+    def test_importar_fachada_no_carga_modulos_pesados(self):
+        cargados = self.resultados['fachada']['modulos']
+        self.assertIn('src.facade.informacion_facade', cargados)
+        self.assertEqual([m for m in PESADOS if m in cargados], [])
+
+    def test_crear_fachada_no_crea_proveedores(self):
+        cargados = self.resultados['fachada_creada']['modulos']
+        self.assertEqual([m for m in PESADOS if m in cargados and m != 'colorama'], [])
+
+    def test_coste_de_importacion(self):
+        self.assertLess(self.resultados['fachada']['neto_ms'], LIMITE_FACADE_MS,
+                        self.resultados['fachada']['mas_costosos'])
+
+
+class TestProveedoresPerezosos(unittest.TestCase):
+    """Los proveedores se crean al primer uso y se enganchan a purgas y autocompletado"""
+
+    def test_creacion_al_primer_uso(self):
+        facade = FachadaInformacionCiudad()
+        self.assertEqual(facade._proveedores, {})
+        self.assertIs(facade.clima_provider, facade.clima_provider)
+        self.assertEqual(list(facade._proveedores), ['clima'])
+
+    def test_autocompletado_con_proveedor_creado_despues(self):
+        facade = FachadaInformacionCiudad()
+        facade.autocompletar("lim")  # índice creado antes que el proveedor de clima
+        facade.clima_provider.cache_coordenadas.guardar("tunja", {
+            'latitude': 5.53, 'longitude': -73.36, 'name': "Tunja", 'country': "Colombia", 'population': 172_548
+        })
+        self.assertEqual(facade.autocompletar("tunj")[0]['nombre'], "Tunja")
+
+    def test_purgas_en_proveedores_creados_despues(self):
+        facade = FachadaInformacionCiudad()
+        purgadas = []
+
+        class Notificador:
+            def purgar(self, claves):
+                purgadas.extend(claves)
+
+        facade.conectar_purgas(Notificador())
+        facade.pais_provider.cache_paises.guardar("peru", [{}])
+        facade.pais_provider.cache_paises.guardar("peru", [{'cca2': 'PE'}])
+        self.assertEqual(purgadas, ['pais/peru'])
+
+    @patch.object(Config, 'USE_MOCK_DATA', True)
+    def test_consulta_con_plazo_crea_el_pool_al_usarlo(self):
+        facade = FachadaInformacionCiudad()
+        self.assertEqual(facade._executors, {})
+        resultado = facade.obtener_informacion_completa("Lima", componentes=['pais'], tiempo_maximo_ms=5000)
+        self.assertIsNotNone(resultado.pais)
+        self.assertIn('pais', facade._executors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL AUTOCOMPLETADO DE CIUDADES
+
+Verifica el índice de prefijos (tildes, orden por población, duplicados),
+que se amplía con las ciudades geocodificadas y el endpoint /api/autocomplete.
+"""
+import sys
+import os
+import time
+import unittest
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.autocompletado import IndiceCiudades, leer_lista_ciudades
+from src.utils.config import Config
+
+
+class TestIndiceCiudades(unittest.TestCase):
+    """Tests del índice en memoria"""
+
+    def setUp(self):
+        self.indice = IndiceCiudades([
+            ("Bogotá", "Colombia", 7_743_955),
+            ("Boston", "Estados Unidos", 675_647),
+            ("Bordeaux", "Francia", 257_068),
+            ("Córdoba", "Argentina", 1_565_112),
+            ("Córdoba", "España", 319_515),
+            ("Madrid", "España", 3_332_035),
+        ])
+
+    def test_prefijo_sin_tildes_ni_mayusculas(self):
+        nombres = [s['nombre'] for s in self.indice.sugerir("BOG")]
+        self.assertEqual(nombres, ["Bogotá"])
+        self.assertEqual(len(self.indice.sugerir("cór")), 2)
+        self.assertEqual(self.indice.sugerir("xyz"), [])
+        self.assertEqual(self.indice.sugerir("   "), [])
+
+    def test_orden_por_poblacion_y_limite(self):
+        sugerencias = self.indice.sugerir("bo", limite=2)
+        self.assertEqual([s['nombre'] for s in sugerencias], ["Bogotá", "Boston"])
+        self.assertEqual(sugerencias[0]['pais'], "Colombia")
+        self.assertEqual(sugerencias[0]['poblacion'], 7_743_955)
+
+    def test_agregar_y_duplicados(self):
+        self.indice.agregar("Bogotá", "Colombia", 8_000_000)
+        self.indice.agregar("Boa Vista", "Brasil", 419_652)
+        self.assertEqual(len(self.indice), 7)
+        self.assertEqual(self.indice.sugerir("bogota")[0]['poblacion'], 8_000_000)
+        self.assertIn("Boa Vista", [s['nombre'] for s in self.indice.sugerir("bo")])
+
+    def test_lista_incluida(self):
+        entradas = leer_lista_ciudades(Config.CITY_LIST_FILE)
+        self.assertGreater(len(entradas), 100)
+        self.assertEqual(leer_lista_ciudades("no/existe.tsv"), [])
+
+    def test_rapidez(self):
+        indice = IndiceCiudades(leer_lista_ciudades(Config.CITY_LIST_FILE))
+        for i in range(20000):
+            indice.agregar(f"Ciudad {i}", "Pruebas", i)
+        indice.sugerir("ci")  # el primer acceso a un prefijo recorre su rango
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            indice.sugerir("ci")
+        self.assertLess((time.perf_counter() - inicio) / 1000, 0.001)
+
+        indice.agregar("Cirebon", "Indonesia", 10**8)
+        self.assertEqual(indice.sugerir("ci")[0]['nombre'], "Cirebon")
+
+
+class TestAutocompletadoFacade(unittest.TestCase):
+    """Tests de la integración con la caché de geocodificación y la web"""
+
+    def test_ciudades_geocodificadas(self):
+        facade = FachadaInformacionCiudad()
+        self.assertEqual(facade.autocompletar("villavicencio"), [])
+        facade.clima_provider.cache_coordenadas.guardar("villavicencio", {
+            'latitude': 4.14, 'longitude': -73.63, 'name': "Villavicencio",
+            'country': "Colombia", 'population': 384_131
+        })
+        self.assertEqual(facade.autocompletar("villav")[0]['nombre'], "Villavicencio")
+
+    def test_endpoint(self):
+        cliente = web_app.app.test_client()
+        data = cliente.get('/api/autocomplete?q=bog&limite=3').get_json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['sugerencias'][0]['nombre'], "Bogotá")
+        self.assertLessEqual(len(data['sugerencias']), 3)
+
+        data = cliente.get('/api/autocomplete').get_json()
+        self.assertEqual(data['sugerencias'], [])
+
+        for limite in (0, -1):
+            data = cliente.get(f'/api/autocomplete?q=bog&limite={limite}').get_json()
+            self.assertEqual([s['nombre'] for s in data['sugerencias']], ["Bogotá"])
+
+
+if __name__ == '__main__':
+    unittest.main()
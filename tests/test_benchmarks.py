@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA SUITE DE BENCHMARKS
+
+Comprueba los servidores simulados y un escenario de carga mínimo.
+"""
+import sys
+import os
+import tempfile
+import json
+import unittest
+from unittest.mock import patch
+
+import requests
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.carga import comparar, ejecutar_escenario, guardar_informe, percentil
+from benchmarks.servidor_grabacion import ServidorGrabacion, urls_para
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado
+from src.providers.clima_provider import ClimaProvider
+from src.providers.pais_provider import PaisProvider
+from src.utils.config import Config
+
+
+class TestServidorSimulado(unittest.TestCase):
+    """Tests de las APIs simuladas"""
+
+    def test_rutas_principales(self):
+        with ServidorSimulado() as servidor:
+            geo = requests.get(f"{servidor.url}/v1/search", params={'name': 'Madrid'}, timeout=5).json()
+            self.assertEqual(geo['results'][0]['name'], 'Madrid')
+
+            historias = requests.get(f"{servidor.url}/v0/topstories.json", timeout=5).json()
+            self.assertGreater(len(historias), 10)
+
+            pais = requests.get(f"{servidor.url}/v3.1/name/Spain", timeout=5).json()
+            self.assertEqual(pais[0]['name']['common'], 'Spain')
+
+    def test_inyeccion_de_errores(self):
+        configuracion = ConfiguracionSimulada(tasa_error=1.0, codigo_error=429)
+        with ServidorSimulado(configuracion) as servidor:
+            respuesta = requests.get(f"{servidor.url}/v0/topstories.json", timeout=5)
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertEqual(configuracion.errores, 1)
+
+
+class TestCarga(unittest.TestCase):
+    """Tests del generador de carga y los informes"""
+
+    def test_percentil(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil([], 95), 0.0)
+
+    def test_escenario_facade_y_comparacion(self):
+        informe = ejecutar_escenario('facade', peticiones=4, concurrencia=2)
+        self.assertEqual(informe['metricas']['peticiones'], 4)
+        self.assertEqual(informe['metricas']['errores'], 0)
+        self.assertGreater(informe['upstream']['peticiones'], 0)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = guardar_informe(informe, directorio)
+            with open(ruta, encoding='utf-8') as archivo:
+                guardado = json.load(archivo)
+        self.assertEqual(comparar(guardado, informe)['p95_ms']['cambio_pct'], 0.0)
+
+
+class TestServidorGrabacion(unittest.TestCase):
+    """Graba contra las APIs simuladas y reproduce sin ellas"""
+
+    def consultar(self, base_url):
+        with patch.multiple(Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False, **urls_para(base_url)):
+            clima = ClimaProvider().obtener_clima('Lima')
+            pais = PaisProvider().obtener_info_pais('Peru')
+        return clima, pais
+
+    def test_grabar_y_reproducir(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            with ServidorSimulado() as upstream:
+                upstreams = {nombre: upstream.url for nombre in ('geocoding', 'meteo', 'hn', 'paises')}
+                with ServidorGrabacion(directorio, 'grabar', upstreams=upstreams) as grabador:
+                    clima_grabado, pais_grabado = self.consultar(grabador.url)
+
+            self.assertEqual(len(os.listdir(directorio)), 3)
+
+            with ServidorGrabacion(directorio, 'reproducir', factor_latencia=0) as reproductor:
+                clima, pais = self.consultar(reproductor.url)
+                no_grabada = requests.get(f"{reproductor.url}/hn/v0/topstories.json", timeout=5)
+
+        self.assertIsNotNone(clima_grabado)
+        self.assertEqual(clima, clima_grabado)
+        self.assertEqual(pais, pais_grabado)
+        self.assertEqual(no_grabada.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE BÚSQUEDA OFFLINE DE NOTICIAS
+
+Verifica el índice invertido: ranking, filtro temporal, desalojo y
+persistencia, y los límites del endpoint /api/buscar-noticias.
+"""
+import sys
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.models.informacion_models import Noticia
+from src.providers.busqueda_noticias import IndiceBusquedaNoticias, tokenizar
+from src.providers.fuentes_noticias import FuenteFeed
+from src.providers.noticias_provider import NoticiasProvider
+
+FEED_ESPANA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds', 'spain_rss.xml')
+
+
+def crear_noticia(titulo, descripcion="", fuente="Hacker News", fecha=None, url=None):
+    return Noticia(
+        titulo=titulo,
+        descripcion=descripcion,
+        url=url or f"https://example.com/{titulo.replace(' ', '-')}",
+        fuente=fuente,
+        fecha_publicacion=fecha
+    )
+
+
+class TestIndiceBusquedaNoticias(unittest.TestCase):
+    """Tests del índice invertido"""
+
+    def setUp(self):
+        self.indice = IndiceBusquedaNoticias(max_documentos=100, max_edad=3600)
+
+    def test_tokenizar_sin_tildes(self):
+        self.assertEqual(tokenizar("Análisis de Python, rápido!"), ['analisis', 'de', 'python', 'rapido'])
+
+    def test_titulo_pesa_mas_que_descripcion(self):
+        self.indice.agregar(crear_noticia("Rust en el kernel", "Comparativa con Python"))
+        self.indice.agregar(crear_noticia("Python 3.13 publicado", "Nueva versión"))
+
+        resultados = self.indice.buscar("python")
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual(resultados[0]['noticia'].titulo, "Python 3.13 publicado")
+
+    def test_busqueda_por_fuente_y_filtro_temporal(self):
+        ahora = time.time()
+        self.indice.agregar(crear_noticia("Noticia reciente", fuente="El Diario", fecha=str(int(ahora))))
+        self.indice.agregar(crear_noticia("Noticia antigua", fuente="El Diario", fecha=str(int(ahora - 10 * 86400))))
+
+        self.assertEqual(len(self.indice.buscar("diario")), 2)
+        recientes = self.indice.buscar("diario", desde=ahora - 7 * 86400)
+        self.assertEqual([r['noticia'].titulo for r in recientes], ["Noticia reciente"])
+
+    def test_desalojo_por_tamano_y_edad(self):
+        indice = IndiceBusquedaNoticias(max_documentos=2, max_edad=60)
+        indice.agregar(crear_noticia("uno"), visto=1000)
+        indice.agregar(crear_noticia("dos"), visto=1001)
+        indice.agregar(crear_noticia("tres"), visto=1002)
+        self.assertEqual(len(indice), 2)
+        self.assertEqual(indice.buscar("uno"), [])
+
+        indice.agregar(crear_noticia("cuatro"), visto=1100)
+        self.assertEqual(len(indice), 1)
+        self.assertEqual(indice.buscar("tres"), [])
+
+    def test_persistencia(self):
+        self.indice.agregar(crear_noticia("Guardado en disco", "Índice persistente"))
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'indice.json')
+            self.indice.guardar(ruta)
+
+            restaurado = IndiceBusquedaNoticias(max_documentos=100, max_edad=3600)
+            self.assertEqual(restaurado.cargar(ruta), 1)
+            self.assertEqual(restaurado.buscar("indice")[0]['noticia'].titulo, "Guardado en disco")
+
+
+class TestBusquedaEnProvider(unittest.TestCase):
+    """Las noticias servidas por el proveedor quedan indexadas"""
+
+    def test_noticias_servidas_se_indexan(self):
+        provider = NoticiasProvider(fuentes={'Spain': [FuenteFeed(FEED_ESPANA)]})
+        provider.indice.detener()
+        provider.obtener_noticias('Spain')
+
+        resultados = provider.buscar_noticias("python")
+        self.assertEqual(resultados[0]['noticia'].titulo, "Valencia acoge un congreso de Python")
+
+
+class TestEndpointBusqueda(unittest.TestCase):
+    """Tests de GET /api/buscar-noticias"""
+
+    def test_limite_acotado(self):
+        cliente = web_app.app.test_client()
+        with patch.object(web_app.facade, 'buscar_noticias', return_value=[]) as buscar:
+            for limite, esperado in (('0', 1), ('-5', 1), ('7', 7), ('500', 100)):
+                respuesta = cliente.get(f'/api/buscar-noticias?q=python&limite={limite}')
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(buscar.call_args.kwargs['limite'], esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
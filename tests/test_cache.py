@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE CACHÉ, PRECALENTAMIENTO Y SNAPSHOT
+
+Verifica la caché con TTL de los proveedores, el presupuesto de memoria
+compartido con admisión W-TinyLFU (también su contabilidad con muchos hilos
+guardando las mismas claves), el precalentamiento de ciudades y el
+volcado/restauración de cachés entre instancias.
+"""
+import sys
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.servidores_simulados import ServidorSimulado, apuntar_facade
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.cache import CacheTTL, PresupuestoMemoria, SketchFrecuencias, tamano_en_memoria
+from src.utils.config import Config
+
+
+class TestCacheTTL(unittest.TestCase):
+    """Tests de la caché con expiración"""
+
+    def test_expiracion(self):
+        cache = CacheTTL(ttl=60)
+        cache.guardar('a', {'valor': 1})
+        cache.guardar('b', {'valor': 2}, ttl=-1)
+
+        self.assertEqual(cache.obtener('a'), {'valor': 1})
+        self.assertIsNone(cache.obtener('b'))
+        self.assertEqual(cache.estadisticas(), {'entradas': 1, 'aciertos': 1, 'fallos': 1})
+
+    def test_importar_descarta_caducadas(self):
+        cache = CacheTTL(ttl=60)
+        ahora = time.time()
+        cargadas = cache.importar([['vigente', 1, ahora + 60], ['caducada', 2, ahora - 1]])
+        self.assertEqual(cargadas, 1)
+        self.assertEqual(len(cache), 1)
+
+
+def valor(n, bytes_texto=1000):
+    return {'ciudad': f"ciudad-{n}", 'datos': 'x' * bytes_texto}
+
+
+class TestPresupuestoMemoria(unittest.TestCase):
+    """Tests del límite de memoria compartido y la política de admisión"""
+
+    def test_tamano_en_memoria(self):
+        pequeno, grande = tamano_en_memoria(valor(1, 10)), tamano_en_memoria(valor(1, 10000))
+        self.assertGreater(grande - pequeno, 9000)
+        compartido = 'y' * 5000
+        self.assertLess(tamano_en_memoria([compartido, compartido]), 2 * 5000)
+
+    def test_sketch_cuenta_y_envejece(self):
+        sketch = SketchFrecuencias(64)
+        for _ in range(20):
+            sketch.incrementar('caliente')
+        sketch.incrementar('fria')
+        self.assertEqual(sketch.frecuencia('caliente'), 15)  # saturado
+        self.assertEqual(sketch.frecuencia('fria'), 1)
+        for i in range(sketch.muestra):
+            sketch.incrementar(i)
+        self.assertLessEqual(sketch.frecuencia('caliente'), 8)
+
+    def test_limite_compartido_entre_caches(self):
+        presupuesto = PresupuestoMemoria(100_000, 0.05)
+        clima, paises = CacheTTL(60, presupuesto), CacheTTL(60, presupuesto)
+        for n in range(300):
+            (clima if n % 2 else paises).guardar(f"c{n}", valor(n))
+
+        estadisticas = presupuesto.estadisticas()
+        self.assertLessEqual(estadisticas['bytes'], 100_000)
+        self.assertEqual(estadisticas['bytes'], clima.bytes + paises.bytes)
+        self.assertEqual(estadisticas['entradas'], len(clima) + len(paises))
+        self.assertGreater(clima.uso_memoria()['expulsiones'] + paises.uso_memoria()['expulsiones'], 0)
+
+    def test_recorrido_no_expulsa_las_entradas_frecuentes(self):
+        presupuesto = PresupuestoMemoria(150_000, 0.05)
+        cache = CacheTTL(60, presupuesto)
+        frecuentes = [f"frecuente-{n}" for n in range(40)]
+        for _ in range(5):
+            for clave in frecuentes:
+                if cache.obtener(clave) is None:
+                    cache.guardar(clave, valor(clave))
+
+        # Recorrido por miles de ciudades consultadas una sola vez
+        for n in range(3000):
+            if cache.obtener(f"unica-{n}") is None:
+                cache.guardar(f"unica-{n}", valor(n))
+
+        presentes = sum(cache.obtener(clave) is not None for clave in frecuentes)
+        self.assertGreaterEqual(presentes, 38)
+        self.assertLessEqual(presupuesto.bytes, 150_000)
+        self.assertGreater(presupuesto.estadisticas()['rechazos'], 2500)
+
+    def test_entrada_mayor_que_el_presupuesto(self):
+        presupuesto = PresupuestoMemoria(10_000, 0.1)
+        cache = CacheTTL(60, presupuesto)
+        cache.guardar('enorme', valor(1, 50_000))
+        self.assertIsNone(cache.obtener('enorme'))
+        self.assertEqual((cache.bytes, presupuesto.bytes), (0, 0))
+
+    def test_limpiar_e_importar_contabilizan(self):
+        presupuesto = PresupuestoMemoria(0)  # sin límite: solo contabiliza
+        cache = CacheTTL(60, presupuesto)
+        cache.guardar('a', valor(1))
+        cache.guardar('a', valor(1, 5000))
+        self.assertEqual(presupuesto.bytes, cache.bytes)
+        exportadas = cache.exportar()
+        cache.limpiar()
+        self.assertEqual((cache.bytes, presupuesto.bytes), (0, 0))
+        self.assertEqual(cache.importar(exportadas), 1)
+        self.assertEqual(presupuesto.bytes, cache.bytes)
+        self.assertGreater(cache.bytes, 5000)
+
+    def test_guardar_durante_una_expulsion(self):
+        presupuesto = PresupuestoMemoria(100_000, 0.5)
+        cache = CacheTTL(60, presupuesto)
+        cache.guardar('k', valor(1, 3000))
+
+        # La expulsión se queda parada entre la decisión del presupuesto y el borrado
+        descartar, en_pausa, seguir = cache._descartar, threading.Event(), threading.Event()
+
+        def descartar_lento(clave):
+            en_pausa.set()
+            seguir.wait(5)
+            descartar(clave)
+
+        cache._descartar = descartar_lento
+        hilo = threading.Thread(target=presupuesto.redimensionar, args=(1000, 0.5))
+        hilo.start()
+        self.assertTrue(en_pausa.wait(5))
+        presupuesto.redimensionar(100_000, 0.5)
+        cache.guardar('k', valor(2, 3000))  # se vuelve a guardar mientras tanto
+        seguir.set()
+        hilo.join()
+
+        self.assertEqual(cache.obtener('k'), valor(2, 3000))
+        self.assertTrue(presupuesto.registrada(cache, 'k'))
+        self.assertEqual(presupuesto.bytes, cache.bytes)
+
+    def test_contabilidad_con_hilos_concurrentes(self):
+        presupuesto = PresupuestoMemoria(60_000, 0.1)
+        caches = [CacheTTL(60, presupuesto), CacheTTL(60, presupuesto)]
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # cambios de hilo frecuentes para provocar carreras
+        self.addCleanup(sys.setswitchinterval, intervalo)
+
+        def trabajar(semilla):
+            aleatorio = random.Random(semilla)
+            for _ in range(1500):
+                cache = aleatorio.choice(caches)
+                clave = f"c{aleatorio.randrange(40)}"
+                if aleatorio.random() < 0.6:
+                    cache.guardar(clave, valor(clave, aleatorio.randrange(100, 4000)),
+                                  ttl=-1 if aleatorio.random() < 0.1 else None)
+                else:
+                    cache.obtener(clave)
+
+        hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        estadisticas = presupuesto.estadisticas()
+        self.assertEqual(estadisticas['bytes'], sum(cache.bytes for cache in caches))
+        self.assertEqual(estadisticas['entradas'], sum(len(cache) for cache in caches))
+        for cache in caches:
+            self.assertEqual(cache.bytes, sum(cache._tamanos.values()))
+            for clave in list(cache._datos):
+                self.assertTrue(presupuesto.registrada(cache, clave), clave)
+        self.assertLessEqual(estadisticas['bytes'], 60_000)
+
+
+@patch.object(Config, 'USE_MOCK_DATA', False)
+class TestArranqueEnCaliente(unittest.TestCase):
+    """Precalentamiento y snapshot contra las APIs simuladas"""
+
+    def setUp(self):
+        self.servidor = ServidorSimulado().iniciar()
+        self.facade = FachadaInformacionCiudad()
+        apuntar_facade(self.facade, self.servidor.url)
+
+    def tearDown(self):
+        self.servidor.detener()
+
+    def test_precalentar_llena_caches(self):
+        resumen = self.facade.precalentar(['Madrid', 'Lima'])
+        self.assertEqual(resumen['fallidas'], 0)
+        peticiones = self.servidor.configuracion.peticiones
+
+        # Tras precalentar, la consulta completa no llama a ninguna API
+        resultado = self.facade.obtener_informacion_completa('Madrid')
+        self.assertFalse(resultado.tiene_errores())
+        self.assertEqual(self.servidor.configuracion.peticiones, peticiones)
+
+    def test_uso_de_memoria(self):
+        self.facade.precalentar(['Lima'])
+        uso = self.facade.uso_memoria()
+        self.assertGreater(uso['caches']['clima.clima']['bytes'], 0)
+        self.assertGreaterEqual(uso['presupuesto']['bytes'],
+                                sum(cache['bytes'] for cache in uso['caches'].values()))
+
+    def test_snapshot_y_restauracion(self):
+        self.facade.precalentar(['Bogota'])
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'cache.json')
+            self.facade.guardar_cache(ruta)
+
+            nueva = FachadaInformacionCiudad()
+            self.assertGreater(nueva.restaurar_cache(ruta), 0)
+
+        self.assertEqual(
+            nueva.clima_provider.cache_coordenadas.obtener('bogota'),
+            self.facade.clima_provider.cache_coordenadas.obtener('bogota')
+        )
+        self.assertIsNotNone(nueva.pais_provider.cache_paises.obtener('colombia'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE CALIDAD DEL AIRE Y TIPO DE CAMBIO
+
+Contra los servidores simulados: la calidad del aire reutiliza las
+coordenadas del clima (una sola geocodificación por ciudad), la tabla de
+tipos de cambio se descarga una vez y las conversiones son locales (la
+tabla simulada del fallback se marca como tal), y los
+proveedores nuevos corren en paralelo con los existentes y llegan
+serializados en las respuestas de la web.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado, apuntar_facade
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.providers.calidad_aire_provider import CalidadAireProvider
+from src.providers.tipo_cambio_provider import TipoCambioProvider
+from src.utils.config import Config
+
+SIN_RED_REAL = dict(USE_MOCK_DATA=False, ENABLE_FALLBACK=False, HEDGE_ENABLED=False)
+
+
+class TestContraServidorSimulado(unittest.TestCase):
+    """Proveedores nuevos contra las APIs simuladas"""
+
+    def consultar(self, latencia_ms, consultas):
+        """Ejecuta (ciudad, componentes) en orden; devuelve resultados, peticiones por consulta y duraciones"""
+        configuracion = ConfiguracionSimulada(latencia_ms=latencia_ms)
+        resultados, peticiones, duraciones = [], [], []
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(Config, **SIN_RED_REAL):
+            self.facade = FachadaInformacionCiudad()
+            apuntar_facade(self.facade, servidor.url)
+            for ciudad, componentes in consultas:
+                antes, inicio = configuracion.peticiones, time.perf_counter()
+                resultados.append(self.facade.obtener_informacion_completa(ciudad, componentes=componentes))
+                duraciones.append(time.perf_counter() - inicio)
+                peticiones.append(configuracion.peticiones - antes)
+        return resultados, peticiones, duraciones
+
+    def test_calidad_aire_reutiliza_coordenadas_del_clima(self):
+        (clima, aire), peticiones, _ = self.consultar(0, [("Lima", ['clima']), ("Lima", ['calidad_aire'])])
+
+        self.assertEqual(peticiones, [2, 1])  # geocoding + forecast; luego solo calidad del aire
+        self.assertIsNotNone(aire.calidad_aire)
+        self.assertEqual(aire.calidad_aire.ciudad, "Lima")
+        self.assertEqual(aire.calidad_aire.nivel, CalidadAireProvider.nivel(aire.calidad_aire.indice_europeo))
+        self.assertIsNone(aire.clima)
+
+    def test_una_geocodificacion_por_consulta(self):
+        (resultado,), peticiones, (duracion,) = self.consultar(100, [("Quito", ['clima', 'calidad_aire'])])
+
+        self.assertEqual(peticiones, [3])  # geocoding compartido + forecast + calidad del aire
+        self.assertLess(duracion, 0.35)  # forecast y calidad del aire a la vez
+        self.assertFalse(resultado.tiene_errores())
+
+    def test_tabla_de_cambios_una_sola_descarga(self):
+        resultados, peticiones, _ = self.consultar(0, [
+            ("Lima", ['tipo_cambio']), ("Quito", ['tipo_cambio']), ("Madrid", ['tipo_cambio'])
+        ])
+
+        self.assertEqual(peticiones, [2, 1, 1])  # país + tabla; después solo el país
+        cambio = resultados[0].tipo_cambio
+        self.assertEqual(cambio.monedas, ['XXX'])
+        self.assertEqual(cambio.equivalencias, {'XXX': {'USD': 0.5, 'EUR': 0.45}})
+        self.assertEqual(cambio.fuente_api, "ExchangeRate-API")
+        self.assertIsNone(resultados[0].pais)  # necesario para el cambio, pero no pedido
+        self.assertAlmostEqual(self.facade.convertir_moneda(100, 'usd', 'EUR'), 90.0)
+        self.assertIsNone(self.facade.convertir_moneda(1, 'USD', 'ZZZ'))
+
+    def test_proveedores_nuevos_no_suman_latencia(self):
+        componentes = ['clima', 'pais', 'calidad_aire', 'tipo_cambio']
+        (resultado,), peticiones, (duracion,) = self.consultar(150, [("Bogota", componentes)])
+
+        # En serie: geocoding, forecast, país, calidad del aire y tabla (≥ 0.75 s)
+        self.assertLess(duracion, 0.5)
+        self.assertEqual(peticiones, [5])
+        self.assertEqual(resultado.informacion_disponible(),
+                         ["clima", "país", "calidad del aire", "tipo de cambio"])
+
+    def test_descarga_concurrente_de_la_tabla(self):
+        configuracion = ConfiguracionSimulada(latencia_ms=100)
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(Config, **SIN_RED_REAL):
+            proveedor = TipoCambioProvider()
+            proveedor.base_url = f"{servidor.url}/v6/latest"
+            hilos = [threading.Thread(target=proveedor.obtener_tabla) for _ in range(5)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(configuracion.peticiones, 1)
+        self.assertEqual(proveedor.obtener_tabla()['base'], 'USD')
+
+    def test_fallback_marcado_como_simulado(self):
+        configuracion = ConfiguracionSimulada(tasa_error=1.0)
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(
+                Config, **dict(SIN_RED_REAL, ENABLE_FALLBACK=True), RETRY_MAX_ATTEMPTS=1):
+            proveedor = TipoCambioProvider()
+            proveedor.base_url = f"{servidor.url}/v6/latest"
+            tabla = proveedor.obtener_tabla()
+
+        self.assertGreater(configuracion.peticiones, 0)
+        pais = SimpleNamespace(codigos_moneda=['EUR'])
+        self.assertEqual(proveedor.obtener_tipos_cambio(pais, tabla).fuente_api, "Datos simulados")
+        self.assertIsNone(proveedor.cache_tasas.obtener('USD'))
+
+
+@patch.object(Config, 'USE_MOCK_DATA', True)
+class TestComponentesOpcionales(unittest.TestCase):
+    """Selección por defecto y datos simulados"""
+
+    def test_no_se_piden_por_defecto(self):
+        resultado = FachadaInformacionCiudad().obtener_informacion_completa("Madrid")
+        self.assertIsNone(resultado.calidad_aire)
+        self.assertIsNone(resultado.tipo_cambio)
+
+    def test_componentes_por_defecto_configurables(self):
+        with patch.object(Config, 'DEFAULT_COMPONENTS', ['pais', 'tipo_cambio', 'calidad_aire']):
+            resultado = FachadaInformacionCiudad().obtener_informacion_completa("Madrid")
+
+        self.assertFalse(resultado.tiene_errores())
+        self.assertIsNone(resultado.clima)
+        self.assertEqual(resultado.tipo_cambio.monedas, ['EUR'])
+        self.assertAlmostEqual(resultado.tipo_cambio.equivalencias['EUR']['USD'], 1 / 0.92, places=4)
+        self.assertIn(resultado.calidad_aire.nivel,
+                      [nivel for _, nivel in CalidadAireProvider.NIVELES] + ["Extremadamente mala"])
+
+
+@patch.object(Config, 'USE_MOCK_DATA', True)
+class TestRespuestasWeb(unittest.TestCase):
+    """Los componentes nuevos llegan serializados en /api/consultar y /api/ciudad"""
+
+    def comprobar(self, datos):
+        self.assertEqual(datos['info_disponible'], ["calidad del aire", "tipo de cambio"])
+        self.assertIsNone(datos['clima'])
+        aire = datos['calidad_aire']
+        self.assertEqual(aire['nivel'], CalidadAireProvider.nivel(aire['indice_europeo']))
+        self.assertIn('pm2_5', aire)
+        cambio = datos['tipo_cambio']
+        self.assertEqual((cambio['monedas'], cambio['moneda_base']), (['EUR'], 'USD'))
+        self.assertEqual(cambio['fuente_api'], "Datos simulados")
+        self.assertAlmostEqual(cambio['equivalencias']['EUR']['USD'], 1 / 0.92, places=4)
+
+    def test_consultar_y_ciudad(self):
+        cliente = web_app.app.test_client()
+        respuesta = cliente.post('/api/consultar',
+                                 json={'ciudad': 'Madrid', 'componentes': ['calidad_aire', 'tipo_cambio']})
+        self.assertEqual(respuesta.status_code, 200)
+        self.comprobar(respuesta.get_json())
+
+        respuesta = cliente.get('/api/ciudad/madrid?componentes=calidad_aire,tipo_cambio')
+        self.assertEqual(respuesta.status_code, 200)
+        self.comprobar(respuesta.get_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE GET /api/ciudad/<nombre> Y LA PURGA POR CLAVES SUSTITUTAS
+
+Verifica la redirección a la URL canónica, las cabeceras Surrogate-Key, que
+los datos simulados o de respaldo no se cachean en la CDN y que
+cambiar un dato ya cacheado (caché de proveedor o índice de feeds locales)
+programa la purga de sus claves, pero llenar la caché en frío no.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.models.informacion_models import InformacionClima, InformacionCompleta, Noticia
+from src.providers.fuentes_noticias import FuenteNoticias
+from src.utils.config import Config
+from src.utils.purgas import NotificadorPurgas
+from src.utils.texto import normalizar_nombre
+
+
+class TestCiudadGet(unittest.TestCase):
+    """Tests del endpoint GET cacheable"""
+
+    def setUp(self):
+        self.cliente = web_app.app.test_client()
+
+    def test_normalizar_nombre(self):
+        self.assertEqual(normalizar_nombre("  Bogotá   D.C. "), "bogota d.c.")
+
+    def test_redirige_a_url_canonica(self):
+        respuesta = self.cliente.get('/api/ciudad/Bogotá?componentes=clima')
+        self.assertEqual(respuesta.status_code, 301)
+        self.assertTrue(respuesta.headers['Location'].endswith('/api/ciudad/bogota?componentes=clima'))
+
+        respuesta = self.cliente.get('/api/ciudad/Buenos%20Aires')
+        self.assertTrue(respuesta.headers['Location'].endswith('/api/ciudad/buenos%20aires'))
+
+    def test_cabeceras_de_cdn(self):
+        informacion = InformacionCompleta(ciudad_consultada='Madrid')
+        informacion.clima = InformacionClima(
+            temperatura=21.5, sensacion_termica=20.0, humedad=55, descripcion="Despejado",
+            ciudad='Madrid', pais='España', icono='01d'
+        )
+        with patch.object(web_app.facade, 'obtener_informacion_completa', return_value=informacion):
+            respuesta = self.cliente.get('/api/ciudad/madrid?componentes=clima')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.get_json()['clima']['ciudad'], 'Madrid')
+        self.assertIn('ciudad/madrid', respuesta.headers['Surrogate-Key'].split())
+        self.assertEqual(respuesta.headers['Surrogate-Control'], f"max-age={Config.WEATHER_CACHE_TTL}")
+        self.assertEqual(respuesta.headers['Cache-Control'], f"public, max-age={Config.WEATHER_CACHE_TTL}")
+        self.assertIn('ETag', respuesta.headers)
+
+    def test_datos_simulados_no_se_cachean(self):
+        with patch.object(Config, 'USE_MOCK_DATA', True):
+            respuesta = self.cliente.get('/api/ciudad/madrid?componentes=pais,noticias')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNone(respuesta.get_json()['clima'])
+        self.assertEqual(respuesta.headers['Surrogate-Key'], 'ciudad/madrid noticias/spain pais/spain')
+        self.assertNotIn('Surrogate-Control', respuesta.headers)
+        self.assertEqual(respuesta.headers['Cache-Control'], 'no-store')
+
+    def test_respaldo_de_api_caida_no_se_cachea(self):
+        with patch.multiple(Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=True), \
+                patch.object(web_app.facade.pais_provider, '_hacer_peticion_pais',
+                             side_effect=ConnectionError("API caída")):
+            respuesta = self.cliente.get('/api/ciudad/lima?componentes=pais')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNotNone(respuesta.get_json()['pais'])
+        self.assertNotIn('Surrogate-Control', respuesta.headers)
+        self.assertEqual(respuesta.headers['Cache-Control'], 'no-store')
+
+    def test_componente_invalido(self):
+        self.assertEqual(self.cliente.get('/api/ciudad/madrid?componentes=bolsa').status_code, 400)
+
+
+class TestPurgas(unittest.TestCase):
+    """Tests de la purga al refrescar cachés"""
+
+    def test_refresco_de_cache_programa_purga(self):
+        facade = FachadaInformacionCiudad()
+        notificador = NotificadorPurgas(url='', intervalo=60)
+        facade.conectar_purgas(notificador)
+
+        # Llenado en frío: es lo que la CDN acaba de guardar, no se purga
+        facade.clima_provider.cache_clima.guardar('40.417,-3.704', {'current': {}})
+        facade.pais_provider.cache_paises.guardar('spain', [{}])
+        facade.noticias_provider.cache_items.guardar('1', {})
+        facade.noticias_provider.cache_items.guardar('2', {})
+        self.assertEqual(notificador.vaciar(), [])
+
+        # Refresco con el mismo valor: tampoco
+        facade.pais_provider.cache_paises.guardar('spain', [{}])
+        self.assertEqual(notificador.vaciar(), [])
+
+        facade.clima_provider.cache_clima.guardar('40.417,-3.704', {'current': {'temperature_2m': 20}})
+        facade.pais_provider.cache_paises.guardar('spain', [{'cca2': 'ES'}])
+        facade.noticias_provider.cache_items.guardar('2', {'title': "Nueva"})
+
+        self.assertEqual(notificador.vaciar(), ['clima/40.417,-3.704', 'noticias/hn', 'pais/spain'])
+        self.assertEqual(notificador.vaciar(), [])
+
+    def test_refresco_de_feeds_locales_programa_purga(self):
+        edicion = [1]
+
+        class FuenteCambiante(FuenteNoticias):
+            def obtener(self, pais):
+                return [Noticia(titulo=f"Edición {edicion[0]}", descripcion="", url=f"https://example.com/{edicion[0]}",
+                                fuente="Prueba")]
+
+        facade = FachadaInformacionCiudad()
+        notificador = NotificadorPurgas(url='', intervalo=60)
+        facade.conectar_purgas(notificador)
+        with patch('src.providers.noticias_provider.crear_fuentes_desde_config',
+                   return_value={'Spain': [FuenteCambiante()]}):
+            indice = facade.noticias_provider.indice
+        indice.detener()
+
+        indice.refrescar()
+        self.assertEqual(notificador.vaciar(), [])
+
+        edicion[0] = 2
+        indice.refrescar()
+        self.assertEqual(notificador.vaciar(), ['noticias/spain'])
+
+    def test_envia_purga_agrupada(self):
+        notificador = NotificadorPurgas(url='http://cdn.local/purge', intervalo=60)
+        notificador.purgar(['pais/peru'])
+        notificador.purgar(['ciudad/lima', 'pais/peru'])
+        with patch('src.utils.purgas.requests.post') as post:
+            notificador.vaciar()
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs['json'], {'surrogate_keys': ['ciudad/lima', 'pais/peru']})
+        self.assertEqual(notificador.estadisticas()['lotes_enviados'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LOS COMPARTIMENTOS (BULKHEADS)
+
+Verifica la cola acotada, el rechazo inmediato con 503 + Retry-After y que
+una API saturada no impide obtener el resto de componentes.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.models.informacion_models import InformacionCompleta
+from src.utils.compartimentos import Compartimento, CompartimentoLleno
+from src.utils.config import Config
+
+
+class TestCompartimento(unittest.TestCase):
+    """Tests del compartimento"""
+
+    def test_rechaza_con_cola_llena(self):
+        compartimento = Compartimento('prueba', max_concurrentes=1, max_cola=0, reintentar_en=3)
+        compartimento.entrar()
+        with self.assertRaises(CompartimentoLleno) as contexto:
+            compartimento.entrar()
+        self.assertEqual(contexto.exception.reintentar_en, 3)
+        self.assertEqual(compartimento.estadisticas()['rechazadas'], 1)
+
+    def test_espera_en_cola(self):
+        compartimento = Compartimento('prueba', max_concurrentes=1, max_cola=1, max_espera=2)
+        compartimento.entrar()
+        threading.Timer(0.05, compartimento.salir).start()
+        inicio = time.monotonic()
+        with compartimento.ocupar():
+            self.assertGreaterEqual(time.monotonic() - inicio, 0.04)
+        self.assertEqual(compartimento.activos, 0)
+
+    def test_agota_espera(self):
+        compartimento = Compartimento('prueba', max_concurrentes=1, max_cola=1, max_espera=0.05)
+        compartimento.entrar()
+        with self.assertRaises(CompartimentoLleno):
+            compartimento.entrar()
+        self.assertEqual(compartimento.en_cola, 0)
+
+
+class TestCompartimentosAplicacion(unittest.TestCase):
+    """Compartimentos en la fachada y en la web"""
+
+    def test_api_saturada_no_bloquea_el_resto(self):
+        facade = FachadaInformacionCiudad()
+        facade.compartimentos['noticias'] = Compartimento('noticias', 1, 0)
+        facade.compartimentos['noticias'].entrar()
+        with patch.object(Config, 'USE_MOCK_DATA', True):
+            resultado = facade.obtener_informacion_completa("Madrid")
+        self.assertIsNone(resultado.noticias)
+        self.assertIsNotNone(resultado.clima)
+        self.assertIsNotNone(resultado.pais)
+        self.assertIn("Error noticias: Compartimento 'noticias' saturado", resultado.errores)
+
+    def test_pool_del_proveedor_no_encola_mas_alla_del_compartimento(self):
+        facade = FachadaInformacionCiudad()
+        facade.compartimentos['pais'] = Compartimento('pais', 1, 0)
+        liberar = threading.Event()
+
+        def pais_lento(pais):
+            liberar.wait(2)
+            return None
+
+        with patch.object(Config, 'USE_MOCK_DATA', True), \
+                patch.object(facade.pais_provider, 'obtener_info_pais', side_effect=pais_lento):
+            primera = threading.Thread(target=facade.obtener_informacion_completa,
+                                       args=("Madrid", ['pais'], 5000))
+            primera.start()
+            time.sleep(0.05)
+
+            inicio = time.monotonic()
+            resultado = facade.obtener_informacion_completa("Lima", ['pais'], tiempo_maximo_ms=5000)
+            duracion = time.monotonic() - inicio
+            liberar.set()
+            primera.join()
+
+        self.assertLess(duracion, 0.5)  # rechazada al momento, no esperando en el executor
+        self.assertIn("Compartimento 'pais' saturado", ' '.join(resultado.errores))
+        self.assertEqual(facade.compartimentos['pais'].estadisticas()['rechazadas'], 1)
+
+    def test_web_rechaza_lotes_con_503(self):
+        import web_app
+
+        cliente = web_app.app.test_client()
+        lotes = Compartimento('lotes', 1, 0, reintentar_en=2)
+        lotes.entrar()
+        with patch.dict(web_app.compartimentos_clientes, {'lotes': lotes}), \
+                patch.object(web_app.facade, 'obtener_informacion_completa',
+                             return_value=InformacionCompleta(ciudad_consultada='Madrid')):
+            rechazada = cliente.post('/api/consultar', json={'ciudad': 'Madrid'},
+                                     headers={'X-Clase-Cliente': 'lotes'})
+            interactiva = cliente.post('/api/consultar', json={'ciudad': 'Madrid'})
+
+        self.assertEqual(rechazada.status_code, 503)
+        self.assertEqual(rechazada.headers['Retry-After'], '2')
+        self.assertEqual(interactiva.status_code, 200)
+        self.assertEqual(web_app.compartimentos_clientes['interactivo'].activos, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA SELECCIÓN DE COMPONENTES Y RESPUESTAS PARCIALES
+
+Verifica que la fachada solo llama a los proveedores pedidos y que con un
+plazo máximo devuelve lo que esté listo y marca el resto como pendiente.
+"""
+import sys
+import os
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.models.informacion_models import InformacionClima, InformacionNoticias, InformacionPais
+
+
+def noticias_lentas(pais):
+    time.sleep(0.5)
+    return MagicMock(spec=InformacionNoticias, noticias=[])
+
+
+@patch('src.providers.pais_provider.PaisProvider.obtener_info_pais')
+@patch('src.providers.noticias_provider.NoticiasProvider.obtener_noticias')
+@patch('src.providers.clima_provider.ClimaProvider.obtener_clima')
+class TestComponentes(unittest.TestCase):
+    """Tests de componentes y plazo máximo en la fachada"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.facade = FachadaInformacionCiudad()
+
+    def configurar(self, mock_clima, mock_noticias, mock_pais):
+        mock_clima.return_value = MagicMock(spec=InformacionClima, temperatura=20.5)
+        mock_noticias.return_value = MagicMock(spec=InformacionNoticias, noticias=[])
+        mock_pais.return_value = MagicMock(spec=InformacionPais, nombre_comun="España")
+
+    def test_solo_componentes_pedidos(self, mock_clima, mock_noticias, mock_pais):
+        self.configurar(mock_clima, mock_noticias, mock_pais)
+        resultado = self.facade.obtener_informacion_completa("Madrid", componentes={'clima', 'Pais'})
+
+        mock_noticias.assert_not_called()
+        self.assertIsNotNone(resultado.clima)
+        self.assertIsNotNone(resultado.pais)
+        self.assertIsNone(resultado.noticias)
+        self.assertFalse(resultado.tiene_errores())
+
+    def test_componente_desconocido(self, mock_clima, mock_noticias, mock_pais):
+        with self.assertRaises(ValueError):
+            self.facade.obtener_informacion_completa("Madrid", componentes=['clima', 'bolsa'])
+        mock_clima.assert_not_called()
+
+    def test_plazo_maximo_marca_pendientes(self, mock_clima, mock_noticias, mock_pais):
+        self.configurar(mock_clima, mock_noticias, mock_pais)
+        mock_noticias.side_effect = noticias_lentas
+
+        inicio = time.perf_counter()
+        resultado = self.facade.obtener_informacion_completa("Madrid", tiempo_maximo_ms=100)
+
+        self.assertLess(time.perf_counter() - inicio, 0.4)
+        self.assertEqual(resultado.pendientes, ['noticias'])
+        self.assertIsNone(resultado.noticias)
+        self.assertIsNotNone(resultado.clima)
+        self.assertIsNotNone(resultado.pais)
+        self.assertEqual(resultado.a_diccionario()['pendientes'], ['noticias'])
+
+    def test_plazo_registra_errores(self, mock_clima, mock_noticias, mock_pais):
+        self.configurar(mock_clima, mock_noticias, mock_pais)
+        mock_clima.side_effect = Exception("sin conexión")
+        resultado = self.facade.obtener_informacion_completa("Madrid", componentes=['clima'], tiempo_maximo_ms=1000)
+        self.assertEqual(resultado.pendientes, [])
+        self.assertEqual(resultado.errores, ["Error clima: sin conexión"])
+
+    def test_endpoint_consultar(self, mock_clima, mock_noticias, mock_pais):
+        import web_app
+
+        self.configurar(mock_clima, mock_noticias, mock_pais)
+        mock_pais.return_value = InformacionPais(
+            nombre_comun="España", nombre_oficial="Reino de España", capital=["Madrid"],
+            poblacion=47351567, area=505992.0, region="Europe", subregion="Southern Europe",
+            idiomas=["Spanish"], monedas=["Euro (€)"], codigo_pais="ES", bandera_emoji="🇪🇸"
+        )
+        cliente = web_app.app.test_client()
+        with patch.object(web_app, 'facade', self.facade):
+            respuesta = cliente.post('/api/consultar', json={'ciudad': 'Madrid', 'componentes': 'pais'})
+            invalida = cliente.post('/api/consultar', json={'ciudad': 'Madrid', 'componentes': ['bolsa']})
+
+        mock_clima.assert_not_called()
+        mock_noticias.assert_not_called()
+        datos = respuesta.get_json()
+        self.assertIsNone(datos['clima'])
+        self.assertEqual(datos['pais']['codigo_pais'], 'ES')
+        self.assertEqual(datos['pendientes'], [])
+        self.assertEqual(invalida.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
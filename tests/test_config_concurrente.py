@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA CONFIGURACIÓN BAJO CONCURRENCIA
+
+Verifica que las instantáneas de Config son inmutables, que una consulta
+mantiene la suya aunque otro hilo cambie la configuración (también en los
+hilos de los proveedores), que actualizar() y recargar() aplican los cambios
+de una vez y llegan a los proveedores, al limitador y a los reintentos ya
+creados, y que muchas consultas simultáneas a la fachada mientras se
+alterna el modo nunca devuelven resultados con partes de modos distintos.
+"""
+import sys
+import os
+import contextvars
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado, apuntar_facade
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.providers.clima_provider import ClimaProvider
+from src.providers.pais_provider import PaisProvider
+from src.utils.cache import presupuesto_global
+from src.utils.config import Config
+from src.utils.limitador import planificador
+from src.utils.reintentos import politica
+
+CIUDADES = ["Lima", "Madrid", "Quito", "Bogota", "Paris", "Tokyo"]
+
+
+def restaurar_config(test: unittest.TestCase):
+    """Deja Config como estaba al terminar el test (recargar() toca todos los ajustes)"""
+    valores = {nombre: valor for nombre, valor in vars(Config).items() if nombre.isupper()}
+    test.addCleanup(Config._aplicar, valores)
+
+
+class TestInstantaneas(unittest.TestCase):
+    """Tests de Config.instantanea, actual y fijar"""
+
+    def test_instantanea_inmutable(self):
+        with patch.object(Config, 'WARMUP_CITIES', ['Lima']):
+            instantanea = Config.instantanea()
+            self.assertIs(Config.instantanea(), instantanea)  # sin cambios se reutiliza
+            self.assertEqual(instantanea.WARMUP_CITIES, ('Lima',))
+            with self.assertRaises(AttributeError):
+                instantanea.USE_MOCK_DATA = True
+            with self.assertRaises(TypeError):
+                instantanea.RATE_LIMITS['otro.host'] = (1, 1)
+            with self.assertRaises(AttributeError):
+                instantanea.NO_EXISTE
+
+            Config.WARMUP_CITIES = ['Quito']
+            self.assertEqual(instantanea.WARMUP_CITIES, ('Lima',))
+            self.assertEqual(Config.actual().WARMUP_CITIES, ('Quito',))
+            self.assertGreater(Config.actual().version, instantanea.version)
+
+    def test_fijar_mantiene_la_instantanea(self):
+        with patch.object(Config, 'USE_MOCK_DATA', False):
+            with Config.fijar() as fijada:
+                Config.usar_datos_simulados()
+                self.assertIs(Config.actual(), fijada)
+                self.assertFalse(Config.actual().USE_MOCK_DATA)
+
+                # Los hilos lanzados con copy_context (como los de la fachada) la heredan
+                vistos = []
+                hilo = threading.Thread(target=contextvars.copy_context().run,
+                                        args=(lambda: vistos.append(Config.actual().USE_MOCK_DATA),))
+                hilo.start()
+                hilo.join()
+                self.assertEqual(vistos, [False])
+
+                with Config.fijar() as anidada:
+                    self.assertIs(anidada, fijada)
+            self.assertTrue(Config.actual().USE_MOCK_DATA)
+
+    def test_actualizar_es_atomico(self):
+        with patch.multiple(Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False):
+            parar = threading.Event()
+            mezclas = []
+
+            def leer():
+                while not parar.is_set():
+                    instantanea = Config.actual()
+                    if instantanea.USE_MOCK_DATA != instantanea.ENABLE_FALLBACK:
+                        mezclas.append(instantanea.version)
+
+            lectores = [threading.Thread(target=leer) for _ in range(4)]
+            for lector in lectores:
+                lector.start()
+            for i in range(2000):
+                Config.actualizar(USE_MOCK_DATA=i % 2 == 0, ENABLE_FALLBACK=i % 2 == 0)
+            parar.set()
+            for lector in lectores:
+                lector.join()
+
+        self.assertEqual(mezclas, [])
+        with self.assertRaises(AttributeError):
+            Config.actualizar(USE_MOK_DATA=True)
+
+
+class TestRecarga(unittest.TestCase):
+    """Tests de Config.recargar y del endpoint de administración"""
+
+    def setUp(self):
+        restaurar_config(self)
+
+    def test_recargar_desde_archivo(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as archivo:
+            archivo.write("USE_MOCK_DATA=true\nNEWS_MAX_ARTICLES=3\nDEFAULT_COMPONENTS=clima, pais\n")
+        self.addCleanup(os.remove, archivo.name)
+        Config.actualizar(USE_MOCK_DATA=False, NEWS_MAX_ARTICLES=10)
+        anterior = Config.actual()
+
+        cambiados = Config.recargar(archivo.name)
+
+        self.assertTrue({'USE_MOCK_DATA', 'NEWS_MAX_ARTICLES', 'DEFAULT_COMPONENTS'} <= set(cambiados))
+        actual = Config.actual()
+        self.assertEqual((actual.USE_MOCK_DATA, actual.NEWS_MAX_ARTICLES), (True, 3))
+        self.assertEqual(actual.DEFAULT_COMPONENTS, ('clima', 'pais'))
+        self.assertFalse(anterior.USE_MOCK_DATA)
+        self.assertEqual(Config.recargar(archivo.name), [])
+
+        with self.assertRaises(FileNotFoundError):
+            Config.recargar(archivo.name + '.no-existe')
+
+    def test_endpoint_recargar(self):
+        cliente = web_app.app.test_client()
+        self.assertEqual(cliente.post('/api/admin/config/recargar').status_code, 403)
+
+        with patch.dict(os.environ, {'ADMIN_TOKEN': 'secreto', 'WATCH_MAX_CITIES': '7'}):
+            Config.actualizar(ADMIN_TOKEN='secreto')
+            respuesta = cliente.post('/api/admin/config/recargar', headers={'X-Admin-Token': 'secreto'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertIn('WATCH_MAX_CITIES', datos['cambiados'])
+        self.assertEqual(datos['version'], Config.actual().version)
+        self.assertEqual(Config.WATCH_MAX_CITIES, 7)
+        self.assertEqual(datos['requieren_reinicio'], [])
+
+    def test_recarga_llega_a_los_objetos_ya_creados(self):
+        ajustes = ("USE_MOCK_DATA=false\nENABLE_FALLBACK=false\nHEDGE_ENABLED=false\n"
+                   "RETRY_MAX_ATTEMPTS=1\nRATE_LIMITS=recarga.test=1000:1000\n"
+                   "REQUEST_TIMEOUT=1\nWEATHER_CACHE_TTL=5\nCACHE_MAX_MB=32\n")
+        with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as archivo:
+            archivo.write(ajustes)
+        self.addCleanup(os.remove, archivo.name)
+        Config.actualizar(USE_MOCK_DATA=False, ENABLE_FALLBACK=False, HEDGE_ENABLED=False,
+                          RETRY_MAX_ATTEMPTS=1, RATE_LIMITS={'recarga.test': (0.5, 1)},
+                          REQUEST_TIMEOUT=10, WEATHER_CACHE_TTL=600, CACHE_MAX_MB=64)
+
+        with ServidorSimulado(ConfiguracionSimulada(latencia_ms=1500)) as servidor:
+            pais = PaisProvider()
+            pais.base_url = f"{servidor.url}/v3.1/name"
+            clima = ClimaProvider()
+            planificador.adquirir('recarga.test')  # agota la ráfaga: el siguiente turno tardaría 2 s
+
+            Config.recargar(archivo.name)
+
+            inicio = time.monotonic()
+            planificador.adquirir('recarga.test')
+            self.assertLess(time.monotonic() - inicio, 0.5)
+
+            # La petición corta por el timeout nuevo (1 s) en lugar de esperar la respuesta (1,5 s)
+            inicio = time.monotonic()
+            self.assertIsNone(pais.obtener_info_pais("Peru"))
+            self.assertLess(time.monotonic() - inicio, 1.4)
+
+        self.assertEqual((pais.timeout, clima.timeout), (1, 1))
+        self.assertEqual(clima.cache_clima.ttl, 5)
+        self.assertEqual(politica.max_intentos, 1)
+        self.assertEqual(presupuesto_global.maximo_bytes, 32 * 1024 * 1024)
+
+
+class TestConsultasConcurrentes(unittest.TestCase):
+    """Muchas consultas a la fachada mientras otro hilo alterna la configuración"""
+
+    @staticmethod
+    def modo(resultado):
+        """Modo de cada parte: el servidor simulado devuelve país 'Simulado' y región 'Simulada'"""
+        return ('real' if resultado.clima.pais == 'Simulado' else 'simulado',
+                'real' if resultado.pais.region == 'Simulada' else 'simulado')
+
+    def test_sin_resultados_mezclados(self):
+        configuracion = ConfiguracionSimulada(latencia_ms=2)
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(
+                Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=True, HEDGE_ENABLED=False):
+            facade = FachadaInformacionCiudad()
+            apuntar_facade(facade, servidor.url)
+
+            parar = threading.Event()
+            cambios = []
+            resultados, fallos = [], []
+            lock = threading.Lock()
+
+            def alternar():
+                aleatorio = random.Random(7)
+                while not parar.is_set():
+                    accion = aleatorio.choice(
+                        [Config.usar_datos_simulados, Config.usar_datos_reales, Config.alternar_fallback]
+                    )
+                    accion()
+                    cambios.append(accion.__name__)
+                    parar.wait(0.001)
+
+            def consultar(semilla):
+                aleatorio = random.Random(semilla)
+                for _ in range(25):
+                    try:
+                        resultado = facade.obtener_informacion_completa(
+                            aleatorio.choice(CIUDADES), componentes=['clima', 'pais']
+                        )
+                    except Exception as e:
+                        resultado = e
+                    with lock:
+                        (fallos if isinstance(resultado, Exception) else resultados).append(resultado)
+
+            alternador = threading.Thread(target=alternar)
+            consultores = [threading.Thread(target=consultar, args=(i,)) for i in range(8)]
+            alternador.start()
+            for hilo in consultores:
+                hilo.start()
+            for hilo in consultores:
+                hilo.join()
+            parar.set()
+            alternador.join()
+
+        self.assertEqual(fallos, [])
+        self.assertEqual(len(resultados), 8 * 25)
+        modos = set()
+        for resultado in resultados:
+            self.assertFalse(resultado.tiene_errores(), resultado.errores)
+            clima, pais = self.modo(resultado)
+            self.assertEqual(clima, pais, f"Resultado mezclado para {resultado.ciudad_consultada}")
+            modos.add(clima)
+        self.assertGreater(len(cambios), 10)
+        self.assertEqual(modos, {'real', 'simulado'})
+
+
+if __name__ == "__main__":
+    unittest.main()
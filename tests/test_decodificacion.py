@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA DECODIFICACIÓN DE RESPUESTAS
+
+Verifica la proyección de campos, que REST Countries se pide con ?fields= y
+que las cachés guardan solo los campos usados.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import decodificacion as benchmark_decodificacion
+from benchmarks.servidor_grabacion import urls_para
+from benchmarks.servidores_simulados import ServidorSimulado
+from src.providers.pais_provider import PaisProvider
+from src.utils.config import Config
+from src.utils.decodificacion import decodificar, proyectar
+
+
+class TestDecodificacion(unittest.TestCase):
+    """Tests de decodificación y extracción de campos"""
+
+    def test_decodificar(self):
+        self.assertEqual(decodificar(b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(decodificar('[]'), [])
+
+    def test_proyectar(self):
+        data = [{'name': 'Spain', 'translations': {}, 'cca2': 'ES'}, {'name': 'Peru'}]
+        self.assertEqual(proyectar(data, ('name', 'cca2')), [{'name': 'Spain', 'cca2': 'ES'}, {'name': 'Peru'}])
+        self.assertIsNone(proyectar(None, ('name',)))
+
+    def test_pais_pide_solo_campos_usados(self):
+        with ServidorSimulado() as servidor:
+            with patch.multiple(Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False, **urls_para(servidor.url)):
+                proveedor = PaisProvider()
+                pais = proveedor.obtener_info_pais('Peru')
+
+        self.assertEqual(pais.nombre_comun, 'Peru')
+        guardado = proveedor.cache_paises.obtener('peru')[0]
+        self.assertEqual(set(guardado), set(PaisProvider.CAMPOS))
+
+    def test_benchmark(self):
+        resultados = benchmark_decodificacion.ejecutar(repeticiones=10)
+        self.assertLess(resultados['pais_fields']['bytes'], resultados['pais_completo']['bytes'])
+        self.assertGreater(resultados['hn_item']['json_us'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
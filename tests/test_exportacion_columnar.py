@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA EXPORTACIÓN COLUMNAR
+
+Verifica el aplanado tipado, la escritura por bloques en formato binario
+(y parquet si pyarrow está instalado) y la lectura de vuelta.
+"""
+import sys
+import os
+import tempfile
+import unittest
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.informacion_models import InformacionClima, InformacionCompleta, InformacionPais
+from src.utils import exportacion_columnar
+from src.utils.exportacion_columnar import ExportadorColumnar, aplanar, leer_columnar
+
+
+def crear_informacion(ciudad, con_pais=True):
+    info = InformacionCompleta(ciudad_consultada=ciudad)
+    info.clima = InformacionClima(
+        temperatura=21.5, sensacion_termica=20.0, humedad=55, descripcion="Despejado",
+        ciudad=ciudad, pais="España", icono="01d", presion=1013
+    )
+    if con_pais:
+        info.pais = InformacionPais(
+            nombre_comun="España", nombre_oficial="Reino de España", capital=["Madrid"],
+            poblacion=47351567, area=505992.0, region="Europe", subregion="Southern Europe",
+            idiomas=["Spanish"], monedas=["Euro (€)"], codigo_pais="ES", bandera_emoji="🇪🇸"
+        )
+    else:
+        info.errores.append("No se pudo obtener información del país")
+    return info
+
+
+class TestExportacionColumnar(unittest.TestCase):
+    """Tests del exportador columnar"""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_aplanar(self):
+        fila = aplanar(crear_informacion('Madrid', con_pais=False))
+        self.assertEqual(fila['temperatura'], 21.5)
+        self.assertIsNone(fila['poblacion'])
+        self.assertEqual(fila['num_errores'], 1)
+        self.assertEqual(fila['num_noticias'], 0)
+
+    def test_binario_por_bloques(self):
+        ruta = os.path.join(self.directorio.name, 'resultados.fmac')
+        with ExportadorColumnar(ruta, 'binario', tam_bloque=2) as exportador:
+            for n in range(5):
+                exportador.agregar(crear_informacion(f"Ciudad {n}", con_pais=n % 2 == 0))
+            self.assertEqual(exportador.filas_escritas, 4)
+            self.assertEqual(exportador.filas_pendientes, 1)
+
+        bloques = list(leer_columnar(ruta))
+        self.assertEqual([len(b['ciudad']) for b in bloques], [2, 2, 1])
+        self.assertEqual(bloques[0]['ciudad'], ['Ciudad 0', 'Ciudad 1'])
+        self.assertEqual(bloques[0]['poblacion'], [47351567, None])
+        self.assertEqual(bloques[2]['capital'], ['Madrid'])
+        self.assertEqual(bloques[1]['humedad'], [55, 55])
+
+    def test_binario_descarta_bloque_incompleto_al_continuar(self):
+        ruta = os.path.join(self.directorio.name, 'resultados.fmac')
+        with ExportadorColumnar(ruta, 'binario') as exportador:
+            exportador.agregar(crear_informacion('Madrid'))
+        with open(ruta, 'ab') as archivo:
+            archivo.write(b'\x05\x00\x00\x00\xff\x00\x00\x00basura')
+
+        with ExportadorColumnar(ruta, 'binario') as exportador:
+            exportador.agregar(crear_informacion('Lima'))
+
+        ciudades = [c for bloque in leer_columnar(ruta) for c in bloque['ciudad']]
+        self.assertEqual(ciudades, ['Madrid', 'Lima'])
+
+    @unittest.skipIf(exportacion_columnar.pa is None, "pyarrow no está instalado")
+    def test_parquet(self):
+        ruta = os.path.join(self.directorio.name, 'resultados.parquet')
+        with ExportadorColumnar(ruta, 'parquet', tam_bloque=2) as exportador:
+            for n in range(3):
+                exportador.agregar(crear_informacion(f"Ciudad {n}"))
+
+        bloques = list(leer_columnar(ruta))
+        self.assertEqual(sum(len(b['ciudad']) for b in bloques), 3)
+        self.assertEqual(bloques[0]['area'][0], 505992.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
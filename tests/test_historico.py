@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL HISTÓRICO DE CLIMA
+
+Verifica los segmentos columnares (sellado, reapertura, compresión), las
+consultas por rango que solo leen los segmentos que las solapan, la
+agregación por intervalos, la retención, el relleno con la API de archivo
+(una sola petición por rango, sin repetir, y sin que una ciudad espere al
+relleno de otra) y el endpoint /api/historico.
+"""
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado, apuntar_facade
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.config import Config
+from src.utils.historico import AlmacenHistorico, filas_archivo, observacion_actual
+
+UBICACION = '4.711,-74.072'
+INICIO = 1700000000 - 1700000000 % 86400  # medianoche UTC
+
+
+def observaciones(horas, inicio=INICIO):
+    return [(inicio + h * 3600, {'temperatura': 10 + h % 24, 'humedad': 50, 'codigo_clima': 3})
+            for h in range(horas)]
+
+
+class TestAlmacen(unittest.TestCase):
+    """Tests del almacén de segmentos"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+
+    def almacen(self, **opciones):
+        opciones.setdefault('retencion_dias', 0)
+        return AlmacenHistorico(self.directorio, **opciones)
+
+    def test_sella_y_reabre(self):
+        historico = self.almacen(filas_segmento=10)
+        for ts, valores in observaciones(25):
+            historico.registrar(UBICACION, ts, valores)
+
+        estadisticas = historico.estadisticas()
+        self.assertEqual((estadisticas['segmentos'], estadisticas['filas_abiertas']), (2, 5))
+
+        reabierto = self.almacen(filas_segmento=10)
+        puntos = reabierto.consultar(UBICACION, INICIO, INICIO + 86400)
+        self.assertEqual([p['ts'] for p in puntos], [ts for ts, _ in observaciones(25)])
+        self.assertEqual(puntos[3]['temperatura'], 13)
+        self.assertIsNone(puntos[3]['presion'])
+        self.assertEqual(reabierto.ubicaciones(), [UBICACION])
+
+    def test_segmentos_comprimidos(self):
+        historico = self.almacen()
+        historico.registrar_varias(UBICACION, observaciones(24 * 30))
+        estadisticas = historico.estadisticas()
+        self.assertEqual(estadisticas['filas_selladas'], 720)
+        self.assertLess(estadisticas['bytes'], 720 * 7 * 8 / 4)  # 7 columnas de 8 bytes sin comprimir
+
+    def test_consulta_solo_lee_segmentos_solapados(self):
+        historico = self.almacen(filas_segmento=24)
+        historico.registrar_varias(UBICACION, observaciones(24 * 10))
+
+        puntos = historico.consultar(UBICACION, INICIO + 3 * 86400 + 3600, INICIO + 4 * 86400 - 3600)
+        self.assertEqual(len(puntos), 23)
+        self.assertEqual(historico.estadisticas()['segmentos_leidos'], 1)
+
+    def test_agregacion_por_intervalo(self):
+        historico = self.almacen()
+        historico.registrar_varias(UBICACION, observaciones(48))
+
+        dias = historico.consultar(UBICACION, INICIO, INICIO + 2 * 86400, intervalo=86400)
+        self.assertEqual([d['ts'] for d in dias], [INICIO, INICIO + 86400])
+        self.assertEqual(dias[0]['muestras'], 24)
+        self.assertEqual((dias[0]['temperatura_min'], dias[0]['temperatura_max']), (10, 33))
+        self.assertEqual(dias[0]['temperatura'], 21.5)
+        self.assertIsNone(dias[0]['viento'])
+
+    def test_lote_sin_duplicados(self):
+        historico = self.almacen()
+        self.assertEqual(historico.registrar_varias(UBICACION, observaciones(24)), 24)
+        self.assertEqual(historico.registrar_varias(UBICACION, observaciones(48)), 24)
+        self.assertEqual(len(historico.consultar(UBICACION, INICIO, INICIO + 2 * 86400)), 48)
+        self.assertEqual(historico.dias_incompletos(UBICACION, INICIO, INICIO + 3 * 86400 - 1), [INICIO + 2 * 86400])
+
+    def test_retencion_borra_segmentos_enteros(self):
+        historico = self.almacen(filas_segmento=24)
+        historico.registrar_varias(UBICACION, observaciones(24 * 4))
+
+        borrados = historico.aplicar_retencion(ahora=INICIO + 4 * 86400)
+        self.assertEqual(borrados, 0)  # sin retención configurada
+        historico.retencion_dias = 2
+        self.assertEqual(historico.aplicar_retencion(ahora=INICIO + 4 * 86400), 2)
+        puntos = historico.consultar(UBICACION, INICIO, INICIO + 4 * 86400)
+        self.assertEqual(puntos[0]['ts'], INICIO + 2 * 86400)
+        self.assertEqual(self.almacen().estadisticas()['segmentos'], 2)
+
+    def test_conversion_de_respuestas_open_meteo(self):
+        ts, valores = observacion_actual({
+            'utc_offset_seconds': -18000,
+            'current': {'time': '2024-05-01T10:15', 'temperature_2m': 14.2, 'weather_code': 3}
+        })
+        self.assertEqual(ts, 1714576500)  # 15:15 UTC
+        self.assertEqual((valores['temperatura'], valores['humedad']), (14.2, None))
+
+        filas = filas_archivo({'hourly': {
+            'time': ['2024-05-01T00:00', '2024-05-01T01:00'],
+            'temperature_2m': [9.5, None], 'relative_humidity_2m': [80, None]
+        }})
+        self.assertEqual(filas, [(1714521600, {'temperatura': 9.5, 'sensacion_termica': None, 'humedad': 80,
+                                               'presion': None, 'viento': None, 'codigo_clima': None})])
+
+
+class TestFachada(unittest.TestCase):
+    """Relleno y observaciones en vivo contra las APIs simuladas"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+
+    def test_relleno_una_vez_y_observaciones_en_vivo(self):
+        configuracion = ConfiguracionSimulada()
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(
+                Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False, HEDGE_ENABLED=False,
+                HISTORY_DIR=self.directorio):
+            facade = FachadaInformacionCiudad()
+            apuntar_facade(facade, servidor.url)
+
+            historial = facade.historial_clima("Lima", dias=5, intervalo=86400)
+            self.assertEqual(configuracion.peticiones, 2)  # geocoding + archivo
+            self.assertGreater(historial['rellenadas'], 4 * 24)
+            self.assertIn(len(historial['puntos']), (5, 6))
+            self.assertEqual(historial['puntos'][1]['muestras'], 24)
+
+            # Segunda consulta: todo sale del histórico local
+            facade.historial_clima("Lima", dias=5)
+            self.assertEqual(configuracion.peticiones, 2)
+
+            # Una consulta de clima deja su observación en el histórico
+            facade.obtener_informacion_completa("Lima", componentes=['clima'])
+            ahora = int(time.time())
+            ultimos = facade.historial_clima("Lima", dias=1, rellenar=False)['puntos']
+            clima = facade.clima_provider.cache_clima.obtener(historial['ubicacion'])
+            self.assertEqual(ultimos[-1]['temperatura'], clima['current']['temperature_2m'])
+            self.assertLessEqual(ahora - ultimos[-1]['ts'], 900)
+
+    def test_rellenos_de_ciudades_distintas_en_paralelo(self):
+        configuracion = ConfiguracionSimulada(latencia_ms=500)
+        with ServidorSimulado(configuracion) as servidor, patch.multiple(
+                Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False, HEDGE_ENABLED=False,
+                HISTORY_DIR=self.directorio):
+            facade = FachadaInformacionCiudad()
+            apuntar_facade(facade, servidor.url)
+
+            # Dos consultas de Lima comparten relleno; Quito y Madrid no esperan por él
+            ciudades = ["Lima", "Lima", "Quito", "Madrid"]
+            resultados = {}
+            hilos = [threading.Thread(target=lambda i, c: resultados.__setitem__(i, facade.historial_clima(c, dias=3)),
+                                      args=(i, ciudad)) for i, ciudad in enumerate(ciudades)]
+            inicio = time.monotonic()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.monotonic() - inicio
+
+        # geocoding + archivo en paralelo (~1 s); con un lock global serían ~2 s
+        self.assertLess(duracion, 1.5)
+        self.assertEqual(configuracion.peticiones, 6)  # 3 geocodings + 3 archivos
+        self.assertEqual(len(resultados), 4)
+        self.assertEqual(sorted(r['rellenadas'] > 0 for r in resultados.values()), [False, True, True, True])
+
+    def test_un_relleno_a_la_vez_por_ubicacion(self):
+        facade = FachadaInformacionCiudad()
+        en_curso, maximo, lock = [0], [0], threading.Lock()
+
+        def rellenar_lento(*args):
+            with lock:
+                en_curso[0] += 1
+                maximo[0] = max(maximo[0], en_curso[0])
+            time.sleep(0.1)
+            with lock:
+                en_curso[0] -= 1
+            return 0
+
+        # El tercero llega cuando el primero ya terminó y el segundo sigue dentro
+        with patch.object(facade, '_rellenar_pendientes', side_effect=rellenar_lento):
+            hilos = [threading.Thread(target=facade._rellenar_historico,
+                                      args=(None, UBICACION, {}, INICIO, INICIO)) for _ in range(3)]
+            hilos[0].start()
+            hilos[1].start()
+            time.sleep(0.15)
+            hilos[2].start()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(maximo[0], 1)
+        self.assertEqual(facade._rellenando, {})
+
+    def test_intentos_de_relleno_se_podan(self):
+        facade = FachadaInformacionCiudad()
+        ahora = time.time()
+        facade._intentos_relleno = {(f"ubicacion-{n}", INICIO): ahora - 10 ** 6 for n in range(3000)}
+        facade._intentos_relleno[(UBICACION, INICIO)] = ahora
+        historico = SimpleNamespace(dias_incompletos=lambda *args: [INICIO])
+
+        with patch.object(Config, 'HISTORY_BACKFILL_RETRY', 3600):
+            self.assertEqual(facade._rellenar_pendientes(historico, UBICACION, {}, INICIO, INICIO), 0)
+
+        # Solo queda el intento reciente, que aún impide reintentar ese día
+        self.assertEqual(list(facade._intentos_relleno), [(UBICACION, INICIO)])
+
+    def test_deshabilitado(self):
+        with patch.object(Config, 'HISTORY_DIR', ''):
+            facade = FachadaInformacionCiudad()
+            self.assertIsNone(facade.historico)
+            with self.assertRaises(RuntimeError):
+                facade.historial_clima("Lima")
+
+
+class TestEndpoint(unittest.TestCase):
+    """Tests de GET /api/historico/<ciudad>"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.cliente = web_app.app.test_client()
+
+    def test_serie_diaria(self):
+        with patch.multiple(Config, USE_MOCK_DATA=True, HISTORY_DIR=self.directorio):
+            respuesta = self.cliente.get('/api/historico/Madrid?desde=2024-03-01&hasta=2024-03-03&intervalo=dia')
+
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertEqual([p['fecha'] for p in datos['puntos']],
+                         ['2024-03-01T00:00Z', '2024-03-02T00:00Z', '2024-03-03T00:00Z'])
+        self.assertTrue(all(p['muestras'] == 24 for p in datos['puntos']))
+        self.assertIn('Cache-Control', respuesta.headers)
+
+    def test_errores(self):
+        with patch.multiple(Config, USE_MOCK_DATA=True, HISTORY_DIR=self.directorio):
+            self.assertEqual(self.cliente.get('/api/historico/Madrid?intervalo=mes').status_code, 400)
+            self.assertEqual(self.cliente.get('/api/historico/Madrid?desde=ayer').status_code, 400)
+            self.assertEqual(self.cliente.get('/api/historico/Madrid?dias=0').status_code, 400)
+        with patch.object(Config, 'HISTORY_DIR', ''):
+            self.assertEqual(self.cliente.get('/api/historico/Madrid').status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
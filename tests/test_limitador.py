@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL LIMITADOR DE TASA
+
+Verifica el cubo de tokens, el orden por prioridad de las peticiones en
+espera y la reducción de la tasa ante respuestas 429 con Retry-After.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado
+from src.utils.config import _parsear_limites
+from src.utils.limitador import (
+    PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, ErrorLimiteTasa, PlanificadorPeticiones,
+    SesionPlanificada, prioridad, segundos_retry_after
+)
+from src.utils.reintentos import PoliticaReintentos
+
+
+class TestLimitador(unittest.TestCase):
+    """Tests del planificador de peticiones por host"""
+
+    def test_parsear_limites(self):
+        limites = _parsear_limites("api.open-meteo.com=10:20;*=5;roto=x")
+        self.assertEqual(limites, {'api.open-meteo.com': (10.0, 20.0), '*': (5.0, 5.0)})
+
+    def test_retry_after(self):
+        self.assertEqual(segundos_retry_after("3"), 3.0)
+        self.assertEqual(segundos_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(segundos_retry_after("pronto"))
+
+    def test_rafaga_y_tasa(self):
+        planificador = PlanificadorPeticiones({'api': (20.0, 2.0)})
+        inicio = time.monotonic()
+        for _ in range(4):
+            planificador.adquirir('api')
+        # 2 de ráfaga + 2 a 20/s => ~0.1s
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.08)
+        planificador.adquirir('sin-limite')
+        self.assertNotIn('sin-limite', planificador.estadisticas())
+
+    def test_interactivo_antes_que_lote(self):
+        planificador = PlanificadorPeticiones({'api': (10.0, 1.0)})
+        planificador.adquirir('api')  # Vacía el cubo
+        orden = []
+
+        def peticion(etiqueta, valor):
+            with prioridad(valor):
+                planificador.adquirir('api')
+            orden.append(etiqueta)
+
+        hilos = [threading.Thread(target=peticion, args=(f"lote{n}", PRIORIDAD_LOTE)) for n in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        time.sleep(0.02)
+        interactivo = threading.Thread(target=peticion, args=("interactivo", PRIORIDAD_INTERACTIVA))
+        interactivo.start()
+        for hilo in hilos + [interactivo]:
+            hilo.join()
+
+        self.assertEqual(orden[0], "interactivo")
+
+    def test_espera_maxima(self):
+        planificador = PlanificadorPeticiones({'api': (1.0, 1.0)}, max_espera=0.1)
+        planificador.adquirir('api')
+        with self.assertRaises(ErrorLimiteTasa):
+            planificador.adquirir('api')
+
+    def test_429_reduce_tasa_y_respeta_retry_after(self):
+        configuracion = ConfiguracionSimulada(tasa_error=1.0, codigo_error=429)
+        with ServidorSimulado(configuracion) as servidor:
+            host = servidor.url.split('://', 1)[1]
+            planificador = PlanificadorPeticiones({host: (50.0, 5.0)})
+            sesion = SesionPlanificada(planificador, PoliticaReintentos(max_intentos=1, cobertura=False))
+            respuesta = sesion.get(f"{servidor.url}/v0/topstories.json", timeout=5)
+
+            self.assertEqual(respuesta.status_code, 429)
+            estado = planificador.estadisticas()[host]
+            self.assertEqual(estado['respuestas_429'], 1)
+            self.assertEqual(estado['tasa_actual'], 25.0)
+            self.assertGreater(estado['bloqueado_s'], 0.5)
+
+            configuracion.tasa_error = 0.0
+            inicio = time.monotonic()
+            self.assertEqual(sesion.get(f"{servidor.url}/v0/topstories.json", timeout=5).status_code, 200)
+            self.assertGreaterEqual(time.monotonic() - inicio, 0.5)
+            self.assertGreater(planificador.estadisticas()[host]['tasa_actual'], 25.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
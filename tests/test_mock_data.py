@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LOS DATOS SIMULADOS
+
+Verifica que el motor de datos simulados es determinista y que el modelo de
+latencia/errores sintéticos se aplica en modo USE_MOCK_DATA.
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.config import Config
+from src.utils.mock_data import ErrorSimulado, MockDataProvider
+
+
+class TestMockDeterminista(unittest.TestCase):
+    """Misma entrada y misma semilla, misma salida"""
+
+    def tearDown(self):
+        MockDataProvider.configurar_semilla(Config.MOCK_SEED)
+
+    def test_clima_determinista(self):
+        self.assertEqual(MockDataProvider.get_clima_mock('Madrid'), MockDataProvider.get_clima_mock('madrid'))
+        self.assertEqual(MockDataProvider.get_clima_mock('Ciudad Inventada'),
+                         MockDataProvider.get_clima_mock('Ciudad Inventada'))
+
+    def test_rangos_de_clima(self):
+        for ciudad in ('Madrid', 'Lima', 'Ciudad Inventada', 'Otra'):
+            datos = MockDataProvider.get_clima_mock(ciudad)
+            self.assertTrue(40 <= datos['main']['humidity'] <= 80)
+            self.assertTrue(1000 <= datos['main']['pressure'] <= 1020)
+        self.assertTrue(13 <= MockDataProvider.get_clima_mock('Madrid')['main']['temp'] <= 23)
+
+    def test_noticias_y_pais_deterministas(self):
+        self.assertEqual(MockDataProvider.get_noticias_mock('Peru'), MockDataProvider.get_noticias_mock('Peru'))
+        self.assertIn(MockDataProvider.get_noticias_mock('Peru')['totalResults'], (3, 4, 5))
+        self.assertEqual(MockDataProvider.get_pais_mock('Peru'), MockDataProvider.get_pais_mock('Peru'))
+        self.assertEqual(MockDataProvider.get_pais_mock('Spain')[0]['cca2'], 'ES')
+
+    def test_semilla_cambia_tablas(self):
+        original = [MockDataProvider.get_clima_mock(f"Ciudad {n}") for n in range(10)]
+        MockDataProvider.configurar_semilla(Config.MOCK_SEED + 1)
+        otra = [MockDataProvider.get_clima_mock(f"Ciudad {n}") for n in range(10)]
+        self.assertNotEqual(original, otra)
+
+
+@patch.object(Config, 'USE_MOCK_DATA', True)
+class TestModeloRedSimulado(unittest.TestCase):
+    """Latencia y errores sintéticos"""
+
+    @patch.object(Config, 'MOCK_ERROR_RATE', 1.0)
+    def test_errores_inyectados(self):
+        with self.assertRaises(ErrorSimulado):
+            MockDataProvider.simular_red("clima")
+
+        resultado = FachadaInformacionCiudad().obtener_informacion_completa('Madrid')
+        self.assertEqual(len(resultado.errores), 3)
+
+    def test_sin_modelo_no_falla(self):
+        resultado = FachadaInformacionCiudad().obtener_informacion_completa('Madrid')
+        self.assertFalse(resultado.tiene_errores())
+        self.assertEqual(resultado.noticias.fuente_api, "Datos simulados")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE NOTICIAS LOCALES POR PAÍS
+
+Verifica el parseo de feeds RSS/Atom desde archivos locales y por HTTP (a
+través del planificador de peticiones), las fechas sin zona horaria y el
+índice precalculado de noticias por país.
+"""
+import sys
+import os
+import threading
+import unittest
+from calendar import timegm
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.providers.fuentes_noticias import FuenteFeed, IndiceNoticiasPorPais, marca_tiempo_noticia
+from src.utils.limitador import SesionPlanificada
+from src.providers.noticias_provider import NoticiasProvider
+from src.utils.config import _parsear_feeds
+
+FEEDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+FEED_ESPANA = os.path.join(FEEDS_DIR, 'spain_rss.xml')
+FEED_MEXICO = os.path.join(FEEDS_DIR, 'mexico_atom.xml')
+
+
+class TestFuenteFeed(unittest.TestCase):
+    """Tests del parseo en streaming de feeds"""
+
+    def test_parseo_rss(self):
+        noticias = FuenteFeed(FEED_ESPANA).obtener('Spain')
+        self.assertEqual(len(noticias), 3)
+        self.assertEqual(noticias[0].titulo, "Madrid estrena nueva línea de metro")
+        self.assertEqual(noticias[0].url, "https://example.com/es/metro")
+        self.assertEqual(noticias[0].fuente, "Diario de Prueba España")
+
+    def test_parseo_atom_con_file_url(self):
+        noticias = FuenteFeed(f"file://{FEED_MEXICO}").obtener('Mexico')
+        self.assertEqual(len(noticias), 2)
+        self.assertEqual(noticias[1].url, "https://example.com/mx/solar")
+        self.assertEqual(noticias[1].descripcion, "El parque abastecerá a 50.000 hogares.")
+
+    def test_limite_articulos(self):
+        noticias = FuenteFeed(FEED_ESPANA, max_articulos=1).obtener('Spain')
+        self.assertEqual(len(noticias), 1)
+
+    def test_feed_http_pasa_por_el_planificador(self):
+        class Manejador(SimpleHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer(('127.0.0.1', 0), partial(Manejador, directory=FEEDS_DIR))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+
+        url = f"http://127.0.0.1:{servidor.server_port}/spain_rss.xml"
+        with patch.object(SesionPlanificada, '_enviar', autospec=True,
+                          side_effect=SesionPlanificada._enviar) as enviar:
+            noticias = FuenteFeed(url).obtener('Spain')
+
+        self.assertEqual(len(noticias), 3)
+        (sesion, metodo, destino), opciones = enviar.call_args
+        self.assertEqual((metodo.upper(), destino), ('GET', url))
+        self.assertTrue(opciones['stream'])
+
+    def test_fechas_sin_zona_horaria_en_utc(self):
+        esperado = timegm((2024, 3, 5, 10, 0, 0))
+        for fecha in ("Tue, 05 Mar 2024 10:00:00 -0000", "Tue, 05 Mar 2024 10:00:00 +0000",
+                      "2024-03-05T10:00:00", "2024-03-05T10:00:00Z", "2024-03-05T11:00:00+01:00"):
+            self.assertEqual(marca_tiempo_noticia(fecha), esperado, fecha)
+
+    def test_parsear_feeds_config(self):
+        feeds = _parsear_feeds("Spain=a.xml|b.xml; Mexico=c.xml;invalido")
+        self.assertEqual(feeds, {'Spain': ['a.xml', 'b.xml'], 'Mexico': ['c.xml']})
+
+
+class TestIndiceNoticiasPorPais(unittest.TestCase):
+    """Tests del índice precalculado"""
+
+    def setUp(self):
+        self.indice = IndiceNoticiasPorPais({
+            'Spain': [FuenteFeed(FEED_ESPANA)],
+            'Mexico': [FuenteFeed(FEED_MEXICO)]
+        })
+
+    def test_ordenado_por_fecha(self):
+        self.indice.refrescar()
+        noticias = self.indice.obtener('spain').noticias
+        titulos = [noticia.titulo for noticia in noticias]
+        self.assertEqual(titulos[0], "Valencia acoge un congreso de Python")
+        self.assertEqual(titulos[-1], "Madrid estrena nueva línea de metro")
+
+    def test_obtener_no_relee_fuentes(self):
+        self.indice.refrescar()
+        with patch.object(FuenteFeed, 'obtener') as mock_obtener:
+            resultado = self.indice.obtener('Mexico')
+        mock_obtener.assert_not_called()
+        self.assertEqual(resultado.pais, 'Mexico')
+        self.assertEqual(resultado.total_resultados, 2)
+
+    def test_pais_sin_fuentes(self):
+        self.assertFalse(self.indice.tiene_pais('Peru'))
+        self.assertIsNone(self.indice.obtener('Peru'))
+
+
+class TestNoticiasProviderLocal(unittest.TestCase):
+    """Tests del proveedor con fuentes locales"""
+
+    def test_noticias_por_pais(self):
+        provider = NoticiasProvider(fuentes={
+            'Spain': [FuenteFeed(FEED_ESPANA)],
+            'Mexico': [FuenteFeed(FEED_MEXICO)]
+        })
+        provider.indice.detener()
+
+        espana = provider.obtener_noticias('Spain')
+        mexico = provider.obtener_noticias('Mexico')
+
+        self.assertEqual(espana.fuente_api, "Feeds RSS/Atom")
+        self.assertNotEqual(espana.noticias[0].titulo, mexico.noticias[0].titulo)
+
+    @patch('requests.Session.get', side_effect=Exception("sin red"))
+    def test_fallback_simulado(self, mock_get):
+        provider = NoticiasProvider(fuentes={})
+        resultado = provider.obtener_noticias('Peru')
+        self.assertIsNotNone(resultado)
+        self.assertEqual(resultado.pais, 'Peru')
+        self.assertGreater(resultado.total_resultados, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
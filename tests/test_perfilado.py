@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL PERFILADO BAJO DEMANDA
+
+Verifica el muestreo de pilas (formato colapsado y reparto CPU/espera por
+función de proveedor), el modo cprofile por peticiones y el endpoint de
+administración protegido por token.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils.config import Config
+from src.utils.perfilado import Perfilador
+
+
+def calcular_sin_parar(segundos):
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        sum(range(1000))
+
+
+class TestPerfilador(unittest.TestCase):
+    """Tests de las sesiones de perfilado"""
+
+    def test_validaciones(self):
+        perfilador = Perfilador()
+        with self.assertRaises(ValueError):
+            perfilador.iniciar(modo='perf', segundos=1)
+        with self.assertRaises(ValueError):
+            perfilador.iniciar()
+        perfilador.iniciar(peticiones=5)
+        with self.assertRaises(RuntimeError):
+            perfilador.iniciar(segundos=1)
+        perfilador.detener()
+        self.assertFalse(perfilador.activo)
+
+    @patch.multiple(Config, USE_MOCK_DATA=True, MOCK_LATENCY_MS=40)
+    def test_muestreo_pilas_y_cpu_frente_a_espera(self):
+        facade = FachadaInformacionCiudad()
+        perfilador = Perfilador()
+        perfilador.iniciar(modo='muestreo', segundos=0.5, intervalo_ms=2)
+        calculo = threading.Thread(target=calcular_sin_parar, args=(0.3,))
+        calculo.start()
+        for _ in range(3):
+            facade.obtener_informacion_completa("Lima", componentes=['clima'])
+        calculo.join()
+        resultado = perfilador.detener()
+
+        self.assertGreater(resultado['muestras'], 0)
+        self.assertIn("calcular_sin_parar (test_perfilado.py:", resultado['pilas_colapsadas'])
+        linea = resultado['pilas_colapsadas'].splitlines()[0]
+        self.assertTrue(linea.rsplit(' ', 1)[1].isdigit())
+
+        clima = resultado['funciones']['ClimaProvider.obtener_clima']
+        self.assertGreater(clima['pared_ms'], 0)
+        if resultado['cpu_disponible']:
+            # La latencia simulada es un sleep: casi todo es espera
+            self.assertGreater(clima['espera_ms'], clima['cpu_ms'])
+
+    def test_cprofile_por_peticiones(self):
+        perfilador = Perfilador()
+        perfilador.iniciar(modo='cprofile', peticiones=2)
+        facade = FachadaInformacionCiudad()
+        with patch.object(Config, 'USE_MOCK_DATA', True):
+            for _ in range(2):
+                perfil = perfilador.antes_de_peticion()
+                facade.obtener_informacion_completa("Lima", componentes=['pais'])
+                perfilador.despues_de_peticion(perfil)
+
+        self.assertFalse(perfilador.activo)
+        resultado = perfilador.resultado
+        self.assertEqual(resultado['peticiones'], 2)
+        self.assertEqual(resultado['funciones']['_procesar_respuesta_pais']['llamadas'], 2)
+        self.assertIn("obtener_informacion_completa", resultado['tabla'])
+
+
+class TestEndpointPerfilado(unittest.TestCase):
+    """Tests de /api/admin/perfilado"""
+
+    def setUp(self):
+        self.cliente = web_app.app.test_client()
+        self.cabeceras = {'X-Admin-Token': 'secreto'}
+
+    def tearDown(self):
+        web_app.perfilador.detener()
+
+    def test_requiere_token(self):
+        self.assertEqual(self.cliente.get('/api/admin/perfilado').status_code, 403)
+        with patch.object(Config, 'ADMIN_TOKEN', 'secreto'):
+            respuesta = self.cliente.get('/api/admin/perfilado', headers={'X-Admin-Token': 'otro'})
+        self.assertEqual(respuesta.status_code, 403)
+
+    @patch.multiple(Config, ADMIN_TOKEN='secreto', USE_MOCK_DATA=True)
+    def test_perfilar_peticiones(self):
+        respuesta = self.cliente.post('/api/admin/perfilado', headers=self.cabeceras,
+                                      json={'modo': 'cprofile', 'peticiones': 1})
+        self.assertEqual(respuesta.status_code, 202)
+        respuesta = self.cliente.post('/api/admin/perfilado', headers=self.cabeceras,
+                                      json={'modo': 'cprofile', 'peticiones': 1})
+        self.assertEqual(respuesta.status_code, 409)
+
+        self.cliente.post('/api/consultar', json={'ciudad': 'Lima', 'componentes': ['pais']})
+
+        data = self.cliente.get('/api/admin/perfilado', headers=self.cabeceras).get_json()
+        self.assertFalse(data['estado']['activo'])
+        self.assertEqual(data['resultado']['peticiones'], 1)
+        self.assertIn('obtener_info_pais', data['resultado']['funciones'])
+
+    @patch.object(Config, 'ADMIN_TOKEN', 'secreto')
+    def test_muestreo_con_espera_y_formato_colapsado(self):
+        data = self.cliente.post('/api/admin/perfilado', headers=self.cabeceras,
+                                 json={'segundos': 0.1, 'esperar': True}).get_json()
+        self.assertEqual(data['resultado']['modo'], 'muestreo')
+
+        respuesta = self.cliente.get('/api/admin/perfilado?formato=colapsado', headers=self.cabeceras)
+        self.assertEqual(respuesta.mimetype, 'text/plain')
+
+
+if __name__ == "__main__":
+    unittest.main()
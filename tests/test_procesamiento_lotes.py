@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL PROCESAMIENTO POR LOTES
+
+Ejecuta el enriquecimiento con datos simulados y verifica la deduplicación,
+la salida incremental y la reanudación desde el checkpoint.
+"""
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procesamiento_lotes import ejecutar, leer_checkpoint
+
+
+class TestProcesamientoLotes(unittest.TestCase):
+    """Tests del CLI de enriquecimiento masivo"""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.directorio.name, 'ciudades.jsonl')
+        with open(self.entrada, 'w', encoding='utf-8') as archivo:
+            for ciudad in ('Madrid', 'Lima', ' madrid ', 'Bogota', 'Quito', 'LIMA'):
+                archivo.write(json.dumps({'ciudad': ciudad}) + '\n')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def leer_salida(self, ruta):
+        with open(ruta, encoding='utf-8') as archivo:
+            return [json.loads(linea) for linea in archivo]
+
+    def test_deduplica_y_escribe_jsonl(self):
+        salida = os.path.join(self.directorio.name, 'resultados.jsonl')
+        resumen = ejecutar(self.entrada, salida, procesos=2, hilos=2, tam_lote=2, usar_mock=True)
+
+        self.assertEqual(resumen['procesadas'], 4)
+        resultados = self.leer_salida(salida)
+        self.assertEqual(sorted(r['ciudad_consultada'] for r in resultados), ['Bogota', 'Lima', 'Madrid', 'Quito'])
+        self.assertTrue(all(r['clima'] for r in resultados))
+        self.assertEqual(leer_checkpoint(salida), {'madrid', 'lima', 'bogota', 'quito'})
+
+    def test_reanuda_desde_checkpoint(self):
+        salida = os.path.join(self.directorio.name, 'resultados.csv')
+        # Simular una ejecución anterior interrumpida tras procesar Madrid y Lima
+        ejecutar(self.entrada, salida, procesos=1, hilos=1, tam_lote=10, usar_mock=True)
+        with open(f"{salida}.checkpoint", 'w', encoding='utf-8') as archivo:
+            archivo.write("madrid\nlima\n")
+        with open(salida, encoding='utf-8') as archivo:
+            lineas = archivo.readlines()
+        with open(salida, 'w', encoding='utf-8') as archivo:
+            archivo.writelines(lineas[:3])
+
+        resumen = ejecutar(self.entrada, salida, procesos=1, hilos=2, tam_lote=10, usar_mock=True)
+
+        self.assertEqual(resumen['omitidas_checkpoint'], 2)
+        self.assertEqual(resumen['procesadas'], 2)
+        with open(salida, encoding='utf-8') as archivo:
+            filas = archivo.read().splitlines()
+        self.assertTrue(filas[0].startswith('ciudad,'))
+        self.assertEqual(len(filas), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DEL REGISTRO DE PROVEEDORES
+
+Verifica el plan de dependencias (orden, ciclos, entradas que faltan), que
+la fachada ejecuta en paralelo los proveedores registrados respetando sus
+entradas (también los que dependen de un resolutor) y su límite de concurrencia, y que un fallo se propaga a los
+proveedores que dependen de él.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.facade.informacion_facade import COMPONENTES, FachadaInformacionCiudad
+from src.providers.registro import DefinicionProveedor, RegistroProveedores, Resolutor, registro
+
+
+class ProveedorLento:
+    """Proveedor de prueba: duerme y anota cuántas llamadas van en paralelo"""
+
+    def __init__(self, espera=0.2, error=None):
+        self.espera = espera
+        self.error = error
+        self.llamadas = []
+        self.en_curso = 0
+        self.maximo_en_curso = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, *argumentos):
+        with self._lock:
+            self.llamadas.append(argumentos)
+            self.en_curso += 1
+            self.maximo_en_curso = max(self.maximo_en_curso, self.en_curso)
+        try:
+            time.sleep(self.espera)
+            if self.error:
+                raise self.error
+            return f"{'/'.join(map(str, argumentos))}"
+        finally:
+            with self._lock:
+                self.en_curso -= 1
+
+
+def definicion(nombre, proveedor, entradas=('ciudad',), concurrencia=(8, 16)):
+    return DefinicionProveedor(nombre=nombre, fabrica=lambda fachada: proveedor, metodo='obtener',
+                               entradas=entradas, concurrencia=concurrencia)
+
+
+class TestPlan(unittest.TestCase):
+    """Tests del grafo de dependencias"""
+
+    def test_registro_predeterminado(self):
+        self.assertEqual(COMPONENTES, ('clima', 'noticias', 'pais', 'calidad_aire', 'tipo_cambio'))
+        self.assertEqual(registro.definicion('noticias').entradas, ('pais_ciudad',))
+
+    def test_orden_topologico(self):
+        registro = RegistroProveedores()
+        registro.registrar(definicion('b', None, entradas=('a',)))
+        registro.registrar(definicion('a', None, entradas=('pais_ciudad',)))
+        registro.registrar_resolutor(Resolutor('pais_ciudad', lambda fachada, ciudad: ciudad))
+        plan = [nodo.nombre for nodo in registro.plan(['b'])]
+        self.assertEqual(plan, ['pais_ciudad', 'a', 'b'])
+
+    def test_solo_lo_necesario(self):
+        registro = RegistroProveedores()
+        registro.registrar(definicion('a', None))
+        registro.registrar(definicion('b', None))
+        self.assertEqual([nodo.nombre for nodo in registro.plan(['b'])], ['b'])
+
+    def test_errores_de_registro(self):
+        registro = RegistroProveedores()
+        registro.registrar(definicion('a', None, entradas=('b',)))
+        registro.registrar(definicion('b', None, entradas=('a',)))
+        registro.registrar(definicion('c', None, entradas=('inexistente',)))
+        with self.assertRaises(ValueError):
+            registro.plan(['a'])
+        with self.assertRaises(ValueError):
+            registro.plan(['c'])
+        with self.assertRaises(ValueError):
+            registro.registrar(definicion('a', None))
+        with self.assertRaises(ValueError):
+            registro.registrar_resolutor(Resolutor('ciudad', lambda fachada, ciudad: ciudad))
+
+
+class TestEjecucion(unittest.TestCase):
+    """Tests de la fachada con un registro propio"""
+
+    def test_proveedores_independientes_en_paralelo(self):
+        registro = RegistroProveedores()
+        proveedores = {nombre: ProveedorLento() for nombre in ('uno', 'dos', 'tres')}
+        for nombre, proveedor in proveedores.items():
+            registro.registrar(definicion(nombre, proveedor))
+        facade = FachadaInformacionCiudad(registro)
+
+        inicio = time.perf_counter()
+        resultado = facade.obtener_informacion_completa("Lima")
+        duracion = time.perf_counter() - inicio
+
+        self.assertLess(duracion, 0.45)  # en serie serían 0.6 s
+        for nombre in proveedores:
+            self.assertEqual(getattr(resultado, nombre), "Lima")
+        self.assertFalse(resultado.tiene_errores())
+
+    def test_dependencias_y_resolutores(self):
+        registro = RegistroProveedores()
+        base, derivado = ProveedorLento(0.05), ProveedorLento(0.05)
+        registro.registrar_resolutor(Resolutor('mayusculas', lambda fachada, ciudad: ciudad.upper()))
+        registro.registrar(definicion('base', base, entradas=('mayusculas',)))
+        registro.registrar(definicion('derivado', derivado, entradas=('base', 'ciudad')))
+        facade = FachadaInformacionCiudad(registro)
+
+        resultado = facade.obtener_informacion_completa("Lima", componentes=['derivado'])
+
+        self.assertEqual(base.llamadas, [("LIMA",)])
+        self.assertEqual(derivado.llamadas, [("LIMA", "Lima")])
+        self.assertEqual(resultado.derivado, "LIMA/Lima")
+        self.assertIsNone(getattr(resultado, 'base', None))
+
+    def test_dependientes_de_un_resolutor_no_esperan_al_primer_proveedor(self):
+        # La forma del registro predeterminado: un proveedor de la ciudad (como
+        # clima) y dos del país resuelto a partir de ella (como noticias y país)
+        registro = RegistroProveedores()
+        proveedores = {nombre: ProveedorLento(0.3) for nombre in ('tiempo', 'titulares', 'nacion')}
+        registro.registrar(definicion('tiempo', proveedores['tiempo']))
+        registro.registrar_resolutor(Resolutor('pais_de', lambda fachada, ciudad: "Peru"))
+        registro.registrar(definicion('titulares', proveedores['titulares'], entradas=('pais_de',)))
+        registro.registrar(definicion('nacion', proveedores['nacion'], entradas=('pais_de',)))
+        facade = FachadaInformacionCiudad(registro)
+
+        inicio = time.perf_counter()
+        resultado = facade.obtener_informacion_completa("Lima")
+        duracion = time.perf_counter() - inicio
+
+        self.assertLess(duracion, 0.5)  # con los dependientes detrás del primero serían 0.6 s
+        self.assertEqual((resultado.tiempo, resultado.titulares, resultado.nacion), ("Lima", "Peru", "Peru"))
+        self.assertFalse(resultado.tiene_errores())
+
+    def test_limite_de_concurrencia_por_proveedor(self):
+        registro = RegistroProveedores()
+        proveedor = ProveedorLento(0.1)
+        registro.registrar(definicion('lento', proveedor, concurrencia=(1, 8)))
+        facade = FachadaInformacionCiudad(registro)
+
+        hilos = [threading.Thread(target=facade.obtener_informacion_completa, args=(ciudad,),
+                                  kwargs={'tiempo_maximo_ms': 2000})
+                 for ciudad in ("Lima", "Quito", "Bogota")]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(proveedor.llamadas), 3)
+        self.assertEqual(proveedor.maximo_en_curso, 1)
+
+    def test_error_se_propaga_a_los_dependientes(self):
+        registro = RegistroProveedores()
+        derivado = ProveedorLento(0)
+        registro.registrar(definicion('base', ProveedorLento(0, error=RuntimeError("caído"))))
+        registro.registrar(definicion('derivado', derivado, entradas=('base',)))
+        registro.registrar(definicion('aparte', ProveedorLento(0)))
+        facade = FachadaInformacionCiudad(registro)
+
+        resultado = facade.obtener_informacion_completa("Lima")
+
+        self.assertEqual(derivado.llamadas, [])
+        self.assertEqual(resultado.aparte, "Lima")
+        self.assertEqual(len(resultado.errores), 2)
+        self.assertTrue(all("caído" in error for error in resultado.errores))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE REINTENTOS Y PETICIONES DE COBERTURA
+
+Verifica el backoff, el presupuesto de reintentos y que una petición lenta
+se cubra con una copia cuando supera el percentil de su endpoint, sin que
+el intento principal espere turno en el pool de las copias.
+"""
+import sys
+import os
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import requests
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.servidores_simulados import ConfiguracionSimulada, ServidorSimulado
+from src.utils.config import Config
+from src.utils.limitador import PlanificadorPeticiones, SesionPlanificada
+from src.utils.reintentos import PoliticaReintentos, PresupuestoReintentos, RegistroLatencias, clave_endpoint
+
+
+class ConfiguracionGuionizada(ConfiguracionSimulada):
+    """Respuestas predefinidas por número de petición: (retardo_s, fallar)"""
+
+    def __init__(self, guion, **kwargs):
+        super().__init__(**kwargs)
+        self.guion = guion
+
+    def siguiente(self):
+        with self._lock:
+            self.peticiones += 1
+            return self.guion.get(self.peticiones, (0.0, False))
+
+
+def enviar_secuencia(*resultados):
+    """Devuelve un callable que produce (o lanza) cada resultado en orden"""
+    pendientes = list(resultados)
+
+    def enviar():
+        resultado = pendientes.pop(0)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return SimpleNamespace(status_code=resultado)
+    return enviar
+
+
+class TestReintentos(unittest.TestCase):
+    """Tests de la política de reintentos"""
+
+    def crear_politica(self, **kwargs):
+        opciones = {'max_intentos': 3, 'espera_base': 0.001, 'espera_maxima': 0.002, 'cobertura': False}
+        opciones.update(kwargs)
+        return PoliticaReintentos(**opciones)
+
+    def test_clave_endpoint(self):
+        self.assertEqual(clave_endpoint("https://hn.example/v0/item/8863.json"), "hn.example/v0/item/{n}.json")
+
+    def test_reintenta_errores_transitorios(self):
+        politica = self.crear_politica()
+        respuesta = politica.ejecutar("http://api/x", enviar_secuencia(requests.ConnectionError(), 503, 200))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(politica.reintentos, 2)
+
+    def test_no_reintenta_errores_del_cliente(self):
+        politica = self.crear_politica()
+        self.assertEqual(politica.ejecutar("http://api/x", enviar_secuencia(404)).status_code, 404)
+        self.assertEqual(politica.reintentos, 0)
+
+    def test_agota_intentos(self):
+        politica = self.crear_politica(max_intentos=2)
+        with self.assertRaises(requests.Timeout):
+            politica.ejecutar("http://api/x", enviar_secuencia(requests.Timeout(), requests.Timeout()))
+
+    def test_presupuesto_limita_reintentos(self):
+        politica = self.crear_politica(presupuesto=PresupuestoReintentos(proporcion=0.0, minimo=1))
+        self.assertEqual(politica.ejecutar("http://api/x", enviar_secuencia(503, 503, 200)).status_code, 503)
+        self.assertEqual(politica.reintentos, 1)
+        self.assertEqual(politica.presupuesto.denegados, 1)
+
+    def test_backoff_acotado(self):
+        politica = PoliticaReintentos(espera_base=0.1, espera_maxima=0.5)
+        for intento in range(1, 8):
+            self.assertLessEqual(politica.espera(intento), min(0.5, 0.1 * 2 ** (intento - 1)))
+
+    def test_cobertura_recorta_peticion_lenta(self):
+        # La petición 21 (primer intento cubierto) tarda 2s; su copia responde al momento
+        configuracion = ConfiguracionGuionizada({21: (2.0, False)})
+        with ServidorSimulado(configuracion) as servidor:
+            politica = self.crear_politica(cobertura=True, latencias=RegistroLatencias(95, min_muestras=20))
+            sesion = SesionPlanificada(PlanificadorPeticiones({}), politica)
+            url = f"{servidor.url}/v0/topstories.json"
+            for _ in range(20):
+                sesion.get(url, timeout=5)
+            self.assertIsNotNone(politica.latencias.umbral(clave_endpoint(url)))
+
+            inicio = time.monotonic()
+            self.assertEqual(sesion.get(url, timeout=5).status_code, 200)
+            self.assertLess(time.monotonic() - inicio, 1.0)
+            self.assertEqual(politica.coberturas, 1)
+            self.assertEqual(politica.coberturas_ganadoras, 1)
+
+    def test_principal_no_pasa_por_el_pool_de_coberturas(self):
+        # Con el umbral ya calculado, 20 peticiones simultáneas no se encolan
+        # tras los 2 hilos del pool: cada principal corre en su propio hilo
+        configuracion = ConfiguracionSimulada(latencia_ms=100)
+        with ServidorSimulado(configuracion) as servidor, patch.object(Config, 'HEDGE_MAX_WORKERS', 2):
+            politica = self.crear_politica(cobertura=True, latencias=RegistroLatencias(95, min_muestras=5))
+            sesion = SesionPlanificada(PlanificadorPeticiones({}), politica)
+            url = f"{servidor.url}/v0/topstories.json"
+            for _ in range(5):
+                sesion.get(url, timeout=5)
+            self.assertIsNotNone(politica.latencias.umbral(clave_endpoint(url)))
+
+            estados = []
+            hilos = [threading.Thread(target=lambda: estados.append(sesion.get(url, timeout=5).status_code))
+                     for _ in range(20)]
+            inicio = time.monotonic()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.monotonic() - inicio
+
+        self.assertEqual(estados, [200] * 20)
+        self.assertLess(duracion, 0.6)  # a través del pool: 10 tandas de 100 ms
+
+
+if __name__ == "__main__":
+    unittest.main()
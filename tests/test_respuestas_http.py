@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE COMPRESIÓN Y CABECERAS DE CACHÉ
+
+Verifica la compresión negociada con umbral, los ETag con respuesta 304 y el
+Cache-Control derivado de los TTL de los componentes.
+"""
+import sys
+import os
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+from werkzeug.datastructures import Accept
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.models.informacion_models import InformacionClima, InformacionCompleta
+from src.utils.config import Config
+from src.utils.respuestas_http import cache_control, elegir_codificacion, ttl_componentes
+
+
+class TestRespuestasHttp(unittest.TestCase):
+    """Tests de las respuestas de la web"""
+
+    def setUp(self):
+        self.cliente = web_app.app.test_client()
+
+    def test_elegir_codificacion(self):
+        aceptadas = Accept([('gzip', 1)])
+        self.assertEqual(elegir_codificacion(aceptadas, 5000, umbral=1024), 'gzip')
+        self.assertIsNone(elegir_codificacion(aceptadas, 100, umbral=1024))
+        self.assertIsNone(elegir_codificacion(Accept([]), 5000, umbral=1024))
+
+    def test_ttl_y_cache_control(self):
+        with patch.multiple(Config, WEATHER_CACHE_TTL=600, COUNTRY_CACHE_TTL=86400):
+            self.assertEqual(ttl_componentes(['clima', 'pais']), 600)
+        self.assertEqual(cache_control(None), 'no-store')
+        self.assertEqual(cache_control(60), 'public, max-age=60')
+
+    def test_facade_info_precalculada(self):
+        respuesta = self.cliente.get('/api/facade-info', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(respuesta.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(respuesta.data))['patron'], 'Facade')
+
+        repetida = self.cliente.get('/api/facade-info', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': respuesta.headers['ETag']
+        })
+        self.assertEqual(repetida.status_code, 304)
+
+        sin_comprimir = self.cliente.get('/api/facade-info')
+        self.assertNotIn('Content-Encoding', sin_comprimir.headers)
+        self.assertEqual(sin_comprimir.get_json()['patron'], 'Facade')
+
+    def test_etag_en_get_dinamico(self):
+        with patch.object(web_app.facade, 'buscar_noticias', return_value=[]), \
+                patch.object(web_app.time, 'perf_counter', return_value=1.0):
+            respuesta = self.cliente.get('/api/buscar-noticias?q=python')
+            repetida = self.cliente.get('/api/buscar-noticias?q=python',
+                                        headers={'If-None-Match': respuesta.headers['ETag']})
+        self.assertNotIn('Content-Encoding', respuesta.headers)  # por debajo del umbral
+        self.assertEqual(repetida.status_code, 304)
+
+    def test_consultar_cache_control_y_compresion(self):
+        informacion = InformacionCompleta(ciudad_consultada='Madrid')
+        informacion.clima = InformacionClima(
+            temperatura=21.5, sensacion_termica=20.0, humedad=55, descripcion="Despejado " * 150,
+            ciudad='Madrid', pais='España', icono='01d', presion=1013
+        )
+        with patch.object(web_app.facade, 'obtener_informacion_completa', return_value=informacion):
+            respuesta = self.cliente.post('/api/consultar', json={'ciudad': 'Madrid', 'componentes': 'clima'},
+                                          headers={'Accept-Encoding': 'gzip'})
+            informacion.errores.append("Error país")
+            con_errores = self.cliente.post('/api/consultar', json={'ciudad': 'Madrid'})
+
+        self.assertEqual(respuesta.headers['Cache-Control'], f"public, max-age={Config.WEATHER_CACHE_TTL}")
+        self.assertEqual(respuesta.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(respuesta.data))['ciudad'], 'Madrid')
+        self.assertEqual(con_errores.headers['Cache-Control'], 'no-store')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LAS TRAZAS POR PETICIÓN
+
+Verifica el enlace padre/hijo de los spans, su propagación a hilos y tareas
+de asyncio, los exportadores (búfer circular y archivo OTLP) y los spans de
+la fachada y de las peticiones HTTP a los servidores simulados.
+"""
+import sys
+import os
+import asyncio
+import contextvars
+import json
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from benchmarks.servidor_grabacion import urls_para
+from benchmarks.servidores_simulados import ServidorSimulado
+from src.facade.informacion_facade import FachadaInformacionCiudad
+from src.utils import trazas
+from src.utils.config import Config
+from src.utils.trazas import ExportadorArchivo, ExportadorMemoria, Trazador, anotar
+
+
+class TestTrazador(unittest.TestCase):
+    """Tests del trazador y los exportadores"""
+
+    def setUp(self):
+        self.memoria = ExportadorMemoria(capacidad=50)
+        self.trazador = Trazador([self.memoria], activo=True)
+
+    def test_spans_anidados(self):
+        with self.trazador.span("raiz", ciudad="Lima") as raiz:
+            with self.trazador.span("hijo") as hijo:
+                anotar(cache=True)
+        self.assertEqual(hijo.traza_id, raiz.traza_id)
+        self.assertEqual(hijo.padre_id, raiz.span_id)
+        self.assertIsNone(raiz.padre_id)
+        self.assertEqual(hijo.atributos, {'cache': True})
+
+        traza = self.memoria.trazas()[0]
+        self.assertEqual(traza['nombre'], "raiz")
+        self.assertEqual([s['nombre'] for s in traza['spans']], ["raiz", "hijo"])
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            with self.trazador.span("falla"):
+                raise ValueError("sin datos")
+        span = self.memoria.spans()[0]
+        self.assertEqual(span['estado'], 'error')
+        self.assertIn("sin datos", span['error'])
+
+    def test_propagacion_a_hilos_y_tareas(self):
+        async def tarea():
+            with self.trazador.span("tarea"):
+                await asyncio.sleep(0)
+
+        with self.trazador.span("raiz") as raiz:
+            hilo = threading.Thread(target=contextvars.copy_context().run,
+                                    args=(self._span_en_hilo,))
+            hilo.start()
+            hilo.join()
+            asyncio.run(tarea())
+
+        hijos = {s['nombre']: s for s in self.memoria.spans() if s['padre_id']}
+        self.assertEqual(hijos['en_hilo']['padre_id'], raiz.span_id)
+        self.assertNotEqual(hijos['en_hilo']['hilo'], threading.current_thread().name)
+        self.assertEqual(hijos['tarea']['padre_id'], raiz.span_id)
+
+    def _span_en_hilo(self):
+        with self.trazador.span("en_hilo"):
+            pass
+
+    def test_bufer_circular(self):
+        memoria = ExportadorMemoria(capacidad=3)
+        trazador = Trazador([memoria], activo=True)
+        for i in range(5):
+            with trazador.span(f"span{i}"):
+                pass
+        self.assertEqual([s['nombre'] for s in memoria.spans()], ["span2", "span3", "span4"])
+        self.assertEqual(memoria.trazas(limite=1)[0]['nombre'], "span4")
+
+    def test_desactivado(self):
+        trazador = Trazador([self.memoria], activo=False)
+        with trazador.span("nada") as span:
+            span.anotar(x=1)
+            anotar(y=2)
+        self.assertEqual(self.memoria.spans(), [])
+
+    def test_exportador_archivo(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "trazas.jsonl")
+            trazador = Trazador([ExportadorArchivo(ruta)], activo=True)
+            with trazador.span("raiz"):
+                with trazador.span("hijo", estado=200, cache=False):
+                    pass
+            with open(ruta, encoding='utf-8') as archivo:
+                lineas = [json.loads(linea) for linea in archivo]
+
+        hijo, raiz = lineas
+        self.assertEqual(hijo['parentSpanId'], raiz['spanId'])
+        self.assertEqual(hijo['traceId'], raiz['traceId'])
+        atributos = {a['key']: a['value'] for a in hijo['attributes']}
+        self.assertEqual(atributos['estado'], {'intValue': '200'})
+        self.assertEqual(atributos['cache'], {'boolValue': False})
+        self.assertGreaterEqual(int(hijo['endTimeUnixNano']), int(hijo['startTimeUnixNano']))
+
+
+class TestTrazasFachada(unittest.TestCase):
+    """Spans de la fachada, los proveedores y la web"""
+
+    def setUp(self):
+        trazas.memoria.limpiar()
+
+    def test_spans_http_con_servidores_simulados(self):
+        with ServidorSimulado() as servidor:
+            with patch.multiple(Config, USE_MOCK_DATA=False, ENABLE_FALLBACK=False, **urls_para(servidor.url)):
+                facade = FachadaInformacionCiudad()
+                facade.obtener_informacion_completa("Lima", componentes=['clima'], tiempo_maximo_ms=5000)
+                facade.obtener_informacion_completa("Lima", componentes=['clima'])
+
+        segunda, primera = trazas.memoria.trazas(limite=2)
+        nombres = [s['nombre'] for s in primera['spans']]
+        self.assertEqual(nombres[:2], ["facade.obtener_informacion_completa", "facade.clima"])
+        http = [s for s in primera['spans'] if s['nombre'].startswith("HTTP GET")]
+        self.assertEqual(len(http), 2)  # geocoding + forecast
+        self.assertTrue(all(s['atributos']['estado'] == 200 and s['atributos']['bytes'] > 0 for s in http))
+        clima = primera['spans'][1]
+        self.assertFalse(clima['atributos']['cache_coordenadas'])
+        self.assertNotEqual(clima['hilo'], threading.current_thread().name)  # consulta con plazo
+
+        # Segunda consulta: todo sale de caché, sin peticiones HTTP
+        clima = segunda['spans'][1]
+        self.assertTrue(clima['atributos']['cache_coordenadas'])
+        self.assertTrue(clima['atributos']['cache_clima'])
+        self.assertEqual(len(segunda['spans']), 2)
+
+    def test_endpoint_de_depuracion(self):
+        cliente = web_app.app.test_client()
+        with patch.object(Config, 'USE_MOCK_DATA', True):
+            respuesta = cliente.post('/api/consultar', json={'ciudad': 'Madrid', 'componentes': ['pais']})
+        traza_id = respuesta.headers['X-Trace-Id']
+
+        self.assertEqual(cliente.get('/api/debug/trazas').status_code, 403)
+        with patch.object(Config, 'ADMIN_TOKEN', 'secreto'):
+            self.assertEqual(cliente.get('/api/debug/trazas', headers={'X-Admin-Token': 'otro'}).status_code, 403)
+            data = cliente.get(f'/api/debug/trazas?traza={traza_id}',
+                               headers={'X-Admin-Token': 'secreto'}).get_json()
+        self.assertEqual(data['total'], 1)
+        spans = data['trazas'][0]['spans']
+        self.assertEqual(data['trazas'][0]['nombre'], "POST /api/consultar")
+        self.assertTrue(any(s['nombre'] == "facade.pais" and s['atributos']['simulado'] for s in spans))
+
+        for limite in (0, -1):
+            with patch.object(Config, 'ADMIN_TOKEN', 'secreto'):
+                data = cliente.get(f'/api/debug/trazas?limite={limite}',
+                                   headers={'X-Admin-Token': 'secreto'}).get_json()
+            self.assertEqual(data['total'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
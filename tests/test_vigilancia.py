@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+🧪 TESTS DE LA VIGILANCIA DEL CLIMA POR SUSCRIPCIÓN
+
+Verifica que hay un solo bucle de refresco por ciudad sea cual sea el número
+de suscriptores, que solo se publican los campos que cambian, que el bucle
+se detiene con la última cancelación, la resincronización de un cliente
+lento y el endpoint SSE /api/vigilar.
+"""
+import sys
+import os
+import json
+import threading
+import time
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_app
+from src.models.informacion_models import InformacionClima
+from src.utils.config import Config
+from src.utils.vigilancia import SuscripcionesAgotadas, VigilanteClima, diferencias
+
+CLIMA = InformacionClima(temperatura=18.0, sensacion_termica=17.0, humedad=60, descripcion="Despejado",
+                         ciudad="Madrid", pais="Spain", icono="01d", presion=1015)
+
+
+class ClimaCambiante:
+    """Fuente de prueba: cuenta consultas por ciudad y devuelve el valor que se le fije"""
+
+    def __init__(self):
+        self.valor = CLIMA
+        self.consultas = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, ciudad):
+        with self._lock:
+            self.consultas[ciudad] = self.consultas.get(ciudad, 0) + 1
+        if isinstance(self.valor, Exception):
+            raise self.valor
+        return self.valor
+
+
+class TestVigilante(unittest.TestCase):
+    """Tests del bucle compartido y los deltas"""
+
+    def setUp(self):
+        self.fuente = ClimaCambiante()
+        self.vigilante = VigilanteClima(self.fuente, intervalo=0.05)
+
+    def test_diferencias(self):
+        self.assertEqual(diferencias({'a': 1, 'b': 2}, {'a': 1, 'b': 3, 'c': 4}), {'b': 3, 'c': 4})
+        self.assertEqual(diferencias(None, {'a': 1}), {'a': 1})
+
+    def test_un_bucle_por_ciudad(self):
+        suscripciones = [self.vigilante.suscribir(['Madrid', 'madrid ']) for _ in range(20)]
+        suscripciones.append(self.vigilante.suscribir(['Lima', 'Madrid']))
+        for suscripcion in suscripciones:
+            evento = suscripcion.siguiente(timeout=1)
+            self.assertEqual(evento['tipo'], 'estado')
+            self.assertEqual(evento['datos']['temperatura'], 18.0)
+
+        time.sleep(0.3)
+        for suscripcion in suscripciones:
+            suscripcion.cancelar()
+
+        self.assertEqual(set(self.fuente.consultas), {'madrid', 'lima'})
+        self.assertLess(self.fuente.consultas['madrid'], 10)  # ~6 refrescos, no 21 × 6
+        self.assertEqual(self.vigilante.estadisticas()['ciudades'], 0)
+
+    def test_solo_se_publican_los_cambios(self):
+        with self.vigilante.suscribir(['Madrid']) as suscripcion:
+            self.assertEqual(suscripcion.siguiente(timeout=1)['version'], 1)
+            time.sleep(0.15)
+            self.assertIsNone(suscripcion.siguiente(timeout=0))  # sin cambios, sin eventos
+
+            self.fuente.valor = replace(CLIMA, temperatura=19.5, icono="02d")
+            evento = suscripcion.siguiente(timeout=1)
+            self.assertEqual(evento, {'tipo': 'cambio', 'ciudad': 'madrid', 'version': 2,
+                                      'cambios': {'temperatura': 19.5, 'icono': '02d'}})
+
+            self.fuente.valor = RuntimeError("API caída")
+            self.assertEqual(suscripcion.siguiente(timeout=1)['tipo'], 'error')
+            time.sleep(0.15)
+            self.assertIsNone(suscripcion.siguiente(timeout=0))  # el error se notifica una vez
+
+    def test_nuevo_suscriptor_recibe_el_estado_sin_consultar(self):
+        with self.vigilante.suscribir(['Madrid']) as primera:
+            primera.siguiente(timeout=1)
+            consultas = self.fuente.consultas['madrid']
+            with self.vigilante.suscribir(['Madrid']) as segunda:
+                self.assertEqual(segunda.siguiente(timeout=0)['tipo'], 'estado')
+            self.assertLessEqual(self.fuente.consultas['madrid'] - consultas, 1)
+
+    def test_bucle_se_detiene_al_cancelar(self):
+        suscripcion = self.vigilante.suscribir(['Madrid'])
+        suscripcion.siguiente(timeout=1)
+        suscripcion.cancelar()
+        time.sleep(0.1)
+        consultas = self.fuente.consultas['madrid']
+        time.sleep(0.2)
+        self.assertEqual(self.fuente.consultas['madrid'], consultas)
+
+    def test_cliente_lento_se_resincroniza(self):
+        with patch.object(Config, 'WATCH_QUEUE_SIZE', 2):
+            vigilante = VigilanteClima(self.fuente, intervalo=3600)
+            with vigilante.suscribir(['Madrid']) as suscripcion:
+                time.sleep(0.1)
+                vigilada = vigilante._ciudades['madrid']
+                for temperatura in (20, 21, 22, 23):
+                    self.fuente.valor = replace(CLIMA, temperatura=temperatura)
+                    vigilante.refrescar(vigilada)
+
+                self.assertGreater(suscripcion.descartados, 0)
+                evento = suscripcion.siguiente(timeout=0)
+                self.assertEqual((evento['tipo'], evento['datos']['temperatura']), ('estado', 23))
+                self.assertIsNone(suscripcion.siguiente(timeout=0))
+
+    def test_limites(self):
+        with self.assertRaises(ValueError):
+            self.vigilante.suscribir([' '])
+        with patch.object(Config, 'WATCH_MAX_SUBSCRIBERS', 1):
+            with self.vigilante.suscribir(['Madrid']):
+                with self.assertRaises(SuscripcionesAgotadas):
+                    self.vigilante.suscribir(['Lima'])
+
+
+class TestEndpoint(unittest.TestCase):
+    """Tests de GET /api/vigilar (Server-Sent Events)"""
+
+    def setUp(self):
+        self.cliente = web_app.app.test_client()
+
+    def test_flujo_de_eventos(self):
+        with patch.object(Config, 'USE_MOCK_DATA', True):
+            respuesta = self.cliente.get('/api/vigilar?ciudades=Madrid,Lima', buffered=False)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertEqual(respuesta.mimetype, 'text/event-stream')
+
+            trozos = respuesta.response
+            self.assertTrue(next(trozos).decode().startswith('retry:'))
+            eventos = [next(trozos).decode() for _ in range(2)]
+            respuesta.close()
+
+        ciudades = set()
+        for evento in eventos:
+            lineas = dict(linea.split(': ', 1) for linea in evento.strip().split('\n'))
+            self.assertEqual(lineas['event'], 'estado')
+            ciudades.add(json.loads(lineas['data'])['ciudad'])
+        self.assertEqual(ciudades, {'madrid', 'lima'})
+        self.assertEqual(web_app.facade.vigilante.estadisticas()['suscripciones'], 0)
+
+    def test_sin_ciudades(self):
+        self.assertEqual(self.cliente.get('/api/vigilar').status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
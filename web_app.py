@@ -12,24 +12,279 @@ APIs utilizadas (todas gratuitas):
 """
 import sys
 import os
-from flask import Flask, render_template, request, jsonify
+import atexit
+import functools
+import hmac
+import signal
+import threading
+from flask import Flask, Response, g, redirect, render_template, request, jsonify, url_for
 from flask_cors import CORS
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 
 # Añadir el directorio actual al path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.facade.informacion_facade import FachadaInformacionCiudad
-from src.utils.config import Config
+from src.facade.informacion_facade import COMPONENTES, FachadaInformacionCiudad
+from src.utils.config import AJUSTES_CON_REINICIO, Config
+from src.utils import compartimentos
+from src.utils.compartimentos import CompartimentoLleno, crear_compartimentos
+from src.utils.limitador import PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, planificador, prioridad
+from src.utils.perfilado import perfilador
+from src.utils.purgas import NotificadorPurgas
+from src.utils.reintentos import politica
+from src.utils.respuestas_http import (
+    RespuestaPrecalculada, cache_control, calcular_etag, comprimir, elegir_codificacion, ttl_componentes
+)
+from src.utils.texto import normalizar_nombre
+from src.utils import trazas
+from src.utils.trazas import trazador
+from src.utils.vigilancia import SuscripcionesAgotadas
 
 # Crear aplicación Flask
 app = Flask(__name__)
 CORS(app)  # Permitir CORS para desarrollo
 
-# Instancia global del Facade
+# Instancia global del Facade (barata: los proveedores se crean con la primera consulta,
+# así los workers pre-fork no abren sesiones ni hilos antes de hacer fork)
 facade = FachadaInformacionCiudad()
 
+# Purga de la CDN por Surrogate-Key cuando se refrescan las cachés
+purgas = NotificadorPurgas()
+facade.conectar_purgas(purgas)
+
+# Arranque en caliente: restaurar cachés del despliegue anterior, guardarlas al
+# salir y precargar en segundo plano las ciudades más consultadas
+if Config.CACHE_SNAPSHOT_FILE:
+    facade.restaurar_cache()
+    atexit.register(facade.guardar_cache)
+if Config.WARMUP_CITIES:
+    threading.Thread(target=facade.precalentar, name="precalentamiento", daemon=True).start()
+
+
+# Compartimentos por clase de cliente: los lotes no pueden agotar los hilos
+# de los usuarios interactivos
+compartimentos_clientes = crear_compartimentos(
+    Config.BULKHEADS_CLIENTS, Config.BULKHEAD_MAX_WAIT, Config.BULKHEAD_RETRY_AFTER
+)
+
+
+def clase_cliente() -> str:
+    """Clase del cliente según la cabecera X-Clase-Cliente (por defecto interactivo)"""
+    clase = request.headers.get('X-Clase-Cliente', 'interactivo').strip().lower()
+    return clase if clase in compartimentos_clientes else 'interactivo'
+
+
+def con_admision(vista):
+    """
+    Control de admisión: la petición ocupa un hueco del compartimento de su
+    clase de cliente o se rechaza al momento con 503 y Retry-After
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        clase = clase_cliente()
+        compartimento = compartimentos_clientes.get(clase)
+        if compartimento is None:
+            return vista(*args, **kwargs)
+        try:
+            compartimento.entrar()
+        except CompartimentoLleno as e:
+            respuesta = jsonify({
+                'success': False,
+                'error': 'Servidor saturado, inténtalo de nuevo en unos segundos'
+            })
+            respuesta.status_code = 503
+            respuesta.headers['Retry-After'] = str(int(e.reintentar_en))
+            return respuesta
+        try:
+            with prioridad(PRIORIDAD_LOTE if clase == 'lotes' else PRIORIDAD_INTERACTIVA):
+                return vista(*args, **kwargs)
+        finally:
+            compartimento.salir()
+    return envoltura
+
+
+@app.before_request
+def iniciar_perfilado_peticion():
+    """Cuenta (y en modo cprofile perfila) las peticiones a la API mientras hay un perfilado activo"""
+    if perfilador.activo and request.path.startswith('/api/') and not request.path.startswith('/api/admin/'):
+        g.perfilada = True
+        g.perfil = perfilador.antes_de_peticion()
+
+
+@app.teardown_request
+def terminar_perfilado_peticion(error=None):
+    if g.get('perfilada'):
+        perfilador.despues_de_peticion(g.get('perfil'))
+
+
+@app.after_request
+def comprimir_y_validar(respuesta):
+    """
+    Comprime las respuestas JSON grandes según Accept-Encoding y, en GET,
+    añade ETag y responde 304 si el cliente ya tiene esa versión
+    """
+    if respuesta.direct_passthrough or respuesta.mimetype != 'application/json' \
+            or 'Content-Encoding' in respuesta.headers:
+        return respuesta
+    cuerpo = respuesta.get_data()
+    codificacion = elegir_codificacion(request.accept_encodings, len(cuerpo))
+    respuesta.vary.add('Accept-Encoding')
+    if request.method in ('GET', 'HEAD') and respuesta.status_code == 200 and not respuesta.get_etag()[0]:
+        respuesta.set_etag(calcular_etag(cuerpo, codificacion))
+        respuesta.make_conditional(request)
+        if respuesta.status_code == 304:
+            return respuesta
+    if codificacion:
+        respuesta.set_data(comprimir(cuerpo, codificacion))
+        respuesta.headers['Content-Encoding'] = codificacion
+    return respuesta
+
+
+def responder_precalculada(precalculada: RespuestaPrecalculada) -> Response:
+    """Sirve un cuerpo precalculado (ya comprimido) con su ETag y Cache-Control"""
+    cuerpo, codificacion, etag = precalculada.variante(request.accept_encodings)
+    respuesta = Response(cuerpo, mimetype=precalculada.tipo)
+    if codificacion:
+        respuesta.headers['Content-Encoding'] = codificacion
+    respuesta.vary.add('Accept-Encoding')
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = precalculada.cache_control
+    return respuesta.make_conditional(request)
+
+
+def leer_seleccion(componentes, tiempo_maximo_ms):
+    """
+    Interpreta la selección de componentes y el plazo máximo de una consulta
+
+    Raises:
+        ValueError: si el plazo no es un número
+    """
+    if isinstance(componentes, str):
+        componentes = componentes.split(',')
+    try:
+        tiempo_maximo_ms = float(tiempo_maximo_ms) if tiempo_maximo_ms is not None else None
+    except (TypeError, ValueError):
+        raise ValueError('tiempo_maximo_ms debe ser un número')
+    return componentes, tiempo_maximo_ms
+
+
+def ttl_respuesta(informacion) -> int:
+    """
+    Segundos que se puede cachear la respuesta: el menor TTL de los componentes
+    incluidos; 0 si es parcial, tiene errores o incluye datos simulados o de respaldo
+    """
+    if informacion.tiene_errores() or informacion.pendientes or informacion.tiene_datos_simulados():
+        return 0
+    return ttl_componentes([c for c in COMPONENTES if getattr(informacion, c)]) or 0
+
+
+def respuesta_informacion(informacion):
+    """Convierte una InformacionCompleta en la respuesta JSON con cabeceras de caché"""
+    # Convertir a formato JSON para la respuesta
+    resultado = {
+        'success': True,
+        'ciudad': informacion.ciudad_consultada,
+        'timestamp': informacion.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        'clima': None,
+        'noticias': None,
+        'pais': None,
+        'calidad_aire': None,
+        'tipo_cambio': None,
+        'errores': informacion.errores,
+        'pendientes': informacion.pendientes,
+        'info_disponible': informacion.informacion_disponible()
+    }
+    
+    # Procesar información climática
+    if informacion.clima:
+        resultado['clima'] = {
+            'temperatura': informacion.clima.temperatura,
+            'sensacion_termica': informacion.clima.sensacion_termica,
+            'humedad': informacion.clima.humedad,
+            'descripcion': informacion.clima.descripcion,
+            'ciudad': informacion.clima.ciudad,
+            'pais': informacion.clima.pais,
+            'icono': informacion.clima.icono,
+            'presion': informacion.clima.presion
+        }
+    
+    # Procesar noticias
+    if informacion.noticias:
+        resultado['noticias'] = {
+            'total_resultados': informacion.noticias.total_resultados,
+            'pais': informacion.noticias.pais,
+            'fuente_api': informacion.noticias.fuente_api,
+            'articulos': []
+        }
+        
+        for noticia in informacion.noticias.noticias[:5]:  # Máximo 5 noticias
+            resultado['noticias']['articulos'].append({
+                'titulo': noticia.titulo,
+                'descripcion': noticia.descripcion,
+                'url': noticia.url,
+                'fuente': noticia.fuente,
+                'fecha_publicacion': noticia.fecha_publicacion
+            })
+    
+    # Procesar información del país
+    if informacion.pais:
+        resultado['pais'] = {
+            'nombre_comun': informacion.pais.nombre_comun,
+            'nombre_oficial': informacion.pais.nombre_oficial,
+            'capital': informacion.pais.capital,
+            'poblacion': informacion.pais.poblacion,
+            'area': informacion.pais.area,
+            'region': informacion.pais.region,
+            'subregion': informacion.pais.subregion,
+            'idiomas': informacion.pais.idiomas,
+            'monedas': informacion.pais.monedas,
+            'codigo_pais': informacion.pais.codigo_pais,
+            'bandera_emoji': informacion.pais.bandera_emoji
+        }
+    
+    # Procesar calidad del aire
+    if informacion.calidad_aire:
+        resultado['calidad_aire'] = {
+            'indice_europeo': informacion.calidad_aire.indice_europeo,
+            'nivel': informacion.calidad_aire.nivel,
+            'ciudad': informacion.calidad_aire.ciudad,
+            'indice_eeuu': informacion.calidad_aire.indice_eeuu,
+            'pm2_5': informacion.calidad_aire.pm2_5,
+            'pm10': informacion.calidad_aire.pm10,
+            'dioxido_nitrogeno': informacion.calidad_aire.dioxido_nitrogeno,
+            'ozono': informacion.calidad_aire.ozono,
+            'monoxido_carbono': informacion.calidad_aire.monoxido_carbono
+        }
+    
+    # Procesar tipo de cambio
+    if informacion.tipo_cambio:
+        resultado['tipo_cambio'] = {
+            'monedas': informacion.tipo_cambio.monedas,
+            'equivalencias': informacion.tipo_cambio.equivalencias,
+            'moneda_base': informacion.tipo_cambio.moneda_base,
+            'actualizada': informacion.tipo_cambio.actualizada,
+            'fuente_api': informacion.tipo_cambio.fuente_api
+        }
+    
+    respuesta = jsonify(resultado)
+    respuesta.headers['Cache-Control'] = cache_control(ttl_respuesta(informacion))
+    return respuesta
+
+
+def trazado(vista):
+    """Abre el span raíz de la petición y devuelve su identificador en X-Trace-Id"""
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        with trazador.span(f"{request.method} {request.url_rule.rule}", clase_cliente=clase_cliente()) as span:
+            respuesta = app.make_response(vista(*args, **kwargs))
+            span.anotar(estado=respuesta.status_code)
+        if span.traza_id:
+            respuesta.headers['X-Trace-Id'] = span.traza_id
+        return respuesta
+    return envoltura
+
 
 @app.route('/')
 def index():
@@ -38,6 +293,8 @@ def index():
 
 
 @app.route('/api/consultar', methods=['POST'])
+@trazado
+@con_admision
 def consultar_ciudad():
     """
     API endpoint que usa el patrón Facade para obtener información completa
@@ -52,72 +309,31 @@ def consultar_ciudad():
                 'error': 'Por favor ingresa el nombre de una ciudad'
             }), 400
         
+        # Selección opcional de componentes ("clima,pais" o ["clima", "pais"]) y
+        # plazo máximo: lo que no llegue a tiempo se devuelve en 'pendientes'
+        try:
+            componentes, tiempo_maximo_ms = leer_seleccion(data.get('componentes'), data.get('tiempo_maximo_ms'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
         print(f"Consultando información de: {ciudad}")
         
         # AQUÍ ES DONDE SE USA EL PATRÓN FACADE
         # Una sola llamada obtiene información de múltiples APIs
-        informacion = facade.obtener_informacion_completa(ciudad)
-        
-        # Convertir a formato JSON para la respuesta
-        resultado = {
-            'success': True,
-            'ciudad': informacion.ciudad_consultada,
-            'timestamp': informacion.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'clima': None,
-            'noticias': None,
-            'pais': None,
-            'errores': informacion.errores,
-            'info_disponible': informacion.informacion_disponible()
-        }
-        
-        # Procesar información climática
-        if informacion.clima:
-            resultado['clima'] = {
-                'temperatura': informacion.clima.temperatura,
-                'sensacion_termica': informacion.clima.sensacion_termica,
-                'humedad': informacion.clima.humedad,
-                'descripcion': informacion.clima.descripcion,
-                'ciudad': informacion.clima.ciudad,
-                'pais': informacion.clima.pais,
-                'icono': informacion.clima.icono,
-                'presion': informacion.clima.presion
-            }
-        
-        # Procesar noticias
-        if informacion.noticias:
-            resultado['noticias'] = {
-                'total_resultados': informacion.noticias.total_resultados,
-                'pais': informacion.noticias.pais,
-                'fuente_api': informacion.noticias.fuente_api,
-                'articulos': []
-            }
-            
-            for noticia in informacion.noticias.noticias[:5]:  # Máximo 5 noticias
-                resultado['noticias']['articulos'].append({
-                    'titulo': noticia.titulo,
-                    'descripcion': noticia.descripcion,
-                    'url': noticia.url,
-                    'fuente': noticia.fuente,
-                    'fecha_publicacion': noticia.fecha_publicacion
-                })
-        
-        # Procesar información del país
-        if informacion.pais:
-            resultado['pais'] = {
-                'nombre_comun': informacion.pais.nombre_comun,
-                'nombre_oficial': informacion.pais.nombre_oficial,
-                'capital': informacion.pais.capital,
-                'poblacion': informacion.pais.poblacion,
-                'area': informacion.pais.area,
-                'region': informacion.pais.region,
-                'subregion': informacion.pais.subregion,
-                'idiomas': informacion.pais.idiomas,
-                'monedas': informacion.pais.monedas,
-                'codigo_pais': informacion.pais.codigo_pais,
-                'bandera_emoji': informacion.pais.bandera_emoji
-            }
+        try:
+            informacion = facade.obtener_informacion_completa(
+                ciudad, componentes=componentes, tiempo_maximo_ms=tiempo_maximo_ms
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        return jsonify(resultado)
+        return respuesta_informacion(informacion)
         
     except Exception as e:
         print(f"Error en consulta: {str(e)}")
@@ -127,34 +343,277 @@ def consultar_ciudad():
         }), 500
 
 
+@app.route('/api/ciudad/<nombre>')
+@trazado
+@con_admision
+def consultar_ciudad_get(nombre):
+    """
+    Versión GET (cacheable por CDN/proxy) de /api/consultar
+
+    La URL canónica usa el nombre en minúsculas y sin tildes; otras variantes
+    redirigen (301) a ella. Parámetros opcionales: componentes, tiempo_maximo_ms.
+    """
+    canonico = normalizar_nombre(nombre)
+    if not canonico:
+        return jsonify({
+            'success': False,
+            'error': 'Por favor ingresa el nombre de una ciudad'
+        }), 400
+    if canonico != nombre:
+        destino = url_for('consultar_ciudad_get', nombre=canonico)
+        if request.query_string:
+            destino += '?' + request.query_string.decode('utf-8')
+        return redirect(destino, code=301)
+    
+    try:
+        componentes, tiempo_maximo_ms = leer_seleccion(
+            request.args.get('componentes'), request.args.get('tiempo_maximo_ms')
+        )
+        informacion = facade.obtener_informacion_completa(
+            canonico, componentes=componentes, tiempo_maximo_ms=tiempo_maximo_ms
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error en consulta: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }), 500
+    
+    respuesta = respuesta_informacion(informacion)
+    respuesta.headers['Surrogate-Key'] = ' '.join(facade.claves_sustitutas(informacion))
+    ttl = ttl_respuesta(informacion)
+    if ttl:
+        respuesta.headers['Surrogate-Control'] = f"max-age={ttl}"
+    return respuesta
+
+
+@app.route('/api/autocomplete')
+def autocompletar():
+    """
+    Sugerencias de ciudades para el buscador (índice en memoria, sin llamar a las APIs)
+
+    Parámetros: q (prefijo), limite (opcional, por defecto 8)
+    """
+    prefijo = request.args.get('q', '').strip()
+    limite = max(1, min(request.args.get('limite', 8, type=int), 50))
+    inicio = time.perf_counter()
+    sugerencias = facade.autocompletar(prefijo, limite) if prefijo else []
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    respuesta = jsonify({
+        'success': True,
+        'consulta': prefijo,
+        'sugerencias': sugerencias,
+        'tiempo_ms': round(duracion_ms, 3)
+    })
+    respuesta.headers['Cache-Control'] = cache_control(300)
+    return respuesta
+
+
+@app.route('/api/buscar-noticias')
+def buscar_noticias():
+    """
+    Búsqueda offline sobre las noticias ya obtenidas (no llama a Hacker News)
+
+    Parámetros: q (texto), dias (opcional), limite (opcional, por defecto 10)
+    """
+    consulta = request.args.get('q', '').strip()
+    if not consulta:
+        return jsonify({
+            'success': False,
+            'error': 'Por favor indica el texto a buscar (parámetro q)'
+        }), 400
+
+    try:
+        dias = request.args.get('dias', type=int)
+        limite = max(1, min(request.args.get('limite', 10, type=int), 100))
+
+        inicio = time.perf_counter()
+        resultados = facade.buscar_noticias(consulta, dias=dias, limite=limite)
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+
+        return jsonify({
+            'success': True,
+            'consulta': consulta,
+            'total': len(resultados),
+            'tiempo_ms': round(duracion_ms, 3),
+            'resultados': [
+                {
+                    'titulo': r['noticia'].titulo,
+                    'descripcion': r['noticia'].descripcion,
+                    'url': r['noticia'].url,
+                    'fuente': r['noticia'].fuente,
+                    'fecha_publicacion': r['noticia'].fecha_publicacion,
+                    'puntuacion': r['puntuacion']
+                }
+                for r in resultados
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# Intervalos con nombre para /api/historico (también se aceptan segundos)
+INTERVALOS_HISTORICO = {'raw': None, 'hora': 3600, 'dia': 86400, 'semana': 604800}
+
+
+def leer_fecha(texto: str, fin_del_dia: bool = False) -> datetime:
+    """
+    Fecha ISO de un parámetro ('2024-05-01' o '2024-05-01T12:00'), en UTC si no trae zona
+
+    Con `fin_del_dia`, una fecha sin hora cubre el día entero.
+
+    Raises:
+        ValueError: si el texto no es una fecha ISO
+    """
+    fecha = datetime.fromisoformat(texto)
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    if fin_del_dia and len(texto) == 10:
+        fecha += timedelta(days=1, seconds=-1)
+    return fecha
+
+
+@app.route('/api/historico/<nombre>')
+@trazado
+@con_admision
+def historico_ciudad(nombre):
+    """
+    Serie histórica del clima de una ciudad (histórico local + API de archivo)
+
+    Parámetros: dias (por defecto 30), desde/hasta (fechas ISO, opcionales) e
+    intervalo (raw, hora, dia, semana o segundos; por defecto dia)
+    """
+    if facade.historico is None:
+        return jsonify({
+            'success': False,
+            'error': 'El histórico de clima está deshabilitado (configura HISTORY_DIR)'
+        }), 503
+
+    try:
+        dias = request.args.get('dias', 30, type=int)
+        if not 0 < dias <= Config.HISTORY_RETENTION_DAYS:
+            raise ValueError(f"dias debe estar entre 1 y {Config.HISTORY_RETENTION_DAYS}")
+        desde = leer_fecha(request.args['desde']) if request.args.get('desde') else None
+        hasta = leer_fecha(request.args['hasta'], fin_del_dia=True) if request.args.get('hasta') else None
+        intervalo = request.args.get('intervalo', 'dia').strip().lower()
+        intervalo = INTERVALOS_HISTORICO[intervalo] if intervalo in INTERVALOS_HISTORICO else int(intervalo)
+
+        historial = facade.historial_clima(nombre, dias=dias, desde=desde, hasta=hasta, intervalo=intervalo)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error en histórico: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }), 500
+
+    respuesta = jsonify({'success': True, **historial})
+    respuesta.headers['Cache-Control'] = cache_control(300)
+    return respuesta
+
+
+def evento_sse(evento: dict) -> str:
+    """Formatea un evento de vigilancia como Server-Sent Event"""
+    datos = app.json.dumps(evento)
+    return f"id: {evento['ciudad']}:{evento['version']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+
+@app.route('/api/vigilar')
+def vigilar_clima():
+    """
+    Suscripción a cambios del clima (Server-Sent Events) en lugar de sondear /api/consultar
+
+    Parámetros: ciudades (separadas por comas). Se recibe primero el estado
+    completo de cada ciudad y después solo los campos que cambian; un
+    comentario periódico mantiene viva la conexión.
+    """
+    ciudades = [c for c in request.args.get('ciudades', '').split(',') if c.strip()]
+    try:
+        suscripcion = facade.vigilante.suscribir(ciudades)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except SuscripcionesAgotadas as e:
+        respuesta = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        respuesta.status_code = 503
+        respuesta.headers['Retry-After'] = str(int(Config.WATCH_KEEPALIVE))
+        return respuesta
+
+    def eventos():
+        try:
+            yield f"retry: {int(Config.WATCH_KEEPALIVE * 1000)}\n\n"
+            while True:
+                evento = suscripcion.siguiente(timeout=Config.WATCH_KEEPALIVE)
+                yield evento_sse(evento) if evento else ": ping\n\n"
+        finally:
+            suscripcion.cancelar()
+
+    respuesta = Response(eventos(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # sin búfer en nginx
+    })
+    # Si la respuesta se cierra sin llegar a iterarse, el finally del generador no corre
+    respuesta.call_on_close(suscripcion.cancelar)
+    return respuesta
+
+
 @app.route('/api/diagnostico')
 def diagnostico():
     """Endpoint para obtener el estado de las APIs"""
     try:
         # Verificar estado de cada proveedor
         estado_apis = {
-            'clima': facade.clima_provider.verificar_conexion(),
-            'noticias': facade.noticias_provider.verificar_conexion(),
-            'pais': facade.pais_provider.verificar_conexion()
+            componente: facade.proveedor(componente).verificar_conexion()
+            for componente in COMPONENTES
         }
         
         # Información de las APIs
         info_apis = Config.get_status_apis()
         
-        # Configuración actual
+        # Configuración actual (de una misma instantánea)
+        actual = Config.actual()
         configuracion = {
-            'usa_mock_data': Config.USE_MOCK_DATA,
-            'idioma': Config.DEFAULT_LANGUAGE,
-            'unidades': Config.DEFAULT_UNITS,
-            'fallback_habilitado': Config.ENABLE_FALLBACK,
-            'timeout': Config.REQUEST_TIMEOUT
+            'usa_mock_data': actual.USE_MOCK_DATA,
+            'idioma': actual.DEFAULT_LANGUAGE,
+            'unidades': actual.DEFAULT_UNITS,
+            'fallback_habilitado': actual.ENABLE_FALLBACK,
+            'timeout': actual.REQUEST_TIMEOUT,
+            **Config.estado()
         }
         
         return jsonify({
             'success': True,
             'estado_apis': estado_apis,
             'info_apis': info_apis,
-            'configuracion': configuracion
+            'configuracion': configuracion,
+            'limitador': planificador.estadisticas(),
+            'reintentos': politica.estadisticas(),
+            'compartimentos': {
+                'clientes': compartimentos.estadisticas(compartimentos_clientes),
+                'apis': compartimentos.estadisticas(facade.compartimentos)
+            },
+            'purgas': purgas.estadisticas(),
+            'historico': facade.historico.estadisticas() if facade.historico else None,
+            'vigilancia': facade.vigilante.estadisticas(),
+            'memoria': facade.uso_memoria()
         })
         
     except Exception as e:
@@ -164,62 +623,155 @@ def diagnostico():
         }), 500
 
 
-@app.route('/api/facade-info')
-def facade_info():
-    """Endpoint que explica el patrón Facade"""
+def es_administrador() -> bool:
+    """La petición trae el token de administración (X-Admin-Token) configurado"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), Config.ADMIN_TOKEN.encode('utf-8'))
+
+
+@app.route('/api/admin/perfilado', methods=['GET', 'POST', 'DELETE'])
+def admin_perfilado():
+    """
+    Perfilado bajo demanda (requiere ADMIN_TOKEN y la cabecera X-Admin-Token)
+
+    - POST {modo: 'muestreo'|'cprofile', segundos | peticiones, intervalo_ms, esperar}:
+      inicia una sesión; con esperar=true (y segundos) responde al terminar con el resultado
+    - GET: estado y último resultado; ?formato=colapsado devuelve las pilas en texto
+      (una por línea, para flamegraph.pl o speedscope)
+    - DELETE: termina la sesión en curso y devuelve el resultado
+    """
+    if not es_administrador():
+        return jsonify({'success': False, 'error': 'No autorizado'}), 403
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            estado = perfilador.iniciar(
+                modo=data.get('modo', 'muestreo'),
+                segundos=data.get('segundos'),
+                peticiones=data.get('peticiones'),
+                intervalo_ms=data.get('intervalo_ms')
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
+        if data.get('esperar') and data.get('segundos') and not data.get('peticiones'):
+            time.sleep(min(float(data['segundos']), Config.PROFILING_MAX_SECONDS))
+            return jsonify({'success': True, 'resultado': perfilador.detener()})
+        return jsonify({'success': True, 'estado': estado}), 202
+
+    if request.method == 'DELETE':
+        return jsonify({'success': True, 'resultado': perfilador.detener()})
+
+    resultado = perfilador.resultado
+    if request.args.get('formato') == 'colapsado':
+        pilas = (resultado or {}).get('pilas_colapsadas', '')
+        return Response(pilas + '\n' if pilas else '', mimetype='text/plain')
+    return jsonify({'success': True, 'estado': perfilador.estado(), 'resultado': resultado})
+
+
+@app.route('/api/admin/config/recargar', methods=['POST'])
+def admin_recargar_config():
+    """
+    Vuelve a leer la configuración del entorno y del .env y la aplica de una
+    vez (requiere ADMIN_TOKEN). Las consultas en curso terminan con la anterior;
+    'requieren_reinicio' lista los cambiados que no surten efecto hasta reiniciar.
+    """
+    if not es_administrador():
+        return jsonify({'success': False, 'error': 'No autorizado'}), 403
+    cambiados = Config.recargar()
     return jsonify({
-        'patron': 'Facade',
-        'descripcion': 'Proporciona una interfaz unificada a un conjunto de interfaces en un subsistema',
-        'beneficios': [
-            'Simplifica el uso de subsistemas complejos',
-            'Desacopla el cliente de los subsistemas',
-            'Facilita el mantenimiento y evolución',
-            'Centraliza el manejo de errores'
+        'success': True,
+        'cambiados': cambiados,
+        'requieren_reinicio': sorted(AJUSTES_CON_REINICIO.intersection(cambiados)),
+        **Config.estado()
+    })
+
+
+@app.route('/api/debug/trazas')
+def debug_trazas():
+    """
+    Últimas trazas del búfer en memoria, de la más reciente a la más antigua
+    (requiere ADMIN_TOKEN y la cabecera X-Admin-Token)
+
+    Parámetros: limite (por defecto 20), traza (un X-Trace-Id concreto)
+    """
+    if not es_administrador():
+        return jsonify({'success': False, 'error': 'No autorizado'}), 403
+    limite = max(1, min(request.args.get('limite', 20, type=int), 200))
+    lista = trazas.memoria.trazas(limite=limite, traza_id=request.args.get('traza') or None)
+    respuesta = jsonify({
+        'success': True,
+        'activo': trazador.activo,
+        'total': len(lista),
+        'trazas': lista
+    })
+    respuesta.headers['Cache-Control'] = 'no-store'
+    return respuesta
+
+
+# Información estática del patrón: se serializa y comprime una sola vez
+FACADE_INFO = {
+    'patron': 'Facade',
+    'descripcion': 'Proporciona una interfaz unificada a un conjunto de interfaces en un subsistema',
+    'beneficios': [
+        'Simplifica el uso de subsistemas complejos',
+        'Desacopla el cliente de los subsistemas',
+        'Facilita el mantenimiento y evolución',
+        'Centraliza el manejo de errores'
+    ],
+    'implementacion': {
+        'facade_class': 'FachadaInformacionCiudad',
+        'subsistemas': [
+            'ClimaProvider (Open-Meteo API - Gratuita)',
+            'NoticiasProvider (Hacker News API - Gratuita)',
+            'PaisProvider (REST Countries API - Gratuita)'
         ],
-        'implementacion': {
-            'facade_class': 'FachadaInformacionCiudad',
-            'subsistemas': [
-                'ClimaProvider (Open-Meteo API - Gratuita)',
-                'NoticiasProvider (Hacker News API - Gratuita)',
-                'PaisProvider (REST Countries API - Gratuita)'
-            ],
-            'metodo_principal': 'obtener_informacion_completa()',
-            'fallback': 'MockDataProvider (datos simulados)'
+        'metodo_principal': 'obtener_informacion_completa()',
+        'fallback': 'MockDataProvider (datos simulados)'
+    },
+    'apis_utilizadas': {
+        'clima': {
+            'nombre': 'Open-Meteo',
+            'descripcion': 'API meteorológica completamente gratuita',
+            'url': 'https://open-meteo.com/',
+            'caracteristicas': ['Sin registro', 'Sin API key', 'Sin límites estrictos']
         },
-        'apis_utilizadas': {
-            'clima': {
-                'nombre': 'Open-Meteo',
-                'descripcion': 'API meteorológica completamente gratuita',
-                'url': 'https://open-meteo.com/',
-                'caracteristicas': ['Sin registro', 'Sin API key', 'Sin límites estrictos']
-            },
-            'noticias': {
-                'nombre': 'Hacker News API',
-                'descripcion': 'API de noticias tecnológicas gratuita',
-                'url': 'https://hacker-news.firebaseio.com/',
-                'caracteristicas': ['Sin registro', 'Sin API key', 'Noticias tech']
-            },
-            'paises': {
-                'nombre': 'REST Countries',
-                'descripcion': 'API de información de países',
-                'url': 'https://restcountries.com/',
-                'caracteristicas': ['Completamente gratuita', 'Sin límites', 'Datos completos']
-            }
+        'noticias': {
+            'nombre': 'Hacker News API',
+            'descripcion': 'API de noticias tecnológicas gratuita',
+            'url': 'https://hacker-news.firebaseio.com/',
+            'caracteristicas': ['Sin registro', 'Sin API key', 'Noticias tech']
         },
-        'ejemplo_uso': {
-            'sin_facade': [
-                'clima_provider = ClimaProvider()',
-                'noticias_provider = NoticiasProvider()',
-                'pais_provider = PaisProvider()',
-                '# 3 llamadas separadas + coordinación manual'
-            ],
-            'con_facade': [
-                'facade = FachadaInformacionCiudad()',
-                'info = facade.obtener_informacion_completa("Madrid")',
-                '# Una sola llamada para todo!'
-            ]
+        'paises': {
+            'nombre': 'REST Countries',
+            'descripcion': 'API de información de países',
+            'url': 'https://restcountries.com/',
+            'caracteristicas': ['Completamente gratuita', 'Sin límites', 'Datos completos']
         }
-    })
+    },
+    'ejemplo_uso': {
+        'sin_facade': [
+            'clima_provider = ClimaProvider()',
+            'noticias_provider = NoticiasProvider()',
+            'pais_provider = PaisProvider()',
+            '# 3 llamadas separadas + coordinación manual'
+        ],
+        'con_facade': [
+            'facade = FachadaInformacionCiudad()',
+            'info = facade.obtener_informacion_completa("Madrid")',
+            '# Una sola llamada para todo!'
+        ]
+    }
+}
+facade_info_precalculada = RespuestaPrecalculada(f"{app.json.dumps(FACADE_INFO)}\n".encode('utf-8'))
+
+
+@app.route('/api/facade-info')
+def facade_info():
+    """Endpoint que explica el patrón Facade"""
+    return responder_precalculada(facade_info_precalculada)
 
 
 if __name__ == '__main__':
@@ -232,5 +784,11 @@ if __name__ == '__main__':
     print("- Hacker News API (noticias): Completamente gratuita")
     print("- REST Countries (países): Completamente gratuita")
     
+    # SIGTERM (despliegues) debe pasar por atexit para guardar el snapshot
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    # SIGHUP recarga la configuración sin reiniciar
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda *args: Config.recargar())
+    
     # Configurar para desarrollo
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file